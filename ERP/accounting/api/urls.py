@@ -35,6 +35,7 @@ urlpatterns += [
     path('dashboard/metrics/', dashboard_views.dashboard_metrics, name='dashboard_metrics'),
     path('dashboard/export/', dashboard_views.dashboard_export_csv, name='dashboard_export'),
     path('voucher-config/', views.get_voucher_config, name='get_voucher_config'),
+    path('reports/general-ledger/', views.general_ledger_page, name='general_ledger_page'),
     # Field configuration endpoints
     path('vouchers/types/<int:voucher_type_id>/fields/<str:field_name>/', views.get_field_config, name='get_field_config'),
     path('vouchers/configs/', views.save_field_config, name='save_field_config'),
@@ -1,3 +1,5 @@
+from datetime import date
+
 from rest_framework import status, viewsets, mixins, permissions
 from rest_framework.decorators import api_view, permission_classes
 from drf_spectacular.utils import extend_schema, OpenApiTypes
@@ -25,6 +27,7 @@ from accounting.models import (
 
 from usermanagement.utils import PermissionUtils
 from accounting.services.post_journal import post_journal
+from accounting.services.report_service import ReportService
 from .serializers import (
     APPaymentSerializer,
     ARReceiptSerializer,
@@ -441,6 +444,40 @@ class FieldConfigViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
         serializer.save(organization=self.get_organization())
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@extend_schema(
+    responses={200: OpenApiTypes.OBJECT},
+    summary="General ledger page",
+    description="Returns one keyset-paginated page of the general ledger; pass next_cursor back as cursor for the next page"
+)
+def general_ledger_page(request):
+    """
+    Page through the general ledger for the active organization.
+    """
+    organization = request.user.get_active_organization()
+    if not organization:
+        return Response({'detail': 'Active organization required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not PermissionUtils.has_permission(request.user, organization, 'accounting', 'journal', 'view'):
+        return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        start_date = date.fromisoformat(request.GET.get('start_date', ''))
+        end_date = date.fromisoformat(request.GET.get('end_date', ''))
+        account_id = int(request.GET['account_id']) if request.GET.get('account_id') else None
+        page_size = int(request.GET.get('page_size') or 200)
+        service = ReportService(organization)
+        service.set_date_range(start_date, end_date)
+        page = service.generate_general_ledger_page(
+            account_id=account_id,
+            cursor=request.GET.get('cursor') or None,
+            page_size=page_size,
+        )
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(page)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @extend_schema(
@@ -6,4 +6,7 @@ class AccountingConfig(AppConfig):
     name = 'accounting'
     def ready(self):
         # Import signals to ensure they are registered
-        from . import signals  # noqa: F401
\ No newline at end of file
+        from . import signals  # noqa: F401
+        from utils.cache_utils import CacheInvalidationManager
+
+        CacheInvalidationManager.setup_model_signals()
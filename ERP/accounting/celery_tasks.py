@@ -26,6 +26,7 @@ from accounting.models import (
     JournalType,
     RecurringJournal,
 )
+from accounting.services.account_balance_service import AccountBalanceService
 from accounting.services.report_service import ReportService
 from accounting.services.report_export_service import ReportExportService
 
@@ -440,7 +441,7 @@ def _generate_closing_entries(period: AccountingPeriod) -> list:
     accounts = ChartOfAccount.objects.filter(
         organization=organization,
         account_type__nature__in=['income', 'expense']
-    )
+    ).select_related('account_type', 'organization')
     
     for account in accounts:
         balance = _calculate_account_balance(
@@ -476,6 +477,9 @@ def _calculate_account_balance(
 ) -> Decimal:
     """
     Calculate account balance for period.
+
+    Reads the ``AccountPeriodBalance`` rows of the periods lying within the
+    date range instead of scanning journal lines.
     
     Args:
         account: Account to calculate balance for
@@ -485,18 +489,10 @@ def _calculate_account_balance(
     Returns:
         Decimal balance
     """
-    lines = JournalLine.objects.filter(
-        account=account,
-        journal__journal_date__gte=start_date,
-        journal__journal_date__lte=end_date,
-        journal__status='posted'
-    )
-    
-    debit_total = sum(
-        (line.debit_amount or Decimal('0')) for line in lines
-    )
-    credit_total = sum(
-        (line.credit_amount or Decimal('0')) for line in lines
+    debit_total, credit_total = AccountBalanceService(account.organization).period_activity(
+        account.pk,
+        start_date,
+        end_date,
     )
     
     nature = getattr(getattr(account, 'account_type', None), 'nature', '').lower()
@@ -1,4 +1,6 @@
 import logging
+import threading
+from collections import OrderedDict
 from django import forms
 import copy
 from django.forms import modelform_factory, modelformset_factory
@@ -10,6 +12,7 @@ from .widgets import DatePicker, AccountChoiceWidget, TypeaheadInput
 from .forms.journal_form import JournalForm
 from .forms.journal_line_form import JournalLineForm, JournalLineFormSet
 from .models import Journal, JournalLine
+from accounting.schema_loader import schema_hash
 from accounting.schema_validation import validate_ui_schema
 from accounting.services.voucher_errors import VoucherProcessError
 
@@ -303,6 +306,84 @@ def validate_ui_schema_or_raise(ui_schema: dict) -> None:
             summary = f"{summary} (+{len(errors) - 3} more)"
         raise VoucherProcessError("CFG-001", f"Invalid voucher schema: {summary}")
 
+
+class CompiledFormCache:
+    """
+    Per-process LRU of generated form and formset classes.
+
+    Keys combine the voucher config id, a hash of the resolved schema, the
+    organization and the factory options that shape the class, so an edited
+    schema (database row or YAML file) simply produces a new key. Entries for
+    a config are also dropped when its ``VoucherModeConfig`` row changes.
+    """
+
+    MAX_ENTRIES = 512
+    SHAPING_OPTIONS = ('prefix', 'phase', 'user_perms', 'initial', 'disabled_fields', 'normalized', 'extra')
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, kind, schema, organization=None, config_id=None, **options):
+        model = options.get('model')
+        shaping = {name: options.get(name) for name in self.SHAPING_OPTIONS}
+        shaping['model'] = model._meta.label if model is not None else None
+        return (
+            kind,
+            config_id,
+            schema_hash(schema),
+            getattr(organization, 'pk', None),
+            str(getattr(organization, 'base_currency_code_id', None) or ''),
+            schema_hash(shaping),
+        )
+
+    def get(self, key):
+        with self._lock:
+            cls = self._entries.get(key)
+            if cls is not None:
+                self._entries.move_to_end(key)
+            return cls
+
+    def put(self, key, cls):
+        with self._lock:
+            self._entries[key] = cls
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return cls
+
+    def invalidate(self, config_id=None):
+        """Drop entries for one config, or everything when ``config_id`` is None."""
+        with self._lock:
+            if config_id is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == config_id]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+compiled_forms = CompiledFormCache()
+
+
+def _build_cached(kind, schema, factory_kwargs, build, config_id=None):
+    """
+    Return the cached class for ``kind`` or create it with ``build()``.
+
+    ``build`` returns the class and the factory that made it; classes whose
+    factory evaluated choices from the database are not cached.
+    """
+    key = compiled_forms.key(kind, schema, config_id=config_id, **factory_kwargs)
+    cls = compiled_forms.get(key)
+    if cls is not None:
+        return cls
+    cls, factory = build()
+    if factory.cacheable:
+        compiled_forms.put(key, cls)
+    return cls
+
 # Minimal dynamic form builder for schema-driven forms
 
 class VoucherFormFactory:
@@ -505,6 +586,8 @@ class VoucherFormFactory:
         self.disabled_fields = disabled_fields or []
         self.normalized = normalized
         self.kwargs = kwargs
+        # Cleared when a built class embeds database rows (see CompiledFormCache).
+        self.cacheable = True
 
     def _create_field_from_schema(self, config, field_name=None):
         """Create a form field from a schema definition."""
@@ -610,9 +693,11 @@ class VoucherFormFactory:
                             else:
                                 field_class = forms.ChoiceField
                                 field_kwargs['choices'] = [(obj.pk, str(obj)) for obj in queryset]
+                                self.cacheable = False
                         except Exception:
                             field_class = forms.ChoiceField
                             field_kwargs['choices'] = [(obj.pk, str(obj)) for obj in queryset]
+                            self.cacheable = False
                     else:
                         field_class = forms.ModelChoiceField
                         field_kwargs['queryset'] = queryset
@@ -1057,7 +1142,8 @@ class VoucherFormFactory:
         class DynamicForm(BaseForm):
             def __init__(self, *args, **kwargs):
                 if self.form_factory.initial is not None:
-                    kwargs.setdefault('initial', self.form_factory.initial)
+                    # Copy: the class (and its factory) is shared via compiled_forms.
+                    kwargs.setdefault('initial', dict(self.form_factory.initial))
                 if self.form_factory.prefix is not None:
                     kwargs.setdefault('prefix', self.form_factory.prefix)
                 
@@ -1343,6 +1429,7 @@ class VoucherFormFactory:
                 disabled_fields=self.disabled_fields,
             )
             LineForm = temp_factory.build_form()
+            self.cacheable = self.cacheable and temp_factory.cacheable
 
         # Fallback: build a regular form (will pick top-level schema/ header if lines missing)
         if LineForm is None:
@@ -1404,22 +1491,17 @@ class VoucherFormFactory:
         return DynamicFormSet
 
     @staticmethod
-    def get_generic_voucher_form(voucher_config, organization, instance=None, data=None, files=None, **kwargs):
+    def get_generic_voucher_form(voucher_config, organization, **kwargs):
         """
-        Create a generic voucher header form.
+        Create a generic voucher header form class.
+
+        The class comes from ``compiled_forms``; bind ``instance``/``data``/
+        ``files`` when instantiating it.
         """
         form_kwargs = {
-            'configuration': voucher_config,
             'organization': organization,
             **kwargs
         }
-        
-        if instance:
-            form_kwargs['instance'] = instance
-        if data is not None:
-            form_kwargs['data'] = data
-        if files is not None:
-            form_kwargs['files'] = files
         # Provide the header model so FK fields (vendor, etc) are detected properly.
         # The authoritative mapping lives in `accounting.forms_factory`.
         try:
@@ -1428,20 +1510,25 @@ class VoucherFormFactory:
         except Exception:
             pass
         resolved_schema = voucher_config.resolve_ui_schema() if hasattr(voucher_config, 'resolve_ui_schema') else {}
-        validate_ui_schema_or_raise(resolved_schema)
-        normalized_schema = normalize_ui_schema(
-            resolved_schema,
-            header_model=form_kwargs.get('model'),
-            line_model=None,
-            organization=organization,
-        )
-        form_kwargs['configuration'] = normalized_schema
 
-        factory = VoucherFormFactory(normalized=True, **form_kwargs)
-        return factory.build_form()
+        def build():
+            validate_ui_schema_or_raise(resolved_schema)
+            normalized_schema = normalize_ui_schema(
+                resolved_schema,
+                header_model=form_kwargs.get('model'),
+                line_model=None,
+                organization=organization,
+            )
+            factory = VoucherFormFactory(normalized_schema, normalized=True, **form_kwargs)
+            return factory.build_form(), factory
+
+        return _build_cached(
+            'header', resolved_schema, {**form_kwargs, 'normalized': True}, build,
+            config_id=getattr(voucher_config, 'pk', None),
+        )
 
     @staticmethod
-    def build(voucher_config, organization, *, instance=None, data=None, files=None, **kwargs):
+    def build(voucher_config, organization, **kwargs):
         """
         Unified public entry point for voucher form generation.
         Returns (header_form_class, line_formset_class) or 
@@ -1450,17 +1537,11 @@ class VoucherFormFactory:
         header_form_cls = VoucherFormFactory.get_generic_voucher_form(
             voucher_config=voucher_config,
             organization=organization,
-            instance=instance,
-            data=data,
-            files=files,
             **kwargs,
         )
         line_formset_cls = VoucherFormFactory.get_generic_voucher_formset(
             voucher_config=voucher_config,
             organization=organization,
-            instance=instance,
-            data=data,
-            files=files,
             **kwargs,
         )
         
@@ -1477,8 +1558,6 @@ class VoucherFormFactory:
             additional_charges_formset_cls = VoucherFormFactory.get_additional_charges_formset(
                 voucher_config=voucher_config,
                 organization=organization,
-                data=data,
-                files=files,
                 **kwargs,
             )
             return header_form_cls, line_formset_cls, additional_charges_formset_cls
@@ -1649,12 +1728,14 @@ class VoucherFormFactory:
         return PaymentFormSet
 
     @staticmethod
-    def get_generic_voucher_formset(voucher_config, organization, instance=None, data=None, files=None, **kwargs):
+    def get_generic_voucher_formset(voucher_config, organization, **kwargs):
         """
-        Create a generic voucher line formset.
+        Create a generic voucher line formset class.
+
+        The class comes from ``compiled_forms``; bind ``instance``/``data``/
+        ``files`` when instantiating it.
         """
         form_kwargs = {
-            'configuration': voucher_config,
             'organization': organization,
             'prefix': 'lines',
             **kwargs
@@ -1667,32 +1748,62 @@ class VoucherFormFactory:
             form_kwargs['model'] = line_model
         except Exception:
             pass
-        
-        if data is not None:
-            form_kwargs['data'] = data
-        if files is not None:
-            form_kwargs['files'] = files
-        
+
         resolved_schema = voucher_config.resolve_ui_schema() if hasattr(voucher_config, 'resolve_ui_schema') else {}
-        validate_ui_schema_or_raise(resolved_schema)
-        normalized_schema = normalize_ui_schema(
-            resolved_schema,
-            header_model=None,
-            line_model=form_kwargs.get('model'),
-            organization=organization,
-        )
-        form_kwargs['configuration'] = normalized_schema
 
-        factory = VoucherFormFactory(normalized=True, **form_kwargs)
-        return factory.build_formset()
+        def build():
+            validate_ui_schema_or_raise(resolved_schema)
+            normalized_schema = normalize_ui_schema(
+                resolved_schema,
+                header_model=None,
+                line_model=form_kwargs.get('model'),
+                organization=organization,
+            )
+            factory = VoucherFormFactory(normalized_schema, normalized=True, **form_kwargs)
+            return factory.build_formset(), factory
+
+        return _build_cached(
+            'lines', resolved_schema, {**form_kwargs, 'normalized': True}, build,
+            config_id=getattr(voucher_config, 'pk', None),
+        )
 
 def build_form(schema, **kwargs):
-    """Build a single form."""
-    return VoucherFormFactory(schema, **kwargs).build_form()
+    """Build a single form (cached per schema, organization and options)."""
+    def build():
+        factory = VoucherFormFactory(schema, **kwargs)
+        return factory.build_form(), factory
+    return _build_cached('form', schema, kwargs, build)
 
 def build_formset(schema, **kwargs):
-    """Build a formset."""
-    return VoucherFormFactory(schema, **kwargs).build_formset()
+    """Build a formset (cached per schema, organization and options)."""
+    def build():
+        factory = VoucherFormFactory(schema, **kwargs)
+        return factory.build_formset(), factory
+    return _build_cached('formset', schema, kwargs, build)
+
+
+def preload_voucher_forms(organization=None) -> int:
+    """
+    Warm the schema file cache and compiled form classes, e.g. at worker startup.
+
+    Returns the number of active voucher configs compiled.
+    """
+    from accounting.models import VoucherModeConfig
+    from accounting.schema_loader import preload_voucher_schemas
+
+    preload_voucher_schemas()
+    configs = VoucherModeConfig.objects.filter(is_active=True).select_related('organization')
+    if organization is not None:
+        configs = configs.filter(organization=organization)
+    compiled = 0
+    for config in configs.iterator():
+        try:
+            VoucherFormFactory.get_generic_voucher_form(config, config.organization)
+            VoucherFormFactory.get_generic_voucher_formset(config, config.organization)
+            compiled += 1
+        except Exception:
+            logger.warning("Skipping voucher form preload for config %s", config.pk, exc_info=True)
+    return compiled
 
 
 def get_voucher_ui_header(organization, journal_type=None):
@@ -1733,11 +1844,3 @@ class LazyVoucherForms(LazyObject):
         }
 
 VOUCHER_FORMS = LazyVoucherForms()
-
-def build_form(schema, **kwargs):
-    """Build a single form."""
-    return VoucherFormFactory(schema, **kwargs).build_form()
-
-def build_formset(schema, **kwargs):
-    """Build a formset."""
-    return VoucherFormFactory(schema, **kwargs).build_formset()
@@ -18,9 +18,11 @@ import hmac
 import json
 import logging
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from datetime import date
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import requests
 from django.conf import settings
@@ -257,6 +259,32 @@ def _log_ird_submission(
         logger.exception("ird.log.write_failed", extra={"invoice_id": getattr(invoice, "pk", None)})
 
 
+def _log_ird_submissions(entries: List[Dict[str, Any]]) -> None:
+    """Bulk variant of ``_log_ird_submission``; each entry carries the same keyword arguments."""
+    try:
+        from ird_integration.models import IRDLog
+    except Exception:  # noqa: BLE001
+        logger.info("ird.log.skipped_no_model")
+        return
+
+    try:
+        IRDLog.objects.bulk_create(
+            [
+                IRDLog(
+                    sales_invoice=getattr(entry["invoice"], "pk", None) and entry["invoice"],
+                    request_payload=json.dumps(entry["payload"], default=str),
+                    response_payload=json.dumps(entry["response"], default=str)
+                    if isinstance(entry["response"], (dict, list))
+                    else str(entry["response"]),
+                    success=entry["success"],
+                )
+                for entry in entries
+            ]
+        )
+    except Exception:  # noqa: BLE001
+        logger.exception("ird.log.write_failed", extra={"entries": len(entries)})
+
+
 def _sign_with_hmac(payload: Dict[str, Any], secret: str) -> str:
     canonical = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
     digest = hmac.new(secret.encode("utf-8"), canonical, hashlib.sha256).digest()
@@ -269,17 +297,27 @@ def _sign_with_rsa(payload: Dict[str, Any], private_key_pem: str, passphrase: Op
 
     The cryptography package is only required if RSA signing is enabled.
     """
+    return _sign_with_rsa_key(payload, _load_rsa_private_key(private_key_pem, passphrase))
+
+
+def _load_rsa_private_key(private_key_pem: str, passphrase: Optional[str] = None) -> Any:
+    """Parse a PEM private key once so batch signers can reuse it across payloads."""
     try:
-        from cryptography.hazmat.primitives import hashes, serialization
-        from cryptography.hazmat.primitives.asymmetric import padding
+        from cryptography.hazmat.primitives import serialization
     except Exception as exc:  # noqa: BLE001
         raise RuntimeError("RSA signing requested but cryptography is not installed.") from exc
 
-    canonical = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    key = serialization.load_pem_private_key(
+    return serialization.load_pem_private_key(
         private_key_pem.encode("utf-8"),
         password=passphrase.encode("utf-8") if passphrase else None,
     )
+
+
+def _sign_with_rsa_key(payload: Dict[str, Any], key: Any) -> str:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    canonical = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
     signature = key.sign(canonical, padding.PKCS1v15(), hashes.SHA256())
     return base64.b64encode(signature).decode("ascii")
 
@@ -316,6 +354,86 @@ def sign_payload(
     return _sign_with_hmac(payload, hmac_secret)
 
 
+def _payload_signer(
+    method: str,
+    hmac_secret: Optional[str],
+    rsa_private_key: Optional[str],
+    rsa_passphrase: Optional[str],
+) -> Callable[[Dict[str, Any]], str]:
+    if (method or DEFAULT_SIGNING_METHOD).lower() == "rsa" and rsa_private_key:
+        key = _load_rsa_private_key(rsa_private_key, rsa_passphrase)
+        return lambda payload: _sign_with_rsa_key(payload, key)
+    return lambda payload: sign_payload(
+        payload,
+        hmac_secret,
+        method=method,
+        rsa_private_key=rsa_private_key,
+        rsa_passphrase=rsa_passphrase,
+    )
+
+
+_worker_signer: Optional[Callable[[Dict[str, Any]], str]] = None
+
+
+def _init_signing_worker(*signer_args: Any) -> None:
+    global _worker_signer
+    _worker_signer = _payload_signer(*signer_args)
+
+
+def _sign_each(
+    payloads: List[Dict[str, Any]],
+    signer: Optional[Callable[[Dict[str, Any]], str]] = None,
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    signer = signer or _worker_signer
+    signed: List[Tuple[Optional[str], Optional[str]]] = []
+    for payload in payloads:
+        try:
+            signed.append((signer(payload), None))
+        except Exception as exc:  # noqa: BLE001
+            signed.append((None, str(exc)))
+    return signed
+
+
+def sign_payloads(
+    payloads: List[Dict[str, Any]],
+    hmac_secret: Optional[str] = None,
+    *,
+    method: str = DEFAULT_SIGNING_METHOD,
+    rsa_private_key: Optional[str] = None,
+    rsa_passphrase: Optional[str] = None,
+    processes: int = 0,
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Sign many payloads, returning ``(signature, error)`` per payload in order.
+
+    RSA signing is CPU-bound, so with ``processes`` > 0 the payloads are split
+    across a process pool whose workers parse the private key once. HMAC is
+    cheap and always runs inline, as does RSA when a pool cannot be started
+    (e.g. inside a daemonic Celery worker process).
+    """
+    method = (method or DEFAULT_SIGNING_METHOD).lower()
+    signer_args = (method, hmac_secret, rsa_private_key, rsa_passphrase)
+    try:
+        signer = _payload_signer(*signer_args)
+    except Exception as exc:  # noqa: BLE001
+        return [(None, str(exc))] * len(payloads)
+
+    if method == "rsa" and processes > 0 and len(payloads) > 1:
+        chunk_size = max(1, -(-len(payloads) // (processes * 4)))
+        chunks = [payloads[start:start + chunk_size] for start in range(0, len(payloads), chunk_size)]
+        try:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_signing_worker,
+                initargs=signer_args,
+            ) as pool:
+                return [signed for chunk in pool.map(_sign_each, chunks) for signed in chunk]
+        except (AssertionError, BrokenProcessPool, OSError) as exc:
+            logger.warning("ird.sign.pool_unavailable", extra={"error": str(exc)})
+
+    return _sign_each(payloads, signer)
+
+
 @dataclass
 class IRDSubmissionResult:
     payload: Dict[str, Any]
@@ -329,6 +447,36 @@ def _basic_auth_header(username: str, password: str) -> str:
     return f"Basic {token}"
 
 
+def _gateway_headers(
+    signing_method: str,
+    settings_obj: Any,
+    *,
+    api_key: Optional[str] = None,
+    auth_username: Optional[str] = None,
+    auth_password: Optional[str] = None,
+) -> Dict[str, str]:
+    """Request headers shared by every submission; callers add ``X-Signature``."""
+    headers = {
+        "Content-Type": "application/json",
+        "X-Signature-Method": signing_method,
+    }
+    if api_key := api_key or getattr(settings, "IRD_API_KEY", None):
+        headers["Authorization"] = f"Bearer {api_key}"
+    if auth_username := auth_username or _safe_getattr(settings_obj, "username") or getattr(settings, "IRD_USERNAME", None):
+        auth_password = auth_password or _safe_getattr(settings_obj, "password") or getattr(settings, "IRD_PASSWORD", "")
+        headers["Authorization"] = _basic_auth_header(auth_username, auth_password)
+    return headers
+
+
+def _extract_ack_id(body: Dict[str, Any]) -> Optional[str]:
+    return (
+        body.get("ack_id")
+        or body.get("referenceNo")
+        or body.get("reference")
+        or body.get("billNo")
+    )
+
+
 def _update_invoice_metadata(invoice: Any, updates: Dict[str, Any]) -> None:
     """Merge IRD-related metadata back to the invoice if it exposes a metadata field."""
     if not hasattr(invoice, "metadata"):
@@ -392,16 +540,14 @@ def submit_invoice_to_ird(
         rsa_passphrase=rsa_passphrase,
     )
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-Signature": signature,
-        "X-Signature-Method": signing_method,
-    }
-    if api_key := api_key or getattr(settings, "IRD_API_KEY", None):
-        headers["Authorization"] = f"Bearer {api_key}"
-    if auth_username := auth_username or _safe_getattr(settings_obj, "username") or getattr(settings, "IRD_USERNAME", None):
-        auth_password = auth_password or _safe_getattr(settings_obj, "password") or getattr(settings, "IRD_PASSWORD", "")
-        headers["Authorization"] = _basic_auth_header(auth_username, auth_password)
+    headers = _gateway_headers(
+        signing_method,
+        settings_obj,
+        api_key=api_key,
+        auth_username=auth_username,
+        auth_password=auth_password,
+    )
+    headers["X-Signature"] = signature
 
     last_exc: Optional[Exception] = None
     response = None
@@ -427,12 +573,7 @@ def submit_invoice_to_ird(
     except ValueError:
         body = {}
 
-    ack_id = (
-        body.get("ack_id")
-        or body.get("referenceNo")
-        or body.get("reference")
-        or body.get("billNo")
-    )
+    ack_id = _extract_ack_id(body)
 
     _log_ird_submission(
         invoice=invoice,
@@ -505,16 +646,14 @@ def submit_credit_note_to_ird(
         rsa_passphrase=rsa_passphrase,
     )
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-Signature": signature,
-        "X-Signature-Method": signing_method,
-    }
-    if api_key := api_key or getattr(settings, "IRD_API_KEY", None):
-        headers["Authorization"] = f"Bearer {api_key}"
-    if auth_username := auth_username or _safe_getattr(settings_obj, "username") or getattr(settings, "IRD_USERNAME", None):
-        auth_password = auth_password or _safe_getattr(settings_obj, "password") or getattr(settings, "IRD_PASSWORD", "")
-        headers["Authorization"] = _basic_auth_header(auth_username, auth_password)
+    headers = _gateway_headers(
+        signing_method,
+        settings_obj,
+        api_key=api_key,
+        auth_username=auth_username,
+        auth_password=auth_password,
+    )
+    headers["X-Signature"] = signature
 
     last_exc: Optional[Exception] = None
     response = None
@@ -541,12 +680,7 @@ def submit_credit_note_to_ird(
     except ValueError:
         body = {}
 
-    ack_id = (
-        body.get("ack_id")
-        or body.get("referenceNo")
-        or body.get("reference")
-        or body.get("billNo")
-    )
+    ack_id = _extract_ack_id(body)
 
     success = bool(response and response.ok)
     _log_ird_submission(
@@ -0,0 +1,68 @@
+"""
+Rebuild or verify the AccountPeriodBalance table from the general ledger.
+
+Usage:
+    python manage.py rebuild_account_balances [--organization ORG_ID] [--verify]
+
+    --organization: Only process one organization (default: all)
+    --verify: Report drift between stored balances and the GL without writing
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.services.account_balance_service import AccountBalanceService
+from usermanagement.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify per-period account balances from the general ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            help='Organization ID to process (default: all)'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored balances with the GL; exit non-zero on drift'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert when rebuilding (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.all().order_by('pk')
+        if options['organization']:
+            organizations = organizations.filter(pk=options['organization'])
+            if not organizations.exists():
+                raise CommandError(f"Organization {options['organization']} not found")
+
+        drifted = 0
+        for organization in organizations:
+            service = AccountBalanceService(organization)
+            if options['verify']:
+                report = service.verify()
+                problems = len(report['missing']) + len(report['extra']) + len(report['mismatched'])
+                if problems:
+                    drifted += 1
+                    self.stdout.write(self.style.ERROR(
+                        f"{organization.name}: {len(report['mismatched'])} mismatched, "
+                        f"{len(report['missing'])} missing, {len(report['extra'])} extra rows"
+                    ))
+                    for key in report['mismatched'][:20]:
+                        self.stdout.write(f"  account={key[0]} period={key[1]} dimensions={key[2]}")
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{organization.name}: {report['stored_rows']} rows match the GL"
+                    ))
+            else:
+                rows = service.rebuild(batch_size=options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(f"{organization.name}: rebuilt {rows} balance rows"))
+
+        if drifted:
+            raise CommandError(f"Balance drift detected for {drifted} organization(s)")
@@ -1,26 +1,26 @@
 import logging
 
 from django.core.management.base import BaseCommand
-from django.db import connection
+
+from accounting.services.monthly_summary_service import MonthlySummaryService
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Refresh the accounting_monthly_journalline_mv materialized view."
+    help = "Refresh the accounting_monthly_journalline_mv summary table."
 
-    def handle(self, *args, **options):
-        refresh_sql = "REFRESH MATERIALIZED VIEW CONCURRENTLY accounting_monthly_journalline_mv;"
-        fallback_sql = "REFRESH MATERIALIZED VIEW accounting_monthly_journalline_mv;"
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every month instead of only months with GL rows past each organization's watermark.",
+        )
 
-        with connection.cursor() as cursor:
-            try:
-                cursor.execute(refresh_sql)
-                self.stdout.write(self.style.SUCCESS("Refreshed materialized view concurrently."))
-            except Exception as exc:
-                logger.warning(
-                    "Concurrent refresh failed for accounting_monthly_journalline_mv: %s. Fallback to blocking refresh.",
-                    exc,
-                )
-                cursor.execute(fallback_sql)
-                self.stdout.write(self.style.WARNING("Refreshed materialized view with blocking fallback."))
+    def handle(self, *args, **options):
+        result = MonthlySummaryService().refresh(full=options["full"])
+        verb = "Rebuilt" if result["full"] else "Refreshed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} monthly summary for {result['organizations']} organization(s): "
+            f"{result['rows_written']} rows in {result['duration_ms']} ms."
+        ))
@@ -2,10 +2,11 @@
 Django management command to seal audit logs with hash-chaining for immutability.
 
 Usage:
-    python manage.py seal_audit_logs [--organization ORG_ID] [--days DAYS] [--force]
+    python manage.py seal_audit_logs [--organization ORG_ID] [--days DAYS] [--batch-size N] [--force]
     
     --organization: Seal logs for specific organization (default: all)
     --days: Only seal logs older than N days (default: 1)
+    --batch-size: Logs sealed per bulk update (default: 1000)
     --force: Skip confirmation prompt
 """
 
@@ -14,7 +15,7 @@ from django.utils import timezone
 from datetime import timedelta
 
 from accounting.models import AuditLog
-from accounting.utils.audit_integrity import compute_content_hash
+from accounting.utils.audit_integrity import organizations_with_unsealed_logs, seal_audit_chain
 from usermanagement.models import Organization
 
 
@@ -33,6 +34,12 @@ class Command(BaseCommand):
             default=1,
             help='Only seal logs older than N days (default: 1)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Logs sealed per bulk update (default: 1000)'
+        )
         parser.add_argument(
             '--force',
             action='store_true',
@@ -70,38 +77,23 @@ class Command(BaseCommand):
                 self.stdout.write("Cancelled")
                 return
         
-        # Seal logs in transaction
+        # Seal each organization's chain in batches
+        organization_ids = (
+            [options['organization']] if options['organization']
+            else organizations_with_unsealed_logs(cutoff_date)
+        )
         sealed_count = 0
-        failed_count = 0
-        
-        prev_hash = None
-        for i, log in enumerate(logs):
-            try:
-                # Compute hash of this record
-                log_dict = {
-                    'user_id': log.user_id,
-                    'action': log.action,
-                    'content_type_id': log.content_type_id,
-                    'object_id': log.object_id,
-                    'changes': log.changes,
-                    'timestamp': log.timestamp,
-                }
-                
-                log.content_hash = compute_content_hash(log_dict)
-                log.previous_hash_id = prev_hash  # Link to previous
-                log.is_immutable = True
-                log.save(update_fields=['content_hash', 'previous_hash_id', 'is_immutable'])
-                
-                prev_hash = log.id  # For next iteration
-                sealed_count += 1
-                
-                if (i + 1) % 100 == 0:
-                    self.stdout.write(f"  Sealed {i + 1}/{count} logs...")
-            
-            except Exception as e:
-                failed_count += 1
-                self.stdout.write(self.style.ERROR(f"Failed to seal log {log.id}: {str(e)}"))
-        
+        for organization_id in organization_ids:
+            while True:
+                sealed = seal_audit_chain(organization_id, cutoff_date, batch_size=options['batch_size'])
+                if not sealed:
+                    break
+                sealed_count += sealed
+                self.stdout.write(f"  Sealed {sealed_count}/{count} logs...")
+
         self.stdout.write(self.style.SUCCESS(f"\n✓ Sealed {sealed_count} audit logs"))
-        if failed_count > 0:
-            self.stdout.write(self.style.WARNING(f"✗ Failed to seal {failed_count} logs"))
+        if sealed_count < count:
+            self.stdout.write(self.style.WARNING(
+                f"✗ {count - sealed_count} logs left unsealed (chain locked by another sealer, "
+                "or queued behind a newer or still uncommitted log)"
+            ))
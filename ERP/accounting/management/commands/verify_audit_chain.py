@@ -0,0 +1,64 @@
+"""
+Django management command to verify sealed audit log hash chains.
+
+Usage:
+    python manage.py verify_audit_chain [--organization ORG_ID] [--after ID] [--limit N]
+
+    --organization: Verify one organization's chain (default: every organization)
+    --after: Resume after this audit log id (requires --organization)
+    --limit: Stop after checking N rows per chain; the last verified id is
+             printed so the next run can resume from it
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounting.models import AuditLog
+from accounting.utils.audit_integrity import verify_audit_chain_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream through sealed audit log chains and report the first broken link in each'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int, help='Organization ID to verify (default: all)')
+        parser.add_argument('--after', type=int, help='Resume after this audit log id')
+        parser.add_argument('--limit', type=int, help='Maximum rows to check per chain')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows fetched per cursor round trip')
+
+    def handle(self, *args, **options):
+        if options['after'] and not options['organization']:
+            raise CommandError("--after needs --organization; each chain resumes independently")
+
+        if options['organization']:
+            organization_ids = [options['organization']]
+        else:
+            organization_ids = list(
+                AuditLog.objects.filter(is_immutable=True)
+                .order_by()
+                .values_list('organization_id', flat=True)
+                .distinct()
+            )
+
+        broken = 0
+        for organization_id in organization_ids:
+            result = verify_audit_chain_stream(
+                organization_id,
+                after_id=options['after'],
+                chunk_size=options['chunk_size'],
+                limit=options['limit'],
+            )
+            label = organization_id if organization_id is not None else 'none'
+            if result.is_valid:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ Organization {label}: {result.checked} logs verified "
+                    f"(last verified id: {result.last_verified_id})"
+                ))
+            else:
+                broken += 1
+                self.stdout.write(self.style.ERROR(
+                    f"✗ Organization {label}: {result.error} "
+                    f"(after {result.checked} good logs, last verified id: {result.last_verified_id})"
+                ))
+
+        if broken:
+            raise CommandError(f"{broken} audit chain(s) failed verification")
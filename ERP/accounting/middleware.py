@@ -1,6 +1,6 @@
 import logging
 from .utils import record_request
-from usermanagement.models import Organization
+from usermanagement.request_context import get_request_context
 
 logger = logging.getLogger(__name__)
 
@@ -10,21 +10,22 @@ class RequestMiddleware:
 
     def __call__(self, request):
         # Respect organization already resolved by upstream middleware
-        if getattr(request, "organization", None):
-            return self.get_response(request)
+        if not getattr(request, "organization", None):
+            self._attach_tenant_organization(request)
 
+        with record_request(request):
+            response = self.get_response(request)
+        return response
+
+    def _attach_tenant_organization(self, request):
         if hasattr(request, 'tenant') and request.tenant:
-            try:
-                organization = Organization.objects.get(tenant=request.tenant)
+            organization = get_request_context(request).organization_for_tenant(request.tenant)
+            if organization:
                 request.organization = organization
                 logger.info(f"Organization '{organization.name}' attached to request for tenant '{request.tenant.name}'.")
-            except Organization.DoesNotExist:
+            else:
                 logger.warning(f"No organization found for tenant '{request.tenant.name}'.")
                 request.organization = None
         else:
             logger.warning("No tenant found on request.")
             request.organization = None
-
-        with record_request(request):
-            response = self.get_response(request)
-        return response
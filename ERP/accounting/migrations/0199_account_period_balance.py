@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-16 09:00
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def backfill_account_period_balances(apps, schema_editor):
+    GeneralLedger = apps.get_model('accounting', 'GeneralLedger')
+    AccountPeriodBalance = apps.get_model('accounting', 'AccountPeriodBalance')
+
+    totals = (
+        GeneralLedger.objects.filter(is_archived=False)
+        .values(
+            'organization_id', 'account_id', 'period_id', 'period__start_date',
+            'department_id', 'project_id', 'cost_center_id',
+        )
+        .annotate(debit=Sum('debit_amount'), credit=Sum('credit_amount'))
+    )
+    activity = {}
+    for row in totals:
+        dimension_key = f"{row['department_id'] or 0}:{row['project_id'] or 0}:{row['cost_center_id'] or 0}"
+        key = (row['account_id'], dimension_key, row['period__start_date'], row['period_id'])
+        bucket = activity.setdefault(key, [row['organization_id'], Decimal('0'), Decimal('0')])
+        bucket[1] += row['debit'] or Decimal('0')
+        bucket[2] += row['credit'] or Decimal('0')
+
+    running = defaultdict(Decimal)
+    rows = []
+    for key in sorted(activity):
+        account_id, dimension_key, _, period_id = key
+        organization_id, debit, credit = activity[key]
+        opening = running[(account_id, dimension_key)]
+        closing = opening + debit - credit
+        running[(account_id, dimension_key)] = closing
+        rows.append(
+            AccountPeriodBalance(
+                organization_id=organization_id,
+                account_id=account_id,
+                period_id=period_id,
+                dimension_key=dimension_key,
+                opening_balance=opening,
+                debit_total=debit,
+                credit_total=credit,
+                closing_balance=closing,
+            )
+        )
+    AccountPeriodBalance.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usermanagement', '0012_remove_organization_tenant'),
+        ('accounting', '0198_vendor_outstanding_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountPeriodBalance',
+            fields=[
+                ('balance_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('dimension_key', models.CharField(default='0:0:0', help_text='department:project:cost_center ids (0 when unset).', max_length=64)),
+                ('opening_balance', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('debit_total', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('credit_total', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('closing_balance', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_balances', to='accounting.chartofaccount')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='account_period_balances', to='usermanagement.organization')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='account_balances', to='accounting.accountingperiod')),
+            ],
+            options={
+                'db_table': 'accounting_account_period_balance',
+                'indexes': [models.Index(fields=['organization', 'period'], name='apb_org_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('account', 'period', 'dimension_key'), name='unique_account_period_dimension_balance')],
+            },
+        ),
+        migrations.RunPython(backfill_account_period_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.5 on 2026-10-16 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SUMMARY_TABLE = "accounting_monthly_journalline_mv"
+
+
+def create_summary_table(apps, schema_editor):
+    """
+    Replace the PostgreSQL-only materialized view from 0136 with a plain table.
+
+    A table can be refreshed month by month (see MonthlySummaryService) and
+    is created the same way on every backend.
+    """
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {SUMMARY_TABLE};")
+    with connection.cursor() as cursor:
+        existing = connection.introspection.table_names(cursor)
+    if SUMMARY_TABLE in existing:
+        return
+    schema_editor.create_model(apps.get_model('accounting', 'MonthlyJournalLineSummary'))
+
+
+def drop_summary_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('accounting', 'MonthlyJournalLineSummary'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0199_account_period_balance'),
+    ]
+
+    operations = [
+        # The summary model is unmanaged, so these operations only update state;
+        # the table itself is created by create_summary_table below.
+        migrations.AddField(
+            model_name='monthlyjournallinesummary',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='monthly_summaries', to='accounting.chartofaccount'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyjournallinesummary',
+            index=models.Index(fields=['month_start', 'account'], name='monthly_jl_mv_month_acct_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyjournallinesummary',
+            constraint=models.UniqueConstraint(fields=('month_start', 'account'), name='unique_monthly_jl_mv_month_account'),
+        ),
+        migrations.RunPython(create_summary_table, drop_summary_table),
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['created_at'], name='gl_created_at_idx'),
+        ),
+        migrations.CreateModel(
+            name='ReportRefreshWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('refreshed_through', models.DateTimeField(blank=True, help_text='GL rows created after this instant are not yet reflected.', null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('months_refreshed', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'accounting_report_refresh_watermark',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-16 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0200_monthly_journalline_summary_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['account', 'transaction_date', 'journal_line'], name='gl_acct_date_line_idx'),
+        ),
+    ]
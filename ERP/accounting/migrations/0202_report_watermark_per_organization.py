@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-16 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usermanagement', '0012_remove_organization_tenant'),
+        ('accounting', '0201_gl_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportrefreshwatermark',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddField(
+            model_name='reportrefreshwatermark',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report_refresh_watermarks', to='usermanagement.organization'),
+        ),
+        migrations.AddField(
+            model_name='reportrefreshwatermark',
+            name='last_id',
+            field=models.BigIntegerField(blank=True, help_text='Highest source row id reflected; every lower id has settled.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportrefreshwatermark',
+            name='refreshed_through',
+            field=models.DateTimeField(blank=True, help_text='When the last refresh started.', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='reportrefreshwatermark',
+            constraint=models.UniqueConstraint(fields=('name', 'organization'), name='unique_report_watermark_per_org'),
+        ),
+    ]
@@ -5535,7 +5535,13 @@ class JournalLineDimension(models.Model):
 
 
 class MonthlyJournalLineSummary(models.Model):
-    """Pre-aggregated monthly journal line balances for faster reporting."""
+    """
+    Pre-aggregated monthly GL totals per account for faster reporting.
+
+    The table is created by migration 0200 and kept current by
+    ``MonthlySummaryService.refresh``, which only recomputes months that
+    received GL rows since the previous refresh.
+    """
 
     month_start = models.DateField()
     account = models.ForeignKey(
@@ -5551,7 +5557,10 @@ class MonthlyJournalLineSummary(models.Model):
         db_table = 'accounting_monthly_journalline_mv'
         ordering = ['-month_start', 'account']
         indexes = [
-            models.Index(fields=['month_start', 'account']),
+            models.Index(fields=['month_start', 'account'], name='monthly_jl_mv_month_acct_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['month_start', 'account'], name='unique_monthly_jl_mv_month_account'),
         ]
 
     @property
@@ -5561,6 +5570,45 @@ class MonthlyJournalLineSummary(models.Model):
     def __str__(self):
         return f"{self.month_start} - {self.account}"
 
+
+class ReportRefreshWatermark(models.Model):
+    """Tracks how far a derived reporting table has been refreshed, per organization."""
+
+    name = models.CharField(max_length=100)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='report_refresh_watermarks',
+    )
+    last_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Highest source row id reflected; every lower id has settled.",
+    )
+    refreshed_through = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the last refresh started.",
+    )
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    months_refreshed = models.PositiveIntegerField(default=0)
+    duration_ms = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'accounting_report_refresh_watermark'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'organization'],
+                name='unique_report_watermark_per_org',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
 class TaxAuthority(models.Model):
     authority_id = models.BigAutoField(primary_key=True)
     organization = models.ForeignKey(Organization, on_delete=models.PROTECT, related_name='tax_authorities', db_column='organization_id')
@@ -6634,6 +6682,8 @@ class GeneralLedger(models.Model):
         indexes = [
             models.Index(fields=['account', 'transaction_date']),
             models.Index(fields=['transaction_date', 'account']),
+            models.Index(fields=['created_at'], name='gl_created_at_idx'),
+            models.Index(fields=['account', 'transaction_date', 'journal_line'], name='gl_acct_date_line_idx'),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -6648,6 +6698,53 @@ class GeneralLedger(models.Model):
     def __str__(self):
         return f"GL Entry {self.gl_entry_id} for {self.account.account_code}"
 
+
+class AccountPeriodBalance(models.Model):
+    """
+    Per-period account totals maintained incrementally by posting.
+
+    One row per (account, period, dimension key). ``opening_balance`` is the
+    cumulative debit-minus-credit balance before the period and
+    ``closing_balance`` includes the period's activity, so trial balance and
+    balance sheet reads scan accounts x periods instead of GL rows.
+    """
+
+    NO_DIMENSIONS = "0:0:0"
+
+    balance_id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='account_period_balances',
+    )
+    account = models.ForeignKey(ChartOfAccount, on_delete=models.CASCADE, related_name='period_balances')
+    period = models.ForeignKey(AccountingPeriod, on_delete=models.CASCADE, related_name='account_balances')
+    dimension_key = models.CharField(
+        max_length=64,
+        default=NO_DIMENSIONS,
+        help_text="department:project:cost_center ids (0 when unset).",
+    )
+    opening_balance = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    debit_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    credit_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    closing_balance = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'accounting_account_period_balance'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'period', 'dimension_key'],
+                name='unique_account_period_dimension_balance',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'period'], name='apb_org_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} @ {self.period_id} [{self.dimension_key}]"
+
 class Attachment(models.Model):
     attachment_id = models.BigAutoField(primary_key=True)
     journal = models.ForeignKey(Journal, on_delete=models.CASCADE, related_name='attachments')
@@ -1,8 +1,462 @@
-import jsonlogic
+"""
+jsonLogic rule evaluation.
 
-def evaluate_rules(rules, data):
-    for rule in sorted(rules, key=lambda r: r.get("priority", 100)):
-        if rule.get("enabled", True):
-            if jsonlogic.jsonLogic(rule["if"], data):
-                return rule["then"]
+A rule is ``{"if": <jsonLogic>, "then": <result>, "priority": 100, "enabled": True}``;
+``evaluate_rules`` returns the ``then`` of the first enabled rule (lowest
+priority first) whose condition is truthy.
+
+Rule sets are compiled once into Python closures, pre-sorted, and indexed by
+the variables they compare against string constants, so a row only runs the
+rules that can match it. ``interpret`` keeps the plain tree-walking evaluator
+for one-off expressions and as a reference for the compiler.
+"""
+
+from collections import OrderedDict
+from copy import deepcopy
+from functools import reduce
+import threading
+
+__all__ = [
+    "CompiledRuleSet",
+    "compile_logic",
+    "compile_rules",
+    "evaluate_rules",
+    "evaluate_rules_batch",
+    "interpret",
+]
+
+
+# ---------------------------------------------------------------------------
+# Operations (json-logic-py semantics)
+# ---------------------------------------------------------------------------
+
+def _soft_equals(a, b):
+    if isinstance(a, str) or isinstance(b, str):
+        return str(a) == str(b)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return bool(a) is bool(b)
+    return a == b
+
+
+def _hard_equals(a, b):
+    if type(a) is not type(b):
+        return False
+    return a == b
+
+
+def _less(a, b, *args):
+    if isinstance(a, (int, float)) or isinstance(b, (int, float)):
+        try:
+            a, b = float(a), float(b)
+        except (TypeError, ValueError):
+            return False
+    try:
+        result = a < b
+    except TypeError:
+        return False
+    return result and (not args or _less(b, *args))
+
+
+def _less_or_equal(a, b, *args):
+    return (_less(a, b) or _soft_equals(a, b)) and (not args or _less_or_equal(b, *args))
+
+
+def _to_numeric(value):
+    if isinstance(value, str):
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def _plus(*args):
+    return sum(_to_numeric(arg) for arg in args)
+
+
+def _minus(*args):
+    if len(args) == 1:
+        return -_to_numeric(args[0])
+    return _to_numeric(args[0]) - _to_numeric(args[1])
+
+
+def _merge(*args):
+    merged = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            merged.extend(arg)
+        else:
+            merged.append(arg)
+    return merged
+
+
+def _substr(source, start, length=None):
+    source = str(source)
+    start = int(start)
+    begin = start if start >= 0 else max(len(source) + start, 0)
+    if length is None:
+        return source[begin:]
+    length = int(length)
+    end = begin + length if length >= 0 else len(source) + length
+    return source[begin:end]
+
+
+def _contains(needle, haystack):
+    try:
+        return needle in haystack
+    except TypeError:
+        return False
+
+
+OPERATIONS = {
+    "==": _soft_equals,
+    "===": _hard_equals,
+    "!=": lambda a, b: not _soft_equals(a, b),
+    "!==": lambda a, b: not _hard_equals(a, b),
+    ">": lambda a, b: _less(b, a),
+    ">=": lambda a, b: _less(b, a) or _soft_equals(a, b),
+    "<": _less,
+    "<=": _less_or_equal,
+    "!": lambda a: not a,
+    "!!": bool,
+    "%": lambda a, b: a % b,
+    "log": lambda a: a,
+    "in": _contains,
+    "cat": lambda *args: "".join(str(arg) for arg in args),
+    "substr": _substr,
+    "+": _plus,
+    "*": lambda *args: reduce(lambda total, arg: total * float(arg), args, 1),
+    "-": _minus,
+    "/": lambda a, b=None: a if b is None else float(a) / float(b),
+    "min": lambda *args: min(args),
+    "max": lambda *args: max(args),
+    "merge": _merge,
+    "count": lambda *args: sum(1 if arg else 0 for arg in args),
+}
+
+# Operations whose arguments are evaluated lazily or against other data.
+_SPECIAL = {"var", "missing", "missing_some", "if", "?:", "and", "or", "map", "filter", "all", "some", "none", "reduce"}
+
+
+def _var_getter(path, default=None):
+    """Return ``data -> value`` for a dotted jsonLogic variable path."""
+    if path is None or path == "" or path == []:
+        return lambda data: data
+    parts = str(path).split(".")
+
+    def get(data):
+        for part in parts:
+            try:
+                data = data[part]
+            except (KeyError, IndexError):
+                return default
+            except TypeError:
+                try:
+                    data = data[int(part)]
+                except (KeyError, IndexError, TypeError, ValueError):
+                    return default
+        return data
+
+    return get
+
+
+def _missing(data, keys):
+    if len(keys) == 1 and isinstance(keys[0], list):
+        keys = keys[0]
+    return [key for key in keys if _var_getter(key)(data) in (None, "")]
+
+
+def _missing_some(data, need_count, keys):
+    missing = _missing(data, keys)
+    if len(keys) - len(missing) >= need_count:
+        return []
+    return missing
+
+
+def _operands(logic):
+    op = next(iter(logic))
+    values = logic[op]
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    return op, values
+
+
+# ---------------------------------------------------------------------------
+# Interpreter
+# ---------------------------------------------------------------------------
+
+def interpret(logic, data=None):
+    """Evaluate a jsonLogic expression by walking the tree on every call."""
+    if not isinstance(logic, dict) or not logic:
+        return logic
+    data = data if data is not None else {}
+    op, values = _operands(logic)
+
+    if op == "var":
+        args = [interpret(value, data) for value in values]
+        return _var_getter(args[0] if args else None, args[1] if len(args) > 1 else None)(data)
+    if op == "missing":
+        return _missing(data, [interpret(value, data) for value in values])
+    if op == "missing_some":
+        need_count, keys = [interpret(value, data) for value in values]
+        return _missing_some(data, need_count, keys)
+    if op in ("if", "?:"):
+        for i in range(0, len(values) - 1, 2):
+            if interpret(values[i], data):
+                return interpret(values[i + 1], data)
+        return interpret(values[-1], data) if len(values) % 2 else None
+    if op in ("and", "or"):
+        result = None
+        for value in values:
+            result = interpret(value, data)
+            if bool(result) is (op == "or"):
+                return result
+        return result
+    if op in ("map", "filter", "all", "some", "none"):
+        items = interpret(values[0], data) or []
+        if op == "map":
+            return [interpret(values[1], item) for item in items]
+        if op == "filter":
+            return [item for item in items if interpret(values[1], item)]
+        if op == "all":
+            return bool(items) and all(interpret(values[1], item) for item in items)
+        if op == "some":
+            return any(interpret(values[1], item) for item in items)
+        return not any(interpret(values[1], item) for item in items)
+    if op == "reduce":
+        items = interpret(values[0], data) or []
+        accumulator = interpret(values[2], data) if len(values) > 2 else None
+        for item in items:
+            accumulator = interpret(values[1], {"current": item, "accumulator": accumulator})
+        return accumulator
+
+    if op not in OPERATIONS:
+        raise ValueError(f"Unrecognized operation {op}")
+    return OPERATIONS[op](*[interpret(value, data) for value in values])
+
+
+# ---------------------------------------------------------------------------
+# Compiler
+# ---------------------------------------------------------------------------
+
+def _constant(value):
+    return lambda data: value
+
+
+def compile_logic(logic):
+    """Compile a jsonLogic expression into a ``data -> value`` closure."""
+    if not isinstance(logic, dict) or not logic:
+        return _constant(logic)
+    op, values = _operands(logic)
+
+    if op == "var":
+        if all(not isinstance(value, dict) for value in values):
+            return _var_getter(values[0] if values else None, values[1] if len(values) > 1 else None)
+        args = [compile_logic(value) for value in values]
+        return lambda data: _var_getter(
+            args[0](data) if args else None, args[1](data) if len(args) > 1 else None
+        )(data)
+    if op == "missing":
+        args = [compile_logic(value) for value in values]
+        return lambda data: _missing(data, [arg(data) for arg in args])
+    if op == "missing_some":
+        need_fn, keys_fn = [compile_logic(value) for value in values]
+        return lambda data: _missing_some(data, need_fn(data), keys_fn(data))
+    if op in ("if", "?:"):
+        branches = [(compile_logic(values[i]), compile_logic(values[i + 1])) for i in range(0, len(values) - 1, 2)]
+        otherwise = compile_logic(values[-1]) if len(values) % 2 else _constant(None)
+
+        def if_(data):
+            for test, result in branches:
+                if test(data):
+                    return result(data)
+            return otherwise(data)
+
+        return if_
+    if op in ("and", "or"):
+        args = [compile_logic(value) for value in values]
+        stop_on = op == "or"
+
+        def and_or(data):
+            result = None
+            for arg in args:
+                result = arg(data)
+                if bool(result) is stop_on:
+                    return result
+            return result
+
+        return and_or
+    if op in ("map", "filter", "all", "some", "none"):
+        items_fn = compile_logic(values[0])
+        test = compile_logic(values[1])
+        if op == "map":
+            return lambda data: [test(item) for item in (items_fn(data) or [])]
+        if op == "filter":
+            return lambda data: [item for item in (items_fn(data) or []) if test(item)]
+        if op == "all":
+            def all_(data):
+                items = items_fn(data) or []
+                return bool(items) and all(test(item) for item in items)
+            return all_
+        if op == "some":
+            return lambda data: any(test(item) for item in (items_fn(data) or []))
+        return lambda data: not any(test(item) for item in (items_fn(data) or []))
+    if op == "reduce":
+        items_fn = compile_logic(values[0])
+        step = compile_logic(values[1])
+        initial = compile_logic(values[2]) if len(values) > 2 else _constant(None)
+
+        def reduce_(data):
+            accumulator = initial(data)
+            for item in items_fn(data) or []:
+                accumulator = step({"current": item, "accumulator": accumulator})
+            return accumulator
+
+        return reduce_
+
+    if op not in OPERATIONS:
+        raise ValueError(f"Unrecognized operation {op}")
+    fn = OPERATIONS[op]
+    args = [compile_logic(value) for value in values]
+    if len(args) == 1:
+        (a,) = args
+        return lambda data: fn(a(data))
+    if len(args) == 2:
+        a, b = args
+        return lambda data: fn(a(data), b(data))
+    return lambda data: fn(*[arg(data) for arg in args])
+
+
+def _plain_var(node):
+    """Return the path of ``{"var": "path"}`` (no default), else None."""
+    if not isinstance(node, dict) or len(node) != 1 or "var" not in node:
+        return None
+    path = node["var"]
+    if isinstance(path, list):
+        if len(path) != 1:
+            return None
+        path = path[0]
+    return path if isinstance(path, str) and path else None
+
+
+def _guard(logic):
+    """
+    Return ``(path, keys)`` when ``logic`` can only be truthy if ``str(var)``
+    is one of ``keys``; used to index rules by the variables they test.
+    """
+    if not isinstance(logic, dict) or len(logic) != 1:
+        return None
+    op, values = _operands(logic)
+    if op == "and":
+        for value in values:
+            guard = _guard(value)
+            if guard:
+                return guard
+        return None
+    if op in ("==", "===") and len(values) == 2:
+        for var, const in (values, values[::-1]):
+            path = _plain_var(var)
+            if path is not None and isinstance(const, str):
+                return path, frozenset([const])
+    if op == "in" and len(values) == 2:
+        path = _plain_var(values[0])
+        haystack = values[1]
+        if path is not None and isinstance(haystack, list) and haystack and all(isinstance(v, str) for v in haystack):
+            return path, frozenset(haystack)
     return None
+
+
+class CompiledRuleSet:
+    """A rule list compiled to closures, sorted by priority and indexed by guard variables."""
+
+    def __init__(self, rules):
+        enabled = [rule for rule in rules if rule.get("enabled", True)]
+        ordered = sorted(enabled, key=lambda r: r.get("priority", 100))
+        self.tests = [compile_logic(rule["if"]) for rule in ordered]
+        self.results = [rule["then"] for rule in ordered]
+
+        self._unguarded = []
+        index = {}
+        for position, rule in enumerate(ordered):
+            guard = _guard(rule["if"])
+            if guard is None:
+                self._unguarded.append(position)
+                continue
+            path, keys = guard
+            table = index.setdefault(path, {})
+            for key in keys:
+                table.setdefault(key, []).append(position)
+        self._index = [(_var_getter(path), table) for path, table in index.items()]
+        self._everything = list(range(len(self.tests)))
+
+    def __len__(self):
+        return len(self.tests)
+
+    def _index_key(self, data):
+        return tuple(str(getter(data)) for getter, _ in self._index)
+
+    def _candidates(self, key):
+        if not self._index:
+            return self._everything
+        positions = list(self._unguarded)
+        for (_, table), value in zip(self._index, key):
+            positions.extend(table.get(value, ()))
+        positions.sort()
+        return positions
+
+    def _first_match(self, positions, data):
+        tests = self.tests
+        for position in positions:
+            if tests[position](data):
+                return self.results[position]
+        return None
+
+    def evaluate(self, data):
+        return self._first_match(self._candidates(self._index_key(data)), data)
+
+    def evaluate_batch(self, rows):
+        """Evaluate many rows, sharing candidate lookups between rows with equal keys."""
+        if not self._index:
+            return [self._first_match(self._everything, row) for row in rows]
+        candidates = {}
+        results = []
+        for row in rows:
+            key = self._index_key(row)
+            positions = candidates.get(key)
+            if positions is None:
+                positions = candidates[key] = self._candidates(key)
+            results.append(self._first_match(positions, row))
+        return results
+
+
+_CACHE_SIZE = 128
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compile_rules(rules):
+    """
+    Return a ``CompiledRuleSet`` for ``rules``, reusing a cached one.
+
+    The cache holds the rule list itself plus a snapshot, so in-place edits
+    to the list (or its dicts) trigger a recompile.
+    """
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+    key = id(rules)
+    entry = _compiled.get(key)
+    if entry is not None and entry[0] is rules and entry[1] == rules:
+        return entry[2]
+    compiled = CompiledRuleSet(rules)
+    with _compiled_lock:
+        _compiled[key] = (rules, deepcopy(rules), compiled)
+        _compiled.move_to_end(key)
+        while len(_compiled) > _CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def evaluate_rules(rules, data):
+    return compile_rules(rules).evaluate(data)
+
+
+def evaluate_rules_batch(rules, rows):
+    """Evaluate ``rules`` against every row (e.g. a formset's cleaned_data); one result per row."""
+    return compile_rules(rules).evaluate_batch(rows)
@@ -1,52 +1,107 @@
+import copy
+import hashlib
+import json
+import logging
 import os
+import re
+import threading
+from typing import Tuple
+
 import yaml
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = os.path.join(os.path.dirname(__file__), 'schemas')
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), 'views', 'schemas')
+FALLBACK_SCHEMAS = ('general.yml', 'standard.yml')
 
+# path -> (mtime_ns, parsed schema, schema hash). Entries are replaced when the
+# file's mtime changes, so edits on disk are picked up without a restart.
 _loaded = {}
-from typing import Tuple
+_loaded_lock = threading.Lock()
+
+
+def schema_hash(schema) -> str:
+    """Stable digest of a schema dict, used as a compiled-form cache key."""
+    payload = json.dumps(schema or {}, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _read_schema_file(path):
+    """
+    Return ``(schema, digest)`` for a YAML file, or ``None`` when it is missing.
+
+    A single ``os.stat`` replaces the old exists/open/parse sequence on a hit.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    with open(path, 'r', encoding='utf-8') as f:
+        schema = yaml.safe_load(f) or {}
+    digest = schema_hash(schema)
+    with _loaded_lock:
+        _loaded[path] = (mtime, schema, digest)
+    return schema, digest
+
+
+def _candidate_files(config):
+    if getattr(config, 'code', None):
+        yield os.path.join(SCHEMA_DIR, f"{config.code.lower()}.yml"), False
+    if getattr(config, 'name', None):
+        slug = re.sub(r'[^a-z0-9_]+', '_', config.name.lower())
+        yield os.path.join(SCHEMA_DIR, f"{slug}.yml"), False
+    for fallback in FALLBACK_SCHEMAS:
+        yield os.path.join(SCHEMA_DIR, fallback), True
 
 
 def load_voucher_schema(config) -> Tuple[dict, str, list]:
     """
     Load the schema YAML for the given config, with fallbacks.
     Returns (schema_dict, warning_str, tried_files_list)
+
+    Parsed files are cached per process and re-read when their mtime changes.
+    The returned schema is a copy, so callers may mutate it freely.
     """
-    import re
     schema = None
     warning = None
     tried_files = []
-    schema_dir = os.path.join(os.path.dirname(__file__), 'views', 'schemas')
 
-    # Try by code
-    if getattr(config, 'code', None):
-        code_file = os.path.join(schema_dir, f"{config.code.lower()}.yml")
-        tried_files.append(code_file)
-        if os.path.exists(code_file):
-            with open(code_file, 'r', encoding='utf-8') as f:
-                schema = yaml.safe_load(f) or {}
-
-    # Try by name (slugified)
-    if schema is None and getattr(config, 'name', None):
-        slug = re.sub(r'[^a-z0-9_]+', '_', config.name.lower())
-        name_file = os.path.join(schema_dir, f"{slug}.yml")
-        tried_files.append(name_file)
-        if os.path.exists(name_file):
-            with open(name_file, 'r', encoding='utf-8') as f:
-                schema = yaml.safe_load(f) or {}
+    for path, is_fallback in _candidate_files(config):
+        tried_files.append(path)
+        loaded = _read_schema_file(path)
+        if loaded is None:
+            continue
+        # Empty fallbacks are skipped so the next fallback gets a chance.
+        if is_fallback and not loaded[0]:
+            schema = loaded[0]
+            continue
+        schema = loaded[0]
+        break
 
-    # Try fallback
-    if schema is None:
-        for fallback in ['general.yml', 'standard.yml']:
-            fallback_file = os.path.join(schema_dir, fallback)
-            tried_files.append(fallback_file)
-            if os.path.exists(fallback_file):
-                with open(fallback_file, 'r', encoding='utf-8') as f:
-                    schema = yaml.safe_load(f) or {}
-                    if schema:
-                        break
-    
     if schema is None:
         warning = f"No schema found for this voucher configuration. Tried: {', '.join(tried_files)}"
-        
-    return schema, warning, tried_files
\ No newline at end of file
+        return schema, warning, tried_files
+
+    return copy.deepcopy(schema), warning, tried_files
+
+
+def preload_voucher_schemas(schema_dir: str = SCHEMA_DIR) -> int:
+    """Parse every voucher schema file up front; returns the number loaded."""
+    loaded = 0
+    try:
+        names = sorted(os.listdir(schema_dir))
+    except OSError:
+        return 0
+    for name in names:
+        if not name.endswith(('.yml', '.yaml')):
+            continue
+        try:
+            if _read_schema_file(os.path.join(schema_dir, name)) is not None:
+                loaded += 1
+        except yaml.YAMLError:
+            logger.exception("Failed to preload voucher schema %s", name)
+    return loaded
@@ -5,6 +5,7 @@ from .fiscal_year_service import close_fiscal_year, reopen_fiscal_year
 from .journal_import_service import import_journal_entries
 from .validation import JournalValidationService
 from .ocr_service import process_receipt_with_ocr
+from .account_balance_service import AccountBalanceService
 from .trial_balance_service import get_trial_balance
 from .chart_of_account_service import ChartOfAccountService
 from .journal_entry_service import JournalEntryService
@@ -46,6 +47,7 @@ __all__ = [
     'import_journal_entries',
     'JournalValidationService',
     'process_receipt_with_ocr',
+    'AccountBalanceService',
     'get_trial_balance',
     'ChartOfAccountService',
     'JournalEntryService',
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from accounting.models import (
+    AccountingPeriod,
+    AccountPeriodBalance,
+    GeneralLedger,
+)
+from usermanagement.models import Organization
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+BalanceKey = Tuple[int, int, str]  # (account_id, period_id, dimension_key)
+
+
+def dimension_key(department_id: Optional[int], project_id: Optional[int], cost_center_id: Optional[int]) -> str:
+    """Encode the GL analytic dimensions as the ``AccountPeriodBalance`` key."""
+    return f"{department_id or 0}:{project_id or 0}:{cost_center_id or 0}"
+
+
+def _locked(queryset):
+    # Lock only balance rows, not the joined period rows, where supported.
+    if connection.features.has_select_for_update_of:
+        return queryset.select_for_update(of=("self",))
+    return queryset.select_for_update()
+
+
+class AccountBalanceService:
+    """
+    Maintains and reads the ``AccountPeriodBalance`` table.
+
+    ``apply_gl_entries`` is called by ``PostingService`` inside the posting
+    transaction, after the affected ``ChartOfAccount`` rows are locked, so
+    concurrent postings to the same account never race on balance rows.
+
+    Archived GL rows are left out, matching the trial balance's historical
+    ``is_archived=False`` filter; run ``rebuild`` after archiving GL rows.
+    """
+
+    UPDATE_FIELDS = ["opening_balance", "debit_total", "credit_total", "closing_balance", "updated_at"]
+
+    def __init__(self, organization: Organization):
+        self.organization = organization
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    @classmethod
+    def apply_gl_entries(cls, entries: Iterable[GeneralLedger]) -> None:
+        """Fold newly created GL rows into the period balance table."""
+        deltas: Dict[BalanceKey, List[Decimal]] = defaultdict(lambda: [ZERO, ZERO])
+        organizations: Dict[int, int] = {}
+        for entry in entries:
+            if entry.is_archived:
+                continue
+            key = (
+                entry.account_id,
+                entry.period_id,
+                dimension_key(entry.department_id, entry.project_id, entry.cost_center_id),
+            )
+            deltas[key][0] += entry.debit_amount or ZERO
+            deltas[key][1] += entry.credit_amount or ZERO
+            organizations[entry.account_id] = entry.organization_id
+        if not deltas:
+            return
+
+        period_starts = dict(
+            AccountingPeriod.objects.filter(pk__in={key[1] for key in deltas}).values_list("pk", "start_date")
+        )
+        account_ids = sorted({key[0] for key in deltas})
+        existing = {
+            (row.account_id, row.period_id, row.dimension_key): row
+            for row in _locked(
+                AccountPeriodBalance.objects.filter(
+                    account_id__in=account_ids,
+                    period__start_date__gte=min(period_starts.values()),
+                )
+                .annotate(period_start=F("period__start_date"))
+                .order_by("account_id", "period_start", "dimension_key")
+            )
+        }
+
+        openings = cls._openings_for_missing(
+            [key for key in deltas if key not in existing],
+            period_starts,
+        )
+
+        series: Dict[Tuple[int, str], List[AccountPeriodBalance]] = defaultdict(list)
+        for (account_id, _, dim_key), row in existing.items():
+            series[(account_id, dim_key)].append(row)
+
+        now = timezone.now()
+        created: List[AccountPeriodBalance] = []
+        changed: Dict[int, AccountPeriodBalance] = {}
+        # Net movement already applied in this call to earlier periods of a series.
+        carried: Dict[Tuple[int, str], Decimal] = defaultdict(lambda: ZERO)
+        for key in sorted(deltas, key=lambda k: (k[0], period_starts[k[1]], k[2])):
+            debit, credit = deltas[key]
+            net = debit - credit
+            account_id, period_id, dim_key = key
+            start = period_starts[period_id]
+
+            # Carry the movement into every later period of the same account/dimension.
+            for later in series[(account_id, dim_key)]:
+                if later.period_start > start:
+                    later.opening_balance += net
+                    later.closing_balance += net
+                    later.updated_at = now
+                    changed[later.pk] = later
+
+            row = existing.get(key)
+            if row is None:
+                opening = openings.get(key, ZERO) + carried[(account_id, dim_key)]
+                created.append(
+                    AccountPeriodBalance(
+                        organization_id=organizations[account_id],
+                        account_id=account_id,
+                        period_id=period_id,
+                        dimension_key=dim_key,
+                        opening_balance=opening,
+                        debit_total=debit,
+                        credit_total=credit,
+                        closing_balance=opening + net,
+                    )
+                )
+            else:
+                row.debit_total += debit
+                row.credit_total += credit
+                row.closing_balance += net
+                row.updated_at = now
+                changed[row.pk] = row
+            carried[(account_id, dim_key)] += net
+
+        if created:
+            AccountPeriodBalance.objects.bulk_create(created)
+        if changed:
+            AccountPeriodBalance.objects.bulk_update(list(changed.values()), cls.UPDATE_FIELDS)
+
+    @staticmethod
+    def _openings_for_missing(
+        missing: Sequence[BalanceKey],
+        period_starts: Dict[int, date],
+    ) -> Dict[BalanceKey, Decimal]:
+        """Opening balance for new rows: net activity of all earlier periods."""
+        openings: Dict[BalanceKey, Decimal] = {}
+        by_period: Dict[int, List[BalanceKey]] = defaultdict(list)
+        for key in missing:
+            by_period[key[1]].append(key)
+        for period_id, keys in by_period.items():
+            totals = (
+                AccountPeriodBalance.objects.filter(
+                    account_id__in={key[0] for key in keys},
+                    period__start_date__lt=period_starts[period_id],
+                )
+                .values("account_id", "dimension_key")
+                .annotate(debit=Sum("debit_total"), credit=Sum("credit_total"))
+            )
+            prior = {
+                (row["account_id"], row["dimension_key"]): (row["debit"] or ZERO) - (row["credit"] or ZERO)
+                for row in totals
+            }
+            for key in keys:
+                openings[key] = prior.get((key[0], key[2]), ZERO)
+        return openings
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def period_totals(self, periods) -> Dict[int, Dict[str, Decimal]]:
+        """Debit/credit totals per account across ``periods``."""
+        rows = (
+            AccountPeriodBalance.objects.filter(organization=self.organization, period__in=periods)
+            .values("account_id")
+            .annotate(debit_total=Sum("debit_total"), credit_total=Sum("credit_total"))
+        )
+        return {
+            row["account_id"]: {
+                "debit_total": row["debit_total"] or ZERO,
+                "credit_total": row["credit_total"] or ZERO,
+            }
+            for row in rows
+        }
+
+    def balances_as_of(
+        self,
+        as_of_date: date,
+        account_ids: Optional[Iterable[int]] = None,
+    ) -> Dict[int, Decimal]:
+        """
+        Debit-minus-credit balance per account at the end of ``as_of_date``.
+
+        Whole periods ending on or before the date come from the balance
+        table; only GL rows of a partially elapsed period are scanned.
+        """
+        balances: Dict[int, Decimal] = defaultdict(lambda: ZERO)
+        closed = AccountPeriodBalance.objects.filter(
+            organization=self.organization,
+            period__end_date__lte=as_of_date,
+        )
+        partial = GeneralLedger.objects.filter(
+            organization=self.organization,
+            is_archived=False,
+            period__start_date__lte=as_of_date,
+            period__end_date__gt=as_of_date,
+            transaction_date__lte=as_of_date,
+        )
+        if account_ids is not None:
+            account_ids = list(account_ids)
+            closed = closed.filter(account_id__in=account_ids)
+            partial = partial.filter(account_id__in=account_ids)
+
+        for row in closed.values("account_id").annotate(debit=Sum("debit_total"), credit=Sum("credit_total")):
+            balances[row["account_id"]] += (row["debit"] or ZERO) - (row["credit"] or ZERO)
+        for row in partial.values("account_id").annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount")):
+            balances[row["account_id"]] += (row["debit"] or ZERO) - (row["credit"] or ZERO)
+        return dict(balances)
+
+    def balance_history(self, account_id: int, dates: Iterable[date]) -> Dict[date, Decimal]:
+        """
+        Balance of one account at the end of each date, in three queries.
+
+        Closed periods contribute their stored net movement; GL rows are only
+        read for the periods that contain one of the requested dates.
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+        periods = list(
+            AccountingPeriod.objects.filter(
+                organization=self.organization,
+                start_date__lte=dates[-1],
+            ).values_list("pk", "start_date", "end_date")
+        )
+        net_by_period = {
+            row["period_id"]: (row["debit"] or ZERO) - (row["credit"] or ZERO)
+            for row in AccountPeriodBalance.objects.filter(
+                account_id=account_id,
+                period_id__in=[period[0] for period in periods],
+            )
+            .values("period_id")
+            .annotate(debit=Sum("debit_total"), credit=Sum("credit_total"))
+        }
+        containing = {
+            as_of: period_id
+            for as_of in dates
+            for period_id, start, end in periods
+            if start <= as_of < end
+        }
+        partial_rows = list(
+            GeneralLedger.objects.filter(
+                account_id=account_id,
+                is_archived=False,
+                period_id__in=set(containing.values()),
+                transaction_date__lte=dates[-1],
+            )
+            .values("period_id", "transaction_date")
+            .annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount"))
+        )
+
+        history: Dict[date, Decimal] = {}
+        for as_of in dates:
+            balance = sum(
+                (net_by_period.get(period_id, ZERO) for period_id, _, end in periods if end <= as_of),
+                ZERO,
+            )
+            period_id = containing.get(as_of)
+            if period_id is not None:
+                balance += sum(
+                    ((row["debit"] or ZERO) - (row["credit"] or ZERO)
+                     for row in partial_rows
+                     if row["period_id"] == period_id and row["transaction_date"] <= as_of),
+                    ZERO,
+                )
+            history[as_of] = balance
+        return history
+
+    def period_activity(self, account_id: int, start_date: date, end_date: date) -> Tuple[Decimal, Decimal]:
+        """Debit and credit totals for periods lying entirely within the range."""
+        totals = AccountPeriodBalance.objects.filter(
+            organization=self.organization,
+            account_id=account_id,
+            period__start_date__gte=start_date,
+            period__end_date__lte=end_date,
+        ).aggregate(debit=Sum("debit_total"), credit=Sum("credit_total"))
+        return totals["debit"] or ZERO, totals["credit"] or ZERO
+
+    # ------------------------------------------------------------------
+    # Rebuild / verification
+    # ------------------------------------------------------------------
+    def _expected_rows(self) -> Dict[BalanceKey, AccountPeriodBalance]:
+        gl_totals = (
+            GeneralLedger.objects.filter(organization=self.organization, is_archived=False)
+            .values("account_id", "period_id", "period__start_date", "department_id", "project_id", "cost_center_id")
+            .annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount"))
+        )
+        activity: Dict[BalanceKey, List] = {}
+        for row in gl_totals:
+            key = (
+                row["account_id"],
+                row["period_id"],
+                dimension_key(row["department_id"], row["project_id"], row["cost_center_id"]),
+            )
+            bucket = activity.setdefault(key, [row["period__start_date"], ZERO, ZERO])
+            bucket[1] += row["debit"] or ZERO
+            bucket[2] += row["credit"] or ZERO
+
+        expected: Dict[BalanceKey, AccountPeriodBalance] = {}
+        running: Dict[Tuple[int, str], Decimal] = defaultdict(lambda: ZERO)
+        for key in sorted(activity, key=lambda k: (k[0], k[2], activity[k][0])):
+            _, debit, credit = activity[key]
+            opening = running[(key[0], key[2])]
+            closing = opening + debit - credit
+            running[(key[0], key[2])] = closing
+            expected[key] = AccountPeriodBalance(
+                organization=self.organization,
+                account_id=key[0],
+                period_id=key[1],
+                dimension_key=key[2],
+                opening_balance=opening,
+                debit_total=debit,
+                credit_total=credit,
+                closing_balance=closing,
+            )
+        return expected
+
+    def verify(self) -> dict:
+        """Compare stored balances with a fresh aggregation of the GL."""
+        expected = self._expected_rows()
+        stored = {
+            (row.account_id, row.period_id, row.dimension_key): row
+            for row in AccountPeriodBalance.objects.filter(organization=self.organization)
+        }
+        fields = ("opening_balance", "debit_total", "credit_total", "closing_balance")
+        mismatched = [
+            key
+            for key, row in expected.items()
+            if key in stored and any(getattr(row, f) != getattr(stored[key], f) for f in fields)
+        ]
+        return {
+            "organization_id": self.organization.pk,
+            "expected_rows": len(expected),
+            "stored_rows": len(stored),
+            "missing": sorted(set(expected) - set(stored)),
+            "extra": sorted(set(stored) - set(expected)),
+            "mismatched": sorted(mismatched),
+        }
+
+    @transaction.atomic
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Replace the organization's balance rows with values derived from the GL."""
+        expected = self._expected_rows()
+        AccountPeriodBalance.objects.filter(organization=self.organization).delete()
+        AccountPeriodBalance.objects.bulk_create(expected.values(), batch_size=batch_size)
+        logger.info(
+            "account_period_balance.rebuilt",
+            extra={"organization_id": self.organization.pk, "rows": len(expected)},
+        )
+        return len(expected)
@@ -25,6 +25,8 @@ from accounting.models import (
     Organization, Account, Journal, JournalLine,
     AccountingPeriod, FiscalYear
 )
+from accounting.services.account_balance_service import AccountBalanceService
+from accounting.services.monthly_activity_service import MonthlyActivityService
 from accounting.services.payable_dashboard_service import PayableDashboardService
 from accounting.services.receivable_dashboard_service import ReceivableDashboardService
 
@@ -237,46 +239,14 @@ class AnalyticsService:
         
         Args:
             account_id: Account ID
-            months: Number of months to retrieve
+            months: Number of calendar months to retrieve
         
         Returns:
-            List of monthly balances
+            List of month-end balances, oldest first (the current month ends today)
         """
-        cache_key = self.cache_manager.get_key(f'account_history_{account_id}_{months}')
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-        
-        try:
-            account = Account.objects.get(
-                id=account_id,
-                organization=self.organization
-            )
-        except Account.DoesNotExist:
+        if not Account.objects.filter(pk=account_id, organization=self.organization).exists():
             return []
-        
-        history = []
-        start_date = date.today() - timedelta(days=30*months)
-        
-        for month_offset in range(months):
-            current_date = start_date + timedelta(days=30*month_offset)
-            month_end = current_date + timedelta(days=29)
-            
-            balance = JournalLine.objects.filter(
-                account=account,
-                journal__journal_date__lte=month_end,
-                journal__organization=self.organization
-            ).aggregate(
-                balance=Sum('debit_amount') - Sum('credit_amount')
-            )['balance'] or Decimal('0.00')
-            
-            history.append({
-                'date': month_end.isoformat(),
-                'balance': float(balance),
-            })
-        
-        cache.set(cache_key, history, self.CACHE_TIMEOUT_LONG)
-        return history
+        return MonthlyActivityService(self.organization).get(months).balance_history(account_id, months)
 
 
 class FinancialMetrics:
@@ -284,6 +254,7 @@ class FinancialMetrics:
     
     def __init__(self, organization: Organization):
         self.organization = organization
+        self._balance_service = AccountBalanceService(organization)
     
     def get_financial_summary(self, as_of_date: date) -> Dict[str, Any]:
         """
@@ -336,23 +307,18 @@ class FinancialMetrics:
                 - equity: Assets - Liabilities
                 - debt_to_equity: Liabilities / Equity
         """
-        # Get asset balances
-        assets = Decimal('0.00')
-        for asset_account in Account.objects.filter(
+        asset_ids = list(Account.objects.filter(
             organization=self.organization,
             account_type='ASSET'
-        ):
-            balance = self._get_account_balance(asset_account, as_of_date)
-            assets += balance
-        
-        # Get liability balances
-        liabilities = Decimal('0.00')
-        for liability_account in Account.objects.filter(
+        ).values_list('pk', flat=True))
+        liability_ids = list(Account.objects.filter(
             organization=self.organization,
             account_type='LIABILITY'
-        ):
-            balance = self._get_account_balance(liability_account, as_of_date)
-            liabilities += balance
+        ).values_list('pk', flat=True))
+        balances = self._balance_service.balances_as_of(as_of_date, asset_ids + liability_ids)
+        
+        assets = sum((balances.get(pk, Decimal('0.00')) for pk in asset_ids), Decimal('0.00'))
+        liabilities = sum((balances.get(pk, Decimal('0.00')) for pk in liability_ids), Decimal('0.00'))
         
         equity = assets - liabilities
         debt_to_equity = (liabilities / equity) if equity > 0 else Decimal('0.00')
@@ -381,19 +347,16 @@ class FinancialMetrics:
             code__startswith='10'  # Asset accounts typically start with 10xx
         )
         
-        current_cash = Decimal('0.00')
-        for account in cash_accounts:
-            balance = self._get_account_balance(account, as_of_date)
-            if balance > 0:
-                current_cash += balance
-        
-        # Get previous month cash
+        cash_ids = list(cash_accounts.values_list('pk', flat=True))
         previous_month = as_of_date - timedelta(days=30)
-        previous_cash = Decimal('0.00')
-        for account in cash_accounts:
-            balance = self._get_account_balance(account, previous_month)
-            if balance > 0:
-                previous_cash += balance
+        current_balances = self._balance_service.balances_as_of(as_of_date, cash_ids)
+        previous_balances = self._balance_service.balances_as_of(previous_month, cash_ids)
+        current_cash = sum(
+            (balance for balance in current_balances.values() if balance > 0), Decimal('0.00')
+        )
+        previous_cash = sum(
+            (balance for balance in previous_balances.values() if balance > 0), Decimal('0.00')
+        )
         
         trend = 'UP' if current_cash > previous_cash else 'DOWN'
         trend_percent = (
@@ -411,14 +374,9 @@ class FinancialMetrics:
     
     def _get_account_balance(self, account: Account, as_of_date: date) -> Decimal:
         """Calculate account balance as of specific date."""
-        balance = JournalLine.objects.filter(
-            account=account,
-            journal__journal_date__lte=as_of_date,
-            journal__is_posted=True
-        ).aggregate(
-            balance=Sum('debit_amount') - Sum('credit_amount')
-        )['balance'] or Decimal('0.00')
-        return balance
+        return self._balance_service.balances_as_of(as_of_date, [account.pk]).get(
+            account.pk, Decimal('0.00')
+        )
 
 
 class PerformanceMetrics:
@@ -478,41 +436,12 @@ class TrendAnalyzer:
         Get monthly revenue/expense trend.
         
         Args:
-            months: Number of months to analyze
+            months: Number of calendar months (AD, or BS for BS organizations)
         
         Returns:
             List of monthly data points with revenue, expenses, net income
         """
-        trend = []
-        start_date = date.today() - timedelta(days=30*months)
-        
-        for month_offset in range(months):
-            current_month = start_date + timedelta(days=30*month_offset)
-            month_start = current_month.replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            revenue = JournalLine.objects.filter(
-                journal__organization=self.organization,
-                account__account_type='REVENUE',
-                journal__journal_date__range=[month_start, month_end],
-                journal__is_posted=True
-            ).aggregate(total=Sum('credit_amount'))['total'] or Decimal('0.00')
-            
-            expenses = JournalLine.objects.filter(
-                journal__organization=self.organization,
-                account__account_type='EXPENSE',
-                journal__journal_date__range=[month_start, month_end],
-                journal__is_posted=True
-            ).aggregate(total=Sum('debit_amount'))['total'] or Decimal('0.00')
-            
-            trend.append({
-                'month': current_month.strftime('%Y-%m'),
-                'revenue': float(revenue),
-                'expenses': float(expenses),
-                'net_income': float(revenue - expenses),
-            })
-        
-        return trend
+        return MonthlyActivityService(self.organization).get(months).trend(months)
     
     def get_revenue_forecast(self, months_ahead: int = 3) -> List[Dict[str, Any]]:
         """
@@ -1,45 +1,360 @@
 from __future__ import annotations
 
-from datetime import timedelta
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from accounting.models import BankStatement, BankTransaction
+from django.db import transaction
+from django.utils import timezone
+
+from accounting.models import BankStatement, BankStatementLine, BankTransaction
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+@dataclass
+class StatementMatch:
+    """One reconciled group: a line with its transactions, or several lines with one transaction."""
+
+    line_ids: List[int]
+    transaction_ids: List[int]
+    confidence: float
+    kind: str  # "one_to_one", "one_to_many" or "many_to_one"
+
+
+@dataclass
+class _Entry:
+    pk: int
+    cents: int
+    day: int  # date ordinal
+    text: str
+    obj: object
+
+
+def _normalize(*values: Optional[str]) -> str:
+    for value in values:
+        if value:
+            return _NON_ALNUM.sub("", value.lower())
+    return ""
+
+
+def _similarity(left: str, right: str) -> float:
+    if not left or not right:
+        return 0.0
+    if left == right:
+        return 1.0
+    return SequenceMatcher(None, left, right).ratio()
+
+
+def _to_cents(amount: Decimal) -> int:
+    return int(amount.quantize(Decimal("0.01")) * 100)
 
 
 class BankReconciliationService:
-    """Matches statement lines against recorded bank transactions."""
+    """
+    Matches statement lines against recorded bank transactions.
+
+    ``match`` reads the statement's unmatched lines and the bank account's
+    unreconciled transactions in the statement's date window once, indexes the
+    transactions by amount (in cents) and date, and then:
+
+    1. pairs lines with transactions of the same amount within
+       ``DATE_TOLERANCE``, best pairs first (closest date, then most similar
+       reference), and follows augmenting paths so repeated amounts yield as
+       many pairs as possible instead of whatever the first match blocks;
+    2. matches each leftover line to two or three leftover transactions
+       summing to its amount (one-to-many), then each leftover transaction to
+       two or three leftover lines (many-to-one);
+    3. saves everything with one ``bulk_update`` per model.
+
+    Each matched line stores ``match_confidence`` (0-1), ``match_type`` and
+    ``matched_transaction_ids`` in its metadata; ``matches`` holds the same
+    report after a run.
+    """
 
     DATE_TOLERANCE = timedelta(days=2)
     AMOUNT_TOLERANCE = Decimal("0.01")
+    # Nearest-dated candidates kept per line for pairing and for split sums.
+    MAX_CANDIDATES = 12
+    SPLIT_CANDIDATES = 40
+    BATCH_SIZE = 1000
 
     def __init__(self, statement: BankStatement):
         self.statement = statement
+        self.matches: List[StatementMatch] = []
 
     def match(self) -> int:
-        matched = 0
-        for line in self.statement.lines.select_related("matched_transaction").all():
-            if line.matched_transaction_id:
-                continue
-            candidate = (
-                BankTransaction.objects.filter(
-                    bank_account=self.statement.bank_account,
-                    amount=line.amount,
-                )
+        """Match every open statement line; returns the number of lines matched."""
+        with transaction.atomic():
+            lines = self._entries(
+                self.statement.lines.filter(matched_transaction__isnull=True).only(
+                    "statement_line_id", "line_date", "amount", "reference", "description", "metadata"
+                ),
+                "line_date",
+            )
+            if not lines:
+                self.matches = []
+                return 0
+            first_day = min(entry.day for entry in lines) - self.DATE_TOLERANCE.days
+            last_day = max(entry.day for entry in lines) + self.DATE_TOLERANCE.days
+            transactions = self._entries(
+                BankTransaction.objects.select_for_update()
                 .filter(
-                    transaction_date__lte=line.line_date + self.DATE_TOLERANCE,
-                    transaction_date__gte=line.line_date - self.DATE_TOLERANCE,
+                    bank_account=self.statement.bank_account,
                     is_reconciled=False,
+                    transaction_date__gte=date.fromordinal(first_day),
+                    transaction_date__lte=date.fromordinal(last_day),
                 )
-                .first()
+                .only("transaction_id", "transaction_date", "amount", "reference", "description"),
+                "transaction_date",
             )
-            if candidate:
-                line.matched_transaction = candidate
-                line.save(update_fields=["matched_transaction"])
-                candidate.is_reconciled = True
-                candidate.reconciled_at = line.line_date
-                candidate.save(update_fields=["is_reconciled", "reconciled_at"])
-                matched += 1
+
+            self.matches = self._pair(lines, transactions)
+            matched_lines = {pk for match in self.matches for pk in match.line_ids}
+            matched_transactions = {pk for match in self.matches for pk in match.transaction_ids}
+            self.matches += self._split(
+                [entry for entry in lines if entry.pk not in matched_lines],
+                [entry for entry in transactions if entry.pk not in matched_transactions],
+            )
+            self._save(lines, transactions)
+
+        matched = sum(len(match.line_ids) for match in self.matches)
         if matched:
             self.statement.status = "matched"
             self.statement.save(update_fields=["status"])
         return matched
+
+    @staticmethod
+    def _entries(queryset, date_field: str) -> List[_Entry]:
+        entries = [
+            _Entry(
+                pk=obj.pk,
+                cents=_to_cents(obj.amount),
+                day=getattr(obj, date_field).toordinal(),
+                text=_normalize(obj.reference, obj.description),
+                obj=obj,
+            )
+            for obj in queryset
+        ]
+        entries.sort(key=lambda entry: (entry.day, entry.pk))
+        return entries
+
+    def _confidence(self, days: int, similarity: float, cents_off: int = 0, parts: int = 1) -> float:
+        score = 0.5 + 0.3 * (1 - days / (self.DATE_TOLERANCE.days + 1)) + 0.2 * similarity
+        if cents_off:
+            score -= 0.1
+        if parts > 1:
+            score *= 0.9
+        return round(max(score, 0.0), 3)
+
+    # ------------------------------------------------------------------
+    # One-to-one
+    # ------------------------------------------------------------------
+    def _pair(self, lines: Sequence[_Entry], transactions: Sequence[_Entry]) -> List[StatementMatch]:
+        by_cents: Dict[int, List[_Entry]] = defaultdict(list)
+        for entry in transactions:
+            by_cents[entry.cents].append(entry)
+        days_by_cents = {cents: [entry.day for entry in bucket] for cents, bucket in by_cents.items()}
+        tolerance_days = self.DATE_TOLERANCE.days
+        tolerance_cents = _to_cents(self.AMOUNT_TOLERANCE)
+
+        costs: Dict[Tuple[int, int], tuple] = {}
+        adjacency: Dict[int, List[int]] = {}
+        for line in lines:
+            options = []
+            for cents in range(line.cents - tolerance_cents, line.cents + tolerance_cents + 1):
+                days = days_by_cents.get(cents)
+                if not days:
+                    continue
+                window = by_cents[cents][
+                    bisect_left(days, line.day - tolerance_days):bisect_right(days, line.day + tolerance_days)
+                ]
+                options.extend(
+                    (abs(cents - line.cents), abs(entry.day - line.day), entry.pk, entry) for entry in window
+                )
+            options.sort(key=lambda option: option[:3])
+            adjacency[line.pk] = []
+            for cents_off, days, _, entry in options[:self.MAX_CANDIDATES]:
+                similarity = _similarity(line.text, entry.text)
+                costs[(line.pk, entry.pk)] = (cents_off, days, -similarity, line.day, line.pk, entry.pk)
+                adjacency[line.pk].append(entry.pk)
+
+        line_of: Dict[int, int] = {}
+        transaction_of: Dict[int, int] = {}
+        for line_pk, transaction_pk in sorted(costs, key=costs.__getitem__):
+            if line_pk not in transaction_of and transaction_pk not in line_of:
+                transaction_of[line_pk] = transaction_pk
+                line_of[transaction_pk] = line_pk
+        for line in lines:
+            if line.pk not in transaction_of and adjacency[line.pk]:
+                self._augment(line.pk, adjacency, transaction_of, line_of)
+
+        matches = []
+        for line in lines:
+            transaction_pk = transaction_of.get(line.pk)
+            if transaction_pk is None:
+                continue
+            cents_off, days, negative_similarity = costs[(line.pk, transaction_pk)][:3]
+            matches.append(StatementMatch(
+                line_ids=[line.pk],
+                transaction_ids=[transaction_pk],
+                confidence=self._confidence(days, -negative_similarity, cents_off),
+                kind="one_to_one",
+            ))
+        return matches
+
+    @staticmethod
+    def _augment(
+        start: int,
+        adjacency: Dict[int, List[int]],
+        transaction_of: Dict[int, int],
+        line_of: Dict[int, int],
+    ) -> bool:
+        """Give ``start`` a transaction by shifting matched lines along an alternating path."""
+        reached_from: Dict[int, int] = {}
+        queue = deque([start])
+        seen = {start}
+        while queue:
+            line_pk = queue.popleft()
+            for transaction_pk in adjacency[line_pk]:
+                if transaction_pk in reached_from:
+                    continue
+                reached_from[transaction_pk] = line_pk
+                owner = line_of.get(transaction_pk)
+                if owner is None:
+                    while True:
+                        line_pk = reached_from[transaction_pk]
+                        previous = transaction_of.get(line_pk)
+                        transaction_of[line_pk] = transaction_pk
+                        line_of[transaction_pk] = line_pk
+                        if line_pk == start:
+                            return True
+                        transaction_pk = previous
+                if owner not in seen:
+                    seen.add(owner)
+                    queue.append(owner)
+        return False
+
+    # ------------------------------------------------------------------
+    # One-to-many and many-to-one
+    # ------------------------------------------------------------------
+    def _split(self, lines: List[_Entry], transactions: List[_Entry]) -> List[StatementMatch]:
+        matches = []
+        used_transactions: set = set()
+        transaction_days = [entry.day for entry in transactions]
+        for line in lines:
+            group = self._find_split(line, transactions, transaction_days, used_transactions)
+            if group:
+                used_transactions.update(entry.pk for entry in group)
+                matches.append(self._split_match([line], group, "one_to_many"))
+
+        used_lines = {pk for match in matches for pk in match.line_ids}
+        line_days = [line.day for line in lines]
+        for entry in transactions:
+            if entry.pk in used_transactions:
+                continue
+            group = self._find_split(entry, lines, line_days, used_lines)
+            if group:
+                used_lines.update(line.pk for line in group)
+                matches.append(self._split_match(group, [entry], "many_to_one"))
+        return matches
+
+    def _find_split(
+        self, target: _Entry, pool: List[_Entry], days: List[int], used: set
+    ) -> Optional[List[_Entry]]:
+        """Two or three same-signed pool entries near ``target`` whose amounts sum to it."""
+        window = pool[
+            bisect_left(days, target.day - self.DATE_TOLERANCE.days):
+            bisect_right(days, target.day + self.DATE_TOLERANCE.days)
+        ]
+        nearest = sorted(
+            (
+                entry for entry in window
+                if entry.pk not in used
+                and entry.cents
+                and (entry.cents > 0) == (target.cents > 0)
+                and abs(entry.cents) < abs(target.cents)
+            ),
+            key=lambda entry: (abs(entry.day - target.day), entry.pk),
+        )[:self.SPLIT_CANDIDATES]
+        # Work on magnitudes in ascending order so each loop can stop as soon
+        # as its smallest possible completion overshoots the target.
+        candidates = sorted(nearest, key=lambda entry: abs(entry.cents))
+        amounts = [abs(entry.cents) for entry in candidates]
+        total = abs(target.cents)
+        positions: Dict[int, List[int]] = defaultdict(list)
+        for index, amount in enumerate(amounts):
+            positions[amount].append(index)
+
+        hits: List[Tuple[int, ...]] = []
+        for first, amount in enumerate(amounts):
+            if amount * 2 > total:
+                break
+            hits.extend((first, last) for last in positions.get(total - amount, ()) if last > first)
+        if not hits:
+            for first, amount in enumerate(amounts):
+                if amount * 3 > total:
+                    break
+                for second in range(first + 1, len(amounts)):
+                    subtotal = amount + amounts[second]
+                    if subtotal + amounts[second] > total:
+                        break
+                    hits.extend(
+                        (first, second, last)
+                        for last in positions.get(total - subtotal, ())
+                        if last > second
+                    )
+        if not hits:
+            return None
+        best = min(hits, key=lambda group: sum(abs(candidates[index].day - target.day) for index in group))
+        return sorted((candidates[index] for index in best), key=lambda entry: (entry.day, entry.pk))
+
+    def _split_match(self, lines: List[_Entry], transactions: List[_Entry], kind: str) -> StatementMatch:
+        days = max(abs(line.day - entry.day) for line in lines for entry in transactions)
+        similarity = max(_similarity(line.text, entry.text) for line in lines for entry in transactions)
+        return StatementMatch(
+            line_ids=[line.pk for line in lines],
+            transaction_ids=[entry.pk for entry in transactions],
+            confidence=self._confidence(days, similarity, parts=len(lines) + len(transactions) - 1),
+            kind=kind,
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _save(self, lines: Sequence[_Entry], transactions: Sequence[_Entry]) -> None:
+        lines_by_pk = {entry.pk: entry.obj for entry in lines}
+        transactions_by_pk = {entry.pk: entry.obj for entry in transactions}
+        changed_lines: List[BankStatementLine] = []
+        changed_transactions: List[BankTransaction] = []
+        for match in self.matches:
+            group_lines = [lines_by_pk[pk] for pk in match.line_ids]
+            for line in group_lines:
+                line.matched_transaction_id = match.transaction_ids[0]
+                line.metadata = {
+                    **(line.metadata or {}),
+                    "match_confidence": match.confidence,
+                    "match_type": match.kind,
+                    "matched_transaction_ids": match.transaction_ids,
+                }
+                changed_lines.append(line)
+            reconciled_at = timezone.make_aware(
+                datetime.combine(max(line.line_date for line in group_lines), time.min)
+            )
+            for pk in match.transaction_ids:
+                bank_transaction = transactions_by_pk[pk]
+                bank_transaction.is_reconciled = True
+                bank_transaction.reconciled_at = reconciled_at
+                changed_transactions.append(bank_transaction)
+
+        BankStatementLine.objects.bulk_update(
+            changed_lines, ["matched_transaction", "metadata"], batch_size=self.BATCH_SIZE
+        )
+        BankTransaction.objects.bulk_update(
+            changed_transactions, ["is_reconciled", "reconciled_at"], batch_size=self.BATCH_SIZE
+        )
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from django.db import transaction
 from django.utils import timezone
@@ -29,6 +29,16 @@ class InventoryPostingResult:
     credit_account: ChartOfAccount
 
 
+@dataclass
+class LayerConsumption:
+    """Planned draw-down of cost layers; ``takes`` holds ``(layer_pk, taken, left)``."""
+    quantity: Decimal
+    total_cost: Decimal
+    unit_cost: Decimal
+    shortfall: Decimal
+    takes: List[Tuple[int, Decimal, Decimal]] = field(default_factory=list)
+
+
 class CostCalculator:
     def __init__(self, *, organization, product, warehouse, location=None, batch=None):
         self.organization = organization
@@ -67,21 +77,60 @@ class CostCalculator:
             unit_cost=unit_cost,
         )
 
-    def consume_layers(self, quantity, method):
-        order = "created_at" if method == CostingMethod.FIFO else "-created_at"
-        layers = self._layer_queryset().order_by(order)
+    def _candidate_layers(self, method, *, lock):
+        """Return ``[(pk, quantity_available, unit_cost), ...]`` in consumption order."""
+        if method == CostingMethod.FIFO:
+            order = ("created_at", "pk")
+        else:
+            order = ("-created_at", "-pk")
+        qs = self._layer_queryset().order_by(*order)
+        if lock:
+            qs = qs.select_for_update()
+        return list(qs.values_list("pk", "quantity_available", "unit_cost"))
+
+    @staticmethod
+    def plan_consumption(layers, quantity) -> LayerConsumption:
+        """Plan taking ``quantity`` from ``(pk, available, unit_cost)`` layers, in order."""
         remaining = quantity
         total_cost = Decimal("0")
-        for layer in layers:
+        takes = []
+        for pk, available, unit_cost in layers:
             if remaining <= 0:
                 break
-            take = min(layer.quantity_available, remaining)
-            total_cost += take * layer.unit_cost
-            layer.consume(take)
+            take = min(available, remaining)
+            total_cost += take * unit_cost
+            takes.append((pk, take, available - take))
             remaining -= take
-        if remaining > 0:
+        unit_cost = (total_cost / (quantity - remaining)) if quantity > remaining else Decimal("0")
+        return LayerConsumption(
+            quantity=quantity,
+            total_cost=total_cost,
+            unit_cost=unit_cost,
+            shortfall=max(remaining, Decimal("0")),
+            takes=takes,
+        )
+
+    def preview_cost(self, quantity, method) -> LayerConsumption:
+        """Dry run: cost ``quantity`` against current layers without locking or writing."""
+        return self.plan_consumption(self._candidate_layers(method, lock=False), quantity)
+
+    @transaction.atomic
+    def consume_layers(self, quantity, method):
+        """
+        Consume ``quantity`` from FIFO/LIFO layers and return ``(total_cost, unit_cost)``.
+
+        The candidate layers are locked in one query, consumption is planned in
+        memory, and the new balances are written with a single ``bulk_update``.
+        Nothing is written when the layers cannot cover ``quantity``.
+        """
+        plan = self.plan_consumption(self._candidate_layers(method, lock=True), quantity)
+        if plan.shortfall > 0:
             raise ValueError("Insufficient stock layers to cover the requested quantity.")
-        return total_cost, (total_cost / quantity) if quantity else Decimal("0")
+        CostLayer.objects.bulk_update(
+            [CostLayer(pk=pk, quantity_available=left) for pk, _, left in plan.takes],
+            ["quantity_available"],
+        )
+        return plan.total_cost, (plan.total_cost / quantity) if quantity else Decimal("0")
 
 
 class InventoryPostingService:
@@ -0,0 +1,384 @@
+"""
+Bulk IRD submission for large backlogs (e.g. month-end).
+
+``process_ird_submission`` sends one invoice per Celery task. ``IRDBatchSubmitter``
+drains the same ``IRDSubmissionTask`` queue a batch at a time:
+
+1. claim up to ``IRD_BATCH_SIZE`` due pending rows with
+   ``SELECT ... FOR UPDATE SKIP LOCKED`` and mark them processing with one
+   ``bulk_update``, so concurrent workers never pick the same invoice;
+2. build the payloads, then sign them with ``sign_payloads`` (a process pool of
+   ``IRD_SIGNING_PROCESSES`` workers for RSA);
+3. post them over a keep-alive ``requests.Session`` whose connection pool is
+   sized to ``IRD_BATCH_CONCURRENCY``, from a thread pool of the same size;
+4. write task, invoice and integration event rows back with ``bulk_update`` /
+   ``bulk_create`` in one transaction, then bulk-insert the IRD logs.
+
+A failed post is not retried inline: the task goes back to pending with the
+same backoff as the single-invoice path and a later batch picks it up. If the
+batch itself fails after claiming, every claimed row not yet recorded is put
+back the same way. Rows left processing by a worker that died are reclaimed
+once their ``last_attempt_at`` is older than ``IRD_PROCESSING_TIMEOUT_SECONDS``.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from accounting.ird_service import (
+    DEFAULT_IRD_TEST_ENDPOINT,
+    DEFAULT_SIGNING_METHOD,
+    _extract_ack_id,
+    _gateway_headers,
+    _get_ird_settings,
+    _log_ird_submissions,
+    build_ird_invoice_payload,
+    sign_payloads,
+)
+from accounting.models import FiscalYear, IntegrationEvent, IRDSubmissionTask, SalesInvoice
+from accounting.tasks import _abandoned_before, _backoff_seconds
+
+logger = logging.getLogger(__name__)
+
+_sessions: Dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    """A per-process keep-alive session holding up to ``pool_size`` connections per host."""
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[pool_size] = session
+        return session
+
+
+@dataclass
+class _Attempt:
+    submission: IRDSubmissionTask
+    invoice: SalesInvoice
+    payload: Dict[str, Any]
+    signature: Optional[str] = None
+    body: Dict[str, Any] = field(default_factory=dict)
+    response_text: str = ""
+    error: Optional[str] = None
+
+
+class IRDBatchSubmitter:
+    """Claim, sign, send and record a batch of queued IRD submissions."""
+
+    def __init__(
+        self,
+        *,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        signing_processes: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+        endpoint: Optional[str] = None,
+        timeout: int = 10,
+    ):
+        self.batch_size = batch_size or getattr(settings, "IRD_BATCH_SIZE", 500)
+        self.concurrency = max(1, concurrency or getattr(settings, "IRD_BATCH_CONCURRENCY", 8))
+        self.signing_processes = (
+            getattr(settings, "IRD_SIGNING_PROCESSES", 2) if signing_processes is None else signing_processes
+        )
+        self.session = session or pooled_session(self.concurrency)
+        self.endpoint = endpoint or getattr(settings, "IRD_ENDPOINT", DEFAULT_IRD_TEST_ENDPOINT)
+        self.timeout = timeout
+
+    def claim(self, task_id: str = "") -> List[IRDSubmissionTask]:
+        """Lock and mark processing up to ``batch_size`` due or abandoned submissions, highest priority first."""
+        now = timezone.now()
+        due = Q(status=IRDSubmissionTask.STATUS_PENDING) & (
+            Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+        )
+        abandoned = Q(status=IRDSubmissionTask.STATUS_PROCESSING, last_attempt_at__lt=_abandoned_before(now))
+        priority_rank = Case(
+            When(priority=IRDSubmissionTask.PRIORITY_HIGH, then=Value(0)),
+            When(priority=IRDSubmissionTask.PRIORITY_NORMAL, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+        with transaction.atomic():
+            submissions = list(
+                IRDSubmissionTask.objects
+                .select_for_update(skip_locked=True)
+                .filter(due | abandoned)
+                .order_by(priority_rank, F('next_attempt_at').asc(nulls_first=True), 'pk')[:self.batch_size]
+            )
+            for submission in submissions:
+                submission.status = IRDSubmissionTask.STATUS_PROCESSING
+                submission.attempts += 1
+                submission.last_attempt_at = now
+                submission.celery_task_id = task_id or ''
+                submission.updated_at = now
+            IRDSubmissionTask.objects.bulk_update(
+                submissions,
+                ['status', 'attempts', 'last_attempt_at', 'celery_task_id', 'updated_at'],
+            )
+        return submissions
+
+    def run(self, task_id: str = "") -> Dict[str, Any]:
+        started = time.perf_counter()
+        submissions = self.claim(task_id)
+        attempts: List[_Attempt] = []
+        if submissions:
+            try:
+                ird_settings = _get_ird_settings()
+                attempts = self._prepare(submissions, ird_settings)
+                self._sign(attempts)
+                self._send(attempts, ird_settings)
+                self._record(attempts)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("ird_batch.failed", extra={"claimed": len(submissions)})
+                released = self._release(submissions, f"Batch failed: {exc}")
+                return {
+                    "claimed": len(submissions),
+                    "released": released,
+                    "error": str(exc),
+                    "elapsed_seconds": round(time.perf_counter() - started, 3),
+                }
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "claimed": len(attempts),
+            "succeeded": sum(1 for attempt in attempts if attempt.error is None),
+            "retrying": sum(
+                1 for attempt in attempts
+                if attempt.submission.status == IRDSubmissionTask.STATUS_PENDING
+            ),
+            "failed": sum(
+                1 for attempt in attempts
+                if attempt.submission.status == IRDSubmissionTask.STATUS_FAILED
+            ),
+            "elapsed_seconds": round(elapsed, 3),
+            "invoices_per_second": round(len(attempts) / elapsed, 1) if attempts and elapsed else None,
+        }
+        if attempts:
+            logger.info("ird_batch.completed", extra=summary)
+        return summary
+
+    @staticmethod
+    def _release(submissions: List[IRDSubmissionTask], error: str) -> int:
+        """Put claimed rows that were not recorded yet back to pending (or failed) with backoff."""
+        claimed_at = {submission.pk: submission.last_attempt_at for submission in submissions}
+        now = timezone.now()
+        with transaction.atomic():
+            unfinished = [
+                submission
+                for submission in IRDSubmissionTask.objects.select_for_update().filter(
+                    pk__in=claimed_at, status=IRDSubmissionTask.STATUS_PROCESSING
+                )
+                # Skip rows another worker has reclaimed since.
+                if submission.last_attempt_at == claimed_at[submission.pk]
+            ]
+            for submission in unfinished:
+                hard_fail = submission.attempts >= submission.max_attempts
+                submission.status = (
+                    IRDSubmissionTask.STATUS_FAILED if hard_fail else IRDSubmissionTask.STATUS_PENDING
+                )
+                submission.last_error = error
+                submission.next_attempt_at = (
+                    None if hard_fail else now + timedelta(seconds=_backoff_seconds(submission.attempts))
+                )
+                submission.updated_at = now
+            IRDSubmissionTask.objects.bulk_update(
+                unfinished, ['status', 'last_error', 'next_attempt_at', 'updated_at']
+            )
+        return len(unfinished)
+
+    def _prepare(self, submissions: List[IRDSubmissionTask], ird_settings: Any) -> List[_Attempt]:
+        invoices = (
+            SalesInvoice.objects
+            .select_related('organization', 'customer', 'currency')
+            .prefetch_related('lines__tax_code')
+            .in_bulk([submission.invoice_id for submission in submissions])
+        )
+        self._prime_fiscal_year_codes(invoices.values())
+        return [
+            _Attempt(
+                submission=submission,
+                invoice=invoices[submission.invoice_id],
+                payload=build_ird_invoice_payload(invoices[submission.invoice_id], ird_settings),
+            )
+            for submission in submissions
+        ]
+
+    @staticmethod
+    def _prime_fiscal_year_codes(invoices) -> None:
+        """Resolve fiscal year codes for the whole batch with one query.
+
+        ``build_ird_invoice_payload`` otherwise runs ``FiscalYear.get_for_date``
+        per invoice. The code is only set in memory and is not saved.
+        """
+        pending = [invoice for invoice in invoices if not invoice.ird_fiscal_year_code]
+        if not pending:
+            return
+        fiscal_years: Dict[int, List[FiscalYear]] = {}
+        for fiscal_year in (
+            FiscalYear.objects
+            .filter(organization_id__in={invoice.organization_id for invoice in pending})
+            .order_by('-is_current', '-start_date')
+        ):
+            fiscal_years.setdefault(fiscal_year.organization_id, []).append(fiscal_year)
+        for invoice in pending:
+            match = next(
+                (
+                    fiscal_year for fiscal_year in fiscal_years.get(invoice.organization_id, [])
+                    if fiscal_year.start_date <= invoice.invoice_date <= fiscal_year.end_date
+                ),
+                None,
+            )
+            invoice.ird_fiscal_year_code = match.code if match else str(invoice.invoice_date.year)
+
+    def _sign(self, attempts: List[_Attempt]) -> None:
+        signed = sign_payloads(
+            [attempt.payload for attempt in attempts],
+            getattr(settings, "IRD_SIGNING_SECRET", ""),
+            method=self._signing_method,
+            rsa_private_key=getattr(settings, "IRD_RSA_PRIVATE_KEY", None),
+            rsa_passphrase=getattr(settings, "IRD_RSA_PRIVATE_KEY_PASSPHRASE", None),
+            processes=self.signing_processes,
+        )
+        for attempt, (signature, error) in zip(attempts, signed):
+            attempt.signature = signature
+            attempt.error = error
+
+    @property
+    def _signing_method(self) -> str:
+        return getattr(settings, "IRD_SIGNING_METHOD", DEFAULT_SIGNING_METHOD)
+
+    def _send(self, attempts: List[_Attempt], ird_settings: Any) -> None:
+        headers = _gateway_headers(self._signing_method, ird_settings)
+        ready = [attempt for attempt in attempts if attempt.error is None]
+        if not ready:
+            return
+
+        def post(attempt: _Attempt) -> None:
+            try:
+                response = self.session.post(
+                    self.endpoint,
+                    json=attempt.payload,
+                    headers={**headers, "X-Signature": attempt.signature},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+            except Exception as exc:  # noqa: BLE001
+                attempt.error = str(exc)
+                return
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            attempt.body = body if isinstance(body, dict) else {}
+            attempt.response_text = getattr(response, "text", "")
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(ready))) as pool:
+            list(pool.map(post, ready))
+
+    def _record(self, attempts: List[_Attempt]) -> None:
+        now = timezone.now()
+        submitted_at = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        invoices: List[SalesInvoice] = []
+        events: List[IntegrationEvent] = []
+        logs: List[Dict[str, Any]] = []
+
+        for attempt in attempts:
+            submission, invoice = attempt.submission, attempt.invoice
+            submission.updated_at = now
+            if attempt.error is not None:
+                hard_fail = submission.attempts >= submission.max_attempts
+                submission.status = (
+                    IRDSubmissionTask.STATUS_FAILED if hard_fail else IRDSubmissionTask.STATUS_PENDING
+                )
+                submission.last_error = attempt.error
+                submission.next_attempt_at = (
+                    None if hard_fail else now + timedelta(seconds=_backoff_seconds(submission.attempts))
+                )
+                logs.append({"invoice": invoice, "payload": attempt.payload, "response": attempt.error, "success": False})
+                continue
+
+            body = attempt.body
+            ack_id = _extract_ack_id(body)
+            submission.status = IRDSubmissionTask.STATUS_SUCCEEDED
+            submission.last_error = ''
+            submission.next_attempt_at = None
+            submission.metadata = {
+                **(submission.metadata or {}),
+                'signature': attempt.signature,
+                'ack_id': ack_id,
+                'response': body,
+            }
+
+            invoice.ird_signature = attempt.signature
+            invoice.ird_ack_id = ack_id
+            invoice.ird_last_response = body
+            invoice.ird_last_submitted_at = now
+            invoice.ird_status = body.get("status") or body.get("responseStatus") or ("synced" if ack_id else None)
+            invoice.metadata = {
+                **(invoice.metadata or {}),
+                "ird_signature": attempt.signature,
+                "ird_ack_id": ack_id,
+                "ird_last_payload": attempt.payload,
+                "ird_last_response": body,
+                "ird_last_submitted_at": submitted_at,
+                "ird_status": invoice.ird_status,
+            }
+            invoice.updated_at = now
+            invoices.append(invoice)
+
+            events.append(IntegrationEvent(
+                event_type="sales_invoice_submitted_to_ird",
+                payload={
+                    "invoice_number": invoice.invoice_number,
+                    "ack_id": ack_id,
+                    "signature": attempt.signature,
+                    "organization_id": invoice.organization_id,
+                },
+                source_object=invoice.__class__.__name__,
+                source_id=str(invoice.pk),
+            ))
+            logs.append({
+                "invoice": invoice,
+                "payload": attempt.payload,
+                "response": body or attempt.response_text,
+                "success": True,
+            })
+
+        with transaction.atomic():
+            IRDSubmissionTask.objects.bulk_update(
+                [attempt.submission for attempt in attempts],
+                ['status', 'last_error', 'next_attempt_at', 'metadata', 'updated_at'],
+            )
+            if invoices:
+                SalesInvoice.objects.bulk_update(
+                    invoices,
+                    [
+                        'ird_signature',
+                        'ird_ack_id',
+                        'ird_last_response',
+                        'ird_last_submitted_at',
+                        'ird_status',
+                        'metadata',
+                        'updated_at',
+                    ],
+                )
+            if events:
+                IntegrationEvent.objects.bulk_create(events)
+        _log_ird_submissions(logs)
@@ -0,0 +1,158 @@
+"""
+Per-month account activity shared by ``TrendAnalyzer`` and ``AnalyticsService``.
+
+One grouped ``GeneralLedger`` query buckets debits and credits per account
+into calendar months (AD, or BS for organizations using the Bikram Sambat
+calendar), and one balance lookup supplies each account's opening balance
+before the window. The monthly trend and every account's balance history are
+derived from that single result in one pass.
+
+The result is cached per organization, calendar and day under a ``CacheTags``
+tag that ``PostingService`` bumps once a posting commits.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+from accounting.models import GeneralLedger
+from accounting.services.account_balance_service import AccountBalanceService
+from utils.cache_utils import CacheTags
+from utils.calendars import CalendarMode, recent_months
+
+ZERO = Decimal("0")
+
+CACHE_KEY = "analytics:monthly_activity:{organization_id}:{calendar}:{day}"
+CACHE_TIMEOUT = 86400
+# Smallest window computed, so the 6- and 12-month dashboards share one entry.
+MIN_MONTHS = 24
+
+Month = Tuple[date, date, str]
+
+
+def _activity_tag(organization_id) -> str:
+    return f"analytics:monthly_activity:{organization_id}"
+
+
+def invalidate_monthly_activity(organization_id) -> None:
+    """Drop the organization's cached monthly activity in every calendar."""
+    if organization_id:
+        CacheTags.invalidate(_activity_tag(organization_id))
+
+
+@dataclass
+class MonthlyActivity:
+    """Debit and credit totals per account for consecutive calendar months."""
+
+    as_of: date
+    months: List[Month]
+    opening: Dict[int, Decimal]
+    natures: Dict[int, str]
+    debits: Dict[int, List[Decimal]]
+    credits: Dict[int, List[Decimal]]
+
+    def trend(self, months: int) -> List[Dict[str, Any]]:
+        """Revenue (income credits), expenses (expense debits) and net income per month."""
+        window = range(len(self.months) - months, len(self.months))
+        revenue = [ZERO] * len(self.months)
+        expenses = [ZERO] * len(self.months)
+        for account_id, nature in self.natures.items():
+            if nature == "income":
+                revenue = [total + amount for total, amount in zip(revenue, self.credits[account_id])]
+            elif nature == "expense":
+                expenses = [total + amount for total, amount in zip(expenses, self.debits[account_id])]
+        return [
+            {
+                'month': self.months[index][2],
+                'revenue': float(revenue[index]),
+                'expenses': float(expenses[index]),
+                'net_income': float(revenue[index] - expenses[index]),
+            }
+            for index in window
+        ]
+
+    def balance_history(self, account_id: int, months: int) -> List[Dict[str, Any]]:
+        """Debit-minus-credit balance of one account at the end of each month."""
+        debits = self.debits.get(account_id) or [ZERO] * len(self.months)
+        credits = self.credits.get(account_id) or [ZERO] * len(self.months)
+        balance = self.opening.get(account_id, ZERO)
+        history = []
+        for index, (_, last_day, _) in enumerate(self.months):
+            balance += debits[index] - credits[index]
+            if index >= len(self.months) - months:
+                history.append({
+                    'date': min(last_day, self.as_of).isoformat(),
+                    'balance': float(balance),
+                })
+        return history
+
+
+class MonthlyActivityService:
+    """Build and cache ``MonthlyActivity`` for one organization."""
+
+    def __init__(self, organization, calendar: Optional[str] = None):
+        self.organization = organization
+        mode = CalendarMode.normalize(calendar or getattr(organization, 'calendar_mode', None))
+        self.calendar = CalendarMode.BS if mode == CalendarMode.BS else CalendarMode.AD
+
+    def get(self, months: int, as_of: Optional[date] = None) -> MonthlyActivity:
+        """Activity covering at least the last ``months`` months up to ``as_of`` (today)."""
+        as_of = as_of or date.today()
+        key = CacheTags.tagged_key(
+            CACHE_KEY.format(organization_id=self.organization.pk, calendar=self.calendar, day=as_of.isoformat()),
+            _activity_tag(self.organization.pk),
+        )
+        activity = cache.get(key)
+        if activity is None or len(activity.months) < months:
+            activity = self.build(max(months, MIN_MONTHS), as_of)
+            cache.set(key, activity, CACHE_TIMEOUT)
+        return activity
+
+    def build(self, months: int, as_of: date) -> MonthlyActivity:
+        calendar_months = recent_months(as_of, months, self.calendar)
+        window_start = calendar_months[0][0]
+        bucket = Case(
+            *[
+                When(transaction_date__gte=first_day, transaction_date__lte=last_day, then=Value(index))
+                for index, (first_day, last_day, _) in enumerate(calendar_months)
+            ],
+            output_field=IntegerField(),
+        )
+        rows = (
+            GeneralLedger.objects.filter(
+                organization=self.organization,
+                transaction_date__gte=window_start,
+                transaction_date__lte=as_of,
+            )
+            .annotate(month=bucket)
+            .values('month', 'account_id', 'account__account_type__nature')
+            .annotate(debit=Sum('debit_amount'), credit=Sum('credit_amount'))
+            .order_by()
+        )
+
+        natures: Dict[int, str] = {}
+        debits: Dict[int, List[Decimal]] = {}
+        credits: Dict[int, List[Decimal]] = {}
+        for row in rows:
+            account_id = row['account_id']
+            if account_id not in natures:
+                natures[account_id] = row['account__account_type__nature']
+                debits[account_id] = [ZERO] * months
+                credits[account_id] = [ZERO] * months
+            debits[account_id][row['month']] += row['debit'] or ZERO
+            credits[account_id][row['month']] += row['credit'] or ZERO
+
+        opening = AccountBalanceService(self.organization).balances_as_of(window_start - timedelta(days=1))
+        return MonthlyActivity(
+            as_of=as_of,
+            months=calendar_months,
+            opening=opening,
+            natures=natures,
+            debits=debits,
+            credits=credits,
+        )
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import List, Optional
+
+from django.db import transaction
+from django.db.models import Min, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from accounting.models import GeneralLedger, MonthlyJournalLineSummary, ReportRefreshWatermark
+from usermanagement.models import Organization
+from utils.watermarks import settled_id
+
+logger = logging.getLogger(__name__)
+
+
+def _next_month(month_start: date) -> date:
+    return (month_start + timedelta(days=32)).replace(day=1)
+
+
+class MonthlySummaryService:
+    """
+    Incremental refresh and freshness checks for ``MonthlyJournalLineSummary``.
+
+    Each organization keeps its own watermark: the highest ``gl_entry_id``
+    folded into the summary. A refresh only recomputes the months of GL rows
+    past it. GL rows are append-only (reversals add new rows), and the
+    watermark only advances to a settled id (see ``utils.watermarks``), so a
+    row whose transaction commits late is still picked up by the next run.
+    """
+
+    WATERMARK_NAME = "monthly_journalline_summary"
+    BATCH_SIZE = 1000
+
+    def __init__(self, organization=None):
+        self.organization = organization
+
+    def _watermark(self) -> Optional[ReportRefreshWatermark]:
+        return ReportRefreshWatermark.objects.filter(
+            name=self.WATERMARK_NAME, organization=self.organization
+        ).first()
+
+    def is_fresh(self) -> bool:
+        """True when every GL row of the organization is in the summary."""
+        watermark = self._watermark()
+        if watermark is None or watermark.last_id is None:
+            return False
+        return not GeneralLedger.objects.filter(
+            organization=self.organization, pk__gt=watermark.last_id
+        ).exists()
+
+    def touched_months(self, after_id: int, through_id: int) -> List[date]:
+        return list(
+            GeneralLedger.objects.filter(
+                organization=self.organization, pk__gt=after_id, pk__lte=through_id
+            ).dates("transaction_date", "month")
+        )
+
+    def refresh(self, *, full: bool = False) -> dict:
+        """Recompute touched months of one organization, or of every organization."""
+        if self.organization is not None:
+            return self._refresh(full=full)
+        watermarks = ReportRefreshWatermark.objects.filter(name=self.WATERMARK_NAME, organization__isnull=False)
+        first_id = None if full else watermarks.aggregate(first=Min("last_id"))["first"]
+        settled = settled_id(GeneralLedger, first_id)
+        results = [
+            MonthlySummaryService(organization)._refresh(full=full, settled=settled)
+            for organization in Organization.objects.filter(
+                pk__in=GeneralLedger.objects.values("organization_id")
+            ).order_by("pk")
+        ]
+        return {
+            "full": full,
+            "organizations": len(results),
+            "rows_written": sum(result["rows_written"] for result in results),
+            "duration_ms": sum(result["duration_ms"] for result in results),
+        }
+
+    @transaction.atomic
+    def _refresh(self, *, full: bool = False, settled: Optional[int] = None) -> dict:
+        started = timezone.now()
+        timer = time.perf_counter()
+        watermark, _ = ReportRefreshWatermark.objects.select_for_update().get_or_create(
+            name=self.WATERMARK_NAME, organization=self.organization
+        )
+        full = full or watermark.last_id is None
+        if settled is None or (not full and settled < watermark.last_id):
+            settled = settled_id(GeneralLedger, None if full else watermark.last_id)
+        summaries = MonthlyJournalLineSummary.objects.filter(account__organization=self.organization)
+        ledger = GeneralLedger.objects.filter(organization=self.organization)
+
+        if full:
+            months = None
+            summaries.delete()
+            source = ledger
+        else:
+            months = self.touched_months(watermark.last_id, settled)
+            if months:
+                summaries.filter(month_start__in=months).delete()
+            source = ledger.filter(
+                reduce(
+                    or_,
+                    (Q(transaction_date__gte=month, transaction_date__lt=_next_month(month)) for month in months),
+                    Q(pk__in=[]),
+                )
+            )
+
+        rows_written = 0
+        months_seen = set()
+        if full or months:
+            totals = (
+                source.annotate(month=TruncMonth("transaction_date"))
+                .values("month", "account_id")
+                .annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount"))
+                .order_by()
+            )
+            batch = []
+            for row in totals.iterator(chunk_size=self.BATCH_SIZE):
+                months_seen.add(row["month"])
+                batch.append(
+                    MonthlyJournalLineSummary(
+                        month_start=row["month"],
+                        account_id=row["account_id"],
+                        total_debit=row["debit"] or Decimal("0"),
+                        total_credit=row["credit"] or Decimal("0"),
+                    )
+                )
+                if len(batch) >= self.BATCH_SIZE:
+                    MonthlyJournalLineSummary.objects.bulk_create(batch)
+                    rows_written += len(batch)
+                    batch = []
+            if batch:
+                MonthlyJournalLineSummary.objects.bulk_create(batch)
+                rows_written += len(batch)
+
+        watermark.last_id = settled
+        watermark.refreshed_through = started
+        watermark.refreshed_at = timezone.now()
+        watermark.rows_written = rows_written
+        watermark.months_refreshed = len(months) if months is not None else len(months_seen)
+        watermark.duration_ms = int((time.perf_counter() - timer) * 1000)
+        watermark.save()
+
+        result = {
+            "organization_id": self.organization.pk,
+            "full": full,
+            "months": [month.isoformat() for month in months] if months is not None else None,
+            "rows_written": rows_written,
+            "duration_ms": watermark.duration_ms,
+        }
+        logger.info("monthly_summary.refreshed", extra=result)
+        return result
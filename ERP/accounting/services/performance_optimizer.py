@@ -22,6 +22,7 @@ from accounting.models import (
     Organization, Journal, JournalLine, Account, AccountingPeriod,
     ApprovalWorkflow
 )
+from utils.cache_utils import CacheTags
 
 logger = logging.getLogger(__name__)
 
@@ -115,7 +116,9 @@ class PerformanceOptimizer:
         Returns:
             dict with organization statistics
         """
-        cache_key = f'org_summary_{organization_id}'
+        cache_key = CacheTags.tagged_key(
+            f'org_summary_{organization_id}', CacheTags.organization(organization_id)
+        )
         cached = cache.get(cache_key)
         
         if cached:
@@ -172,7 +175,9 @@ class PerformanceOptimizer:
             date = datetime.now().date()
         
         if use_cache:
-            cache_key = f'account_balances_{organization_id}_{date}'
+            cache_key = CacheTags.tagged_key(
+                f'account_balances_{organization_id}_{date}', CacheTags.organization(organization_id)
+            )
             cached = cache.get(cache_key)
             if cached:
                 return cached
@@ -217,7 +222,9 @@ class PerformanceOptimizer:
         if as_of_date is None:
             as_of_date = datetime.now().date()
         
-        cache_key = f'trial_balance_{organization_id}_{as_of_date}'
+        cache_key = CacheTags.tagged_key(
+            f'trial_balance_{organization_id}_{as_of_date}', CacheTags.organization(organization_id)
+        )
         cached = cache.get(cache_key)
         if cached:
             return cached
@@ -283,24 +290,13 @@ class PerformanceOptimizer:
         """
         Invalidate all caches for an organization.
         
-        Called when data changes.
+        Called when data changes. Bumps the organization's cache generation,
+        so every key built with ``CacheTags.organization`` becomes stale.
         
         Args:
             organization_id: Organization ID
         """
-        patterns = [
-            f'org_summary_{organization_id}',
-            f'account_balances_{organization_id}_*',
-            f'trial_balance_{organization_id}_*',
-            f'journal_list_{organization_id}_*'
-        ]
-        
-        for pattern in patterns:
-            # Use cache delete_pattern if available
-            try:
-                cache.delete_pattern(pattern)
-            except:
-                pass
+        CacheTags.invalidate(CacheTags.organization(organization_id))
         
         logger.info(f'Cache invalidated for organization {organization_id}')
 
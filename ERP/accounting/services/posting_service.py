@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 from typing import Iterable, Optional
 
@@ -15,7 +18,14 @@ from accounting.models import (
     Journal,
     JournalLine,
 )
-from accounting.utils.audit import log_audit_event
+from accounting.services.account_balance_service import AccountBalanceService
+from accounting.services.monthly_activity_service import invalidate_monthly_activity
+from accounting.utils.audit import (
+    audit_buffer,
+    build_audit_event,
+    log_audit_event,
+    log_audit_events_bulk,
+)
 from accounting.services.exchange_rate_service import ExchangeRateService
 from accounting.extensions.hooks import HookRunner
 from usermanagement.models import CustomUser, Organization
@@ -28,6 +38,48 @@ class OptimisticLockError(ValidationError):
     """Raised when concurrent edits modify a journal before posting completes."""
 
 
+class LockWaitTracker:
+    """Accumulates time spent acquiring journal/account row locks."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.acquisitions = 0
+
+
+_lock_wait_state = threading.local()
+
+
+@contextmanager
+def track_lock_wait():
+    """
+    Measure row-lock acquisition time for postings run in this thread.
+
+    Batch posting wraps each shard in this context to report lock-wait time
+    alongside throughput.
+    """
+    tracker = LockWaitTracker()
+    previous = getattr(_lock_wait_state, "tracker", None)
+    _lock_wait_state.tracker = tracker
+    try:
+        yield tracker
+    finally:
+        _lock_wait_state.tracker = previous
+
+
+@contextmanager
+def _timed_lock():
+    tracker = getattr(_lock_wait_state, "tracker", None)
+    if tracker is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracker.seconds += time.perf_counter() - started
+        tracker.acquisitions += 1
+
+
 class PostingService:
     """
     Handles posting and reversal of journals while enforcing validation,
@@ -74,6 +126,19 @@ class PostingService:
     QUANTIZE_TARGET = Decimal("0.0000")
     FX_TOLERANCE = Decimal("0.0001")
 
+    # Journal line fields rewritten by ``_compute_line_amounts``.
+    LINE_AMOUNT_FIELDS = (
+        "debit_amount",
+        "credit_amount",
+        "functional_debit_amount",
+        "functional_credit_amount",
+        "updated_at",
+    )
+
+    # When True, journals are posted through the set-based path in
+    # ``_apply_journal_effects``; False falls back to line-by-line posting.
+    bulk_posting = True
+
     def __init__(self, user: Optional[CustomUser]):
         self.user = user
         if user is not None:
@@ -274,7 +339,8 @@ class PostingService:
     # ---------------------------------------------------------------------
     # Posting helpers
     # ---------------------------------------------------------------------
-    def _prepare_line_amounts(self, line: JournalLine, journal: Journal) -> Decimal:
+    def _compute_line_amounts(self, line: JournalLine, journal: Journal) -> Decimal:
+        """Quantize line amounts in memory and return the signed balance delta."""
         debit = (line.debit_amount or Decimal("0")).quantize(self.QUANTIZE_TARGET, rounding=ROUND_HALF_UP)
         credit = (line.credit_amount or Decimal("0")).quantize(self.QUANTIZE_TARGET, rounding=ROUND_HALF_UP)
 
@@ -288,18 +354,53 @@ class PostingService:
         line.functional_debit_amount = (debit * journal.exchange_rate).quantize(self.QUANTIZE_TARGET, rounding=ROUND_HALF_UP)
         line.functional_credit_amount = (credit * journal.exchange_rate).quantize(self.QUANTIZE_TARGET, rounding=ROUND_HALF_UP)
         line.updated_at = timezone.now()
-        line.save(
-            update_fields=[
-                "debit_amount",
-                "credit_amount",
-                "functional_debit_amount",
-                "functional_credit_amount",
-                "updated_at",
-            ]
-        )
 
         return debit - credit
 
+    def _prepare_line_amounts(self, line: JournalLine, journal: Journal) -> Decimal:
+        delta = self._compute_line_amounts(line, journal)
+        line.save(update_fields=list(self.LINE_AMOUNT_FIELDS))
+        return delta
+
+    @staticmethod
+    def _is_closing_journal(journal: Journal) -> bool:
+        journal_metadata = journal.metadata or {}
+        return bool(
+            journal_metadata.get("is_closing_entry")
+            or journal_metadata.get("closing_type") == "year_end"
+        )
+
+    def _build_gl_entry(
+        self,
+        line: JournalLine,
+        journal: Journal,
+        account: ChartOfAccount,
+        is_closing_entry: bool,
+    ) -> GeneralLedger:
+        return GeneralLedger(
+            organization=journal.organization,
+            account=account,
+            journal=journal,
+            journal_line=line,
+            period=journal.period,
+            transaction_date=journal.journal_date,
+            debit_amount=line.debit_amount,
+            credit_amount=line.credit_amount,
+            balance_after=account.current_balance,
+            currency_code=journal.currency_code,
+            exchange_rate=journal.exchange_rate,
+            functional_debit_amount=line.functional_debit_amount,
+            functional_credit_amount=line.functional_credit_amount,
+            department=line.department,
+            project=line.project,
+            cost_center=line.cost_center,
+            description=line.description,
+            source_module="Accounting",
+            source_reference=journal.journal_number,
+            is_closing_entry=is_closing_entry,
+            created_by=self.user if hasattr(GeneralLedger, "created_by") else None,
+        )
+
     def _apply_line_effects(
         self,
         line: JournalLine,
@@ -308,7 +409,8 @@ class PostingService:
     ) -> None:
         delta = self._prepare_line_amounts(line, journal)
 
-        account = ChartOfAccount.objects.select_for_update().get(pk=line.account_id)
+        with _timed_lock():
+            account = ChartOfAccount.objects.select_for_update().get(pk=line.account_id)
         previous_balance = account.current_balance or Decimal("0")
         account.current_balance = previous_balance + delta
         account.save(update_fields=["current_balance"])
@@ -321,38 +423,14 @@ class PostingService:
             after_state={"current_balance": account.current_balance},
         )
 
-        journal_metadata = journal.metadata or {}
-        is_closing_entry = bool(
-            journal_metadata.get("is_closing_entry")
-            or journal_metadata.get("closing_type") == "year_end"
-        )
+        is_closing_entry = self._is_closing_journal(journal)
 
         try:
-            gl_entry = GeneralLedger.objects.create(
-                organization=journal.organization,
-                account=account,
-                journal=journal,
-                journal_line=line,
-                period=journal.period,
-                transaction_date=journal.journal_date,
-                debit_amount=line.debit_amount,
-                credit_amount=line.credit_amount,
-                balance_after=account.current_balance,
-                currency_code=journal.currency_code,
-                exchange_rate=journal.exchange_rate,
-                functional_debit_amount=line.functional_debit_amount,
-                functional_credit_amount=line.functional_credit_amount,
-                department=line.department,
-                project=line.project,
-                cost_center=line.cost_center,
-                description=line.description,
-                source_module="Accounting",
-                source_reference=journal.journal_number,
-                is_closing_entry=is_closing_entry,
-                created_by=self.user if hasattr(GeneralLedger, "created_by") else None,
-            )
+            gl_entry = self._build_gl_entry(line, journal, account, is_closing_entry)
+            gl_entry.save(force_insert=True)
         except IntegrityError as exc:
             raise ValidationError(self.ERR_GL_EXISTS) from exc
+        AccountBalanceService.apply_gl_entries([gl_entry])
         log_audit_event(
             self.user,
             gl_entry,
@@ -365,17 +443,125 @@ class PostingService:
             },
         )
 
+    def _apply_journal_effects(
+        self,
+        lines: list[JournalLine],
+        journal: Journal,
+        posting_time: timezone.datetime,
+    ) -> None:
+        """
+        Set-based equivalent of calling ``_apply_line_effects`` per line.
+
+        Affected accounts are locked once in primary-key order (a stable lock
+        order avoids deadlocks between concurrent postings), balances are
+        accumulated in memory in line order so ``balance_after`` matches the
+        line-by-line path, and lines, accounts, GL rows and audit rows are
+        each written with a single bulk statement.
+        """
+        if not lines:
+            return
+
+        previous_amounts = []
+        deltas = []
+        for line in lines:
+            previous_amounts.append({field: getattr(line, field) for field in self.LINE_AMOUNT_FIELDS})
+            deltas.append(self._compute_line_amounts(line, journal))
+        JournalLine.objects.bulk_update(lines, list(self.LINE_AMOUNT_FIELDS))
+
+        account_ids = sorted({line.account_id for line in lines})
+        with _timed_lock():
+            accounts = {
+                account.pk: account
+                for account in ChartOfAccount.objects.select_for_update()
+                .filter(pk__in=account_ids)
+                .order_by("pk")
+            }
+
+        is_closing_entry = self._is_closing_journal(journal)
+        organization = journal.organization
+        audit_entries = []
+        gl_entries = []
+        gl_audit_slots = []
+        for line, previous, delta in zip(lines, previous_amounts, deltas):
+            changed = {
+                field: {"old": str(previous[field]), "new": str(getattr(line, field))}
+                for field in self.LINE_AMOUNT_FIELDS
+                if str(previous[field]) != str(getattr(line, field))
+            }
+            if changed:
+                audit_entries.append(
+                    build_audit_event(
+                        line.updated_by,
+                        line,
+                        "updated",
+                        changes=changed,
+                    )
+                )
+
+            account = accounts[line.account_id]
+            previous_balance = account.current_balance or Decimal("0")
+            account.current_balance = previous_balance + delta
+            audit_entries.append(
+                build_audit_event(
+                    self.user,
+                    account,
+                    "balance_updated",
+                    details=f"Balance updated via journal {journal.journal_number}",
+                    before_state={"current_balance": previous_balance},
+                    after_state={"current_balance": account.current_balance},
+                    organization=organization,
+                )
+            )
+            gl_entries.append(self._build_gl_entry(line, journal, account, is_closing_entry))
+            # Placeholder for the GL audit row; filled once primary keys exist.
+            gl_audit_slots.append(len(audit_entries))
+            audit_entries.append(None)
+
+        ChartOfAccount.objects.bulk_update(list(accounts.values()), ["current_balance"])
+
+        try:
+            GeneralLedger.objects.bulk_create(gl_entries)
+        except IntegrityError as exc:
+            raise ValidationError(self.ERR_GL_EXISTS) from exc
+        AccountBalanceService.apply_gl_entries(gl_entries)
+
+        if any(entry.pk is None for entry in gl_entries):
+            # Backends without RETURNING support leave primary keys unset.
+            gl_ids = dict(
+                GeneralLedger.objects.filter(journal_line__in=[line.pk for line in lines])
+                .values_list("journal_line_id", "gl_entry_id")
+            )
+            for entry in gl_entries:
+                entry.gl_entry_id = gl_ids.get(entry.journal_line_id)
+
+        for index, gl_entry in zip(gl_audit_slots, gl_entries):
+            audit_entries[index] = build_audit_event(
+                self.user,
+                gl_entry,
+                "gl_posted",
+                details=f"GL entry {gl_entry.gl_entry_id} created for journal {journal.journal_number}",
+                changes={
+                    "debit": str(gl_entry.debit_amount),
+                    "credit": str(gl_entry.credit_amount),
+                    "closing_entry": is_closing_entry,
+                },
+                organization=organization,
+            )
+
+        log_audit_events_bulk(audit_entries)
+
     # ---------------------------------------------------------------------
     # Core posting operations
     # ---------------------------------------------------------------------
-    @transaction.atomic
+    @audit_buffer()
     def _post_internal(self, journal: Journal, enforce_permission: bool) -> Journal:
         expected_rowversion = getattr(journal, "rowversion", None)
-        journal = (
-            Journal.objects.select_for_update()
-            .select_related("journal_type", "period", "organization")
-            .get(pk=journal.pk)
-        )
+        with _timed_lock():
+            journal = (
+                Journal.objects.select_for_update()
+                .select_related("journal_type", "period", "organization")
+                .get(pk=journal.pk)
+            )
         if (
             expected_rowversion is not None
             and journal.rowversion is not None
@@ -392,7 +578,9 @@ class PostingService:
             "total_credit": journal.total_credit,
         }
         lines = list(
-            journal.lines.select_related("account", "department", "project", "cost_center").order_by("line_number")
+            journal.lines.select_related(
+                "account", "department", "project", "cost_center", "created_by", "updated_by"
+            ).order_by("line_number")
         )
 
         if enforce_permission:
@@ -428,8 +616,13 @@ class PostingService:
 
         posting_time = timezone.now()
 
-        for line in lines:
-            self._apply_line_effects(line, journal, posting_time)
+        if self.bulk_posting:
+            self._apply_journal_effects(lines, journal, posting_time)
+        else:
+            for line in lines:
+                self._apply_line_effects(line, journal, posting_time)
+        organization_id = journal.organization_id
+        transaction.on_commit(lambda: invalidate_monthly_activity(organization_id))
         # After applying all line effects, re-run a sanity check to ensure
         # the double-entry invariant still holds before committing the status.
         journal.update_totals()
@@ -504,7 +697,7 @@ class PostingService:
     # ---------------------------------------------------------------------
     # Reversal
     # ---------------------------------------------------------------------
-    @transaction.atomic
+    @audit_buffer()
     def reverse(self, original_journal: Journal) -> Journal:
         original = (
             Journal.objects.select_for_update()
@@ -8,15 +8,27 @@ Handles exporting reports to multiple formats:
 """
 
 import csv
+import tempfile
 from io import BytesIO, StringIO
 from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Tuple
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAMABLE_REPORT_TYPES = ("general_ledger",)
+STREAM_ERROR_MARKER = "ERROR: export failed before completion; this file is incomplete."
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer`` streaming."""
+
+    def write(self, value: str) -> str:
+        return value
+
 
 class ReportExportService:
     """
@@ -103,43 +115,12 @@ class ReportExportService:
         writer = csv.writer(output)
 
         report_type = report_data.get("report_type") or "report"
-        title = report_data.get("name") or ReportExportService._human_title(report_type)
 
         # Write header
-        writer.writerow([f"{title}"])
-        organization = report_data.get("organization")
-        if organization:
-            writer.writerow([f"Organization: {organization}"])
-        if "as_of_date" in report_data and report_data["as_of_date"]:
-            writer.writerow([f"As of: {report_data['as_of_date']}"])
-        elif report_data.get("period"):
-            writer.writerow([f"Period: {report_data['period']}"])
-        generated = ReportExportService._format_timestamp(report_data.get("generated_at"))
-        if generated:
-            writer.writerow([f"Generated: {generated}"])
-        writer.writerow([])  # Blank line
+        writer.writerows(ReportExportService._csv_header_rows(report_data))
         
         # Write data based on report type
-        handled = True
-        if report_type == "general_ledger":
-            ReportExportService._export_ledger_csv(writer, report_data)
-        elif report_type == "trial_balance":
-            ReportExportService._export_trial_balance_csv(writer, report_data)
-        elif report_type == "profit_loss":
-            ReportExportService._export_pl_csv(writer, report_data)
-        elif report_type == "balance_sheet":
-            ReportExportService._export_bs_csv(writer, report_data)
-        elif report_type == "cash_flow":
-            ReportExportService._export_cf_csv(writer, report_data)
-        elif report_type == "ar_aging":
-            ReportExportService._export_ar_aging_csv(writer, report_data)
-        elif report_type == "ap_aging":
-            ReportExportService._export_ap_aging_csv(writer, report_data)
-        else:
-            handled = False
-
-        if not handled or not output.getvalue().strip():
-            ReportExportService._export_generic_csv(writer, report_data)
+        ReportExportService._write_csv_body(writer, report_data)
         
         # Convert to bytes
         csv_bytes = BytesIO(output.getvalue().encode("utf-8"))
@@ -147,6 +128,150 @@ class ReportExportService:
         
         return csv_bytes, filename
     
+    @staticmethod
+    def stream_csv(report_data: Dict[str, Any], chunk_bytes: int = STREAM_CHUNK_BYTES) -> Tuple[Iterator[bytes], str]:
+        """
+        Export report to CSV as an iterator of byte chunks.
+
+        Intended for ``StreamingHttpResponse``: rows are encoded as they are
+        produced, so a report whose ``lines`` is a generator (see
+        ``ReportService.stream_general_ledger``) is never held in memory.
+
+        Returns:
+            Tuple of (chunk iterator, filename)
+        """
+        logger.info("Streaming report to CSV: %s", report_data.get("report_type"))
+
+        report_type = report_data.get("report_type") or "report"
+        filename = f"{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+        def chunks() -> Iterator[bytes]:
+            pending: List[str] = []
+            size = 0
+            try:
+                for text in ReportExportService._csv_stream_text(report_data):
+                    pending.append(text)
+                    size += len(text)
+                    if size >= chunk_bytes:
+                        yield "".join(pending).encode("utf-8")
+                        pending, size = [], 0
+            except Exception:  # noqa: BLE001
+                # Headers are already sent; mark the file as incomplete instead.
+                logger.exception("Streaming CSV export failed: %s", report_type)
+                pending.append(csv.writer(_Echo()).writerow([STREAM_ERROR_MARKER]))
+            if pending:
+                yield "".join(pending).encode("utf-8")
+
+        return chunks(), filename
+
+    @staticmethod
+    def _csv_stream_text(report_data: Dict[str, Any]) -> Iterator[str]:
+        writer = csv.writer(_Echo())
+        for record in ReportExportService._csv_header_rows(report_data):
+            yield writer.writerow(record)
+        if report_data.get("report_type") in STREAMABLE_REPORT_TYPES:
+            for record in ReportExportService._ledger_rows(report_data, ReportExportService._decimal_to_str):
+                yield writer.writerow(record)
+            return
+        # Summary reports are bounded by the chart of accounts; render them whole.
+        output = StringIO()
+        ReportExportService._write_csv_body(csv.writer(output), report_data)
+        yield output.getvalue()
+
+    @staticmethod
+    def _write_csv_body(writer, report_data: Dict[str, Any]) -> None:
+        exporters = {
+            "general_ledger": ReportExportService._export_ledger_csv,
+            "trial_balance": ReportExportService._export_trial_balance_csv,
+            "profit_loss": ReportExportService._export_pl_csv,
+            "balance_sheet": ReportExportService._export_bs_csv,
+            "cash_flow": ReportExportService._export_cf_csv,
+            "ar_aging": ReportExportService._export_ar_aging_csv,
+            "ap_aging": ReportExportService._export_ap_aging_csv,
+        }
+        exporter = exporters.get(report_data.get("report_type"), ReportExportService._export_generic_csv)
+        exporter(writer, report_data)
+
+    @staticmethod
+    def _csv_header_rows(report_data: Dict[str, Any]) -> List[List[str]]:
+        report_type = report_data.get("report_type") or "report"
+        title = report_data.get("name") or ReportExportService._human_title(report_type)
+
+        rows = [[f"{title}"]]
+        organization = report_data.get("organization")
+        if organization:
+            rows.append([f"Organization: {organization}"])
+        if "as_of_date" in report_data and report_data["as_of_date"]:
+            rows.append([f"As of: {report_data['as_of_date']}"])
+        elif report_data.get("period"):
+            rows.append([f"Period: {report_data['period']}"])
+        generated = ReportExportService._format_timestamp(report_data.get("generated_at"))
+        if generated:
+            rows.append([f"Generated: {generated}"])
+        rows.append([])  # Blank line
+        return rows
+
+    @staticmethod
+    def stream_excel(report_data: Dict[str, Any]) -> Tuple[IO[bytes], str]:
+        """
+        Export report to Excel using openpyxl's write-only workbook.
+
+        Rows are flushed to a temporary file as they are appended, keeping
+        memory flat for large ledgers. Report types without a streaming
+        layout fall back to ``to_excel``.
+
+        Returns:
+            Tuple of (file object positioned at 0, filename)
+        """
+        report_type = report_data.get("report_type")
+        if report_type not in STREAMABLE_REPORT_TYPES:
+            return ReportExportService.to_excel(report_data)
+
+        logger.info("Streaming report to Excel: %s", report_type)
+
+        try:
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font, PatternFill
+        except ImportError:
+            logger.error("openpyxl not installed. Install with: pip install openpyxl")
+            raise ImportError("openpyxl is required for Excel export")
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Report")
+        for column, width in zip("ABCDEFGH", (12, 30, 15, 20, 40, 15, 15, 15)):
+            ws.column_dimensions[column].width = width
+
+        title_font = Font(bold=True, size=14)
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_font_white = Font(bold=True, color="FFFFFF")
+
+        def styled(values: Iterable[Any], **styles) -> List[Any]:
+            cells = []
+            for value in values:
+                cell = WriteOnlyCell(ws, value=value)
+                for attr, style in styles.items():
+                    setattr(cell, attr, style)
+                cells.append(cell)
+            return cells
+
+        header_rows = ReportExportService._csv_header_rows(report_data)
+        ws.append(styled([f"{header_rows[0][0]} Report"], font=title_font))
+        for header_row in header_rows[1:]:
+            ws.append(header_row)
+
+        rows = ReportExportService._ledger_rows(report_data, ReportExportService._decimal_to_float)
+        ws.append(styled(next(rows), fill=header_fill, font=header_font_white))
+        for record in rows:
+            ws.append(record)
+
+        output = tempfile.TemporaryFile()
+        wb.save(output)
+        output.seek(0)
+
+        filename = f"{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        return output, filename
+
     @staticmethod
     def to_excel(report_data: Dict[str, Any]) -> Tuple[BytesIO, str]:
         """
@@ -289,30 +414,38 @@ class ReportExportService:
     @staticmethod
     def _export_ledger_csv(writer, report_data: Dict) -> None:
         """Export General Ledger to CSV."""
-        writer.writerow(["Date", "Account", "Journal #", "Reference", "Description", "Debit", "Credit", "Balance"])
+        writer.writerows(ReportExportService._ledger_rows(report_data, ReportExportService._decimal_to_str))
+
+    @staticmethod
+    def _ledger_rows(report_data: Dict, amount: Callable[[Any], Any]) -> Iterator[List[Any]]:
+        """
+        Yield General Ledger rows: column header, one row per line, then totals.
+
+        Totals are read after the lines are consumed, so streamed reports whose
+        totals accumulate during iteration are exported correctly.
+        """
+        yield ["Date", "Account", "Journal #", "Reference", "Description", "Debit", "Credit", "Balance"]
 
         for line in report_data.get("lines", []):
             account_bits = [line.get("account_code") or "", line.get("account_name") or ""]
             account_label = " ".join(bit for bit in account_bits if bit).strip()
-            writer.writerow(
-                [
-                    line.get("date") or "",
-                    account_label,
-                    line.get("journal_no") or "",
-                    line.get("reference") or "",
-                    line.get("description") or "",
-                    ReportExportService._decimal_to_str(line.get("debit")),
-                    ReportExportService._decimal_to_str(line.get("credit")),
-                    ReportExportService._decimal_to_str(line.get("running_balance") or line.get("balance")),
-                ]
-            )
+            yield [
+                line.get("date") or "",
+                account_label,
+                line.get("journal_no") or "",
+                line.get("reference") or "",
+                line.get("description") or "",
+                amount(line.get("debit")),
+                amount(line.get("credit")),
+                amount(line.get("running_balance") or line.get("balance")),
+            ]
 
         totals = report_data.get("totals") or {}
-        writer.writerow([])
-        writer.writerow(["Opening Balance", ReportExportService._decimal_to_str(totals.get("opening_balance"))])
-        writer.writerow(["Total Debit", ReportExportService._decimal_to_str(totals.get("total_debit"))])
-        writer.writerow(["Total Credit", ReportExportService._decimal_to_str(totals.get("total_credit"))])
-        writer.writerow(["Ending Balance", ReportExportService._decimal_to_str(totals.get("ending_balance"))])
+        yield []
+        yield ["Opening Balance", amount(totals.get("opening_balance"))]
+        yield ["Total Debit", amount(totals.get("total_debit"))]
+        yield ["Total Credit", amount(totals.get("total_credit"))]
+        yield ["Ending Balance", amount(totals.get("ending_balance"))]
     
     @staticmethod
     def _export_trial_balance_csv(writer, report_data: Dict) -> None:
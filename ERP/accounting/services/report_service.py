@@ -2,21 +2,28 @@ from __future__ import annotations
 
 from collections import defaultdict, OrderedDict
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
+from django.core import signing
 from django.db import connection
+from django.db.models import Q, Sum
 from django.urls import reverse
 from django.utils import timezone
 
-from accounting.models import FiscalYear
+from accounting.models import ChartOfAccount, FiscalYear, GeneralLedger, MonthlyJournalLineSummary
+from accounting.services.monthly_summary_service import MonthlySummaryService
 from reporting.models import ReportDefinition
 from accounting.services.ap_aging_service import APAgingService
 from usermanagement.models import Organization
 
 
 ZERO = Decimal("0.00")
+STREAM_CHUNK_SIZE = 2000
+LEDGER_PAGE_SIZE = 200
+MAX_LEDGER_PAGE_SIZE = 1000
+LEDGER_CURSOR_SALT = "accounting.report_service.ledger_page.v2"
 
 
 @dataclass
@@ -77,6 +84,39 @@ class ReportService:
 
         return [dict(zip(columns, row)) for row in rows]
 
+    def _iter_function(
+        self,
+        function_name: str,
+        params: Sequence[Any],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a reporting function through a server-side cursor and yield rows.
+
+        Rows are fetched ``chunk_size`` at a time, so memory use does not grow
+        with the size of the result set. As with ``QuerySet.iterator()``, a
+        plain cursor is used when ``DISABLE_SERVER_SIDE_CURSORS`` is set (e.g.
+        behind a transaction-mode pooler).
+        """
+        placeholders = ", ".join(["%s"] * len(params))
+        sql = f"SELECT * FROM {function_name}({placeholders});" if params else f"SELECT * FROM {function_name}();"
+
+        if connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+            cursor = connection.cursor()
+        else:
+            cursor = connection.chunked_cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
     def _start_of_fiscal_year(self) -> Optional[date]:
         """
         Resolve the current fiscal year's starting date for the organization.
@@ -99,15 +139,50 @@ class ReportService:
             "fn_report_general_ledger",
             [self.organization.id, self.start_date, self.end_date, account_id],
         )
+        report = self._general_ledger_report()
+        report["lines"] = list(self._ledger_lines(rows, report))
+        return report
 
-        totals = {
-            "total_debit": ZERO,
-            "total_credit": ZERO,
-            "opening_balance": ZERO,
-            "ending_balance": ZERO,
+    def stream_general_ledger(self, account_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Same payload as ``generate_general_ledger`` with ``lines`` as a generator.
+
+        Rows are read through a server-side cursor; ``totals`` and ``accounts``
+        are filled in as the lines are consumed, so they are only complete once
+        the generator is exhausted.
+        """
+        if not (self.start_date and self.end_date):
+            raise ValueError("Call set_date_range() before generating the general ledger.")
+
+        rows = self._iter_function(
+            "fn_report_general_ledger",
+            [self.organization.id, self.start_date, self.end_date, account_id],
+        )
+        report = self._general_ledger_report()
+        report["lines"] = self._ledger_lines(rows, report)
+        return report
+
+    def _general_ledger_report(self) -> Dict[str, Any]:
+        return {
+            "report_type": "general_ledger",
+            "organization": self.organization.name,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "generated_at": timezone.now(),
+            "lines": [],
+            "accounts": [],
+            "totals": {
+                "total_debit": ZERO,
+                "total_credit": ZERO,
+                "opening_balance": ZERO,
+                "ending_balance": ZERO,
+            },
         }
+
+    def _ledger_lines(self, rows: Iterable[Dict[str, Any]], report: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield ledger lines, accumulating totals and per-account summaries into ``report``."""
+        totals = report["totals"]
         account_summary: Dict[int, Dict[str, Any]] = OrderedDict()
-        lines: List[Dict[str, Any]] = []
 
         for row in rows:
             debit = row.get("debit_amount") or ZERO
@@ -133,7 +208,7 @@ class ReportService:
                 )
                 summary["closing_balance"] = running
 
-            line = {
+            yield {
                 "date": row.get("transaction_date"),
                 "account_id": account_id_value,
                 "account_code": row.get("account_code"),
@@ -149,13 +224,135 @@ class ReportService:
                 "journal_line_id": row.get("journal_line_id"),
                 "journal_url": self._journal_url(row.get("journal_id")),
             }
-            lines.append(line)
 
         if account_summary:
             totals["opening_balance"] = sum(info["opening_balance"] for info in account_summary.values())
             totals["ending_balance"] = sum(info["closing_balance"] for info in account_summary.values())
+        report["accounts"] = list(account_summary.values())
+
+    def generate_general_ledger_page(
+        self,
+        account_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        page_size: int = LEDGER_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Return one keyset-paginated page of the general ledger.
+
+        Rows are ordered by (account_id, transaction_date, journal_line_id), the
+        columns of ``gl_acct_date_line_idx``, and each page starts strictly
+        after the key carried in ``cursor``, so a page is an index range scan
+        whose cost does not depend on how deep into the ledger it is.
+        The cursor also carries the running balance of the last row, letting
+        the next page continue the balance without re-reading earlier rows.
+        """
+        if not (self.start_date and self.end_date):
+            raise ValueError("Call set_date_range() before generating the general ledger.")
+        page_size = max(1, min(int(page_size), MAX_LEDGER_PAGE_SIZE))
+
+        state = self._decode_ledger_cursor(cursor, account_id) if cursor else None
+        queryset = GeneralLedger.objects.filter(
+            account__organization=self.organization,
+            transaction_date__range=(self.start_date, self.end_date),
+        )
+        if account_id:
+            queryset = queryset.filter(account_id=account_id)
+        if state:
+            key_account, txn_date, line_id = state["key"]
+            txn_date = date.fromisoformat(txn_date)
+            queryset = queryset.filter(
+                Q(account_id__gt=key_account)
+                | Q(account_id=key_account, transaction_date__gt=txn_date)
+                | Q(account_id=key_account, transaction_date=txn_date, journal_line_id__gt=line_id)
+            )
 
-        report = {
+        rows = list(
+            queryset.order_by("account_id", "transaction_date", "journal_line_id").values(
+                "account_id",
+                "account__account_code",
+                "account__account_name",
+                "transaction_date",
+                "journal_id",
+                "journal__journal_number",
+                "journal__reference",
+                "journal_line_id",
+                "journal_line__description",
+                "debit_amount",
+                "credit_amount",
+            )[: page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        carried_account = state["account_id"] if state else None
+        running = Decimal(state["balance"]) if state else ZERO
+        openings = self._ledger_openings(
+            {row["account_id"] for row in rows if row["account_id"] != carried_account}
+        )
+        journal_url = self._journal_url_builder()
+
+        totals = {"total_debit": ZERO, "total_credit": ZERO, "opening_balance": ZERO, "ending_balance": ZERO}
+        account_summary: Dict[int, Dict[str, Any]] = OrderedDict()
+        lines: List[Dict[str, Any]] = []
+        for row in rows:
+            row_account = row["account_id"]
+            if row_account != carried_account:
+                carried_account = row_account
+                running = openings.get(row_account, ZERO)
+            opening = running
+            debit = row["debit_amount"] or ZERO
+            credit = row["credit_amount"] or ZERO
+            running += debit - credit
+            totals["total_debit"] += debit
+            totals["total_credit"] += credit
+
+            summary = account_summary.setdefault(
+                row_account,
+                {
+                    "account_id": row_account,
+                    "account_code": row["account__account_code"],
+                    "account_name": row["account__account_name"],
+                    "opening_balance": opening,
+                    "closing_balance": running,
+                    "detail_url": self._ledger_detail_url(row_account),
+                },
+            )
+            summary["closing_balance"] = running
+
+            lines.append(
+                {
+                    "date": row["transaction_date"],
+                    "account_id": row_account,
+                    "account_code": row["account__account_code"],
+                    "account_name": row["account__account_name"],
+                    "journal_id": row["journal_id"],
+                    "journal_no": row["journal__journal_number"],
+                    "reference": row["journal__reference"],
+                    "description": row["journal_line__description"],
+                    "debit": debit,
+                    "credit": credit,
+                    "balance": running,
+                    "running_balance": running,
+                    "journal_line_id": row["journal_line_id"],
+                    "journal_url": journal_url(row["journal_id"]),
+                }
+            )
+
+        if account_summary:
+            totals["opening_balance"] = sum(info["opening_balance"] for info in account_summary.values())
+            totals["ending_balance"] = sum(info["closing_balance"] for info in account_summary.values())
+
+        next_cursor = None
+        if has_more and lines:
+            last = lines[-1]
+            next_cursor = self._encode_ledger_cursor(
+                account_id,
+                key=[last["account_id"], last["date"].isoformat(), last["journal_line_id"]],
+                account=last["account_id"],
+                balance=last["running_balance"],
+            )
+
+        return {
             "report_type": "general_ledger",
             "organization": self.organization.name,
             "start_date": self.start_date,
@@ -164,8 +361,53 @@ class ReportService:
             "lines": lines,
             "accounts": list(account_summary.values()),
             "totals": totals,
+            "page": {
+                "page_size": page_size,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+            },
         }
-        return report
+
+    def _ledger_openings(self, account_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Balance of each account before ``start_date`` (one grouped query)."""
+        account_ids = list(account_ids)
+        if not account_ids:
+            return {}
+        rows = (
+            GeneralLedger.objects.filter(account_id__in=account_ids, transaction_date__lt=self.start_date)
+            .values("account_id")
+            .annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount"))
+            .order_by()
+        )
+        return {row["account_id"]: (row["debit"] or ZERO) - (row["credit"] or ZERO) for row in rows}
+
+    def _encode_ledger_cursor(self, account_filter: Optional[int], *, key: List[Any], account: int, balance: Decimal) -> str:
+        return signing.dumps(
+            {
+                "org": self.organization.pk,
+                "range": [self.start_date.isoformat(), self.end_date.isoformat()],
+                "filter": account_filter,
+                "key": key,
+                "account_id": account,
+                "balance": str(balance),
+            },
+            salt=LEDGER_CURSOR_SALT,
+            compress=True,
+        )
+
+    def _decode_ledger_cursor(self, cursor: str, account_filter: Optional[int]) -> Dict[str, Any]:
+        try:
+            state = signing.loads(cursor, salt=LEDGER_CURSOR_SALT)
+        except signing.BadSignature as exc:
+            raise ValueError("Invalid ledger cursor.") from exc
+        expected = (
+            self.organization.pk,
+            [self.start_date.isoformat(), self.end_date.isoformat()],
+            account_filter,
+        )
+        if (state.get("org"), state.get("range"), state.get("filter")) != expected:
+            raise ValueError("Ledger cursor does not match the requested filters.")
+        return state
 
     # ------------------------------------------------------------------
     # Trial Balance
@@ -175,14 +417,18 @@ class ReportService:
         if not as_of_date:
             raise ValueError("An 'as of' date is required for the trial balance.")
 
-        rows = self._call_function(
-            "fn_report_trial_balance",
-            [self.organization.id, as_of_date],
-        )
+        if MonthlySummaryService(self.organization).is_fresh():
+            rows = self._trial_balance_rows_from_summary(as_of_date)
+        else:
+            rows = self._call_function(
+                "fn_report_trial_balance",
+                [self.organization.id, as_of_date],
+            )
 
         lines: List[Dict[str, Any]] = []
         total_debits = ZERO
         total_credits = ZERO
+        detail_start = self._start_of_fiscal_year() or as_of_date.replace(month=1, day=1)
 
         for row in rows:
             debit_total = row.get("debit_total") or ZERO
@@ -202,7 +448,7 @@ class ReportService:
                     "credit_balance": credit_total,
                     "detail_url": self._ledger_detail_url(
                         account_id_value,
-                        start_date=self._start_of_fiscal_year() or (as_of_date.replace(month=1, day=1)),
+                        start_date=detail_start,
                         end_date=as_of_date,
                     ),
                 }
@@ -224,6 +470,66 @@ class ReportService:
             "is_balanced": is_balanced,
         }
 
+    def _trial_balance_rows_from_summary(self, as_of_date: date) -> List[Dict[str, Any]]:
+        """
+        Build ``fn_report_trial_balance`` rows from the monthly summary.
+
+        Whole months before ``as_of_date`` come from the summary table; only the
+        trailing partial month is aggregated from the general ledger.
+        """
+        month_start = as_of_date.replace(day=1)
+        if (as_of_date + timedelta(days=1)).day == 1:
+            closed_through = as_of_date + timedelta(days=1)
+        else:
+            closed_through = month_start
+
+        totals: Dict[int, List[Decimal]] = defaultdict(lambda: [ZERO, ZERO])
+        summary = (
+            MonthlyJournalLineSummary.objects.filter(
+                account__organization=self.organization,
+                month_start__lt=closed_through,
+            )
+            .values("account_id")
+            .annotate(debit=Sum("total_debit"), credit=Sum("total_credit"))
+            .order_by()
+        )
+        partial = (
+            GeneralLedger.objects.filter(
+                organization=self.organization,
+                transaction_date__gte=closed_through,
+                transaction_date__lte=as_of_date,
+            )
+            .values("account_id")
+            .annotate(debit=Sum("debit_amount"), credit=Sum("credit_amount"))
+            .order_by()
+        )
+        for source in (summary, partial):
+            for row in source:
+                bucket = totals[row["account_id"]]
+                bucket[0] += row["debit"] or ZERO
+                bucket[1] += row["credit"] or ZERO
+
+        accounts = (
+            ChartOfAccount.objects.filter(organization=self.organization, is_active=True)
+            .values("account_id", "account_code", "account_name", "account_type__nature")
+            .order_by("account_type__display_order", "account_code")
+        )
+        rows: List[Dict[str, Any]] = []
+        for account in accounts:
+            debit_total, credit_total = totals.get(account["account_id"], (ZERO, ZERO))
+            rows.append(
+                {
+                    "account_id": account["account_id"],
+                    "account_code": account["account_code"],
+                    "account_name": account["account_name"],
+                    "account_nature": account["account_type__nature"],
+                    "debit_total": debit_total,
+                    "credit_total": credit_total,
+                    "net_balance": debit_total - credit_total,
+                }
+            )
+        return rows
+
     # ------------------------------------------------------------------
     # Profit & Loss
 
@@ -534,6 +840,16 @@ class ReportService:
     # ------------------------------------------------------------------
     # URL helpers
 
+    def _journal_url_builder(self):
+        """Reverse the journal detail URL once and substitute ids per row."""
+        placeholder = 987654321
+        try:
+            template = reverse("accounting:journal_entry_detail", args=[placeholder])
+        except Exception:
+            return lambda journal_id: None
+        marker = str(placeholder)
+        return lambda journal_id: template.replace(marker, str(journal_id)) if journal_id else None
+
     def _journal_url(self, journal_id: Optional[int]) -> Optional[str]:
         if not journal_id:
             return None
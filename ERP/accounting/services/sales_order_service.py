@@ -4,11 +4,12 @@ from decimal import Decimal
 from typing import Iterable, Optional, Tuple
 
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import transaction
 
 from accounting.models import SalesInvoice, SalesOrder, SalesOrderLine
 from accounting.services.sales_invoice_service import SalesInvoiceService
-from inventory.models import InventoryItem, Product, Warehouse
+from inventory.models import Product, Warehouse
+from inventory.services import InventoryService
 
 
 class SalesOrderService:
@@ -123,13 +124,6 @@ class SalesOrderService:
         order.save(update_fields=["status", "updated_by", "updated_at"])
         return order
 
-    def _get_product(self, order: SalesOrder, product_code: str) -> Optional[Product]:
-        if not product_code:
-            return None
-        return Product.objects.filter(
-            organization=order.organization, code=product_code
-        ).select_related("organization").first()
-
     @transaction.atomic
     def reserve_stock(self, order: SalesOrder, warehouse: Optional[Warehouse] = None) -> dict:
         """Soft-allocate quantities to the order lines.
@@ -139,8 +133,23 @@ class SalesOrderService:
         """
         warehouse = warehouse or order.warehouse
         summary = {"allocated": [], "shortages": []}
-        for line in order.lines.select_related():
-            product = self._get_product(order, line.product_code)
+        lines = list(order.lines.all())
+        products = {
+            product.code: product
+            for product in Product.objects.filter(
+                organization=order.organization,
+                code__in={line.product_code for line in lines if line.product_code},
+            )
+        }
+        stock = InventoryService.stock_by_product(
+            InventoryService.get_current_stock_many(
+                order.organization,
+                [product.pk for product in products.values()],
+                [warehouse.pk] if warehouse else None,
+            )
+        )
+        for line in lines:
+            product = products.get(line.product_code)
             if not product:
                 summary["shortages"].append(
                     {"line": line.line_number, "product_code": line.product_code, "reason": "Product not found"}
@@ -148,11 +157,7 @@ class SalesOrderService:
                 line.allocated_quantity = Decimal("0")
                 line.save(update_fields=["allocated_quantity", "updated_at"])
                 continue
-            qs = InventoryItem.objects.filter(organization=order.organization, product=product)
-            if warehouse:
-                qs = qs.filter(warehouse=warehouse)
-            available = qs.aggregate(total=models.Sum("quantity_on_hand"))
-            available_qty = available.get("total") or Decimal("0")
+            available_qty = stock.get(product.pk, Decimal("0"))
             allocate_qty = min(line.quantity, available_qty)
             line.allocated_quantity = allocate_qty
             line.save(update_fields=["allocated_quantity", "updated_at"])
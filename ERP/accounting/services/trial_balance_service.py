@@ -1,6 +1,6 @@
 from decimal import Decimal
-from django.db.models import Sum
-from ..models import ChartOfAccount, GeneralLedger, FiscalYear, Organization
+from ..models import ChartOfAccount, FiscalYear, Organization
+from .account_balance_service import AccountBalanceService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,42 +9,29 @@ logger = logging.getLogger(__name__)
 def get_trial_balance(organization: Organization, fiscal_year: FiscalYear):
     """Return trial balance data for an organization and fiscal year.
 
-    This aggregates all general ledger entries for the supplied fiscal year and
-    returns a list of accounts with their total debits, credits and resulting
-    balance.  All accounts for the organisation are included even if there is no
-    activity during the year."""
+    Totals come from the incrementally maintained ``AccountPeriodBalance``
+    table for the fiscal year's periods and are returned as a list of accounts
+    with their total debits, credits and resulting balance.  All accounts for
+    the organisation are included even if there is no activity during the
+    year."""
 
     accounts = (
         ChartOfAccount.objects.filter(organization=organization, is_active=True)
-        .values("id", "account_code", "account_name")
+        .values("account_id", "account_code", "account_name")
         .order_by("account_code")
     )
 
-    gl_totals = (
-        GeneralLedger.objects.filter(
-            organization=organization,
-            period__fiscal_year=fiscal_year,
-            is_archived=False,
-        )
-        .values("account_id")
-        .annotate(
-            debit_total=Sum("debit_amount"),
-            credit_total=Sum("credit_amount"),
-        )
-    )
-    totals_map = {
-        row["account_id"]: row for row in gl_totals
-    }
+    totals_map = AccountBalanceService(organization).period_totals(fiscal_year.periods.all())
 
     results = []
     for account in accounts:
-        totals = totals_map.get(account["id"], {})
+        totals = totals_map.get(account["account_id"], {})
         debit = totals.get("debit_total") or Decimal("0")
         credit = totals.get("credit_total") or Decimal("0")
         balance = debit - credit
         results.append(
             {
-                "account_id": account["id"],
+                "account_id": account["account_id"],
                 "account_code": account["account_code"],
                 "account_name": account["account_name"],
                 "debit_total": debit,
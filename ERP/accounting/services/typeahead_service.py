@@ -0,0 +1,249 @@
+"""
+In-memory typeahead for voucher and journal lookups.
+
+Each (entity, organization) pair gets an index of codes and names built with a
+single query on first use. Lookups are answered from a sorted token list
+(prefix matches) and a trigram map (substring matches) instead of running
+``icontains`` scans per keystroke, and every endpoint shares one ranking:
+
+    exact code > code prefix > word prefix in a name > substring anywhere
+
+with ties broken by code. Save and delete receivers in ``accounting.signals``
+bump the index's ``CacheTags`` generation, so every worker rebuilds its copy on
+the next lookup; ``TYPEAHEAD_INDEX_TTL`` bounds staleness from bulk updates
+that bypass signals.
+"""
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+
+from utils.cache_utils import CacheTags
+
+_WORD_SPLIT = re.compile(r"[\s\-_/.,:;()]+")
+
+
+@dataclass(frozen=True)
+class TypeaheadSource:
+    """Where an entity's rows come from and which columns are searchable."""
+
+    model: str
+    code_field: str = "code"
+    name_field: str = "name"
+    search_fields: Tuple[str, ...] = ()
+    filters: Tuple[Tuple[str, Any], ...] = (("is_active", True),)
+    extra_fields: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def indexed_fields(self) -> set:
+        """Model fields whose changes can alter the index."""
+        lookups = [self.code_field, self.name_field, *self.search_fields, "organization"]
+        lookups += [name for name, _ in self.filters] + [lookup for _, lookup in self.extra_fields]
+        return {lookup.split("__")[0] for lookup in lookups}
+
+
+SOURCES: Dict[str, TypeaheadSource] = {
+    "account": TypeaheadSource(
+        "accounting.ChartOfAccount",
+        code_field="account_code",
+        name_field="account_name",
+        filters=(("is_active", True), ("archived_at__isnull", True)),
+        extra_fields=(("account_type", "account_type__code"), ("account_type_name", "account_type__name")),
+    ),
+    "vendor": TypeaheadSource(
+        "accounting.Vendor", name_field="display_name", search_fields=("legal_name",),
+        filters=(("status", "active"),),
+    ),
+    "customer": TypeaheadSource(
+        "accounting.Customer", name_field="display_name", search_fields=("legal_name",),
+        filters=(("status", "active"),),
+    ),
+    "product": TypeaheadSource("Inventory.Product", search_fields=("barcode",), filters=()),
+    "tax_code": TypeaheadSource("accounting.TaxCode"),
+    "cost_center": TypeaheadSource("accounting.CostCenter"),
+    "department": TypeaheadSource("accounting.Department"),
+    "project": TypeaheadSource("accounting.Project"),
+    "agent": TypeaheadSource("accounting.Agent"),
+    "warehouse": TypeaheadSource("Inventory.Warehouse"),
+}
+
+
+@dataclass
+class TypeaheadEntry:
+    id: Any
+    code: str
+    name: str
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "code": self.code, "name": self.name}
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TypeaheadIndex:
+    """Prefix and trigram index over one entity's rows for one organization."""
+
+    def __init__(self, entries: List[TypeaheadEntry], search_text: List[Tuple[str, ...]], version: str):
+        self.entries = entries
+        self.version = version
+        self.built_at = time.monotonic()
+        self._codes = [entry.code.lower() for entry in entries]
+        self._haystacks = [" ".join(texts) for texts in search_text]
+        tokens = []
+        trigrams = defaultdict(set)
+        for idx, haystack in enumerate(self._haystacks):
+            for word in {w for w in _WORD_SPLIT.split(haystack) if w}:
+                tokens.append((word, idx))
+            for gram in _trigrams(haystack):
+                trigrams[gram].add(idx)
+        tokens.sort()
+        self._tokens = tokens
+        self._token_keys = [token for token, _ in tokens]
+        self._trigrams = dict(trigrams)
+
+    def _word_prefix_matches(self, query: str) -> set:
+        start = bisect.bisect_left(self._token_keys, query)
+        matches = set()
+        for pos in range(start, len(self._tokens)):
+            token, idx = self._tokens[pos]
+            if not token.startswith(query):
+                break
+            matches.add(idx)
+        return matches
+
+    def _substring_matches(self, query: str) -> Iterable[int]:
+        if len(query) < 3:
+            candidates = range(len(self.entries))
+        else:
+            grams = sorted((self._trigrams.get(g, set()) for g in _trigrams(query)), key=len)
+            candidates = set.intersection(*grams) if grams else set()
+        return [idx for idx in candidates if query in self._haystacks[idx]]
+
+    def rank(self, idx: int, query: str, word_prefix: set) -> int:
+        code = self._codes[idx]
+        if code == query:
+            return 0
+        if code.startswith(query):
+            return 1
+        if idx in word_prefix:
+            return 2
+        return 3
+
+    def search(self, query: str, limit: int = 20, where: Optional[Dict[str, Any]] = None) -> List[TypeaheadEntry]:
+        query = (query or "").strip().lower()
+        if query:
+            word_prefix = self._word_prefix_matches(query)
+            matched = word_prefix.union(self._substring_matches(query))
+            ranked = sorted(matched, key=lambda idx: (self.rank(idx, query, word_prefix), self._codes[idx]))
+        else:
+            ranked = range(len(self.entries))
+        results = []
+        for idx in ranked:
+            entry = self.entries[idx]
+            if where and any(entry.extra.get(key) != value for key, value in where.items()):
+                continue
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+
+class TypeaheadService:
+    """Per-process LRU of ``TypeaheadIndex`` objects keyed by entity and organization."""
+
+    MAX_INDEXES = 256
+
+    def __init__(self, sources: Optional[Dict[str, TypeaheadSource]] = None):
+        self.sources = sources or SOURCES
+        self._indexes: "OrderedDict[Tuple[str, Any], TypeaheadIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, "TYPEAHEAD_INDEX_TTL", 300)
+
+    @staticmethod
+    def index_tag(entity: str, organization_id) -> str:
+        return f"typeahead:{entity}:{organization_id}"
+
+    def _version(self, entity: str, organization_id) -> str:
+        tag = self.index_tag(entity, organization_id)
+        return str(CacheTags.generations([tag])[tag])
+
+    def _build(self, entity: str, organization_id, version: str) -> TypeaheadIndex:
+        source = self.sources[entity]
+        model = apps.get_model(source.model)
+        queryset = model._default_manager.filter(**dict(source.filters))
+        if organization_id is not None:
+            queryset = queryset.filter(organization_id=organization_id)
+        columns = ["pk", source.code_field, source.name_field, *source.search_fields]
+        columns += [lookup for _, lookup in source.extra_fields]
+        entries, search_text = [], []
+        for row in queryset.values_list(*columns).order_by(source.code_field).iterator():
+            pk, code, name = row[0], row[1] or "", row[2] or ""
+            searchable = row[3:3 + len(source.search_fields)]
+            extras = row[3 + len(source.search_fields):]
+            entries.append(TypeaheadEntry(
+                id=pk,
+                code=code,
+                name=name,
+                extra={key: value for (key, _), value in zip(source.extra_fields, extras)},
+            ))
+            search_text.append(tuple(text.lower() for text in (code, name, *searchable) if text))
+        return TypeaheadIndex(entries, search_text, version)
+
+    def index(self, entity: str, organization=None) -> TypeaheadIndex:
+        organization_id = getattr(organization, "pk", organization)
+        key = (entity, organization_id)
+        version = self._version(entity, organization_id)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+        if index is not None and index.version == version and time.monotonic() - index.built_at < self.ttl:
+            return index
+        index = self._build(entity, organization_id, version)
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.MAX_INDEXES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def search(self, entity: str, organization, query: str, limit: int = 20, where=None) -> List[TypeaheadEntry]:
+        return self.index(entity, organization).search(query, limit=limit, where=where)
+
+    def lookup(self, entity: str, organization, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """``[{'id', 'code', 'name'}]`` rows for JSON lookup endpoints."""
+        return [entry.as_dict() for entry in self.search(entity, organization, query, limit)]
+
+    def invalidate(self, entity: str, organization_id=None) -> None:
+        """Mark the organization's index, and the organization-less one, as stale everywhere."""
+        for org_id in {organization_id, None}:
+            CacheTags.invalidate(self.index_tag(entity, org_id))
+            with self._lock:
+                self._indexes.pop((entity, org_id), None)
+
+    def entity_for_model(self, model, update_fields=None) -> Optional[str]:
+        """The entity indexed from ``model``, unless ``update_fields`` leaves it untouched."""
+        label = model._meta.label
+        for entity, source in self.sources.items():
+            if source.model == label:
+                if update_fields and not source.indexed_fields.intersection(update_fields):
+                    return None
+                return entity
+        return None
+
+
+typeahead = TypeaheadService()
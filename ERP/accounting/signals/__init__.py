@@ -6,6 +6,8 @@ from datetime import date, datetime
 from decimal import Decimal
 from threading import local
 
+from utils.cache_utils import invalidate_now_and_on_commit
+
 from ..models import (
     Journal,
     JournalLine,
@@ -190,6 +192,38 @@ for audited_model in AUDITED_MODELS:
     post_delete.connect(_audit_post_delete, sender=audited_model, weak=False)
 
 
+@receiver([post_save, post_delete], sender=VoucherModeConfig)
+def invalidate_compiled_voucher_forms(sender, instance, **kwargs):
+    """Drop cached form classes built from this config's schema."""
+    from accounting.forms_factory import compiled_forms
+
+    compiled_forms.invalidate(instance.pk)
+
+
+def invalidate_typeahead_index(sender, instance, **kwargs):
+    """Mark the lookup index for this row's entity and organization as stale."""
+    from accounting.services.typeahead_service import typeahead
+
+    entity = typeahead.entity_for_model(sender, kwargs.get('update_fields'))
+    if entity:
+        invalidate_now_and_on_commit(typeahead.invalidate, entity, getattr(instance, 'organization_id', None))
+
+
+def _connect_typeahead_signals():
+    from accounting.services.typeahead_service import SOURCES
+
+    for entity, source in SOURCES.items():
+        for name, signal in (('save', post_save), ('delete', post_delete)):
+            signal.connect(
+                invalidate_typeahead_index,
+                sender=source.model,
+                dispatch_uid=f'typeahead-{name}-{entity}',
+            )
+
+
+_connect_typeahead_signals()
+
+
 @receiver(post_save, sender=JournalType)
 def create_default_voucher_config(sender, instance, created, **kwargs):
     """Seed voucher definitions for the organization when new journal types are added."""
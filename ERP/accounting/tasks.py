@@ -5,12 +5,13 @@ import logging
 from datetime import date, timedelta
 
 from celery import shared_task
+from django.conf import settings
 from django.db import transaction
 from django.core.files.base import ContentFile
 from django.utils import timezone
 
 from accounting.ird_service import submit_invoice_to_ird
-from accounting.models import IRDSubmissionTask, RecurringJournal
+from accounting.models import AuditLog, IRDSubmissionTask, RecurringJournal
 from accounting.services import process_receipt_with_ocr
 from accounting.services.create_voucher import create_voucher
 from accounting.utils.event_utils import emit_integration_event
@@ -65,6 +66,11 @@ def _backoff_seconds(attempts: int) -> int:
     return min(2 ** base * 60, 60 * 60)
 
 
+def _abandoned_before(now):
+    """Submissions still processing since before this were left behind by a dead worker."""
+    return now - timedelta(seconds=getattr(settings, "IRD_PROCESSING_TIMEOUT_SECONDS", 900))
+
+
 @shared_task(bind=True, autoretry_for=(), max_retries=0)
 def process_ird_submission(self, submission_id: int) -> dict:
     """Submit a queued sales invoice to the IRD gateway."""
@@ -78,8 +84,13 @@ def process_ird_submission(self, submission_id: int) -> dict:
             )
             if submission.is_terminal:
                 return {"status": submission.status}
-
             now = timezone.now()
+            if submission.status == IRDSubmissionTask.STATUS_PROCESSING and not (
+                submission.last_attempt_at and submission.last_attempt_at < _abandoned_before(now)
+            ):
+                # Already claimed by another worker or a batch run.
+                return {"status": "in_progress"}
+
             if submission.next_attempt_at and submission.next_attempt_at > now:
                 countdown = int((submission.next_attempt_at - now).total_seconds())
                 process_ird_submission.apply_async((submission.pk,), countdown=max(countdown, 30))
@@ -163,6 +174,19 @@ def process_ird_submission(self, submission_id: int) -> dict:
     return {"status": "succeeded", "ack_id": result.ack_id}
 
 
+@shared_task(bind=True, max_retries=0)
+def process_ird_submission_batch(self, batch_size: int | None = None) -> dict:
+    """
+    Submit up to ``batch_size`` due queued invoices to the IRD gateway in one pass.
+
+    See ``accounting.services.ird_batch_submitter``; rows claimed here are
+    skipped by concurrent batches and by ``process_ird_submission``.
+    """
+    from accounting.services.ird_batch_submitter import IRDBatchSubmitter
+
+    return IRDBatchSubmitter(batch_size=batch_size).run(task_id=self.request.id or '')
+
+
 def _run_receipt_ocr(file_bytes: bytes, filename: str | None = None) -> dict:
     """Shared helper to process OCR from raw bytes."""
     safe_file = ContentFile(file_bytes)
@@ -197,8 +221,25 @@ def analyze_expense_receipt(self, file_bytes: bytes, filename: str | None = None
 # BATCH POSTING (Performance / PR10)
 # ============================================================================
 
+def _get_batch_user(user_id: int):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    try:
+        return User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        logger.warning("batch_posting.user_missing", extra={"user_id": user_id})
+        return None
+
+
 @shared_task(bind=True, max_retries=1)
-def post_journals_batch(self, user_id: int, journal_ids: list[int] | None = None, limit: int = 100) -> dict:
+def post_journals_batch(
+    self,
+    user_id: int,
+    journal_ids: list[int] | None = None,
+    limit: int = 100,
+    shard_count: int = 1,
+) -> dict:
     """
     Post a batch of journals asynchronously for high-volume tenants.
 
@@ -208,18 +249,38 @@ def post_journals_batch(self, user_id: int, journal_ids: list[int] | None = None
             for the user's active organization are processed up to `limit`.
         limit: Safety cap for implicit selections so a single task cannot post
             unbounded journals.
+        shard_count: When greater than 1, ready journals are split into shards with
+            disjoint account sets and each shard is posted by its own
+            `post_journal_shard` task; results are merged by
+            `summarize_journal_shards`.
     """
-    from django.contrib.auth import get_user_model
+    from celery import chord
     from accounting.services.batch_posting import BatchPostingService
 
-    User = get_user_model()
-    try:
-        user = User.objects.get(pk=user_id)
-    except User.DoesNotExist:
-        logger.warning("batch_posting.user_missing", extra={"user_id": user_id})
+    user = _get_batch_user(user_id)
+    if user is None:
         return {"posted": [], "failed": [{"error": "user_missing"}]}
 
     service = BatchPostingService(user)
+    if shard_count > 1:
+        shards = service.plan_shards(journal_ids=journal_ids, limit=limit, shard_count=shard_count)
+        if len(shards) > 1:
+            chord(
+                post_journal_shard.s(user_id, shard, index) for index, shard in enumerate(shards)
+            )(summarize_journal_shards.s(user_id, timezone.now().isoformat()))
+            logger.info(
+                "batch_posting.shards_dispatched",
+                extra={
+                    "user_id": user_id,
+                    "shard_count": len(shards),
+                    "journal_count": sum(len(shard) for shard in shards),
+                },
+            )
+            return {"dispatched_shards": [len(shard) for shard in shards]}
+        journal_ids = shards[0] if shards else []
+        if not journal_ids:
+            return {"posted": [], "failed": []}
+
     summary = service.post_journals(journal_ids=journal_ids, limit=limit)
     logger.info(
         "batch_posting.completed",
@@ -232,6 +293,76 @@ def post_journals_batch(self, user_id: int, journal_ids: list[int] | None = None
     return summary
 
 
+@shared_task(bind=True, max_retries=0)
+def post_journal_shard(self, user_id: int, journal_ids: list[int], shard_index: int = 0) -> dict:
+    """Post one lock-disjoint shard of journals, publishing progress as task state."""
+    from accounting.services.batch_posting import BatchPostingService
+
+    user = _get_batch_user(user_id)
+    if user is None:
+        return {
+            "posted": [],
+            "failed": [{"journal_id": journal_id, "error": "user_missing"} for journal_id in journal_ids],
+            "shard": {
+                "shard": shard_index,
+                "journal_count": len(journal_ids),
+                "processed": 0,
+                "posted_count": 0,
+                "failed_count": len(journal_ids),
+                "elapsed_seconds": 0.0,
+                "journals_per_second": None,
+                "lock_wait_seconds": 0.0,
+            },
+        }
+
+    def _report(stats: dict) -> None:
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=stats)
+
+    return BatchPostingService(user).post_shard(
+        journal_ids,
+        shard_index=shard_index,
+        progress_callback=_report,
+    )
+
+
+@shared_task
+def summarize_journal_shards(results: list[dict], user_id: int, started_at: str | None = None) -> dict:
+    """Chord callback merging shard results into one batch summary."""
+    from datetime import datetime
+
+    from accounting.services.batch_posting import summarize_shard_results
+
+    elapsed = None
+    if started_at:
+        elapsed = (timezone.now() - datetime.fromisoformat(started_at)).total_seconds()
+    summary = summarize_shard_results(results, elapsed=elapsed)
+    logger.info(
+        "batch_posting.completed",
+        extra={
+            "user_id": user_id,
+            "posted_count": len(summary["posted"]),
+            "failed_count": len(summary["failed"]),
+            "shard_count": len(summary["shards"]),
+            "journals_per_second": summary["journals_per_second"],
+            "lock_wait_seconds": summary["lock_wait_seconds"],
+        },
+    )
+    return summary
+
+
+# ============================================================================
+# REPORTING SUMMARIES
+# ============================================================================
+
+@shared_task(bind=True, max_retries=1)
+def refresh_monthly_journalline_summary(self, full: bool = False) -> dict:
+    """Recompute months of the monthly GL summary with rows past each organization's watermark."""
+    from accounting.services.monthly_summary_service import MonthlySummaryService
+
+    return MonthlySummaryService().refresh(full=full)
+
+
 # ============================================================================
 # AUDIT LOGGING TASKS (Async)
 # ============================================================================
@@ -291,65 +422,80 @@ def log_audit_event_async(self, user_id, action, content_type_id, object_id,
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
+@shared_task(bind=True, max_retries=3)
+def log_audit_events_batch_async(self, rows):
+    """
+    Write a batch of audit rows sent by ``accounting.utils.audit.enqueue_audit_batches``.
+
+    Each row carries the same fields as ``log_audit_event_async`` arguments,
+    with foreign keys as ids, so the whole batch is one ``bulk_create``.
+    """
+    try:
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                user_id=row["user_id"],
+                action=row["action"],
+                content_type_id=row["content_type_id"],
+                object_id=row["object_id"],
+                changes=row.get("changes") or {},
+                details=row.get("details"),
+                ip_address=row.get("ip_address"),
+                organization_id=row.get("organization_id"),
+            )
+            for row in rows
+        ])
+        logger.info("audit_log.batch_created", extra={"count": len(rows)})
+
+    except Exception as exc:
+        logger.exception("log_audit_events_batch_async.failed")
+        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+
+
 @shared_task(bind=True, max_retries=2)
-def seal_audit_logs_batch(self, organization_id=None, batch_size=1000):
+def seal_audit_logs_batch(self, organization_id=None, batch_size=1000, all_organizations=None):
     """
     Asynchronously seal audit logs with hash-chaining for immutability.
     
     Should be run as a scheduled task (e.g., daily) to seal logs older than 24 hours.
+    Each organization has its own chain. Without ``organization_id`` the task
+    fans out one task per organization with pending logs, so chains are sealed
+    in parallel; organization-less logs are sealed by the fan-out task itself.
     
     Args:
         organization_id: Optional organization to seal (all if None)
         batch_size: Number of logs to seal per task invocation
+        all_organizations: Pass False with ``organization_id=None`` to seal only
+            the organization-less chain instead of fanning out
     """
     try:
-        from datetime import timedelta
-        from usermanagement.models import Organization
-        from accounting.utils.audit_integrity import compute_content_hash
-        
+        from accounting.utils.audit_integrity import (
+            organizations_with_unsealed_logs,
+            seal_audit_chain,
+        )
+
         cutoff_date = timezone.now() - timedelta(hours=24)
-        logs = AuditLog.objects.filter(
-            timestamp__lt=cutoff_date,
-            is_immutable=False
-        ).order_by('timestamp')[:batch_size]
-        
-        if organization_id:
-            logs = logs.filter(organization_id=organization_id)
-        
-        count = 0
-        prev_hash = None
-        
-        for log in logs:
-            try:
-                log_dict = {
-                    'user_id': log.user_id,
-                    'action': log.action,
-                    'content_type_id': log.content_type_id,
-                    'object_id': log.object_id,
-                    'changes': log.changes,
-                    'timestamp': log.timestamp,
-                }
-                
-                log.content_hash = compute_content_hash(log_dict)
-                log.previous_hash_id = prev_hash
-                log.is_immutable = True
-                log.save(update_fields=['content_hash', 'previous_hash_id', 'is_immutable'])
-                
-                prev_hash = log.id
-                count += 1
-            
-            except Exception as e:
-                logger.warning(f"Failed to seal audit log {log.id}: {str(e)}")
-        
+
+        if organization_id is None and all_organizations is not False:
+            pending = organizations_with_unsealed_logs(cutoff_date)
+            for pending_org_id in pending:
+                if pending_org_id is not None:
+                    seal_audit_logs_batch.delay(organization_id=pending_org_id, batch_size=batch_size)
+            logger.info("seal_audit_logs_batch.dispatched", extra={"organizations": len(pending)})
+            if None not in pending:
+                return
+
+        count = seal_audit_chain(organization_id, cutoff_date, batch_size=batch_size)
+
         logger.info(
             "seal_audit_logs_batch.completed",
-            sealed_count=count,
-            batch_size=batch_size
+            extra={"organization_id": organization_id, "sealed_count": count, "batch_size": batch_size},
         )
         
         # Schedule next batch if there are more logs
         if count == batch_size:
-            seal_audit_logs_batch.delay(organization_id=organization_id, batch_size=batch_size)
+            seal_audit_logs_batch.delay(
+                organization_id=organization_id, batch_size=batch_size, all_organizations=False,
+            )
     
     except Exception as exc:
         logger.exception("seal_audit_logs_batch.failed")
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounting.models import AccountPeriodBalance, GeneralLedger, JournalLine
+from accounting.services.account_balance_service import AccountBalanceService
+from accounting.services.posting_service import PostingService
+from accounting.services.trial_balance_service import get_trial_balance
+from accounting.tests import factories as f
+
+
+class AccountBalanceServiceTests(TestCase):
+    def setUp(self):
+        self.organization = f.create_organization()
+        self.user = f.create_user(organization=self.organization, role="superadmin")
+        self.user.get_active_organization = lambda: self.organization
+        self.fiscal_year = f.create_fiscal_year(organization=self.organization)
+        self.first_period = f.create_accounting_period(fiscal_year=self.fiscal_year)
+        self.second_period = f.create_accounting_period(
+            fiscal_year=self.fiscal_year,
+            period_number=2,
+            name=f"{self.fiscal_year.code}-P2",
+            start_date=self.first_period.end_date + timedelta(days=1),
+            is_current=False,
+        )
+        self.cash = f.create_chart_of_account(organization=self.organization)
+        self.revenue = f.create_chart_of_account(organization=self.organization)
+
+    def _post(self, period, amount):
+        journal = f.create_journal(
+            organization=self.organization,
+            period=period,
+            journal_date=period.start_date,
+            created_by=self.user,
+            journal_number=None,
+        )
+        JournalLine.objects.create(
+            journal=journal, line_number=1, account=self.cash,
+            debit_amount=amount, credit_amount=Decimal("0"),
+        )
+        JournalLine.objects.create(
+            journal=journal, line_number=2, account=self.revenue,
+            debit_amount=Decimal("0"), credit_amount=amount,
+        )
+        return PostingService(self.user).post(journal)
+
+    def _row(self, account, period):
+        return AccountPeriodBalance.objects.get(account=account, period=period)
+
+    def test_posting_maintains_period_balances(self):
+        self._post(self.first_period, Decimal("100.00"))
+        self._post(self.first_period, Decimal("25.00"))
+
+        row = self._row(self.cash, self.first_period)
+        self.assertEqual(row.debit_total, Decimal("125.00"))
+        self.assertEqual(row.opening_balance, Decimal("0"))
+        self.assertEqual(row.closing_balance, Decimal("125.00"))
+        self.assertEqual(self._row(self.revenue, self.first_period).closing_balance, Decimal("-125.00"))
+
+    def test_backdated_posting_rolls_forward_into_later_periods(self):
+        self._post(self.second_period, Decimal("40.00"))
+        self._post(self.first_period, Decimal("100.00"))
+
+        later = self._row(self.cash, self.second_period)
+        self.assertEqual(later.opening_balance, Decimal("100.00"))
+        self.assertEqual(later.closing_balance, Decimal("140.00"))
+
+        report = AccountBalanceService(self.organization).verify()
+        self.assertEqual((report["missing"], report["extra"], report["mismatched"]), ([], [], []))
+
+    def test_verify_detects_drift_and_rebuild_repairs_it(self):
+        self._post(self.first_period, Decimal("60.00"))
+
+        AccountPeriodBalance.objects.filter(organization=self.organization).update(closing_balance=Decimal("1"))
+        service = AccountBalanceService(self.organization)
+        self.assertTrue(service.verify()["mismatched"])
+        service.rebuild()
+        self.assertEqual(service.verify()["mismatched"], [])
+
+    def test_balances_as_of_combines_closed_periods_and_partial_period(self):
+        self._post(self.first_period, Decimal("100.00"))
+        self._post(self.second_period, Decimal("30.00"))
+
+        service = AccountBalanceService(self.organization)
+        self.assertEqual(
+            service.balances_as_of(self.first_period.end_date, [self.cash.pk])[self.cash.pk],
+            Decimal("100.00"),
+        )
+        self.assertEqual(
+            service.balances_as_of(self.second_period.start_date, [self.cash.pk])[self.cash.pk],
+            Decimal("130.00"),
+        )
+
+    def test_archived_gl_rows_are_left_out_of_balances(self):
+        self._post(self.first_period, Decimal("100.00"))
+        archived = self._post(self.first_period, Decimal("25.00"))
+        GeneralLedger.objects.filter(journal=archived).update(is_archived=True)
+
+        service = AccountBalanceService(self.organization)
+        service.rebuild()
+
+        self.assertEqual(self._row(self.cash, self.first_period).debit_total, Decimal("100.00"))
+        totals = {row["account_id"]: row for row in get_trial_balance(self.organization, self.fiscal_year)}
+        self.assertEqual(totals[self.cash.pk]["debit_total"], Decimal("100.00"))
+        self.assertEqual(
+            service.balances_as_of(self.first_period.start_date, [self.cash.pk])[self.cash.pk],
+            Decimal("100.00"),
+        )
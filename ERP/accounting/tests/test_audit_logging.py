@@ -1,11 +1,17 @@
+from datetime import timedelta
 from unittest import mock
 
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from accounting.models import AuditLog
 from accounting.tests import factories as f
-from accounting.utils.audit import log_audit_event
+from accounting.utils.audit import audit_buffer, log_audit_event
+from accounting.utils.audit_integrity import SEAL_LOCK_KEY, seal_audit_chain, verify_audit_chain_stream
 from configuration.models import ConfigurationEntry
 from configuration.services import ConfigurationService
 
@@ -52,6 +58,143 @@ class LogAuditEventTests(TestCase):
         )
 
 
+class AuditBufferTests(TestCase):
+    def setUp(self):
+        self.organization = f.create_organization()
+        self.user = f.create_user(organization=self.organization)
+        self.journal = f.create_journal(organization=self.organization, created_by=self.user)
+        self.content_type = ContentType.objects.get_for_model(self.journal)
+        self.existing = set(self._audits().values_list("pk", flat=True))
+
+    def _audits(self):
+        return AuditLog.objects.filter(content_type=self.content_type, object_id=self.journal.pk)
+
+    def _count(self):
+        return self._audits().exclude(pk__in=self.existing).count()
+
+    def test_events_are_written_in_one_insert_inside_the_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                with audit_buffer():
+                    for action in ("submit", "approve", "post"):
+                        entry = log_audit_event(self.user, self.journal, action)
+                        self.assertIsNone(entry.pk)
+                    self.assertEqual(self._count(), 0)
+            self.assertEqual(self._count(), 3)
+
+        self.assertEqual(callbacks, [])
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+
+    def test_failed_write_rolls_back_the_block(self):
+        with mock.patch("accounting.utils.audit._write_audit_entries", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                with audit_buffer():
+                    type(self.journal).objects.filter(pk=self.journal.pk).update(description="rolled back")
+                    log_audit_event(self.user, self.journal, "post")
+
+        self.journal.refresh_from_db()
+        self.assertNotEqual(self.journal.description, "rolled back")
+
+    def test_rolled_back_events_are_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with audit_buffer():
+                log_audit_event(self.user, self.journal, "submit")
+                with self.assertRaises(ValueError):
+                    with audit_buffer():
+                        log_audit_event(self.user, self.journal, "approve")
+                        raise ValueError
+        self.assertEqual(
+            list(self._audits().exclude(pk__in=self.existing).values_list("action", flat=True)),
+            ["submit"],
+        )
+
+    @mock.patch("accounting.tasks.log_audit_events_batch_async.delay")
+    def test_async_events_are_coalesced_into_batches(self, mock_delay):
+        with self.settings(AUDIT_ASYNC_BATCH_SIZE=2):
+            with self.captureOnCommitCallbacks(execute=True):
+                with audit_buffer():
+                    for _ in range(5):
+                        log_audit_event(self.user, self.journal, "update", async_write=True)
+
+        self.assertEqual([len(call.args[0]) for call in mock_delay.call_args_list], [2, 2, 1])
+        self.assertEqual(mock_delay.call_args_list[0].args[0][0]["organization_id"], self.organization.pk)
+        self.assertEqual(self._count(), 0)
+
+
+class AuditChainSealingTests(TestCase):
+    def setUp(self):
+        self.org_a = f.create_organization()
+        self.org_b = f.create_organization()
+        self.logs = {}
+        for organization in (self.org_a, self.org_b):
+            user = f.create_user(organization=organization)
+            journal = f.create_journal(organization=organization, created_by=user)
+            AuditLog.objects.filter(organization=organization).delete()
+            self.logs[organization.pk] = [
+                log_audit_event(user, journal, action).pk for action in ("submit", "approve", "post")
+            ]
+        AuditLog.objects.update(timestamp=timezone.now() - timedelta(days=2))
+        self.cutoff = timezone.now() - timedelta(days=1)
+
+    def test_each_organization_gets_its_own_chain(self):
+        self.assertEqual(seal_audit_chain(self.org_a.pk, self.cutoff, batch_size=2), 2)
+        self.assertEqual(seal_audit_chain(self.org_a.pk, self.cutoff, batch_size=2), 1)
+        self.assertEqual(seal_audit_chain(self.org_b.pk, self.cutoff), 3)
+
+        for organization in (self.org_a, self.org_b):
+            ids = self.logs[organization.pk]
+            links = list(
+                AuditLog.objects.filter(pk__in=ids).order_by("pk").values_list("previous_hash_id", flat=True)
+            )
+            self.assertEqual(links, [None] + ids[:-1])
+            result = verify_audit_chain_stream(organization.pk)
+            self.assertTrue(result.is_valid)
+            self.assertEqual((result.checked, result.last_verified_id), (3, ids[-1]))
+
+    def test_verifier_reports_first_broken_link_and_resumes(self):
+        seal_audit_chain(self.org_a.pk, self.cutoff)
+        first, second, third = self.logs[self.org_a.pk]
+
+        partial = verify_audit_chain_stream(self.org_a.pk, limit=1)
+        self.assertEqual((partial.checked, partial.last_verified_id), (1, first))
+
+        AuditLog.objects.filter(pk=second).update(changes={"tampered": True})
+        result = verify_audit_chain_stream(self.org_a.pk, after_id=partial.last_verified_id)
+        self.assertFalse(result.is_valid)
+        self.assertEqual((result.broken_id, result.checked), (second, 0))
+
+        AuditLog.objects.filter(pk=second).delete()
+        result = verify_audit_chain_stream(self.org_a.pk)
+        self.assertEqual((result.broken_id, result.last_verified_id), (third, first))
+
+    def test_newer_logs_are_not_sealed_ahead_of_their_turn(self):
+        AuditLog.objects.filter(pk=self.logs[self.org_a.pk][1]).update(timestamp=timezone.now())
+        self.assertEqual(seal_audit_chain(self.org_a.pk, self.cutoff), 1)
+
+    def test_sealing_waits_for_ids_an_open_transaction_may_still_commit(self):
+        # Pretend the first log is still in flight: its id is taken but not visible.
+        AuditLog.objects.filter(pk=self.logs[self.org_a.pk][0]).delete()
+        with mock.patch(
+            "utils.watermarks.oldest_open_transaction",
+            return_value=timezone.now() - timedelta(days=3),
+        ):
+            self.assertEqual(seal_audit_chain(self.org_a.pk, self.cutoff), 0)
+        self.assertEqual(seal_audit_chain(self.org_a.pk, self.cutoff), 2)
+
+    def test_lock_taken_over_by_another_sealer_is_kept(self):
+        lock_key = SEAL_LOCK_KEY.format(organization_id=self.org_a.pk)
+
+        def expire_and_steal():
+            cache.set(lock_key, "other-sealer")
+            return 0
+
+        with mock.patch("accounting.utils.audit_integrity.sealable_id", side_effect=expire_and_steal):
+            seal_audit_chain(self.org_a.pk, self.cutoff)
+        self.assertEqual(cache.get(lock_key), "other-sealer")
+        cache.delete(lock_key)
+
+
 class ConfigurationAuditLoggingTests(TestCase):
     def setUp(self):
         self.organization = f.create_organization()
@@ -98,3 +98,61 @@ class BankReconciliationServiceTests(TestCase):
         matched = service.match()
         self.assertEqual(matched, 0)
         self.assertEqual(self.statement.status, 'draft')
+
+    def _transaction(self, day, amount, reference=''):
+        return BankTransaction.objects.create(
+            bank_account=self.bank_master,
+            transaction_date=date(2025, 1, day),
+            transaction_type='receipt',
+            amount=Decimal(amount),
+            reference=reference,
+        )
+
+    def _line(self, day, amount, reference=''):
+        return BankStatementLine.objects.create(
+            statement=self.statement,
+            line_date=date(2025, 1, day),
+            description='Deposit',
+            reference=reference,
+            amount=Decimal(amount),
+        )
+
+    def test_repeated_amounts_pair_by_closest_date(self):
+        late = self._transaction(12, '100')
+        early = self._transaction(10, '100')
+        first = self._line(10, '100')
+        second = self._line(12, '100')
+
+        self.assertEqual(BankReconciliationService(self.statement).match(), 2)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.matched_transaction_id, early.pk)
+        self.assertEqual(second.matched_transaction_id, late.pk)
+        self.assertEqual(first.metadata['match_type'], 'one_to_one')
+        self.assertGreater(first.metadata['match_confidence'], 0.5)
+
+    def test_line_matches_several_transactions_summing_to_it(self):
+        part_one = self._transaction(10, '100')
+        part_two = self._transaction(11, '200')
+        line = self._line(11, '300')
+
+        self.assertEqual(BankReconciliationService(self.statement).match(), 1)
+
+        line.refresh_from_db()
+        self.assertEqual(line.metadata['match_type'], 'one_to_many')
+        self.assertEqual(line.metadata['matched_transaction_ids'], [part_one.pk, part_two.pk])
+        self.assertEqual(
+            BankTransaction.objects.filter(pk__in=[part_one.pk, part_two.pk], is_reconciled=True).count(), 2
+        )
+
+    def test_several_lines_match_one_transaction(self):
+        trx = self._transaction(20, '200')
+        lines = [self._line(20, '120'), self._line(21, '80')]
+
+        self.assertEqual(BankReconciliationService(self.statement).match(), 2)
+
+        for line in lines:
+            line.refresh_from_db()
+            self.assertEqual(line.matched_transaction_id, trx.pk)
+            self.assertEqual(line.metadata['match_type'], 'many_to_one')
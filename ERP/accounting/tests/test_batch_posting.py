@@ -1,7 +1,7 @@
 from django.test import TestCase
 
 from accounting.models import Journal, JournalLine
-from accounting.services.batch_posting import BatchPostingService
+from accounting.services.batch_posting import BatchPostingService, plan_posting_shards
 from accounting.services.posting_service import OptimisticLockError, PostingService
 from accounting.tests import factories as f
 
@@ -77,6 +77,48 @@ class BatchPostingServiceTests(TestCase):
         self.assertEqual(summary["posted"], [])
         self.assertEqual(summary["failed"][0]["journal_id"], journal.pk)
 
+    def test_plan_shards_keeps_shared_accounts_together(self):
+        shared_first = self._build_balanced_journal()
+        shared_second = self._build_balanced_journal()
+        original_account = self.account
+        self.account = f.create_chart_of_account(organization=self.organization)
+        independent = self._build_balanced_journal()
+        self.account = original_account
+
+        shards = BatchPostingService(self.user).plan_shards(limit=10, shard_count=4)
+
+        self.assertEqual(len(shards), 2)
+        shard_of = {journal_id: index for index, shard in enumerate(shards) for journal_id in shard}
+        self.assertEqual(shard_of[shared_first.pk], shard_of[shared_second.pk])
+        self.assertNotEqual(shard_of[shared_first.pk], shard_of[independent.pk])
+
+    def test_post_shard_reports_throughput_and_lock_wait(self):
+        journal = self._build_balanced_journal()
+        progress = []
+
+        result = BatchPostingService(self.user).post_shard(
+            [journal.pk], shard_index=3, progress_callback=progress.append
+        )
+
+        self.assertEqual(result["posted"], [journal.pk])
+        self.assertEqual(result["shard"]["shard"], 3)
+        self.assertEqual(result["shard"]["posted_count"], 1)
+        self.assertGreaterEqual(result["shard"]["lock_wait_seconds"], 0)
+        self.assertEqual(progress[-1], result["shard"])
+
+
+class PlanPostingShardsTests(TestCase):
+    def test_transitively_linked_journals_share_a_shard(self):
+        shards = plan_posting_shards({1: {10, 11}, 2: {12}, 3: {11, 13}, 4: {13}}, shard_count=4)
+
+        self.assertIn([1, 3, 4], shards)
+        self.assertIn([2], shards)
+
+    def test_hot_account_serialises_all_journals(self):
+        shards = plan_posting_shards({1: {1, 2}, 2: {1, 3}, 3: {1, 4}}, shard_count=3)
+
+        self.assertEqual(shards, [[1, 2, 3]])
+
 
 class PostingServiceOptimisticLockTests(TestCase):
     def setUp(self):
@@ -1,9 +1,10 @@
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.test import TestCase
 
-from accounting.models import GeneralLedger, JournalLine
+from accounting.models import AuditLog, ChartOfAccount, GeneralLedger, JournalLine
 from accounting.services.posting_service import PostingService
 from accounting.tests import factories as f
 
@@ -63,3 +64,51 @@ class GeneralLedgerPostingTests(TestCase):
         with self.assertRaises(ValidationError) as exc:
             PostingService(self.user).post(self.journal)
         self.assertIn("general ledger entry already exists", str(exc.exception).lower())
+
+    def _snapshot_posting(self):
+        gl_rows = list(
+            GeneralLedger.objects.filter(journal=self.journal)
+            .order_by("journal_line__line_number")
+            .values_list("account_id", "debit_amount", "credit_amount", "balance_after")
+        )
+        balances = dict(
+            ChartOfAccount.objects.filter(organization=self.organization).values_list("pk", "current_balance")
+        )
+        # GL primary keys are not reused after rollback on every backend, so
+        # compare audit rows by action and content type only.
+        audit_actions = sorted(AuditLog.objects.values_list("action", "content_type_id"))
+        return gl_rows, balances, audit_actions
+
+    def test_bulk_posting_matches_line_by_line_posting(self):
+        second_account = f.create_chart_of_account(organization=self.organization)
+        for number, (debit, credit) in enumerate(
+            [(Decimal("40.00"), Decimal("0")), (Decimal("0"), Decimal("40.00"))], start=3
+        ):
+            JournalLine.objects.create(
+                journal=self.journal,
+                line_number=number,
+                account=second_account,
+                debit_amount=debit,
+                credit_amount=credit,
+            )
+
+        class _Rollback(Exception):
+            pass
+
+        line_service = PostingService(self.user)
+        line_service.bulk_posting = False
+        # Run commit callbacks so both postings are compared with the same side effects.
+        try:
+            with transaction.atomic():
+                with self.captureOnCommitCallbacks(execute=True):
+                    line_service.post(self.journal)
+                expected = self._snapshot_posting()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PostingService(self.user).post(self.journal)
+        actual = self._snapshot_posting()
+        self.assertTrue(actual[2])
+        self.assertEqual(actual, expected)
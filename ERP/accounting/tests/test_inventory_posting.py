@@ -3,8 +3,9 @@ from decimal import Decimal
 from django.test import TestCase
 
 from accounting.models import AccountType, ChartOfAccount
-from accounting.services.inventory_posting_service import InventoryPostingService
+from accounting.services.inventory_posting_service import CostCalculator, InventoryPostingService
 from inventory.models import (
+    CostLayer,
     CostingMethod,
     Product,
     Warehouse,
@@ -170,3 +171,44 @@ class InventoryPostingCostingTests(TestCase):
         )
         self.assertEqual(result.ledger_entry.unit_cost, Decimal("15"))
         self.assertEqual(result.total_cost, Decimal("30"))
+
+    def test_fifo_issue_spanning_layers_and_cost_preview(self):
+        self.product.costing_method = CostingMethod.FIFO
+        self.product.save(update_fields=["costing_method"])
+
+        service = self._create_service()
+        for ref, qty, cost in (("RC-1", "2", "10"), ("RC-2", "2", "20"), ("RC-3", "2", "30")):
+            service.record_receipt(
+                product=self.product,
+                warehouse=self.warehouse,
+                quantity=Decimal(qty),
+                unit_cost=Decimal(cost),
+                grir_account=self.grir_account,
+                reference_id=ref,
+            )
+        calculator = CostCalculator(organization=self.organization, product=self.product, warehouse=self.warehouse)
+
+        preview = calculator.preview_cost(Decimal("5"), CostingMethod.FIFO)
+        self.assertEqual(preview.total_cost, Decimal("80"))
+        self.assertEqual(preview.shortfall, Decimal("0"))
+        self.assertEqual(
+            sorted(CostLayer.objects.values_list("quantity_available", flat=True)),
+            [Decimal("2"), Decimal("2"), Decimal("2")],
+        )
+        self.assertEqual(calculator.preview_cost(Decimal("7"), CostingMethod.FIFO).shortfall, Decimal("1"))
+
+        result = service.record_issue(
+            product=self.product,
+            warehouse=self.warehouse,
+            quantity=Decimal("5"),
+            reference_id="ISSUE-1",
+            cogs_account=self.cogs_account,
+        )
+        self.assertEqual(result.total_cost, Decimal("80"))
+        self.assertEqual(
+            list(CostLayer.objects.order_by("created_at", "pk").values_list("quantity_available", flat=True)),
+            [Decimal("0"), Decimal("0"), Decimal("1")],
+        )
+        with self.assertRaises(ValueError):
+            calculator.consume_layers(Decimal("2"), CostingMethod.FIFO)
+        self.assertEqual(CostLayer.objects.filter(quantity_available__gt=0).count(), 1)
@@ -0,0 +1,196 @@
+import json
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounting.models import Customer, IntegrationEvent, IRDSubmissionTask, SalesInvoice
+from accounting.services.ird_batch_submitter import IRDBatchSubmitter
+from accounting.tests import factories as f
+
+
+class _StubIRDHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.signatures.append(self.headers.get("X-Signature"))
+        if payload["invoice_number"] in server.reject:
+            status, body = 500, {"error": "rejected"}
+        else:
+            status, body = 200, {"ack_id": f"ACK-{payload['invoice_number']}", "status": "synced"}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class IRDBatchSubmitterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubIRDHandler)
+        cls.server.lock = threading.Lock()
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}/api/bill"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.signatures = []
+        self.server.reject = set()
+        self.organization = f.create_organization()
+        self.currency = f.create_currency()
+        receivable_account = f.create_chart_of_account(
+            organization=self.organization,
+            account_type=f.create_account_type(nature='asset'),
+            currency=self.currency,
+        )
+        self.customer = Customer.objects.create(
+            organization=self.organization,
+            code='C-IRD',
+            display_name='IRD Customer',
+            accounts_receivable_account=receivable_account,
+        )
+
+    def _queue(self, count, **task_fields):
+        tasks = []
+        for index in range(count):
+            invoice = SalesInvoice.objects.create(
+                organization=self.organization,
+                customer=self.customer,
+                customer_display_name=self.customer.display_name,
+                invoice_number=f'INV-{SalesInvoice.objects.count() + 1:05d}',
+                invoice_date=date.today(),
+                due_date=date.today(),
+                currency=self.currency,
+                subtotal=Decimal('100'),
+                tax_total=Decimal('13'),
+                total=Decimal('113'),
+                base_currency_total=Decimal('113'),
+            )
+            tasks.append(IRDSubmissionTask.objects.create(
+                organization=self.organization,
+                invoice=invoice,
+                next_attempt_at=timezone.now() - timedelta(seconds=1),
+                **task_fields,
+            ))
+        return tasks
+
+    def _submitter(self, **kwargs):
+        return IRDBatchSubmitter(endpoint=self.endpoint, concurrency=4, signing_processes=0, **kwargs)
+
+    @override_settings(IRD_SIGNING_METHOD='hmac', IRD_SIGNING_SECRET='secret', IRD_API_KEY=None, IRD_USERNAME=None)
+    def test_batch_submits_over_pooled_connections_and_records_results(self):
+        tasks = self._queue(40)
+
+        summary = self._submitter(batch_size=100).run(task_id='batch-1')
+
+        self.assertEqual(summary['claimed'], 40)
+        self.assertEqual(summary['succeeded'], 40)
+        self.assertGreater(summary['invoices_per_second'], 0)
+        self.assertEqual(self.server.requests, 40)
+        # Keep-alive: at most one connection per concurrent sender.
+        self.assertLessEqual(len(self.server.connections), 4)
+        self.assertTrue(all(self.server.signatures))
+
+        for task in tasks:
+            task.refresh_from_db()
+            self.assertEqual(task.status, IRDSubmissionTask.STATUS_SUCCEEDED)
+            self.assertEqual(task.attempts, 1)
+            self.assertEqual(task.celery_task_id, 'batch-1')
+            self.assertEqual(task.metadata['ack_id'], f'ACK-{task.invoice.invoice_number}')
+            task.invoice.refresh_from_db()
+            self.assertEqual(task.invoice.ird_ack_id, f'ACK-{task.invoice.invoice_number}')
+            self.assertEqual(task.invoice.ird_status, 'synced')
+            self.assertIsNotNone(task.invoice.ird_last_submitted_at)
+        self.assertEqual(
+            IntegrationEvent.objects.filter(event_type='sales_invoice_submitted_to_ird').count(), 40
+        )
+
+    @override_settings(IRD_SIGNING_METHOD='hmac', IRD_SIGNING_SECRET='secret', IRD_API_KEY=None, IRD_USERNAME=None)
+    def test_rejected_invoices_back_off_and_exhausted_ones_fail(self):
+        retrying, exhausted, accepted = self._queue(3)
+        exhausted.attempts = exhausted.max_attempts - 1
+        exhausted.save(update_fields=['attempts'])
+        self.server.reject = {retrying.invoice.invoice_number, exhausted.invoice.invoice_number}
+
+        summary = self._submitter().run()
+
+        self.assertEqual((summary['succeeded'], summary['retrying'], summary['failed']), (1, 1, 1))
+        retrying.refresh_from_db()
+        self.assertEqual(retrying.status, IRDSubmissionTask.STATUS_PENDING)
+        self.assertGreater(retrying.next_attempt_at, timezone.now())
+        self.assertIn('500', retrying.last_error)
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, IRDSubmissionTask.STATUS_FAILED)
+        self.assertIsNone(exhausted.next_attempt_at)
+        accepted.refresh_from_db()
+        self.assertEqual(accepted.status, IRDSubmissionTask.STATUS_SUCCEEDED)
+
+    @override_settings(IRD_SIGNING_METHOD='hmac', IRD_SIGNING_SECRET='secret', IRD_API_KEY=None, IRD_USERNAME=None)
+    def test_claim_takes_due_pending_rows_by_priority(self):
+        low, = self._queue(1, priority=IRDSubmissionTask.PRIORITY_LOW)
+        high, = self._queue(1, priority=IRDSubmissionTask.PRIORITY_HIGH)
+        not_due, = self._queue(1)
+        not_due.next_attempt_at = timezone.now() + timedelta(hours=1)
+        not_due.save(update_fields=['next_attempt_at'])
+        self._queue(1, status=IRDSubmissionTask.STATUS_PROCESSING)
+
+        claimed = self._submitter(batch_size=1).claim()
+        self.assertEqual([task.pk for task in claimed], [high.pk])
+
+        claimed = self._submitter(batch_size=10).claim()
+        self.assertEqual([task.pk for task in claimed], [low.pk])
+        low.refresh_from_db()
+        self.assertEqual((low.status, low.attempts), (IRDSubmissionTask.STATUS_PROCESSING, 1))
+
+    def test_claim_reclaims_rows_abandoned_in_processing(self):
+        stale, fresh = self._queue(2, status=IRDSubmissionTask.STATUS_PROCESSING, attempts=1)
+        IRDSubmissionTask.objects.filter(pk=stale.pk).update(last_attempt_at=timezone.now() - timedelta(hours=1))
+        IRDSubmissionTask.objects.filter(pk=fresh.pk).update(last_attempt_at=timezone.now())
+
+        with override_settings(IRD_PROCESSING_TIMEOUT_SECONDS=600):
+            claimed = self._submitter(batch_size=10).claim()
+        self.assertEqual([task.pk for task in claimed], [stale.pk])
+        self.assertEqual(claimed[0].attempts, 2)
+
+    @override_settings(IRD_SIGNING_METHOD='hmac', IRD_SIGNING_SECRET='secret', IRD_API_KEY=None, IRD_USERNAME=None)
+    def test_failed_batch_puts_claimed_rows_back(self):
+        retrying, exhausted = self._queue(2)
+        exhausted.attempts = exhausted.max_attempts - 1
+        exhausted.save(update_fields=['attempts'])
+
+        submitter = self._submitter()
+        with mock.patch.object(submitter, '_record', side_effect=RuntimeError('database went away')):
+            summary = submitter.run()
+
+        self.assertEqual((summary['claimed'], summary['released']), (2, 2))
+        self.assertEqual(summary['error'], 'database went away')
+        retrying.refresh_from_db()
+        self.assertEqual(retrying.status, IRDSubmissionTask.STATUS_PENDING)
+        self.assertGreater(retrying.next_attempt_at, timezone.now())
+        self.assertIn('database went away', retrying.last_error)
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, IRDSubmissionTask.STATUS_FAILED)
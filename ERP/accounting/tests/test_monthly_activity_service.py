@@ -0,0 +1,85 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounting.models import JournalLine
+from accounting.services.monthly_activity_service import MonthlyActivityService
+from accounting.services.posting_service import PostingService
+from accounting.tests import factories as f
+
+
+class MonthlyActivityServiceTests(TestCase):
+    def setUp(self):
+        self.organization = f.create_organization()
+        self.user = f.create_user(organization=self.organization, role="superadmin")
+        self.user.get_active_organization = lambda: self.organization
+        self.fiscal_year = f.create_fiscal_year(organization=self.organization)
+        self.first_period = f.create_accounting_period(fiscal_year=self.fiscal_year)
+        self.second_period = f.create_accounting_period(
+            fiscal_year=self.fiscal_year,
+            period_number=2,
+            name=f"{self.fiscal_year.code}-P2",
+            start_date=(self.first_period.end_date + timedelta(days=5)).replace(day=1),
+            is_current=False,
+        )
+        self.cash = f.create_chart_of_account(
+            organization=self.organization, account_type=f.create_account_type(nature="asset")
+        )
+        self.revenue = f.create_chart_of_account(
+            organization=self.organization, account_type=f.create_account_type(nature="income")
+        )
+        self.as_of = self.second_period.start_date + timedelta(days=14)
+        self.service = MonthlyActivityService(self.organization)
+
+    def _post(self, period, amount):
+        journal = f.create_journal(
+            organization=self.organization,
+            period=period,
+            journal_date=period.start_date,
+            created_by=self.user,
+            journal_number=None,
+        )
+        JournalLine.objects.create(
+            journal=journal, line_number=1, account=self.cash,
+            debit_amount=amount, credit_amount=Decimal("0"),
+        )
+        JournalLine.objects.create(
+            journal=journal, line_number=2, account=self.revenue,
+            debit_amount=Decimal("0"), credit_amount=amount,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return PostingService(self.user).post(journal)
+
+    def test_trend_and_balance_history_follow_calendar_months(self):
+        self._post(self.first_period, Decimal("100.00"))
+        self._post(self.second_period, Decimal("40.00"))
+
+        activity = self.service.get(2, as_of=self.as_of)
+
+        self.assertEqual(
+            [(row["month"], row["revenue"], row["net_income"]) for row in activity.trend(2)],
+            [
+                (self.first_period.start_date.strftime("%Y-%m"), 100.0, 100.0),
+                (self.second_period.start_date.strftime("%Y-%m"), 40.0, 40.0),
+            ],
+        )
+        first_month_end = self.second_period.start_date - timedelta(days=1)
+        self.assertEqual(
+            activity.balance_history(self.cash.pk, 2),
+            [
+                {"date": first_month_end.isoformat(), "balance": 100.0},
+                {"date": self.as_of.isoformat(), "balance": 140.0},
+            ],
+        )
+        self.assertEqual([row["balance"] for row in activity.balance_history(self.cash.pk, 1)], [140.0])
+
+    def test_result_is_cached_until_a_posting_commits(self):
+        self._post(self.first_period, Decimal("100.00"))
+        self.service.get(6, as_of=self.as_of)
+        with self.assertNumQueries(0):
+            activity = self.service.get(12, as_of=self.as_of)
+        self.assertEqual(activity.trend(1)[0]["revenue"], 0.0)
+
+        self._post(self.second_period, Decimal("40.00"))
+        self.assertEqual(self.service.get(6, as_of=self.as_of).trend(1)[0]["revenue"], 40.0)
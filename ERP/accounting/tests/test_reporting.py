@@ -7,8 +7,10 @@ from django.test import Client, SimpleTestCase, TestCase
 from django.urls import reverse
 
 from reporting.models import ReportDefinition
+from accounting.models import JournalLine
+from accounting.services.posting_service import PostingService
 from accounting.tests import factories
-from accounting.services.report_export_service import ReportExportService
+from accounting.services.report_export_service import STREAM_ERROR_MARKER, ReportExportService
 from accounting.services.report_service import ReportService
 
 User = get_user_model()
@@ -32,6 +34,47 @@ class ReportServiceStoredProcedureTests(TestCase):
         self.assertIn("totals", report)
         self.assertEqual(report["totals"]["total_debit"], Decimal("0.00"))
 
+    def test_general_ledger_pages_carry_running_balance(self):
+        user = factories.create_user(organization=self.organization, role="superadmin")
+        user.get_active_organization = lambda: self.organization
+        period = factories.create_accounting_period(
+            fiscal_year=factories.create_fiscal_year(organization=self.organization)
+        )
+        cash = factories.create_chart_of_account(organization=self.organization)
+        revenue = factories.create_chart_of_account(organization=self.organization)
+        for amount in ("10.00", "20.00", "30.00"):
+            journal = factories.create_journal(
+                organization=self.organization, period=period, journal_date=period.start_date,
+                created_by=user, journal_number=None,
+            )
+            JournalLine.objects.create(journal=journal, line_number=1, account=cash,
+                                       debit_amount=Decimal(amount), credit_amount=Decimal("0"))
+            JournalLine.objects.create(journal=journal, line_number=2, account=revenue,
+                                       debit_amount=Decimal("0"), credit_amount=Decimal(amount))
+            PostingService(user).post(journal)
+
+        self.service.set_date_range(period.start_date, period.end_date)
+        balances, cursor, pages = [], None, 0
+        while True:
+            page = self.service.generate_general_ledger_page(cursor=cursor, page_size=2)
+            pages += 1
+            balances.extend((line["account_id"], line["running_balance"]) for line in page["lines"])
+            cursor = page["page"]["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(
+            [balance for account, balance in balances if account == cash.pk],
+            [Decimal("10.00"), Decimal("30.00"), Decimal("60.00")],
+        )
+        self.assertEqual(
+            [balance for account, balance in balances if account == revenue.pk],
+            [Decimal("-10.00"), Decimal("-30.00"), Decimal("-60.00")],
+        )
+        with self.assertRaises(ValueError):
+            self.service.generate_general_ledger_page(cursor="tampered", page_size=2)
+
     def test_trial_balance_returns_structure_without_data(self):
         """Trial balance should execute stored function without seeded data."""
         as_of = datetime.date.today()
@@ -285,3 +328,43 @@ class ReportExportServiceTests(TestCase):
             },
         )
         self.assertEqual(response.status_code, 400)
+
+    def test_stream_csv_matches_buffered_export_for_lazy_ledger(self):
+        totals = {"opening_balance": Decimal("0"), "total_debit": Decimal("0"), "total_credit": Decimal("0"), "ending_balance": Decimal("0")}
+        generated_at = datetime.datetime(2024, 1, 31, 12, 0, 0)
+
+        def lines():
+            for idx in range(500):
+                totals["total_debit"] += Decimal("1.00")
+                yield {
+                    "date": datetime.date(2024, 1, 1),
+                    "account_code": "1000",
+                    "account_name": "Cash",
+                    "journal_no": f"JV-{idx}",
+                    "debit": Decimal("1.00"),
+                    "credit": Decimal("0.00"),
+                    "running_balance": Decimal(idx + 1),
+                }
+
+        streamed = {"report_type": "general_ledger", "generated_at": generated_at, "lines": lines(), "totals": totals}
+        chunks, filename = ReportExportService.stream_csv(streamed, chunk_bytes=1024)
+        chunks = list(chunks)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(filename.endswith(".csv"))
+
+        buffered = {"report_type": "general_ledger", "generated_at": generated_at, "lines": list(lines()), "totals": dict(totals, total_debit=Decimal("500.00"))}
+        expected, _ = ReportExportService.to_csv(buffered)
+        self.assertEqual(b"".join(chunks), expected.getvalue())
+        self.assertIn(b"Total Debit,500.00", b"".join(chunks))
+
+    def test_stream_csv_ends_with_error_marker_when_lines_fail(self):
+        def lines():
+            yield {"date": datetime.date(2024, 1, 1), "journal_no": "JV-1", "debit": Decimal("1.00")}
+            raise RuntimeError("cursor lost")
+
+        chunks, _ = ReportExportService.stream_csv({"report_type": "general_ledger", "lines": lines()})
+        with self.assertLogs("accounting.services.report_export_service", level="ERROR"):
+            body = b"".join(chunks).decode("utf-8")
+
+        self.assertIn("JV-1", body)
+        self.assertTrue(body.rstrip().endswith(STREAM_ERROR_MARKER))
@@ -0,0 +1,50 @@
+from django.test import TestCase
+
+from accounting.services.typeahead_service import TypeaheadService
+from accounting.tests import factories as f
+
+
+class TypeaheadServiceTests(TestCase):
+    def setUp(self):
+        self.service = TypeaheadService()
+        self.organization = f.create_organization()
+        for code, name in (
+            ("4000", "Sales"),
+            ("4010", "Sales Returns"),
+            ("1000", "Cash in Hand"),
+            ("5000", "Purchase of Resale Goods"),
+        ):
+            f.create_chart_of_account(organization=self.organization, account_code=code, account_name=name)
+
+    def _codes(self, query, **kwargs):
+        return [entry.code for entry in self.service.search("account", self.organization, query, **kwargs)]
+
+    def test_ranking_is_code_then_word_prefix_then_substring(self):
+        self.assertEqual(self._codes("sale"), ["4000", "4010", "5000"])
+        self.assertEqual(self._codes("40"), ["4000", "4010"])
+        self.assertEqual(self._codes("4000"), ["4000"])
+        self.assertEqual(self._codes("hand"), ["1000"])
+        self.assertEqual(self._codes("", limit=2), ["1000", "4000"])
+
+    def test_index_is_built_once_and_rebuilt_after_save(self):
+        self.service.index("account", self.organization)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._codes("cash"), ["1000"])
+
+        account = f.create_chart_of_account(
+            organization=self.organization, account_code="1010", account_name="Petty Cash"
+        )
+        self.assertEqual(self._codes("cash"), ["1000", "1010"])
+
+        account.account_name = "Bank Charges"
+        account.save()
+        self.assertEqual(self._codes("cash"), ["1000"])
+
+    def test_indexes_are_scoped_to_organization(self):
+        other = f.create_organization()
+        f.create_chart_of_account(organization=other, account_code="4000", account_name="Other Sales")
+        self.assertEqual(self._codes("other"), [])
+        self.assertEqual(
+            [entry.code for entry in self.service.search("account", other, "sales")],
+            ["4000"],
+        )
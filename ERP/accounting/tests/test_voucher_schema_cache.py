@@ -0,0 +1,81 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from accounting import schema_loader
+from accounting.forms_factory import VoucherFormFactory, build_form, compiled_forms
+from accounting.models import VoucherModeConfig
+from accounting.tests import factories as f
+from accounting.voucher_schema import ui_schema_to_definition
+
+
+class SchemaLoaderCacheTests(SimpleTestCase):
+    def test_schema_file_is_reparsed_only_when_mtime_changes(self):
+        with tempfile.TemporaryDirectory() as schema_dir:
+            path = os.path.join(schema_dir, "jv.yml")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("header:\n  narration: {type: char}\n")
+            config = SimpleNamespace(code="JV", name=None)
+
+            with mock.patch.object(schema_loader, "SCHEMA_DIR", schema_dir):
+                first, warning, _ = schema_loader.load_voucher_schema(config)
+                first["header"]["mutated"] = True
+                second, _, _ = schema_loader.load_voucher_schema(config)
+
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write("header:\n  reference: {type: char}\n")
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+                third, _, _ = schema_loader.load_voucher_schema(config)
+
+        self.assertIsNone(warning)
+        self.assertNotIn("mutated", second["header"])
+        self.assertEqual(list(third["header"]), ["reference"])
+
+
+class CompiledFormCacheTests(TestCase):
+    def setUp(self):
+        compiled_forms.invalidate()
+        self.organization = f.create_organization()
+        self.schema = {"narration": {"type": "char", "required": False}}
+
+    def test_same_schema_reuses_form_class(self):
+        first = build_form(self.schema, organization=self.organization, prefix="header")
+        second = build_form(dict(self.schema), organization=self.organization, prefix="header")
+        other = build_form({"reference": {"type": "char"}}, organization=self.organization, prefix="header")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertIn("narration", first().fields)
+
+    def test_config_update_drops_compiled_classes(self):
+        config = VoucherModeConfig.objects.create(organization=self.organization, code="JV", name="Journal")
+        key = compiled_forms.key("header", {}, organization=self.organization, config_id=config.pk)
+        compiled_forms.put(key, object)
+
+        config.name = "Journal Voucher"
+        config.save()
+
+        self.assertIsNone(compiled_forms.get(key))
+
+    def test_build_returns_additional_charges_formset(self):
+        definition = ui_schema_to_definition({
+            "header": {"narration": {"type": "char", "required": False}},
+            "lines": {"amount": {"type": "decimal", "required": False}},
+        })
+        definition["additional_charges"] = [
+            {"key": "freight", "field_type": "decimal", "required": False},
+        ]
+        config = VoucherModeConfig.objects.create(
+            organization=self.organization, code="PI", name="Purchase", schema_definition=definition,
+        )
+
+        header_form_cls, line_formset_cls, charges_formset_cls = VoucherFormFactory.build(
+            voucher_config=config, organization=self.organization,
+        )
+
+        charges = charges_formset_cls(prefix="additional_charges")
+        self.assertIn("freight", charges.forms[0].fields)
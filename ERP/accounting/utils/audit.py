@@ -1,16 +1,40 @@
 import datetime
 import logging
+import threading
+import time
+from contextlib import ContextDecorator
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, transaction
 from django.forms.models import model_to_dict
+from prometheus_client import Gauge, Histogram
 
 from accounting.models import AuditLog
 from accounting.utils.audit_integrity import compute_field_changes
 
 logger = logging.getLogger(__name__)
 
+AUDIT_BUFFERED_EVENTS = Gauge(
+    "erp_audit_buffered_events",
+    "Audit events collected by open audit_buffer blocks and not yet flushed.",
+)
+AUDIT_FLUSH_EVENTS = Histogram(
+    "erp_audit_flush_events",
+    "Audit events written per buffer flush.",
+    ["sink"],
+    buckets=(1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+AUDIT_FLUSH_SECONDS = Histogram(
+    "erp_audit_flush_seconds",
+    "Time to write one audit buffer flush (bulk insert or Celery enqueue).",
+    ["sink"],
+)
+
+_buffers = threading.local()
+
 def convert_dates_to_strings(obj):
     """Backward-compatible name: convert common types to JSON-safe values.
 
@@ -88,7 +112,7 @@ def _normalize_snapshot(snapshot: Any) -> Optional[Dict[str, Any]]:
     return {"value": snapshot}
 
 
-def log_audit_event(
+def build_audit_event(
     user,
     model_instance,
     action,
@@ -98,14 +122,13 @@ def log_audit_event(
     *,
     before_state: Optional[Dict[str, Any]] = None,
     after_state: Optional[Dict[str, Any]] = None,
-    async_write: bool = False,
     organization=None,
-):
+) -> Optional[AuditLog]:
     """
-    Logs an audit event for a given model instance.
+    Build an unsaved ``AuditLog`` for a model instance.
 
-    Supports optional before/after snapshots and async persistence to
-    satisfy SYSTEM.md requirements for deterministic, append-only audits.
+    Returns ``None`` when the event cannot be attributed to a user or the
+    instance has no primary key, mirroring ``log_audit_event``.
     """
     resolved_user = _resolve_audit_user(user, model_instance)
     if not resolved_user:
@@ -129,18 +152,241 @@ def log_audit_event(
         after_payload = _normalize_snapshot(after_state)
         changes = compute_field_changes(before_payload, after_payload or {})
 
-    cleaned_changes = convert_dates_to_strings(changes or {})
+    return AuditLog(
+        user=resolved_user,
+        organization=org,
+        content_type=content_type,
+        object_id=object_id,
+        action=action,
+        changes=convert_dates_to_strings(changes or {}),
+        details=details,
+        ip_address=ip_address,
+    )
+
+
+def _current_buffer(using: str = DEFAULT_DB_ALIAS) -> Optional["audit_buffer"]:
+    stack = getattr(_buffers, using, None)
+    return stack[-1] if stack else None
+
+
+def _async_row(entry: AuditLog) -> Dict[str, Any]:
+    return {
+        "user_id": entry.user_id,
+        "action": entry.action,
+        "content_type_id": entry.content_type_id,
+        "object_id": entry.object_id,
+        "changes": entry.changes,
+        "details": entry.details,
+        "ip_address": entry.ip_address,
+        "organization_id": entry.organization_id,
+    }
+
+
+class audit_buffer(ContextDecorator):
+    """
+    Transaction-scoped audit buffer.
+
+    Opens ``transaction.atomic(using)`` and collects every ``log_audit_event``
+    and ``log_audit_events_bulk`` call made inside it. Just before the
+    outermost block leaves its ``atomic``, the events are written with one
+    ``bulk_create``, so they commit or roll back together with the work they
+    describe. Events logged with ``async_write=True`` are sent to Celery in
+    messages of ``AUDIT_ASYNC_BATCH_SIZE`` rows once the transaction commits.
+    A nested buffer behaves like a savepoint: its events join the parent on
+    success and are discarded on error.
+
+    Usable as a context manager or a decorator::
+
+        with audit_buffer():
+            post_many(journals)
+    """
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using or DEFAULT_DB_ALIAS
+        self.entries: List[AuditLog] = []
+        self.async_entries: List[AuditLog] = []
+
+    def __len__(self):
+        return len(self.entries) + len(self.async_entries)
+
+    def _recreate_cm(self):
+        # A fresh buffer per decorated call; instances hold per-call state.
+        return type(self)(self.using)
+
+    def add(self, entry: AuditLog, async_write: bool = False) -> None:
+        (self.async_entries if async_write else self.entries).append(entry)
+        AUDIT_BUFFERED_EVENTS.inc()
+
+    def __enter__(self):
+        stack = getattr(_buffers, self.using, None)
+        if stack is None:
+            stack = []
+            setattr(_buffers, self.using, stack)
+        self._parent = stack[-1] if stack else None
+        stack.append(self)
+        self._atomic = transaction.atomic(using=self.using)
+        self._atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        getattr(_buffers, self.using).pop()
+        if exc_type is None and self._parent is None and self.entries:
+            # Write inside our atomic so a failed insert rolls the block back.
+            try:
+                self._flush_entries()
+            except BaseException as exc:
+                self._discard()
+                self._atomic.__exit__(type(exc), exc, exc.__traceback__)
+                raise
+        try:
+            self._atomic.__exit__(exc_type, exc_value, traceback)
+        except BaseException:
+            self._discard()
+            raise
+        if exc_type is not None:
+            self._discard()
+        elif self._parent is not None:
+            self._parent.entries.extend(self.entries)
+            self._parent.async_entries.extend(self.async_entries)
+        elif self.async_entries:
+            # Registered in the enclosing transaction (if any), so an outer
+            # rollback drops this callback together with the events.
+            transaction.on_commit(self._flush_async_entries, using=self.using)
+        return False
+
+    def _discard(self) -> None:
+        AUDIT_BUFFERED_EVENTS.dec(len(self))
+        self.entries, self.async_entries = [], []
+
+    def _flush_entries(self) -> None:
+        entries, self.entries = self.entries, []
+        AUDIT_BUFFERED_EVENTS.dec(len(entries))
+        start = time.perf_counter()
+        _write_audit_entries(entries)
+        AUDIT_FLUSH_SECONDS.labels(sink="db").observe(time.perf_counter() - start)
+        AUDIT_FLUSH_EVENTS.labels(sink="db").observe(len(entries))
+
+    def _flush_async_entries(self) -> None:
+        async_entries, self.async_entries = self.async_entries, []
+        AUDIT_BUFFERED_EVENTS.dec(len(async_entries))
+        if async_entries:
+            start = time.perf_counter()
+            enqueue_audit_batches(async_entries)
+            AUDIT_FLUSH_SECONDS.labels(sink="celery").observe(time.perf_counter() - start)
+            AUDIT_FLUSH_EVENTS.labels(sink="celery").observe(len(async_entries))
+
+
+def enqueue_audit_batches(entries: Iterable[AuditLog], batch_size: Optional[int] = None) -> int:
+    """
+    Send unsaved audit entries to Celery in messages of ``batch_size`` rows.
+
+    Falls back to a synchronous ``bulk_create`` for any batch that cannot be
+    enqueued. Returns the number of messages sent.
+    """
+    from accounting.tasks import log_audit_events_batch_async
+
+    batch_size = batch_size or getattr(settings, "AUDIT_ASYNC_BATCH_SIZE", 500)
+    entries = list(entries)
+    sent = 0
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        try:
+            log_audit_events_batch_async.delay([_async_row(entry) for entry in batch])
+        except Exception:
+            logger.exception("Failed to enqueue audit batch; falling back to sync write.")
+            _write_audit_entries(batch)
+        else:
+            sent += 1
+    if sent:
+        logger.info("audit.event.batch_enqueued", extra={"count": len(entries), "messages": sent})
+    return sent
+
+
+def log_audit_events_bulk(entries: Iterable[Optional[AuditLog]]) -> List[AuditLog]:
+    """
+    Persist pre-built audit entries with a single ``bulk_create``.
+
+    ``None`` placeholders (events skipped by ``build_audit_event``) are
+    ignored so callers can pass its results straight through. Inside an
+    ``audit_buffer`` the entries are buffered instead and returned unsaved.
+    """
+    pending = [entry for entry in entries if entry is not None]
+    if not pending:
+        return []
+    buffer = _current_buffer()
+    if buffer is not None:
+        for entry in pending:
+            buffer.add(entry)
+        return pending
+    return _write_audit_entries(pending)
+
+
+def _write_audit_entries(pending: List[AuditLog]) -> List[AuditLog]:
+    created = AuditLog.objects.bulk_create(pending)
+    logger.info(
+        "audit.event.bulk_recorded",
+        extra={
+            "count": len(created),
+            "organization_id": created[0].organization_id,
+        },
+    )
+    return created
+
+
+def log_audit_event(
+    user,
+    model_instance,
+    action,
+    changes: Optional[Dict[str, Any]] = None,
+    details: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    *,
+    before_state: Optional[Dict[str, Any]] = None,
+    after_state: Optional[Dict[str, Any]] = None,
+    async_write: bool = False,
+    organization=None,
+):
+    """
+    Logs an audit event for a given model instance.
+
+    Supports optional before/after snapshots and async persistence to
+    satisfy SYSTEM.md requirements for deterministic, append-only audits.
+    Inside an ``audit_buffer`` the entry is buffered and returned unsaved:
+    its ``pk`` stays ``None`` until the outermost buffer writes it, and
+    ``async_write`` entries never get one in this process.
+    """
+    entry = build_audit_event(
+        user,
+        model_instance,
+        action,
+        changes=changes,
+        details=details,
+        ip_address=ip_address,
+        before_state=before_state,
+        after_state=after_state,
+        organization=organization,
+    )
+    if entry is None:
+        return None
+
+    content_type = entry.content_type
+    org = entry.organization
+
+    buffer = _current_buffer()
+    if buffer is not None:
+        buffer.add(entry, async_write=async_write)
+        return entry
 
     if async_write:
         try:
             from accounting.tasks import log_audit_event_async
 
             log_audit_event_async.delay(
-                resolved_user.pk,
+                entry.user.pk,
                 action,
                 content_type.pk,
-                object_id,
-                changes=cleaned_changes,
+                entry.object_id,
+                changes=entry.changes,
                 details=details,
                 ip_address=ip_address,
                 organization_id=getattr(org, "pk", None),
@@ -153,22 +399,13 @@ def log_audit_event(
                 extra={
                     "action": action,
                     "content_type": content_type.model,
-                    "object_id": getattr(model_instance, "pk", None),
+                    "object_id": entry.object_id,
                     "organization_id": getattr(org, "pk", None),
                 },
             )
             return None
 
-    entry = AuditLog.objects.create(
-        user=resolved_user,
-        organization=org,
-        content_type=content_type,
-        object_id=object_id,
-        action=action,
-        changes=cleaned_changes,
-        details=details,
-        ip_address=ip_address,
-    )
+    entry.save()
     logger.info(
         "audit.event.recorded",
         extra={
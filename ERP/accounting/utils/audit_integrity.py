@@ -4,14 +4,19 @@ Audit utility functions for hash-chaining, integrity verification, and change de
 
 import hashlib
 import json
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
 from usermanagement.models import CustomUser, Organization
+from utils.watermarks import settled_id
 
 
 def compute_content_hash(audit_log_dict: Dict[str, Any]) -> str:
@@ -83,6 +88,164 @@ def verify_audit_chain(audit_log) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+# ---------------------------------------------------------------------------
+# Per-organization chains
+#
+# Each organization's sealed logs form their own chain in primary-key order:
+# every sealed row's ``previous_hash`` points at the sealed row before it in
+# the same organization (``None`` for the first). Chains are independent, so
+# organizations can be sealed concurrently on separate workers; within one
+# organization a cache lock keeps sealers from interleaving. Ids are taken at
+# insert time, not at commit, so sealing never passes ``sealable_id()``: a log
+# still uncommitted below the tail could never join the chain.
+# ---------------------------------------------------------------------------
+
+_HASH_FIELDS = ('user_id', 'action', 'content_type_id', 'object_id', 'changes', 'timestamp')
+SEAL_LOCK_KEY = 'audit:seal:{organization_id}'
+SEAL_LOCK_TIMEOUT = 600
+
+
+def _chain(organization_id):
+    from accounting.models import AuditLog
+
+    if organization_id is None:
+        return AuditLog.objects.filter(organization__isnull=True)
+    return AuditLog.objects.filter(organization_id=organization_id)
+
+
+def sealable_id() -> int:
+    """Highest AuditLog id below which no log can still be committed."""
+    from accounting.models import AuditLog
+
+    # Every sealed id was settled when it was sealed, so resume the walk there.
+    start = AuditLog.objects.filter(is_immutable=True).order_by('-id').values_list('id', flat=True).first()
+    return settled_id(AuditLog, start, timestamp_field='timestamp')
+
+
+def seal_audit_chain(organization_id, cutoff, batch_size: int = 1000, safe_id: Optional[int] = None) -> int:
+    """
+    Seal the next ``batch_size`` logs older than ``cutoff`` in one organization's chain.
+
+    Logs are sealed strictly in id order: the batch stops at the first unsealed
+    log that is not yet old enough, so a late row can never be skipped over,
+    and never goes past ``safe_id`` (``sealable_id()`` when omitted). Hashes
+    and links are written with one ``bulk_update``. Returns the number of logs
+    sealed, or 0 if another worker holds this chain.
+    """
+    from accounting.models import AuditLog
+
+    lock_key = SEAL_LOCK_KEY.format(organization_id=organization_id)
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, SEAL_LOCK_TIMEOUT):
+        return 0
+    try:
+        if safe_id is None:
+            safe_id = sealable_id()
+        chain = _chain(organization_id)
+        with transaction.atomic():
+            tail_id = (
+                chain.filter(is_immutable=True).order_by('-id').values_list('id', flat=True).first()
+            )
+            pending = list(
+                chain.filter(is_immutable=False, id__lte=safe_id)
+                .order_by('id')
+                .only('id', 'user', 'action', 'content_type', 'object_id', 'changes', 'timestamp')[:batch_size]
+            )
+            sealed: List[AuditLog] = []
+            for log in pending:
+                if log.timestamp >= cutoff:
+                    break
+                log.content_hash = compute_content_hash({field: getattr(log, field) for field in _HASH_FIELDS})
+                log.previous_hash_id = tail_id
+                log.is_immutable = True
+                tail_id = log.id
+                sealed.append(log)
+            if sealed:
+                AuditLog.objects.bulk_update(sealed, ['content_hash', 'previous_hash', 'is_immutable'])
+        return len(sealed)
+    finally:
+        # The lock may have expired and been taken by another sealer; leave theirs alone.
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def organizations_with_unsealed_logs(cutoff) -> List[Optional[int]]:
+    """Organization ids (``None`` for organization-less logs) that have logs to seal."""
+    from accounting.models import AuditLog
+
+    return list(
+        AuditLog.objects.filter(is_immutable=False, timestamp__lt=cutoff)
+        .order_by()
+        .values_list('organization_id', flat=True)
+        .distinct()
+    )
+
+
+@dataclass
+class ChainVerification:
+    """Outcome of ``verify_audit_chain_stream``; ``last_verified_id`` resumes a later run."""
+
+    organization_id: Optional[int]
+    checked: int = 0
+    last_verified_id: Optional[int] = None
+    broken_id: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.broken_id is None
+
+
+def _sealed_rows(organization_id, after_id, chunk_size) -> Iterator[tuple]:
+    rows = _chain(organization_id).filter(is_immutable=True)
+    if after_id is not None:
+        rows = rows.filter(id__gt=after_id)
+    return (
+        rows.order_by('id')
+        .values_list('id', 'previous_hash_id', 'content_hash', *_HASH_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def verify_audit_chain_stream(
+    organization_id,
+    after_id: Optional[int] = None,
+    chunk_size: int = 5000,
+    limit: Optional[int] = None,
+) -> ChainVerification:
+    """
+    Walk one organization's sealed chain in id order and report the first broken link.
+
+    Rows are streamed with ``QuerySet.iterator`` (a server-side cursor on
+    PostgreSQL), so memory stays constant however long the chain is. Each row
+    must hash to its ``content_hash`` and point at the previous sealed row.
+    Pass a previous result's ``last_verified_id`` as ``after_id`` to resume;
+    ``limit`` caps the rows checked in one run.
+    """
+    result = ChainVerification(organization_id=organization_id, last_verified_id=after_id)
+    expected_previous = after_id
+    for row in _sealed_rows(organization_id, after_id, chunk_size):
+        log_id, previous_id, content_hash = row[:3]
+        computed = compute_content_hash(dict(zip(_HASH_FIELDS, row[3:])))
+        if computed != content_hash:
+            result.broken_id = log_id
+            result.error = f"Content hash mismatch on audit log {log_id}. Expected {computed}, got {content_hash}"
+            return result
+        if previous_id != expected_previous:
+            result.broken_id = log_id
+            result.error = (
+                f"Audit log {log_id} links to {previous_id}, expected {expected_previous}; "
+                "a sealed row was removed, reordered or re-linked"
+            )
+            return result
+        expected_previous = log_id
+        result.checked += 1
+        result.last_verified_id = log_id
+        if limit is not None and result.checked >= limit:
+            break
+    return result
+
+
 def compute_field_changes(old_values: Dict[str, Any], new_values: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compute field-level changes between two states.
@@ -13,7 +13,6 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.db.models import Q
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_POST
 
@@ -32,30 +31,12 @@ from accounting.models import (
     PaymentTerm,
     Project,
     TaxCode,
-    Vendor,
     VoucherModeConfig,
     VoucherUDFConfig,
     VoucherUIPreference,
 )
-try:  # Optional customer/product modules
-    from accounting.models import Customer  # type: ignore
-except Exception:
-    Customer = None  # noqa: N816
-try:
-    from inventory.models import Product  # type: ignore
-except Exception:
-    Product = None  # noqa: N816
-
-# Fallback Customer model from sales/commerce if accounting.Customer is absent
-if Customer is None:
-    try:
-        from sales.models import Customer  # type: ignore
-    except Exception:
-        try:
-            from commerce.models import Customer  # type: ignore
-        except Exception:
-            Customer = None  # noqa: N816
 from accounting.services.journal_entry_service import JournalEntryService
+from accounting.services.typeahead_service import typeahead
 from accounting.utils.idempotency import resolve_idempotency_key
 from usermanagement.utils import PermissionUtils
 from utils.calendars import DateSeedStrategy
@@ -104,27 +85,6 @@ WORKFLOW_PERMISSION_RULES = {
 }
 
 
-def _org_filter(qs, request):
-    """Scope queryset to the user's organization when the model has an organization FK."""
-    org = getattr(getattr(request, 'user', None), 'organization', None)
-    if org is None or not hasattr(qs.model, 'organization'):
-        return qs
-    try:
-        return qs.filter(organization=org)
-    except Exception:
-        return qs
-
-
-def _lookup_payload(qs, fields, limit=10):
-    rows = []
-    for obj in qs[:limit]:
-        row = {'id': getattr(obj, 'pk', None)}
-        for key, attr in fields.items():
-            row[key] = getattr(obj, attr, '') or ''
-        rows.append(row)
-    return rows
-
-
 LINE_COLUMN_DEFAULTS = [
     {"key": "account", "default_label": "Account", "default_visible": True, "order": 0, "css_class": "text-start", "configurable": True},
     {"key": "description", "default_label": "Description", "default_visible": True, "order": 1, "css_class": "text-start", "configurable": True},
@@ -195,84 +155,6 @@ def _apply_required_overrides(required_map, required_keys):
         required_map[key] = True
 
 
-@login_required
-@require_GET
-def journal_vendor_lookup(request):
-    q = (request.GET.get('q') or '').strip()
-    qs = Vendor.objects.all()
-    qs = _org_filter(qs, request)
-    if q:
-        qs = qs.filter(
-            Q(code__icontains=q)
-            | Q(display_name__icontains=q)
-            | Q(legal_name__icontains=q)
-            | Q(email__icontains=q)
-            | Q(phone_number__icontains=q)
-        )
-    data = _lookup_payload(qs.order_by('code'), {'code': 'code', 'name': 'display_name'})
-    return JsonResponse({'results': data})
-
-
-@login_required
-@require_GET
-def journal_tax_code_lookup(request):
-    q = (request.GET.get('q') or '').strip()
-    qs = TaxCode.objects.all()
-    qs = _org_filter(qs, request)
-    if q:
-        qs = qs.filter(Q(code__icontains=q) | Q(name__icontains=q))
-    data = _lookup_payload(qs.order_by('code'), {'code': 'code', 'name': 'name'})
-    return JsonResponse({'results': data})
-
-
-@login_required
-@require_GET
-def journal_product_lookup(request):
-    if Product is None:
-        return JsonResponse({'results': []})
-    q = (request.GET.get('q') or '').strip()
-    qs = Product.objects.all()
-    qs = _org_filter(qs, request)
-    if q:
-        qs = qs.filter(Q(code__icontains=q) | Q(name__icontains=q) | Q(description__icontains=q))
-    
-    results = []
-    for p in qs.order_by('code')[:10]:  # limit to 10
-        pid = getattr(p, 'pk', None)
-        unit = getattr(p, 'base_unit', None)
-        unit_id = getattr(unit, 'id', None) if unit else None
-        unit_code = getattr(unit, 'code', '') if unit else ''
-        unit_name = getattr(unit, 'name', '') if unit else ''
-        
-        results.append({
-            'id': pid,
-            'text': f"{p.code} - {p.name}",
-            'code': p.code,
-            'name': p.name,
-            'unit_id': unit_id,
-            'unit_code': unit_code,
-            'unit_name': unit_name,
-        })
-    
-    return JsonResponse({'results': results})
-
-
-@login_required
-@require_GET
-def journal_customer_lookup(request):
-    # Fallback to Vendor if no dedicated Customer model is installed
-    model_cls = Customer or Vendor
-    if model_cls is None:
-        return JsonResponse({'results': []})
-    q = (request.GET.get('q') or '').strip()
-    qs = model_cls.objects.all()
-    qs = _org_filter(qs, request)
-    if q:
-        qs = qs.filter(Q(code__icontains=q) | Q(display_name__icontains=q) | Q(legal_name__icontains=q))
-    data = _lookup_payload(qs.order_by('code'), {'code': 'code', 'name': 'display_name'})
-    return JsonResponse({'results': data})
-
-
 def _line_columns_from_preferences(line_labels, preferences):
     catalog: List[Dict[str, Any]] = []
     pref_columns = preferences.get("lineColumns") if isinstance(preferences, dict) else []
@@ -2621,236 +2503,71 @@ def journal_entry_data(request, pk: int):
     return JsonResponse({"ok": True, "journal": _serialize_journal(journal)})
 
 
+def _typeahead_lookup(request, entity: str) -> JsonResponse:
+    # Allow lookups even when no active organization is set (tests and lightweight JS rely on this)
+    organization = _active_organization(request.user)
+    query = (request.GET.get("q") or "").strip()
+    return JsonResponse({"ok": True, "results": typeahead.lookup(entity, organization, query, limit=20)})
+
+
 @login_required
 @require_GET
 def journal_account_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    
-    # Allow lookups even when no active organization is set (tests and lightweight JS rely on this)
-    if organization:
-        qs = ChartOfAccount.active_accounts.filter(organization=organization)
-    else:
-        qs = ChartOfAccount.active_accounts.all()
-    
-    if query:
-        qs = qs.filter(Q(account_code__icontains=query) | Q(account_name__icontains=query))
-    qs = qs.order_by("account_code")[:20]
-    results = [
-        {"id": acc.pk, "code": acc.account_code, "name": acc.account_name}
-        for acc in qs
-    ]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "account")
 
 
 @login_required
 @require_GET
 def journal_cost_center_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = CostCenter.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = CostCenter.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [
-        {"id": cc.pk, "code": cc.code, "name": cc.name}
-        for cc in qs
-    ]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "cost_center")
 
 
 @login_required
 @require_GET
 def journal_department_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    from accounting.models import Department
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Department.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = Department.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": obj.code, "name": obj.name} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "department")
 
 
 @login_required
 @require_GET
 def journal_agent_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from accounting.models import Agent
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Agent.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = Agent.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": obj.code, "name": obj.name} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "agent")
 
 
 @login_required
 @require_GET
 def journal_warehouse_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from inventory.models import Warehouse
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Warehouse.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = Warehouse.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": obj.code, "name": obj.name} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "warehouse")
 
 
 @login_required
 @require_GET
 def journal_project_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    from accounting.models import Project
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Project.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = Project.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": obj.code, "name": obj.name} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "project")
 
 
 @login_required
 @require_GET
 def journal_tax_code_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    from accounting.models import TaxCode
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = TaxCode.objects.filter(organization=organization, is_active=True)
-    else:
-        qs = TaxCode.objects.filter(is_active=True)
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": obj.code, "name": obj.name} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "tax_code")
 
 
 @login_required
 @require_GET
 def journal_vendor_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    from accounting.models import Vendor
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Vendor.objects.filter(organization=organization, status='active')
-    else:
-        qs = Vendor.objects.filter(status='active')
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(display_name__icontains=query) | Q(legal_name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [
-        {
-            "id": getattr(obj, 'vendor_id', None) or obj.pk,
-            "code": obj.code,
-            "name": obj.display_name,
-        }
-        for obj in qs
-    ]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "vendor")
 
 
 @login_required
 @require_GET
 def journal_customer_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    from accounting.models import Customer
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Customer.objects.filter(organization=organization, status='active')
-    else:
-        qs = Customer.objects.filter(status='active')
-    
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(display_name__icontains=query) | Q(legal_name__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [
-        {
-            "id": getattr(obj, 'customer_id', None) or obj.pk,
-            "code": obj.code,
-            "name": obj.display_name,
-        }
-        for obj in qs
-    ]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "customer")
 
 
 @login_required
 @require_GET
 def journal_product_lookup(request):
-    organization = _active_organization(request.user)
-    query = (request.GET.get("q") or "").strip()
-    from django.db.models import Q
-    try:
-        from inventory.models import Product
-    except Exception:
-        return JsonResponse({"ok": True, "results": []})
-
-    # Allow lookups even when no active organization is set
-    if organization:
-        qs = Product.objects.filter(organization=organization)
-    else:
-        qs = Product.objects.all()
-    
-    if hasattr(Product, 'is_active'):
-        try:
-            qs = qs.filter(is_active=True)
-        except Exception:
-            pass
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query) | Q(barcode__icontains=query))
-    qs = qs.order_by("code")[:20]
-    results = [{"id": obj.pk, "code": getattr(obj, 'code', ''), "name": getattr(obj, 'name', '')} for obj in qs]
-    return JsonResponse({"ok": True, "results": results})
+    return _typeahead_lookup(request, "product")
 
 
 @login_required
@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from django.db import models
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import NoReverseMatch, reverse
 from django.utils import timezone
@@ -23,6 +23,7 @@ from inventory.models import InventoryItem, Product as InventoryProduct, Warehou
 from accounting.services.report_export_service import ReportExportService
 from accounting.services.report_service import ReportService
 from accounting.utils.udf import filterable_udfs, pivot_udfs, serialize_udf_definition
+from tenancy.middleware import tenant_schema
 from usermanagement.mixins import UserOrganizationMixin
 
 logger = logging.getLogger(__name__)
@@ -147,6 +148,12 @@ def _parse_date(value: Optional[str]) -> Optional[date]:
         return None
 
 
+def _tenant_scoped(chunks: Iterator[bytes], tenant) -> Iterator[bytes]:
+    # The body is consumed after ActiveTenantMiddleware reset the schema.
+    with tenant_schema(tenant):
+        yield from chunks
+
+
 def _default_period() -> (date, date):
     today = timezone.localdate()
     start = today - timedelta(days=30)
@@ -304,17 +311,28 @@ class GeneralLedgerView(UserOrganizationMixin, View):
                 service = ReportService(self.organization)
                 service.set_date_range(start_date, end_date)
                 account_id = int(account_id_raw) if account_id_raw else None
-                report_data = service.generate_general_ledger(account_id=account_id)
+                report_data = service.generate_general_ledger_page(
+                    account_id=account_id,
+                    cursor=request.GET.get("cursor") or None,
+                )
             except ValueError as exc:
                 error = str(exc)
                 logger.warning("General ledger generation error: %s", exc)
 
+        next_page_url = None
+        if report_data and report_data["page"]["next_cursor"]:
+            query = request.GET.copy()
+            query["cursor"] = report_data["page"]["next_cursor"]
+            next_page_url = f"{request.path}?{query.urlencode()}"
+
         context = {
             "accounts": accounts,
             "selected_account": account_id_raw or "",
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
             "report_data": report_data,
+            "next_page_url": next_page_url,
+            "paged": bool(next_page_url or request.GET.get("cursor")),
             "error": error,
         }
         return render(request, self.template_name, context)
@@ -906,6 +924,9 @@ class ReportExportView(UserOrganizationMixin, View):
         export_format = request.POST.get("export_format", "csv").lower()
 
         service = ReportService(self.organization)
+        if report_type == "general_ledger" and export_format in ("csv", "excel"):
+            return self._stream_ledger_export(service, export_format, request.POST)
+
         try:
             report_data = self._generate_report_for_export(service, report_type, request.POST)
         except ValueError as exc:
@@ -932,6 +953,36 @@ class ReportExportView(UserOrganizationMixin, View):
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
+    def _stream_ledger_export(self, service: ReportService, export_format: str, data: Dict[str, Any]):
+        """Stream the general ledger so large periods are never held in worker memory."""
+        start = _parse_date(data.get("start_date"))
+        end = _parse_date(data.get("end_date"))
+        if not (start and end):
+            return self._export_error_response("Start and end dates are required for the general ledger export.")
+        service.set_date_range(start, end)
+        account_id = int(data["account_id"]) if data.get("account_id") else None
+        report_data = service.stream_general_ledger(account_id=account_id)
+
+        try:
+            if export_format == "csv":
+                chunks, filename = ReportExportService.stream_csv(report_data)
+                response = StreamingHttpResponse(
+                    _tenant_scoped(chunks, getattr(self.request, "tenant", None)),
+                    content_type="text/csv",
+                )
+                response["Content-Disposition"] = f'attachment; filename="{filename}"'
+                return response
+            file_obj, filename = ReportExportService.stream_excel(report_data)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Export failed:")
+            return self._export_error_response(str(exc))
+        return FileResponse(
+            file_obj,
+            as_attachment=True,
+            filename=filename,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
     def _generate_report_for_export(self, service: ReportService, report_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
         if report_type == "general_ledger":
             start = _parse_date(data.get("start_date"))
@@ -393,33 +393,25 @@ class VoucherAccountLookupHtmxView(BaseVoucherView):
             HttpResponse: HTML with account options
         """
         from accounting.models import ChartOfAccount
+        from accounting.services.typeahead_service import typeahead
 
         organization = self.get_organization()
         search = request.GET.get('search', '').strip()
         account_type = request.GET.get('account_type', '').strip()
 
-        # Build query
-        accounts = ChartOfAccount.objects.filter(
-            organization=organization,
-            is_active=True
+        matches = typeahead.search(
+            'account',
+            organization,
+            search,
+            limit=20,
+            where={'account_type': account_type} if account_type else None,
         )
-
-        if search:
-            from django.db.models import Q
-            accounts = accounts.filter(
-                Q(code__icontains=search) |
-                Q(name__icontains=search)
-            )
-
-        if account_type:
-            accounts = accounts.filter(account_type__code=account_type)
-
-        # Limit results
-        accounts = accounts[:20]
+        by_pk = ChartOfAccount.objects.in_bulk([entry.id for entry in matches])
+        accounts = [by_pk[entry.id] for entry in matches if entry.id in by_pk]
 
         logger.debug(
             f"Account lookup - search: '{search}', "
-            f"type: {account_type}, results: {accounts.count()}"
+            f"type: {account_type}, results: {len(accounts)}"
         )
 
         context = {
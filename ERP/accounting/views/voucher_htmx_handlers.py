@@ -807,30 +807,15 @@ class VoucherAccountLookupHtmxView(BaseVoucherView):
 
         try:
             from accounting.models import ChartOfAccount
+            from accounting.services.typeahead_service import typeahead
 
-            # Build queryset with filters
+            # Rank from the in-memory index, then load just the matches for type and balance.
             # Allow lookups even when no active organization is set (tests and lightweight JS rely on this)
-            if organization:
-                accounts = ChartOfAccount.objects.filter(
-                    organization=organization,
-                    is_active=True
-                )
-            else:
-                accounts = ChartOfAccount.objects.filter(
-                    is_active=True
-                )
-
-            if query:
-                accounts = accounts.filter(
-                    account_name__icontains=query
-                ) | accounts.filter(
-                    account_code__icontains=query
-                )
-
-            # Order by relevance (exact matches first, then code, then name)
-            accounts = accounts.order_by(
-                'account_code'
-            )[:limit]
+            matches = typeahead.search('account', organization, query, limit=limit)
+            by_pk = ChartOfAccount.objects.select_related('account_type').in_bulk(
+                [entry.id for entry in matches]
+            )
+            accounts = [by_pk[entry.id] for entry in matches if entry.id in by_pk]
 
             # Format results
             results = []
@@ -871,4 +871,36 @@ CELERY_BEAT_SCHEDULE = {
         "task": "backups.tasks.run_nightly_backups",
         "schedule": crontab(hour=2, minute=30),
     },
+    "accounting-refresh-monthly-journalline-summary": {
+        "task": "accounting.tasks.refresh_monthly_journalline_summary",
+        "schedule": int(os.environ.get("MONTHLY_SUMMARY_REFRESH_SECONDS", "300")),
+    },
+    "inventory-month-end-valuation-snapshot": {
+        "task": "inventory.tasks.snapshot_stock_valuations",
+        "schedule": crontab(day_of_month=1, hour=0, minute=45),
+    },
+    "accounting-ird-submission-batch": {
+        "task": "accounting.tasks.process_ird_submission_batch",
+        "schedule": int(os.environ.get("IRD_BATCH_INTERVAL_SECONDS", "60")),
+    },
 }
+
+# Compile voucher schemas and form classes when a web worker starts
+VOUCHER_SCHEMA_PRELOAD = env_bool("VOUCHER_SCHEMA_PRELOAD", False)
+
+# Upper bound, in seconds, on how long a per-worker lookup index is reused
+TYPEAHEAD_INDEX_TTL = int(os.getenv("TYPEAHEAD_INDEX_TTL", "300"))
+
+# Same bound for the per-worker POS product index (codes, barcodes, prices, stock)
+POS_PRODUCT_INDEX_TTL = int(os.getenv("POS_PRODUCT_INDEX_TTL", "300"))
+
+# Rows per Celery message when audit_buffer flushes async_write audit events
+AUDIT_ASYNC_BATCH_SIZE = int(os.getenv("AUDIT_ASYNC_BATCH_SIZE", "500"))
+
+# Queued IRD submissions claimed per batch run, concurrent keep-alive connections
+# to the gateway, and worker processes used for RSA signing (0 signs inline)
+IRD_BATCH_SIZE = int(os.getenv("IRD_BATCH_SIZE", "500"))
+IRD_BATCH_CONCURRENCY = int(os.getenv("IRD_BATCH_CONCURRENCY", "8"))
+IRD_SIGNING_PROCESSES = int(os.getenv("IRD_SIGNING_PROCESSES", "2"))
+# Submissions still "processing" after this long belong to a dead worker and are reclaimed
+IRD_PROCESSING_TIMEOUT_SECONDS = int(os.getenv("IRD_PROCESSING_TIMEOUT_SECONDS", "900"))
@@ -7,10 +7,20 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
 
 application = get_wsgi_application()
+
+if getattr(settings, 'VOUCHER_SCHEMA_PRELOAD', False):
+    try:
+        from accounting.forms_factory import preload_voucher_forms
+
+        preload_voucher_forms()
+    except Exception:
+        logging.getLogger(__name__).exception("Voucher form preload failed")
@@ -373,14 +373,11 @@ def calculate_atp(request):
         return Response({'error': 'product_codes required'}, status=400)
     
     service = AllocationService(request.user.organization)
+    batch = service.calculate_atp_batch(product_codes, warehouse_code, include_future)
     results = {}
     
     for product_code in product_codes:
-        atp_results = service.calculate_atp(
-            product_code,
-            warehouse_code,
-            include_future
-        )
+        atp_results = batch.get(product_code, [])
         
         results[product_code] = [
             {
@@ -506,11 +503,13 @@ def check_order_availability(request):
     if not items:
         return Response({'error': 'items required'}, status=400)
     
-    # Convert to dict
-    product_quantities = {
-        item['product_code']: Decimal(str(item['quantity']))
-        for item in items
-    }
+    # Convert to dict, summing repeated lines for the same product
+    product_quantities = {}
+    for item in items:
+        product_quantities[item['product_code']] = (
+            product_quantities.get(item['product_code'], Decimal('0'))
+            + Decimal(str(item['quantity']))
+        )
     
     service = AllocationService(request.user.organization)
     availability = service.check_multi_product_availability(
@@ -569,11 +568,13 @@ def get_fulfillment_options(request):
     except KeyError:
         priority = AllocationPriority.B2C
     
-    # Convert to dict
-    product_quantities = {
-        item['product_code']: Decimal(str(item['quantity']))
-        for item in items
-    }
+    # Convert to dict, summing repeated lines for the same product
+    product_quantities = {}
+    for item in items:
+        product_quantities[item['product_code']] = (
+            product_quantities.get(item['product_code'], Decimal('0'))
+            + Decimal(str(item['quantity']))
+        )
     
     service = AllocationService(request.user.organization)
     options = service.get_fulfillment_options(product_quantities, priority)
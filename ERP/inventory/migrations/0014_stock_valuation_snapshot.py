@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0013_alter_product_costing_method'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockledger',
+            index=models.Index(fields=['organization', 'txn_date'], name='inv_ledger_org_txn_date'),
+        ),
+        migrations.CreateModel(
+            name='StockValuationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('quantity', models.DecimalField(decimal_places=4, default=Decimal('0'), max_digits=15)),
+                ('total_value', models.DecimalField(decimal_places=4, default=Decimal('0'), max_digits=19)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='usermanagement.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='Inventory.product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='Inventory.warehouse')),
+            ],
+            options={
+                'unique_together': {('organization', 'product', 'warehouse', 'as_of')},
+                'indexes': [models.Index(fields=['organization', 'as_of'], name='inv_valsnap_org_asof')],
+            },
+        ),
+    ]
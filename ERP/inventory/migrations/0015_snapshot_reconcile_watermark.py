@@ -0,0 +1,23 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0014_stock_valuation_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotReconcileWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_ledger_id', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('items_updated', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_reconcile_watermark', to='usermanagement.organization')),
+            ],
+        ),
+    ]
@@ -290,7 +290,10 @@ class StockLedger(models.Model):
     total_cost   = models.DecimalField(max_digits=19, decimal_places=4, default=Decimal("0"))
     created_at   = models.DateTimeField(default=timezone.now)
     class Meta:
-        indexes = [models.Index(fields=['organization', 'product', 'warehouse'])]
+        indexes = [
+            models.Index(fields=['organization', 'product', 'warehouse']),
+            models.Index(fields=['organization', 'txn_date'], name='inv_ledger_org_txn_date'),
+        ]
         ordering = ('-txn_date', '-id')
     def __str__(self):
         loc_code = self.location.code if self.location else 'N/A'
@@ -298,6 +301,36 @@ class StockLedger(models.Model):
         return f"{self.organization.name} - {self.txn_type} {self.product.code} @ {self.warehouse.code}/{loc_code} ({batch_num}): +{self.qty_in}/-{self.qty_out}"
 
 
+class StockValuationSnapshot(models.Model):
+    """Quantity and value per product/warehouse at the end of ``as_of``, rebuilt from the ledger."""
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT)
+    product      = models.ForeignKey(Product, on_delete=models.PROTECT)
+    warehouse    = models.ForeignKey(Warehouse, on_delete=models.PROTECT)
+    as_of        = models.DateField()
+    quantity     = models.DecimalField(max_digits=15, decimal_places=4, default=Decimal("0"))
+    total_value  = models.DecimalField(max_digits=19, decimal_places=4, default=Decimal("0"))
+    created_at   = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('organization', 'product', 'warehouse', 'as_of')
+        indexes = [models.Index(fields=['organization', 'as_of'], name='inv_valsnap_org_asof')]
+
+    def __str__(self):
+        return f"{self.organization.name} - {self.product.code} @ {self.warehouse.code} on {self.as_of}: {self.quantity} / {self.total_value}"
+
+
+class SnapshotReconcileWatermark(models.Model):
+    """Highest StockLedger id already reconciled into InventoryItem, per organization."""
+    organization   = models.OneToOneField(Organization, on_delete=models.CASCADE, related_name='inventory_reconcile_watermark')
+    last_ledger_id = models.BigIntegerField(default=0)
+    reconciled_at  = models.DateTimeField(null=True, blank=True)
+    items_updated  = models.PositiveIntegerField(default=0)
+    duration_ms    = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.organization.name} reconciled through ledger #{self.last_ledger_id}"
+
+
 class StockAdjustment(models.Model):
     """Record physical count adjustments and ledger variance tracking."""
     STATUS_CHOICES = [
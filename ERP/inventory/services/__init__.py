@@ -4,6 +4,8 @@ from .fulfillment_service import PickPackShipService as FulfillmentService
 from .inventory_service import InventoryService
 from .transfer_order_service import TransferOrderService
 from .price_history_service import PriceHistoryService
+from .valuation_service import StockValuationService
+from .snapshot_reconciliation import InventorySnapshotReconciler
 
 __all__ = [
     'ProductService',
@@ -12,4 +14,6 @@ __all__ = [
     'InventoryService',
     'TransferOrderService',
     'PriceHistoryService',
+    'StockValuationService',
+    'InventorySnapshotReconciler',
 ]
@@ -13,9 +13,11 @@ Key Features:
 - Cost-optimized allocation (ship from nearest/cheapest)
 - Backorder management
 - Future inventory visibility (in-transit, production)
+- Batch ATP for multi-line orders in a fixed number of grouped queries
 """
+from collections import defaultdict
 from decimal import Decimal
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -26,10 +28,13 @@ from django.utils import timezone
 
 from ..models import (
     Product, Warehouse, InventoryItem, Location,
-    TransitWarehouse, PickList, PickListLine
+    PickList, PickListLine, TransferOrderLine
 )
 
 
+FUTURE_ATP_DAYS = 30
+
+
 class AllocationPriority(Enum):
     """Channel allocation priorities"""
     CRITICAL = 1      # Critical customers, rush orders
@@ -92,6 +97,9 @@ class AllocationService:
     safety stock, and channel prioritization.
     """
     
+    ACTIVE_PICK_STATUSES = ('draft', 'released', 'picking')
+    INBOUND_TRANSFER_STATUSES = ('released', 'in_transit')
+    
     def __init__(self, organization):
         self.organization = organization
     
@@ -114,53 +122,78 @@ class AllocationService:
         Returns:
             List of ATPResult for each warehouse
         """
-        # Get product
-        try:
-            product = Product.objects.get(
+        return self.calculate_atp_batch(
+            [product_code], warehouse_code, include_future
+        ).get(product_code, [])
+    
+    def calculate_atp_batch(
+        self,
+        product_codes: Iterable[str],
+        warehouse_code: Optional[str] = None,
+        include_future: bool = False
+    ) -> Dict[str, List[ATPResult]]:
+        """
+        Calculate ATP for many products at once
+        
+        Products, on-hand stock, pick-list allocations and inbound transfer
+        orders are each read with one grouped query for the whole set, and
+        ATP is computed in memory.
+        
+        Returns:
+            Dict of {product_code: [ATPResult per warehouse]}; unknown
+            product codes are omitted
+        """
+        codes = set(product_codes)
+        if not codes:
+            return {}
+        
+        products = {
+            row['id']: row for row in Product.objects.filter(
                 organization=self.organization,
-                code=product_code
-            )
-        except Product.DoesNotExist:
-            return []
+                code__in=codes
+            ).values('id', 'code', 'reorder_level')
+        }
+        results = {row['code']: [] for row in products.values()}
+        if not products:
+            return results
         
-        # Get inventory items
-        inventory_items = InventoryItem.objects.filter(
+        on_hand = InventoryItem.objects.filter(
             organization=self.organization,
-            product=product
-        ).select_related('warehouse')
-        
+            product_id__in=products
+        )
         if warehouse_code:
-            inventory_items = inventory_items.filter(warehouse__code=warehouse_code)
-        
-        results = []
+            on_hand = on_hand.filter(warehouse__code=warehouse_code)
+        on_hand = (
+            on_hand.values('product_id', 'warehouse_id', 'warehouse__code')
+            .annotate(total=Sum('quantity_on_hand'))
+            .order_by('warehouse__code')
+        )
         
-        for item in inventory_items:
-            # Calculate allocated quantity (from active pick lists)
-            allocated = self._get_allocated_quantity(product, item.warehouse)
+        rows = list(on_hand)
+        warehouse_ids = {row['warehouse_id'] for row in rows}
+        
+        allocated = self._allocated_quantities(products, warehouse_ids)
+        receipts = self._inbound_receipts(products, warehouse_ids)
+        horizon = self._future_dates() if include_future else []
+        
+        for row in rows:
+            key = (row['product_id'], row['warehouse_id'])
+            product = products[row['product_id']]
+            quantity_on_hand = row['total'] or Decimal('0.00')
+            allocated_qty = allocated.get(key, Decimal('0.00'))
+            safety_stock = self._get_safety_stock(product['reorder_level'])
+            base_atp = quantity_on_hand - allocated_qty - safety_stock
+            inbound = receipts.get(key, [])
             
-            # Get safety stock (could be warehouse-specific)
-            safety_stock = self._get_safety_stock(product, item.warehouse)
-            
-            # Calculate available
-            available = item.quantity_on_hand - allocated - safety_stock
-            
-            # Get in-transit quantity
-            in_transit = self._get_in_transit_quantity(product, item.warehouse)
-            
-            # Future ATP calculations
-            future_atp = {}
-            if include_future:
-                future_atp = self._calculate_future_atp(product, item.warehouse)
-            
-            results.append(ATPResult(
-                product_code=product.code,
-                warehouse_code=item.warehouse.code,
-                on_hand=item.quantity_on_hand,
-                allocated=allocated,
+            results[product['code']].append(ATPResult(
+                product_code=product['code'],
+                warehouse_code=row['warehouse__code'],
+                on_hand=quantity_on_hand,
+                allocated=allocated_qty,
                 safety_stock=safety_stock,
-                available=max(available, Decimal('0.00')),
-                in_transit=in_transit,
-                future_available=future_atp
+                available=max(base_atp, Decimal('0.00')),
+                in_transit=sum((qty for _, qty in inbound), Decimal('0.00')),
+                future_available=self._project_atp(base_atp, inbound, horizon),
             ))
         
         return results
@@ -267,15 +300,15 @@ class AllocationService:
         Returns:
             Dict of {product_code: available_bool}
         """
-        availability = {}
+        atp = self.calculate_atp_batch(product_quantities, warehouse_code)
         
-        for product_code, quantity in product_quantities.items():
-            atp_results = self.calculate_atp(product_code, warehouse_code, include_future=False)
-            
-            total_available = sum(atp.available for atp in atp_results)
-            availability[product_code] = total_available >= quantity
-        
-        return availability
+        return {
+            product_code: sum(
+                (result.available for result in atp.get(product_code, [])),
+                Decimal('0.00')
+            ) >= quantity
+            for product_code, quantity in product_quantities.items()
+        }
     
     def get_fulfillment_options(
         self,
@@ -296,37 +329,35 @@ class AllocationService:
         """
         options = []
         
-        # Option 1: Single warehouse fulfillment (preferred)
-        warehouses = Warehouse.objects.filter(
+        # One batch ATP read serves both the single-warehouse and split checks
+        warehouses = list(Warehouse.objects.filter(
             organization=self.organization,
             is_active=True
-        )
+        ).order_by('code').values_list('code', flat=True))
+        available = self._available_by_warehouse(product_quantities)
         
-        for warehouse in warehouses:
+        # Option 1: Single warehouse fulfillment (preferred)
+        for warehouse_code in warehouses:
             can_fulfill = True
             warehouse_allocations = []
             
             for product_code, quantity in product_quantities.items():
-                atp_results = self.calculate_atp(
-                    product_code,
-                    warehouse.code,
-                    include_future=False
-                )
+                warehouse_available = available.get(product_code, {}).get(warehouse_code)
                 
-                if not atp_results or atp_results[0].available < quantity:
+                if warehouse_available is None or warehouse_available < quantity:
                     can_fulfill = False
                     break
                 
                 warehouse_allocations.append({
                     'product_code': product_code,
                     'quantity': quantity,
-                    'available': atp_results[0].available
+                    'available': warehouse_available
                 })
             
             if can_fulfill:
                 options.append({
                     'type': 'single_warehouse',
-                    'warehouses': [warehouse.code],
+                    'warehouses': [warehouse_code],
                     'split_shipment': False,
                     'allocations': warehouse_allocations,
                     'priority': 1  # Highest priority
@@ -335,7 +366,9 @@ class AllocationService:
         # Option 2: Multi-warehouse split (if single warehouse not available)
         if not options:
             # Try to fulfill across multiple warehouses
-            split_option = self._calculate_split_fulfillment(product_quantities)
+            split_option = self._calculate_split_fulfillment(
+                product_quantities, available, warehouses
+            )
             if split_option:
                 options.append(split_option)
         
@@ -365,110 +398,109 @@ class AllocationService:
         # that counts against ATP but doesn't move inventory yet
         return True
     
-    def _get_allocated_quantity(self, product: Product, warehouse: Warehouse) -> Decimal:
-        """Get quantity already allocated in active pick lists"""
-        allocated = PickListLine.objects.filter(
-            pick_list__organization=self.organization,
-            pick_list__warehouse=warehouse,
-            product=product,
-            pick_list__status__in=['draft', 'released', 'in_progress']
-        ).aggregate(total=Sum('quantity'))['total'] or Decimal('0.00')
-        
-        return allocated
+    def _allocated_quantities(
+        self,
+        product_ids: Iterable[int],
+        warehouse_ids: Iterable[int]
+    ) -> Dict[Tuple[int, int], Decimal]:
+        """Quantity on active pick lists by (product_id, warehouse_id)"""
+        if not warehouse_ids:
+            return {}
+        rows = (
+            PickListLine.objects.filter(
+                pick_list__organization=self.organization,
+                pick_list__warehouse_id__in=warehouse_ids,
+                pick_list__status__in=self.ACTIVE_PICK_STATUSES,
+                product_id__in=product_ids
+            )
+            .values('product_id', 'pick_list__warehouse_id')
+            .annotate(total=Sum('quantity_ordered'))
+            .order_by()
+        )
+        return {
+            (row['product_id'], row['pick_list__warehouse_id']): row['total'] or Decimal('0.00')
+            for row in rows
+        }
     
-    def _get_safety_stock(self, product: Product, warehouse: Warehouse) -> Decimal:
-        """Get safety stock level for product at warehouse"""
+    @staticmethod
+    def _get_safety_stock(reorder_level: Optional[Decimal]) -> Decimal:
+        """Get safety stock level for a product's reorder level"""
         # Simple implementation - could be made more sophisticated
         # with warehouse-specific safety stock rules
-        if product.reorder_level:
-            return product.reorder_level * Decimal('0.25')  # 25% of reorder level
+        if reorder_level:
+            return reorder_level * Decimal('0.25')  # 25% of reorder level
         return Decimal('0.00')
     
-    def _get_in_transit_quantity(self, product: Product, warehouse: Warehouse) -> Decimal:
-        """Get quantity in transit to warehouse"""
-        in_transit = TransitWarehouse.objects.filter(
-            organization=self.organization,
-            to_warehouse=warehouse,
-            is_active=True
-        ).aggregate(total=Sum('quantity'))['total'] or Decimal('0.00')
+    def _inbound_receipts(
+        self,
+        product_ids: Iterable[int],
+        warehouse_ids: Iterable[int]
+    ) -> Dict[Tuple[int, int], List[Tuple[Optional[date], Decimal]]]:
+        """
+        Open transfer-order quantities heading to each warehouse
         
-        return in_transit
+        Returns {(product_id, warehouse_id): [(expected_date, quantity)]};
+        the expected date is the transfer's scheduled date, or None when it
+        has not been scheduled.
+        """
+        if not warehouse_ids:
+            return {}
+        rows = (
+            TransferOrderLine.objects.filter(
+                transfer_order__organization=self.organization,
+                transfer_order__destination_warehouse_id__in=warehouse_ids,
+                transfer_order__status__in=self.INBOUND_TRANSFER_STATUSES,
+                product_id__in=product_ids
+            )
+            .exclude(status='received')
+            .values('product_id', 'transfer_order__destination_warehouse_id', 'transfer_order__scheduled_date')
+            .annotate(total=Sum('quantity_requested'))
+            .order_by()
+        )
+        receipts = defaultdict(list)
+        for row in rows:
+            scheduled = row['transfer_order__scheduled_date']
+            if scheduled is not None:
+                scheduled = timezone.localtime(scheduled).date() if timezone.is_aware(scheduled) else scheduled.date()
+            key = (row['product_id'], row['transfer_order__destination_warehouse_id'])
+            receipts[key].append((scheduled, row['total'] or Decimal('0.00')))
+        return receipts
     
-    def _calculate_future_atp(
-        self,
-        product: Product,
-        warehouse: Warehouse,
-        days_ahead: int = 30
+    def _future_dates(self, days_ahead: int = FUTURE_ATP_DAYS) -> List[date]:
+        current_date = date.today()
+        return [current_date + timedelta(days=offset) for offset in range(1, days_ahead + 1)]
+    
+    @staticmethod
+    def _project_atp(
+        base_atp: Decimal,
+        receipts: List[Tuple[Optional[date], Decimal]],
+        horizon: List[date]
     ) -> Dict[date, Decimal]:
         """
-        Calculate future ATP projections
+        Project ATP over ``horizon`` by adding scheduled receipts as they arrive
         
-        Considers:
-        - In-transit arrivals
-        - Planned receipts (POs, production orders)
-        - Scheduled allocations
+        TODO: Add purchase orders, production orders and scheduled allocations
         """
         future_atp = {}
-        current_date = date.today()
-        
-        # Get current ATP as baseline
-        current_item = InventoryItem.objects.filter(
-            organization=self.organization,
-            product=product,
-            warehouse=warehouse
-        ).first()
-        
-        if not current_item:
-            return future_atp
-        
-        base_atp = current_item.quantity_on_hand - \
-                   self._get_allocated_quantity(product, warehouse) - \
-                   self._get_safety_stock(product, warehouse)
-        
-        # Project ATP for next N days
-        for day_offset in range(1, days_ahead + 1):
-            future_date = current_date + timedelta(days=day_offset)
-            
-            # Add expected receipts (in-transit, POs, production)
-            receipts = self._get_expected_receipts(product, warehouse, future_date)
-            
-            # Subtract scheduled allocations
-            scheduled_alloc = self._get_scheduled_allocations(product, warehouse, future_date)
-            
-            projected_atp = base_atp + receipts - scheduled_alloc
-            future_atp[future_date] = max(projected_atp, Decimal('0.00'))
-        
+        dated = sorted((arrival, qty) for arrival, qty in receipts if arrival is not None)
+        received = Decimal('0.00')
+        index = 0
+        for future_date in horizon:
+            while index < len(dated) and dated[index][0] <= future_date:
+                received += dated[index][1]
+                index += 1
+            future_atp[future_date] = max(base_atp + received, Decimal('0.00'))
         return future_atp
     
-    def _get_expected_receipts(
+    def _available_by_warehouse(
         self,
-        product: Product,
-        warehouse: Warehouse,
-        target_date: date
-    ) -> Decimal:
-        """Get expected receipts for a future date"""
-        # Check in-transit with expected arrival
-        receipts = TransitWarehouse.objects.filter(
-            organization=self.organization,
-            to_warehouse=warehouse,
-            is_active=True,
-            expected_arrival__lte=target_date
-        ).aggregate(total=Sum('quantity'))['total'] or Decimal('0.00')
-        
-        # TODO: Add purchase orders, production orders
-        
-        return receipts
-    
-    def _get_scheduled_allocations(
-        self,
-        product: Product,
-        warehouse: Warehouse,
-        target_date: date
-    ) -> Decimal:
-        """Get scheduled future allocations"""
-        # TODO: Implement scheduled allocation logic
-        # This would check for future-dated orders
-        return Decimal('0.00')
+        product_quantities: Dict[str, Decimal]
+    ) -> Dict[str, Dict[str, Decimal]]:
+        """Batch ATP reshaped to {product_code: {warehouse_code: available}}"""
+        return {
+            product_code: {result.warehouse_code: result.available for result in results}
+            for product_code, results in self.calculate_atp_batch(product_quantities).items()
+        }
     
     def _sort_warehouses_by_strategy(
         self,
@@ -514,43 +546,41 @@ class AllocationService:
     
     def _calculate_split_fulfillment(
         self,
-        product_quantities: Dict[str, Decimal]
+        product_quantities: Dict[str, Decimal],
+        available: Optional[Dict[str, Dict[str, Decimal]]] = None,
+        warehouses: Optional[List[str]] = None
     ) -> Optional[Dict]:
         """Calculate optimal warehouse split for multi-product order"""
         # This is a simplified implementation
         # Production system would use optimization algorithms
         
-        all_warehouses = Warehouse.objects.filter(
-            organization=self.organization,
-            is_active=True
-        )
+        if warehouses is None:
+            warehouses = list(Warehouse.objects.filter(
+                organization=self.organization,
+                is_active=True
+            ).order_by('code').values_list('code', flat=True))
+        if available is None:
+            available = self._available_by_warehouse(product_quantities)
         
         warehouse_allocations = {}
         unfulfilled = {}
         
         for product_code, quantity in product_quantities.items():
             remaining = quantity
+            product_available = available.get(product_code, {})
             
-            for warehouse in all_warehouses:
+            for warehouse_code in warehouses:
                 if remaining <= 0:
                     break
                 
-                atp_results = self.calculate_atp(
-                    product_code,
-                    warehouse.code,
-                    include_future=False
-                )
-                
-                if atp_results and atp_results[0].available > 0:
-                    allocated = min(atp_results[0].available, remaining)
-                    
-                    if warehouse.code not in warehouse_allocations:
-                        warehouse_allocations[warehouse.code] = []
+                warehouse_available = product_available.get(warehouse_code, Decimal('0.00'))
+                if warehouse_available > 0:
+                    allocated = min(warehouse_available, remaining)
                     
-                    warehouse_allocations[warehouse.code].append({
+                    warehouse_allocations.setdefault(warehouse_code, []).append({
                         'product_code': product_code,
                         'quantity': allocated,
-                        'available': atp_results[0].available
+                        'available': warehouse_available
                     })
                     
                     remaining -= allocated
@@ -1,111 +1,179 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
 from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Sum, Value, When
 from django.utils import timezone
-from accounting.models import Organization
-from inventory.models import Product, StockLedger, StockAdjustment
+
+from inventory.models import InventoryItem, StockLedger
+
+logger = logging.getLogger(__name__)
 
 
 class InventoryService:
-    """Service for managing inventory operations and stock ledger entries."""
+    """
+    Service for managing inventory operations and stock ledger entries.
+
+    ``InventoryItem`` is the on-hand projection of ``StockLedger``: one row per
+    (organization, product, warehouse, location, batch), moved in the same
+    transaction as every ledger write. Stock reads go to the projection instead
+    of summing ledger history; ``InventorySnapshotReconciler`` repairs drift.
+    """
 
     @staticmethod
-    def create_stock_ledger_entry(organization, product, transaction_type, quantity,
-                                unit_cost=None, total_cost=None, reference_doc=None,
-                                reference_type=None, warehouse=None, batch=None, expiry_date=None):
-        """
-        Create a stock ledger entry for inventory transactions.
+    @transaction.atomic
+    def create_stock_ledger_entry(
+        organization,
+        product,
+        warehouse,
+        location,
+        batch,
+        txn_type,
+        reference_id,
+        qty_in=0,
+        qty_out=0,
+        unit_cost=0,
+        txn_date=None,
+        async_ledger=False,
+    ):
+        """Creates a StockLedger entry and updates InventoryItem.
 
-        Args:
-            organization: Organization instance
-            product: Product instance
-            transaction_type: Type of transaction (IN/OUT/ADJUSTMENT)
-            quantity: Quantity of the transaction
-            unit_cost: Cost per unit (optional)
-            total_cost: Total cost (optional)
-            reference_doc: Reference document (optional)
-            reference_type: Type of reference document (optional)
-            warehouse: Warehouse location (optional)
-            batch: Batch number (optional)
-            expiry_date: Expiry date (optional)
+        The ledger row and the projection are written in the same transaction.
+        ``async_ledger=True`` defers the ledger row until after commit to ease
+        lock contention on hot rows, at the cost of on-hand briefly running
+        ahead of the ledger (or alone, if the process dies before the callback).
         """
-        try:
-            # Calculate total cost if not provided
-            if total_cost is None and unit_cost is not None:
-                total_cost = unit_cost * abs(quantity)
-            elif total_cost is None:
-                total_cost = 0
-
-            # Calculate unit cost if not provided
-            if unit_cost is None and quantity != 0:
-                unit_cost = total_cost / abs(quantity)
-            elif unit_cost is None:
-                unit_cost = 0
-
-            # Create stock ledger entry
-            stock_entry = StockLedger.objects.create(
-                organization=organization,
-                product=product,
-                transaction_type=transaction_type,
-                quantity=quantity,
-                unit_cost=unit_cost,
-                total_cost=total_cost,
-                reference_doc=reference_doc,
-                reference_type=reference_type,
-                warehouse=warehouse,
-                batch=batch,
-                expiry_date=expiry_date,
-                transaction_date=timezone.now()
+        if not txn_date:
+            txn_date = timezone.now()
+
+        ledger_kwargs = {
+            "organization": organization,
+            "product": product,
+            "warehouse": warehouse,
+            "location": location,
+            "batch": batch,
+            "txn_type": txn_type,
+            "reference_id": reference_id,
+            "txn_date": txn_date,
+            "qty_in": qty_in,
+            "qty_out": qty_out,
+            "unit_cost": unit_cost,
+        }
+
+        inventory_item, created = InventoryItem.objects.get_or_create(
+            organization=organization,
+            product=product,
+            warehouse=warehouse,
+            location=location, # Include location in unique key for granular tracking
+            batch=batch,       # Include batch in unique key
+            defaults={'quantity_on_hand': Decimal('0'), 'unit_cost': unit_cost}
+        )
+
+        quantity_delta = qty_in - qty_out
+        update_kwargs = {
+            "quantity_on_hand": F('quantity_on_hand') + quantity_delta,
+            "updated_at": timezone.now(),
+        }
+
+        if qty_in > 0:
+            moving_average = ExpressionWrapper(
+                (F('quantity_on_hand') * F('unit_cost') + Value(qty_in) * Value(unit_cost)) /
+                (F('quantity_on_hand') + Value(qty_in)),
+                output_field=DecimalField(max_digits=19, decimal_places=4),
             )
 
-            return stock_entry
+            update_kwargs["unit_cost"] = Case(
+                When(quantity_on_hand__gt=0, then=moving_average),
+                default=Value(unit_cost),
+                output_field=DecimalField(max_digits=19, decimal_places=4),
+            )
+
+        InventoryItem.objects.filter(pk=inventory_item.pk).update(**update_kwargs)
+        inventory_item.refresh_from_db() # Get updated values after F() expression
+
+        def _create_ledger_entry():
+            StockLedger.objects.create(**ledger_kwargs)
+
+        if async_ledger:
+            transaction.on_commit(_create_ledger_entry)
+            ledger_entry = None
+        else:
+            ledger_entry = StockLedger.objects.create(**ledger_kwargs)
 
-        except Exception as e:
-            raise Exception(f"Failed to create stock ledger entry: {str(e)}")
+        logger.info(
+            f"Inventory update: Txn={txn_type}, Ref={reference_id}, "
+            f"Product={product.code}, Wh={warehouse.code}, Loc={location.code if location else 'N/A'}, "
+            f"Batch={batch.batch_number if batch else 'N/A'}, "
+            f"QtyIn={qty_in}, QtyOut={qty_out}, Cost={unit_cost}, "
+            f"New QOH={inventory_item.quantity_on_hand}, New Cost={inventory_item.unit_cost}"
+        )
+
+        return ledger_entry, inventory_item
 
     @staticmethod
-    def apply_stock_adjustment(organization, product, adjustment_type, quantity,
-                             reason, reference_doc=None, warehouse=None):
-        """
-        Apply a stock adjustment to inventory.
+    @transaction.atomic
+    def apply_stock_adjustment(
+        organization,
+        product,
+        warehouse,
+        location,
+        batch,
+        counted_quantity,
+        reference_id,
+    ):
+        """Apply a manual stock adjustment line and post a ledger entry."""
+        inventory_item = InventoryItem.objects.filter(
+            organization=organization,
+            product=product,
+            warehouse=warehouse,
+            location=location,
+            batch=batch,
+        ).first()
 
-        Args:
-            organization: Organization instance
-            product: Product instance
-            adjustment_type: Type of adjustment (POSITIVE/NEGATIVE)
-            quantity: Adjustment quantity
-            reason: Reason for adjustment
-            reference_doc: Reference document (optional)
-            warehouse: Warehouse location (optional)
-        """
-        try:
-            with transaction.atomic():
-                # Create stock adjustment record
-                adjustment = StockAdjustment.objects.create(
-                    organization=organization,
-                    product=product,
-                    adjustment_type=adjustment_type,
-                    quantity=quantity,
-                    reason=reason,
-                    reference_doc=reference_doc,
-                    warehouse=warehouse,
-                    adjustment_date=timezone.now()
-                )
-
-                # Create corresponding stock ledger entry
-                transaction_type = 'IN' if adjustment_type == 'POSITIVE' else 'OUT'
-                InventoryService.create_stock_ledger_entry(
-                    organization=organization,
-                    product=product,
-                    transaction_type=transaction_type,
-                    quantity=quantity if adjustment_type == 'POSITIVE' else -quantity,
-                    reference_doc=reference_doc,
-                    reference_type='STOCK_ADJUSTMENT',
-                    warehouse=warehouse
-                )
-
-                return adjustment
-
-        except Exception as e:
-            raise Exception(f"Failed to apply stock adjustment: {str(e)}")
+        system_quantity = inventory_item.quantity_on_hand if inventory_item else Decimal('0')
+        unit_cost = (
+            inventory_item.unit_cost
+            if inventory_item and inventory_item.unit_cost
+            else product.cost_price
+        ) or Decimal('0')
+
+        quantity_delta = counted_quantity - system_quantity
+        if quantity_delta == 0:
+            return {
+                'inventory_item': inventory_item,
+                'system_quantity': system_quantity,
+                'unit_cost': unit_cost,
+                'quantity_delta': Decimal('0'),
+                'ledger_entry': None,
+            }
+
+        txn_type = 'adjustment_receipt' if quantity_delta > 0 else 'adjustment_issue'
+        qty_in = quantity_delta if quantity_delta > 0 else Decimal('0')
+        qty_out = -quantity_delta if quantity_delta < 0 else Decimal('0')
+
+        ledger_entry, inventory_item = InventoryService.create_stock_ledger_entry(
+            organization=organization,
+            product=product,
+            warehouse=warehouse,
+            location=location,
+            batch=batch,
+            txn_type=txn_type,
+            reference_id=reference_id,
+            qty_in=qty_in,
+            qty_out=qty_out,
+            unit_cost=unit_cost,
+            async_ledger=False,
+        )
+
+        return {
+            'inventory_item': inventory_item,
+            'system_quantity': system_quantity,
+            'unit_cost': unit_cost,
+            'quantity_delta': quantity_delta,
+            'ledger_entry': ledger_entry,
+        }
 
     @staticmethod
     def get_current_stock(organization, product, warehouse=None):
@@ -120,24 +188,56 @@ class InventoryService:
         Returns:
             Current stock quantity
         """
-        try:
-            queryset = StockLedger.objects.filter(
-                organization=organization,
-                product=product
-            )
+        queryset = InventoryItem.objects.filter(
+            organization=organization,
+            product=product
+        )
 
-            if warehouse:
-                queryset = queryset.filter(warehouse=warehouse)
+        if warehouse:
+            queryset = queryset.filter(warehouse=warehouse)
 
-            # Sum all quantities (IN positive, OUT negative)
-            total_quantity = queryset.aggregate(
-                total=models.Sum('quantity')
-            )['total'] or 0
+        return queryset.aggregate(total=Sum('quantity_on_hand'))['total'] or Decimal('0')
 
-            return total_quantity
+    @staticmethod
+    def get_current_stock_many(
+        organization,
+        product_ids: Iterable[int],
+        warehouse_ids: Optional[Iterable[int]] = None,
+    ) -> Dict[Tuple[int, int], Decimal]:
+        """
+        Get stock for many products in one grouped query.
 
-        except Exception as e:
-            raise Exception(f"Failed to get current stock: {str(e)}")
+        Returns ``{(product_id, warehouse_id): quantity_on_hand}``, summed over
+        locations and batches. Pairs with no stock row are omitted.
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+
+        queryset = InventoryItem.objects.filter(
+            organization=organization,
+            product_id__in=product_ids
+        )
+        if warehouse_ids is not None:
+            queryset = queryset.filter(warehouse_id__in=list(warehouse_ids))
+
+        rows = (
+            queryset.values('product_id', 'warehouse_id')
+            .annotate(total=Sum('quantity_on_hand'))
+            .order_by()
+        )
+        return {
+            (row['product_id'], row['warehouse_id']): row['total'] or Decimal('0')
+            for row in rows
+        }
+
+    @staticmethod
+    def stock_by_product(stock: Dict[Tuple[int, int], Decimal]) -> Dict[int, Decimal]:
+        """Collapse a ``get_current_stock_many`` result to ``{product_id: quantity}``."""
+        totals = defaultdict(Decimal)
+        for (product_id, _), quantity in stock.items():
+            totals[product_id] += quantity
+        return dict(totals)
 
 
 class WarehouseService:
@@ -155,4 +255,4 @@ class WarehouseService:
         return [
             {'id': warehouse.id, 'name': warehouse.name}
             for warehouse in warehouses
-        ]
\ No newline at end of file
+        ]
@@ -0,0 +1,125 @@
+# Inventory/services/replenishment_service.py
+"""
+Batch low-stock and replenishment planning.
+
+On-hand stock is read with one grouped query per organization, reorder-level
+and MOQ rules run in memory, and recommendations are bulk-created, so the
+daily jobs scale with row counts instead of query counts.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from ..models import InventoryItem, Product, ReorderRecommendation, Warehouse
+
+
+class ReplenishmentPlanner:
+    BATCH_SIZE = 1000
+
+    def __init__(self, organization):
+        self.organization = organization
+
+    def _products(self) -> List[dict]:
+        return list(
+            Product.objects.filter(
+                organization=self.organization,
+                is_inventory_item=True,
+                reorder_level__isnull=False,
+            ).values(
+                'id', 'code', 'name', 'reorder_level', 'min_order_quantity',
+                'preferred_vendor_id', 'cost_price',
+            ).order_by('code')
+        )
+
+    def on_hand(self) -> Dict[Tuple[int, int], Decimal]:
+        """``{(product_id, warehouse_id): quantity_on_hand}`` from one grouped query."""
+        rows = (
+            InventoryItem.objects.filter(organization=self.organization)
+            .values('product_id', 'warehouse_id')
+            .annotate(total=Sum('quantity_on_hand'))
+            .order_by()
+        )
+        return {(row['product_id'], row['warehouse_id']): row['total'] or Decimal('0') for row in rows}
+
+    def low_stock_alerts(self, on_hand=None) -> List[dict]:
+        on_hand = self.on_hand() if on_hand is None else on_hand
+        per_product = defaultdict(Decimal)
+        for (product_id, _), qty in on_hand.items():
+            per_product[product_id] += qty
+
+        alerts = []
+        for product in self._products():
+            total_qty = per_product.get(product['id'], Decimal('0'))
+            if total_qty < product['reorder_level']:
+                alerts.append({
+                    'org': self.organization.name,
+                    'product': product['code'],
+                    'current_qty': float(total_qty),
+                    'reorder_level': float(product['reorder_level']),
+                    'shortage': float(product['reorder_level'] - total_qty),
+                })
+        return alerts
+
+    def plan(self, on_hand=None) -> List[ReorderRecommendation]:
+        """Unsaved recommendations for every product x active warehouse below reorder level."""
+        on_hand = self.on_hand() if on_hand is None else on_hand
+        warehouses = list(
+            Warehouse.objects.filter(organization=self.organization, is_active=True).values_list('id', flat=True)
+        )
+        recommendations = []
+        for product in self._products():
+            reorder_level = product['reorder_level']
+            for warehouse_id in warehouses:
+                wh_stock = on_hand.get((product['id'], warehouse_id), Decimal('0'))
+                if wh_stock >= reorder_level:
+                    continue
+                # Order up to twice the reorder level, but never below the MOQ.
+                suggested_qty = max((reorder_level * 2) - wh_stock, product['min_order_quantity'])
+                recommendations.append(ReorderRecommendation(
+                    organization=self.organization,
+                    product_id=product['id'],
+                    warehouse_id=warehouse_id,
+                    reorder_level=reorder_level,
+                    current_stock=wh_stock,
+                    shortage=reorder_level - wh_stock,
+                    suggested_qty=suggested_qty,
+                    estimated_cost=suggested_qty * product['cost_price'],
+                    vendor_id=product['preferred_vendor_id'],
+                ))
+        return recommendations
+
+    @transaction.atomic
+    def replace_recommendations(self) -> List[ReorderRecommendation]:
+        """Swap the organization's recommendations for a freshly planned set."""
+        recommendations = self.plan()
+        ReorderRecommendation.objects.filter(organization=self.organization).delete()
+        ReorderRecommendation.objects.bulk_create(recommendations, batch_size=self.BATCH_SIZE)
+        return recommendations
+
+    def describe(self, recommendations) -> List[dict]:
+        """Serializable summaries of ``recommendations`` for task results."""
+        products = {
+            row['id']: row for row in Product.objects.filter(
+                pk__in={rec.product_id for rec in recommendations}
+            ).values('id', 'code', 'name')
+        }
+        warehouse_codes = dict(
+            Warehouse.objects.filter(pk__in={rec.warehouse_id for rec in recommendations}).values_list('id', 'code')
+        )
+        return [
+            {
+                'organization': self.organization.name,
+                'product_code': products[rec.product_id]['code'],
+                'product_name': products[rec.product_id]['name'],
+                'warehouse_code': warehouse_codes[rec.warehouse_id],
+                'current_stock': float(rec.current_stock),
+                'reorder_level': float(rec.reorder_level),
+                'suggested_qty': float(rec.suggested_qty),
+                'vendor_id': rec.vendor_id,
+                'estimated_cost': float(rec.estimated_cost),
+            }
+            for rec in recommendations
+        ]
@@ -0,0 +1,129 @@
+# Inventory/services/snapshot_reconciliation.py
+"""
+Set-based reconciliation of InventoryItem.quantity_on_hand against the ledger.
+
+One grouped aggregate over StockLedger per organization is matched in memory
+against the InventoryItem rows, and corrections are written with one
+``bulk_update`` per chunk. Incremental runs only look at products that
+received ledger rows past the organization's watermark, which advances by
+ledger id only as far as ``utils.watermarks.settled_id`` allows, so rows
+from transactions that commit late are still picked up.
+"""
+import time
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from utils.watermarks import settled_id
+from ..models import InventoryItem, SnapshotReconcileWatermark, StockLedger
+
+Key = Tuple[int, int, Optional[int], Optional[int]]  # product, warehouse, location, batch
+
+
+class InventorySnapshotReconciler:
+    CHUNK_SIZE = 1000
+
+    def __init__(self, organization):
+        self.organization = organization
+
+    def _touched_products(self, after_id):
+        return set(
+            StockLedger.objects.filter(organization=self.organization, pk__gt=after_id)
+            .values_list('product_id', flat=True)
+            .distinct()
+        )
+
+    def ledger_balances(self, product_ids=None) -> Dict[Key, Decimal]:
+        ledger = StockLedger.objects.filter(organization=self.organization)
+        if product_ids is not None:
+            ledger = ledger.filter(product_id__in=product_ids)
+        rows = (
+            ledger.values('product_id', 'warehouse_id', 'location_id', 'batch_id')
+            .annotate(total_in=Sum('qty_in'), total_out=Sum('qty_out'))
+            .order_by()
+        )
+        return {
+            (row['product_id'], row['warehouse_id'], row['location_id'], row['batch_id']):
+                (row['total_in'] or Decimal('0')) - (row['total_out'] or Decimal('0'))
+            for row in rows
+        }
+
+    def reconcile(self, *, incremental: bool = False, dry_run: bool = False) -> dict:
+        started = timezone.now()
+        timer = time.perf_counter()
+        watermark = SnapshotReconcileWatermark.objects.filter(organization=self.organization).first()
+        last_id = watermark.last_ledger_id if watermark is not None else 0
+        # Fix the target before reading: rows past it are rechecked next run.
+        settled = settled_id(StockLedger, last_id)
+        product_ids = None
+        if incremental and watermark is not None:
+            product_ids = self._touched_products(last_id)
+
+        stats = {
+            'organization': self.organization.pk,
+            'incremental': product_ids is not None,
+            'items_checked': 0,
+            'items_updated': 0,
+            'total_abs_drift': Decimal('0'),
+            'max_drift': Decimal('0'),
+            'max_drift_key': None,
+            'ledger_keys_without_item': 0,
+        }
+        if product_ids is not None and not product_ids:
+            return self._finish(stats, settled, timer, dry_run)
+
+        balances = self.ledger_balances(product_ids)
+        items = InventoryItem.objects.filter(organization=self.organization)
+        if product_ids is not None:
+            items = items.filter(product_id__in=product_ids)
+        rows = items.values_list(
+            'pk', 'product_id', 'warehouse_id', 'location_id', 'batch_id', 'quantity_on_hand'
+        ).order_by('pk')
+
+        seen = set()
+        corrections = []
+        for pk, product_id, warehouse_id, location_id, batch_id, on_hand in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            key = (product_id, warehouse_id, location_id, batch_id)
+            seen.add(key)
+            stats['items_checked'] += 1
+            calculated = balances.get(key, Decimal('0'))
+            if on_hand == calculated:
+                continue
+            drift = abs(calculated - on_hand)
+            stats['total_abs_drift'] += drift
+            if drift > stats['max_drift']:
+                stats['max_drift'], stats['max_drift_key'] = drift, key
+            corrections.append(InventoryItem(pk=pk, quantity_on_hand=calculated, updated_at=started))
+            if len(corrections) >= self.CHUNK_SIZE:
+                stats['items_updated'] += self._apply(corrections, dry_run)
+                corrections = []
+        if corrections:
+            stats['items_updated'] += self._apply(corrections, dry_run)
+
+        stats['ledger_keys_without_item'] = sum(
+            1 for key, qty in balances.items() if qty and key not in seen
+        )
+        return self._finish(stats, settled, timer, dry_run)
+
+    def _apply(self, corrections, dry_run) -> int:
+        if not dry_run:
+            with transaction.atomic():
+                InventoryItem.objects.bulk_update(corrections, ['quantity_on_hand', 'updated_at'])
+        return len(corrections)
+
+    def _finish(self, stats, settled, timer, dry_run) -> dict:
+        stats['duration_ms'] = int((time.perf_counter() - timer) * 1000)
+        if not dry_run:
+            SnapshotReconcileWatermark.objects.update_or_create(
+                organization=self.organization,
+                defaults={
+                    'last_ledger_id': settled,
+                    'reconciled_at': timezone.now(),
+                    'items_updated': stats['items_updated'],
+                    'duration_ms': stats['duration_ms'],
+                },
+            )
+        return stats
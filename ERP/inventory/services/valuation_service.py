@@ -0,0 +1,125 @@
+# Inventory/services/valuation_service.py
+"""
+Point-in-time stock valuation.
+
+The stock position at the end of a date is the latest StockValuationSnapshot
+on or before it plus the StockLedger movements after that snapshot. Every
+ledger row records the unit cost it moved at (moving average, the FIFO/LIFO
+layer cost, or standard cost), so ``(qty_in - qty_out) * unit_cost`` replays
+the value for any costing method without re-walking CostLayers.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Sum
+from django.utils import timezone
+
+from ..models import Product, StockLedger, StockValuationSnapshot
+
+Position = Tuple[Decimal, Decimal]  # (quantity, value)
+
+_AMOUNT = DecimalField(max_digits=30, decimal_places=8)
+
+
+def _end_of_day(day: date) -> datetime:
+    moment = datetime.combine(day + timedelta(days=1), time.min)
+    if settings.USE_TZ:
+        return timezone.make_aware(moment)
+    return moment
+
+
+class StockValuationService:
+    """Replay ledger movements on top of periodic snapshots for any past date."""
+
+    def __init__(self, organization):
+        self.organization = organization
+
+    def latest_snapshot_date(self, as_of: date) -> Optional[date]:
+        return StockValuationSnapshot.objects.filter(
+            organization=self.organization, as_of__lte=as_of
+        ).aggregate(latest=Max('as_of'))['latest']
+
+    def positions_as_of(self, as_of: date) -> Dict[Tuple[int, int], Position]:
+        """Return ``{(product_id, warehouse_id): (quantity, value)}`` at the end of ``as_of``."""
+        base = self.latest_snapshot_date(as_of)
+        positions: Dict[Tuple[int, int], Position] = {}
+        if base is not None:
+            rows = StockValuationSnapshot.objects.filter(
+                organization=self.organization, as_of=base
+            ).values_list('product_id', 'warehouse_id', 'quantity', 'total_value')
+            for product_id, warehouse_id, quantity, value in rows:
+                positions[(product_id, warehouse_id)] = (quantity, value)
+            if base == as_of:
+                return positions
+
+        # One grouped pass over the delta; each (product, warehouse) is independent.
+        ledger = StockLedger.objects.filter(organization=self.organization, txn_date__lt=_end_of_day(as_of))
+        if base is not None:
+            ledger = ledger.filter(txn_date__gte=_end_of_day(base))
+        deltas = (
+            ledger.values('product_id', 'warehouse_id')
+            .annotate(
+                qty=Sum(F('qty_in') - F('qty_out')),
+                value=Sum((F('qty_in') - F('qty_out')) * F('unit_cost'), output_field=_AMOUNT),
+            )
+            .order_by()
+        )
+        for row in deltas:
+            key = (row['product_id'], row['warehouse_id'])
+            quantity, value = positions.get(key, (Decimal('0'), Decimal('0')))
+            positions[key] = (quantity + (row['qty'] or 0), value + (row['value'] or 0))
+        return positions
+
+    def valuation(self, as_of: date) -> Dict:
+        """Per-product valuation shaped like ``InventoryService.get_stock_valuation``."""
+        per_product: Dict[int, Position] = {}
+        for (product_id, _), (quantity, value) in self.positions_as_of(as_of).items():
+            total_qty, total_value = per_product.get(product_id, (Decimal('0'), Decimal('0')))
+            per_product[product_id] = (total_qty + quantity, total_value + value)
+
+        products = Product.objects.filter(
+            pk__in=[pk for pk, (quantity, _) in per_product.items() if quantity > 0],
+            is_inventory_item=True,
+        ).values('id', 'code', 'name').order_by('code')
+
+        total_value = Decimal('0')
+        product_valuations = []
+        for product in products:
+            quantity, value = per_product[product['id']]
+            total_value += value
+            product_valuations.append({
+                'product_id': product['id'],
+                'product_code': product['code'],
+                'product_name': product['name'],
+                'stock_quantity': quantity,
+                'average_cost': value / quantity,
+                'total_value': value,
+            })
+        return {
+            'total_value': total_value,
+            'product_valuations': product_valuations,
+            'as_of_date': as_of,
+        }
+
+    @transaction.atomic
+    def take_snapshot(self, as_of: date) -> int:
+        """Persist positions at the end of ``as_of``; returns rows written."""
+        positions = self.positions_as_of(as_of)
+        StockValuationSnapshot.objects.filter(organization=self.organization, as_of=as_of).delete()
+        rows = [
+            StockValuationSnapshot(
+                organization=self.organization,
+                product_id=product_id,
+                warehouse_id=warehouse_id,
+                as_of=as_of,
+                quantity=quantity,
+                total_value=value,
+            )
+            for (product_id, warehouse_id), (quantity, value) in positions.items()
+            if quantity or value
+        ]
+        StockValuationSnapshot.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
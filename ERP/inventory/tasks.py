@@ -5,56 +5,54 @@ Supports distributor and retailer vertical playbooks
 """
 from celery import shared_task
 from django.utils import timezone
-from django.db.models import Sum, F
 from decimal import Decimal
-from typing import List, Dict
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _fan_out(task, organization_id, fan_out):
+    """
+    Resolve the organizations a per-org task should handle.
+
+    Returns ``None`` after dispatching one subtask per active organization
+    when ``fan_out`` is set, otherwise the organizations to run inline.
+    """
+    from usermanagement.models import Organization
+
+    organizations = Organization.objects.filter(is_active=True)
+    if organization_id is not None:
+        return list(organizations.filter(pk=organization_id))
+    if fan_out:
+        from celery import group
+
+        group(task.s(organization_id=org_id) for org_id in organizations.values_list('pk', flat=True)).apply_async()
+        return None
+    return list(organizations)
+
+
 @shared_task
-def check_low_stock_alerts():
+def check_low_stock_alerts(organization_id=None, fan_out=False):
     """
     Check for products below reorder level and send alerts
-    Runs daily
+    Runs daily; ``fan_out`` dispatches one subtask per organization
     """
-    from .models import Product, InventoryItem
-    from usermanagement.models import Organization
-    
+    from .services.replenishment_service import ReplenishmentPlanner
+
+    organizations = _fan_out(check_low_stock_alerts, organization_id, fan_out)
+    if organizations is None:
+        return {'dispatched': True}
+
     results = []
-    
-    for org in Organization.objects.filter(is_active=True):
-        # Find products below reorder level
-        low_stock_products = Product.objects.filter(
-            organization=org,
-            is_inventory_item=True,
-            reorder_level__isnull=False
-        )
-        
-        for product in low_stock_products:
-            # Calculate total on-hand across all warehouses
-            total_qty = InventoryItem.objects.filter(
-                organization=org,
-                product=product
-            ).aggregate(
-                total=Sum('quantity_on_hand')
-            )['total'] or Decimal('0')
-            
-            if total_qty < product.reorder_level:
-                results.append({
-                    'org': org.name,
-                    'product': product.code,
-                    'current_qty': float(total_qty),
-                    'reorder_level': float(product.reorder_level),
-                    'shortage': float(product.reorder_level - total_qty)
-                })
-                
-                logger.warning(
-                    f"Low stock alert: {org.name} - {product.code} "
-                    f"(Current: {total_qty}, Reorder: {product.reorder_level})"
-                )
-    
+    for org in organizations:
+        alerts = ReplenishmentPlanner(org).low_stock_alerts()
+        for alert in alerts:
+            logger.warning(
+                f"Low stock alert: {org.name} - {alert['product']} "
+                f"(Current: {alert['current_qty']}, Reorder: {alert['reorder_level']})"
+            )
+        results.extend(alerts)
+
     return {
         'total_alerts': len(results),
         'alerts': results
@@ -62,68 +60,22 @@ def check_low_stock_alerts():
 
 
 @shared_task
-def generate_replenishment_suggestions():
+def generate_replenishment_suggestions(organization_id=None, fan_out=False):
     """
     Generate procurement suggestions based on reorder levels and lead times
-    Runs daily
+    Runs daily; ``fan_out`` dispatches one subtask per organization
     """
-from .models import Product, InventoryItem, Warehouse, ReorderRecommendation
-    from usermanagement.models import Organization
-    
+    from .services.replenishment_service import ReplenishmentPlanner
+
+    organizations = _fan_out(generate_replenishment_suggestions, organization_id, fan_out)
+    if organizations is None:
+        return {'dispatched': True}
+
     suggestions = []
-    
-    for org in Organization.objects.filter(is_active=True):
-        products = Product.objects.filter(
-            organization=org,
-            is_inventory_item=True,
-            reorder_level__isnull=False
-        )
-        
-        ReorderRecommendation.objects.filter(organization=org).delete()
-        warehouse_qs = Warehouse.objects.filter(organization=org, is_active=True)
-        for product in products:
-            for warehouse in warehouse_qs:
-                # Get current stock at this warehouse
-                wh_stock = InventoryItem.objects.filter(
-                    organization=org,
-                    product=product,
-                    warehouse=warehouse
-                ).aggregate(
-                    total=Sum('quantity_on_hand')
-                )['total'] or Decimal('0')
-                
-                # Check if below reorder level
-                if wh_stock < product.reorder_level:
-                    # Calculate suggested order quantity (2x reorder level - current stock)
-                    suggested_qty = (product.reorder_level * 2) - wh_stock
-                    
-                    # Apply MOQ if specified
-                    if product.min_order_quantity > suggested_qty:
-                        suggested_qty = product.min_order_quantity
-                    
-                    suggestions.append({
-                        'organization': org.name,
-                        'product_code': product.code,
-                        'product_name': product.name,
-                        'warehouse_code': warehouse.code,
-                        'current_stock': float(wh_stock),
-                        'reorder_level': float(product.reorder_level),
-                        'suggested_qty': float(suggested_qty),
-                        'vendor_id': product.preferred_vendor_id,
-                        'estimated_cost': float(suggested_qty * product.cost_price)
-                    })
-                    ReorderRecommendation.objects.create(
-                        organization=org,
-                        product=product,
-                        warehouse=warehouse,
-                        reorder_level=product.reorder_level,
-                        current_stock=wh_stock,
-                        shortage=product.reorder_level - wh_stock,
-                        suggested_qty=suggested_qty,
-                        estimated_cost=suggested_qty * product.cost_price,
-                        vendor_id=product.preferred_vendor_id,
-                    )
-    
+    for org in organizations:
+        planner = ReplenishmentPlanner(org)
+        suggestions.extend(planner.describe(planner.replace_recommendations()))
+
     logger.info(f"Generated {len(suggestions)} replenishment suggestions")
     return {
         'total_suggestions': len(suggestions),
@@ -176,51 +128,34 @@ def process_backorder_fulfillment():
 
 
 @shared_task
-def update_inventory_snapshots():
+def update_inventory_snapshots(incremental=False):
     """
     Recalculate inventory snapshots from ledger for accuracy verification
-    Runs weekly
+    Runs weekly; ``incremental`` only rechecks products with ledger rows
+    past the organization's reconcile watermark.
     """
-    from .models import InventoryItem, StockLedger
-    from django.db import transaction
-    
-    updated_count = 0
-    
-    inventory_items = InventoryItem.objects.select_related(
-        'organization', 'product', 'warehouse'
-    )
-    
-    for item in inventory_items:
-        # Calculate from ledger
-        ledger_balance = StockLedger.objects.filter(
-            organization=item.organization,
-            product=item.product,
-            warehouse=item.warehouse,
-            location=item.location,
-            batch=item.batch
-        ).aggregate(
-            total_in=Sum('qty_in'),
-            total_out=Sum('qty_out')
-        )
-        
-        calculated_qty = (
-            (ledger_balance['total_in'] or Decimal('0')) -
-            (ledger_balance['total_out'] or Decimal('0'))
-        )
-        
-        # Update if different
-        if item.quantity_on_hand != calculated_qty:
-            with transaction.atomic():
-                item.quantity_on_hand = calculated_qty
-                item.save()
-                updated_count += 1
-                logger.info(
-                    f"Updated inventory snapshot: {item.organization.name} - "
-                    f"{item.product.code} @ {item.warehouse.code}"
-                )
-    
+    from usermanagement.models import Organization
+    from .services.snapshot_reconciliation import InventorySnapshotReconciler
+
+    organizations = []
+    for org in Organization.objects.filter(is_active=True):
+        stats = InventorySnapshotReconciler(org).reconcile(incremental=incremental)
+        if stats['items_updated']:
+            logger.info(
+                f"Corrected {stats['items_updated']} inventory snapshots for {org.name} "
+                f"(total drift {stats['total_abs_drift']}, max {stats['max_drift']} at {stats['max_drift_key']})"
+            )
+        organizations.append(stats)
+
     return {
-        'items_updated': updated_count
+        'items_updated': sum(stats['items_updated'] for stats in organizations),
+        'items_checked': sum(stats['items_checked'] for stats in organizations),
+        'total_abs_drift': str(sum((stats['total_abs_drift'] for stats in organizations), Decimal('0'))),
+        'ledger_keys_without_item': sum(stats['ledger_keys_without_item'] for stats in organizations),
+        'organizations': [
+            {**stats, 'total_abs_drift': str(stats['total_abs_drift']), 'max_drift': str(stats['max_drift'])}
+            for stats in organizations
+        ],
     }
 
 
@@ -262,3 +197,25 @@ def apply_promotional_pricing():
         'activated': activated,
         'deactivated': deactivated
     }
+
+
+@shared_task
+def snapshot_stock_valuations(as_of=None):
+    """
+    Persist stock valuation snapshots so past-date valuations only replay a
+    short ledger delta. Runs monthly for the previous month end.
+    """
+    from datetime import date, timedelta
+    from usermanagement.models import Organization
+    from .services.valuation_service import StockValuationService
+
+    if as_of is None:
+        as_of = timezone.localdate().replace(day=1) - timedelta(days=1)
+    elif isinstance(as_of, str):
+        as_of = date.fromisoformat(as_of)
+
+    written = {}
+    for org in Organization.objects.filter(is_active=True):
+        written[org.code] = StockValuationService(org).take_snapshot(as_of)
+    logger.info(f"Stock valuation snapshots for {as_of}: {sum(written.values())} rows")
+    return {'as_of': as_of.isoformat(), 'rows': written}
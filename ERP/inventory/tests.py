@@ -1,3 +1,4 @@
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
 from django.conf import settings
@@ -276,3 +277,325 @@ class InventoryNavigationViewTests(TestCase):
 		create_url = reverse('inventory:transfer_order_create')
 		self.assertEqual(self.client.get(list_url).status_code, 200)
 		self.assertEqual(self.client.get(create_url).status_code, 200)
+
+
+class StockValuationReplayTests(TestCase):
+	def setUp(self):
+		self.organization = Organization.objects.create(name="Valuation Org", code="VAL", type="company")
+		self.product = Product.objects.create(
+			organization=self.organization,
+			code="VAL-1",
+			name="Valued Item",
+			is_inventory_item=True,
+		)
+		self.warehouse = Warehouse.objects.create(
+			organization=self.organization,
+			code="VW",
+			name="Valuation Warehouse",
+			address_line1="1 Road",
+			city="Pokhara",
+			country_code="NP",
+		)
+
+	def _move(self, day, qty_in="0", qty_out="0", unit_cost="10"):
+		StockLedger.objects.create(
+			organization=self.organization,
+			product=self.product,
+			warehouse=self.warehouse,
+			txn_type="purchase" if Decimal(qty_in) else "sale",
+			reference_id=f"REF-{day}",
+			txn_date=timezone.make_aware(datetime.combine(day, time(12))),
+			qty_in=Decimal(qty_in),
+			qty_out=Decimal(qty_out),
+			unit_cost=Decimal(unit_cost),
+		)
+
+	def test_past_valuation_replays_ledger_on_top_of_snapshot(self):
+		from .services.valuation_service import StockValuationService
+
+		today = timezone.localdate()
+		month_end = today.replace(day=1) - timedelta(days=1)
+		self._move(month_end - timedelta(days=3), qty_in="10", unit_cost="10")
+		self._move(month_end - timedelta(days=1), qty_out="4", unit_cost="10")
+		self._move(month_end + timedelta(days=1), qty_in="5", unit_cost="16")
+
+		service = StockValuationService(self.organization)
+		before_snapshot = service.valuation(month_end)
+		self.assertEqual(before_snapshot["total_value"], Decimal("60"))
+
+		self.assertEqual(service.take_snapshot(month_end), 1)
+		after = service.valuation(month_end + timedelta(days=1))
+		row = after["product_valuations"][0]
+		self.assertEqual(row["stock_quantity"], Decimal("11"))
+		self.assertEqual(after["total_value"], Decimal("140"))
+		self.assertEqual(service.valuation(month_end - timedelta(days=2))["total_value"], Decimal("100"))
+
+
+class InventorySnapshotReconcilerTests(TestCase):
+	def setUp(self):
+		self.organization = Organization.objects.create(name="Recon Org", code="REC", type="company")
+		self.warehouse = Warehouse.objects.create(
+			organization=self.organization,
+			code="RW",
+			name="Recon Warehouse",
+			address_line1="2 Road",
+			city="Butwal",
+			country_code="NP",
+		)
+		self.products = [
+			Product.objects.create(
+				organization=self.organization, code=f"REC-{i}", name=f"Recon {i}", is_inventory_item=True,
+			)
+			for i in range(2)
+		]
+
+	def _ledger(self, product, qty_in="0", qty_out="0"):
+		StockLedger.objects.create(
+			organization=self.organization, product=product, warehouse=self.warehouse,
+			txn_type="adjustment", reference_id="R", txn_date=timezone.now(),
+			qty_in=Decimal(qty_in), qty_out=Decimal(qty_out),
+		)
+
+	def _item(self, product, on_hand):
+		return InventoryItem.objects.create(
+			organization=self.organization, product=product, warehouse=self.warehouse,
+			quantity_on_hand=Decimal(on_hand),
+		)
+
+	def test_full_then_incremental_reconcile(self):
+		from .services.snapshot_reconciliation import InventorySnapshotReconciler
+
+		first, second = self.products
+		self._ledger(first, qty_in="10", qty_out="3")
+		self._ledger(second, qty_in="5")
+		drifted = self._item(first, "9")
+		correct = self._item(second, "5")
+
+		stats = InventorySnapshotReconciler(self.organization).reconcile()
+		self.assertEqual((stats["items_checked"], stats["items_updated"]), (2, 1))
+		self.assertEqual(stats["max_drift"], Decimal("2"))
+		drifted.refresh_from_db()
+		self.assertEqual(drifted.quantity_on_hand, Decimal("7"))
+
+		InventoryItem.objects.filter(pk=correct.pk).update(quantity_on_hand=Decimal("1"))
+		self._ledger(first, qty_out="2")
+		stats = InventorySnapshotReconciler(self.organization).reconcile(incremental=True)
+		self.assertTrue(stats["incremental"])
+		self.assertEqual(stats["items_checked"], 1)
+		drifted.refresh_from_db()
+		self.assertEqual(drifted.quantity_on_hand, Decimal("5"))
+
+	def test_watermark_waits_for_ledger_ids_that_may_still_commit(self):
+		from unittest import mock
+		from .models import SnapshotReconcileWatermark
+		from .services.snapshot_reconciliation import InventorySnapshotReconciler
+
+		first, second = self.products
+		self._ledger(first, qty_in="10")
+		self._item(first, "10")
+		InventorySnapshotReconciler(self.organization).reconcile()
+		reconciled = StockLedger.objects.latest("pk").pk
+
+		self._ledger(second, qty_in="1")
+		gap = StockLedger.objects.latest("pk")
+		gap.delete()
+		self._ledger(first, qty_out="4")
+
+		# The row after the gap is younger than an open transaction: keep the watermark.
+		with mock.patch(
+			"utils.watermarks.oldest_open_transaction",
+			return_value=timezone.now() - timedelta(hours=1),
+		):
+			stats = InventorySnapshotReconciler(self.organization).reconcile(incremental=True)
+		self.assertEqual(stats["items_updated"], 1)
+		watermark = SnapshotReconcileWatermark.objects.get(organization=self.organization)
+		self.assertEqual(watermark.last_ledger_id, reconciled)
+
+		InventorySnapshotReconciler(self.organization).reconcile(incremental=True)
+		watermark.refresh_from_db()
+		self.assertEqual(watermark.last_ledger_id, StockLedger.objects.latest("pk").pk)
+
+
+class ReplenishmentPlannerTests(TestCase):
+	def setUp(self):
+		self.organization = Organization.objects.create(name="Replenish Org", code="RPL", type="company")
+		self.warehouses = [
+			Warehouse.objects.create(
+				organization=self.organization, code=f"W{i}", name=f"Warehouse {i}",
+				address_line1="3 Road", city="Dharan", country_code="NP",
+			)
+			for i in range(2)
+		]
+		self.products = [
+			Product.objects.create(
+				organization=self.organization, code=f"RPL-{i}", name=f"Replenish {i}",
+				is_inventory_item=True, reorder_level=Decimal("10"), min_order_quantity=Decimal("25"),
+				cost_price=Decimal("2"),
+			)
+			for i in range(3)
+		]
+		for product in self.products:
+			InventoryItem.objects.create(
+				organization=self.organization, product=product, warehouse=self.warehouses[0],
+				quantity_on_hand=Decimal("12"),
+			)
+
+	def test_plan_uses_grouped_queries_and_bulk_creates(self):
+		from .models import ReorderRecommendation
+		from .services.replenishment_service import ReplenishmentPlanner
+
+		planner = ReplenishmentPlanner(self.organization)
+		with self.assertNumQueries(3):
+			recommendations = planner.plan()
+		# Only the empty second warehouse is below the reorder level.
+		self.assertEqual(len(recommendations), 3)
+		self.assertEqual({rec.warehouse_id for rec in recommendations}, {self.warehouses[1].pk})
+		self.assertEqual(recommendations[0].suggested_qty, Decimal("25"))
+		self.assertEqual(recommendations[0].estimated_cost, Decimal("50"))
+
+		planner.replace_recommendations()
+		self.assertEqual(ReorderRecommendation.objects.filter(organization=self.organization).count(), 3)
+		self.assertEqual(planner.low_stock_alerts(), [])
+
+
+class AllocationBatchATPTests(TestCase):
+	def setUp(self):
+		self.organization = Organization.objects.create(name="ATP Org", code="ATP", type="company")
+		self.warehouses = [
+			Warehouse.objects.create(
+				organization=self.organization, code=f"ATP-W{i}", name=f"ATP Warehouse {i}",
+				address_line1="4 Road", city="Butwal", country_code="NP",
+			)
+			for i in range(2)
+		]
+		self.products = [
+			Product.objects.create(
+				organization=self.organization, code=f"ATP-{i}", name=f"ATP {i}",
+				is_inventory_item=True, reorder_level=Decimal("8"),
+			)
+			for i in range(3)
+		]
+		for product in self.products:
+			for warehouse, qty in zip(self.warehouses, (Decimal("20"), Decimal("6"))):
+				InventoryItem.objects.create(
+					organization=self.organization, product=product, warehouse=warehouse,
+					quantity_on_hand=qty,
+				)
+
+	def test_batch_atp_uses_grouped_queries(self):
+		from .models import PickList, PickListLine, TransferOrder, TransferOrderLine
+		from .services.allocation_service import AllocationService
+
+		pick_list = PickList.objects.create(
+			organization=self.organization, pick_number="PL-ATP-1",
+			warehouse=self.warehouses[0], order_reference="SO-1", status="released",
+		)
+		PickListLine.objects.create(
+			pick_list=pick_list, product=self.products[0], quantity_ordered=Decimal("5"), line_number=1,
+		)
+		transfer = TransferOrder.objects.create(
+			organization=self.organization, order_number="TO-ATP-1",
+			source_warehouse=self.warehouses[0], destination_warehouse=self.warehouses[1],
+			status="in_transit", scheduled_date=timezone.now() + timedelta(days=3),
+		)
+		TransferOrderLine.objects.create(
+			transfer_order=transfer, product=self.products[0], quantity_requested=Decimal("4"),
+		)
+
+		service = AllocationService(self.organization)
+		codes = [product.code for product in self.products] + ["MISSING"]
+		with self.assertNumQueries(4):
+			batch = service.calculate_atp_batch(codes, include_future=True)
+
+		self.assertNotIn("MISSING", batch)
+		first = {result.warehouse_code: result for result in batch["ATP-0"]}
+		# Safety stock is 25% of the reorder level.
+		self.assertEqual(first["ATP-W0"].available, Decimal("13"))
+		self.assertEqual(first["ATP-W1"].available, Decimal("4"))
+		self.assertEqual(first["ATP-W1"].in_transit, Decimal("4"))
+		future = sorted(first["ATP-W1"].future_available.items())
+		self.assertEqual(future[0][1], Decimal("4"))
+		self.assertEqual(future[-1][1], Decimal("8"))
+
+		self.assertEqual(
+			[(r.warehouse_code, r.available) for r in service.calculate_atp("ATP-1", include_future=False)],
+			[(r.warehouse_code, r.available) for r in batch["ATP-1"]],
+		)
+
+	def test_fulfillment_options_split_across_warehouses(self):
+		from .services.allocation_service import AllocationService
+
+		service = AllocationService(self.organization)
+		request = {"ATP-0": Decimal("20"), "ATP-1": Decimal("2")}
+		self.assertEqual(service.check_multi_product_availability(request), {"ATP-0": True, "ATP-1": True})
+
+		with self.assertNumQueries(5):
+			options = service.get_fulfillment_options(request)
+		self.assertEqual(len(options), 1)
+		self.assertEqual(options[0]["type"], "multi_warehouse")
+		by_warehouse = options[0]["allocations_by_warehouse"]
+		self.assertEqual(
+			[line["quantity"] for line in by_warehouse["ATP-W1"]],
+			[Decimal("2")],
+		)
+
+
+class StockProjectionTests(TestCase):
+	def setUp(self):
+		self.organization = Organization.objects.create(name="Projection Org", code="PRJ", type="company")
+		self.warehouses = [
+			Warehouse.objects.create(
+				organization=self.organization, code=f"PRJ-W{i}", name=f"Projection Warehouse {i}",
+				address_line1="5 Road", city="Hetauda", country_code="NP",
+			)
+			for i in range(2)
+		]
+		self.products = [
+			Product.objects.create(
+				organization=self.organization, code=f"PRJ-{i}", name=f"Projection {i}",
+				is_inventory_item=True,
+			)
+			for i in range(2)
+		]
+
+	def _post(self, product, warehouse, qty_in=Decimal("0"), qty_out=Decimal("0")):
+		InventoryService.create_stock_ledger_entry(
+			organization=self.organization, product=product, warehouse=warehouse,
+			location=None, batch=None, txn_type="receipt" if qty_in else "issue",
+			reference_id="PRJ", qty_in=qty_in, qty_out=qty_out, unit_cost=Decimal("2"),
+			async_ledger=False,
+		)
+
+	def test_ledger_writes_maintain_projection(self):
+		self._post(self.products[0], self.warehouses[0], qty_in=Decimal("10"))
+		self._post(self.products[0], self.warehouses[0], qty_out=Decimal("3"))
+		self._post(self.products[0], self.warehouses[1], qty_in=Decimal("4"))
+		self._post(self.products[1], self.warehouses[1], qty_in=Decimal("6"))
+
+		self.assertEqual(
+			InventoryService.get_current_stock(self.organization, self.products[0]),
+			Decimal("11"),
+		)
+		self.assertEqual(
+			InventoryService.get_current_stock(self.organization, self.products[0], self.warehouses[0]),
+			Decimal("7"),
+		)
+
+		with self.assertNumQueries(1):
+			stock = InventoryService.get_current_stock_many(
+				self.organization, [product.pk for product in self.products],
+			)
+		self.assertEqual(stock, {
+			(self.products[0].pk, self.warehouses[0].pk): Decimal("7"),
+			(self.products[0].pk, self.warehouses[1].pk): Decimal("4"),
+			(self.products[1].pk, self.warehouses[1].pk): Decimal("6"),
+		})
+		self.assertEqual(
+			InventoryService.stock_by_product(stock),
+			{self.products[0].pk: Decimal("11"), self.products[1].pk: Decimal("6")},
+		)
+
+		filtered = InventoryService.get_current_stock_many(
+			self.organization, [self.products[0].pk], [self.warehouses[1].pk],
+		)
+		self.assertEqual(filtered, {(self.products[0].pk, self.warehouses[1].pk): Decimal("4")})
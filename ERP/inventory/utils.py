@@ -669,16 +669,24 @@ class InventoryService:
         as_of_date: Optional[date] = None
     ) -> Dict[str, Any]:
         """
-        Calculate inventory valuation using current stock levels.
+        Calculate inventory valuation.
 
         Args:
             organization: Organization instance
             valuation_method: Valuation method
-            as_of_date: Date for valuation
+            as_of_date: Date for valuation; past dates are replayed from the
+                stock ledger on top of the nearest valuation snapshot
 
         Returns:
             Valuation results
         """
+        if as_of_date is not None and as_of_date < timezone.localdate():
+            from inventory.services.valuation_service import StockValuationService
+
+            result = StockValuationService(organization).valuation(as_of_date)
+            result['valuation_method'] = valuation_method
+            return result
+
         # Get current stock valuation
         valuation_data = InventoryItem.objects.filter(
             organization=organization,
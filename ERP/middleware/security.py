@@ -2,12 +2,12 @@
 Security middleware for Himalytix ERP
 Implements rate limiting and security headers
 """
-import time
 from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 
+from utils.ratelimit import limiter, rate_limit_key
+
 
 DEFAULT_RATE_LIMITS = {
     "api": (100, 3600),   # 100 requests per hour
@@ -34,6 +34,10 @@ class RateLimitMiddleware(MiddlewareMixin):
     - Login endpoint: 5 requests/minute per IP
     - Admin endpoints: 50 requests/hour per user
     - Staff/superusers are exempt.
+
+    Counting is a sliding-window log (``utils.ratelimit.SlidingWindowLimiter``):
+    one atomic cache operation per request, with ``X-RateLimit-Limit``,
+    ``-Remaining`` and ``-Reset`` headers on every limited response.
     """
 
     def process_request(self, request):
@@ -55,52 +59,28 @@ class RateLimitMiddleware(MiddlewareMixin):
             return None  # No rate limit for other endpoints
 
         limit, window = get_limit_config(group)
-        
-        # Generate cache key
-        if request.user.is_authenticated:
-            key = f'ratelimit:{group}:{request.user.id}'
-        else:
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            ip = x_forwarded_for.split(',')[0] if x_forwarded_for else request.META.get('REMOTE_ADDR')
-            key = f'ratelimit:{group}:{ip}'
-        
-        # Check current request count
-        current = cache.get(key, {'count': 0, 'reset': time.time() + window})
-        
-        # Reset if window expired
-        if time.time() > current['reset']:
-            current = {'count': 0, 'reset': time.time() + window}
-        
-        # Increment count
-        current['count'] += 1
-        cache.set(key, current, window)
-        
-        # Check limit
-        if current['count'] > limit:
-            retry_after = int(current['reset'] - time.time())
+        result = limiter.hit(rate_limit_key(group, request), limit, window)
+
+        if not result.allowed:
+            retry_after = result.retry_after
             return JsonResponse({
                 'error': 'Rate limit exceeded',
                 'detail': f'Too many requests. Please try again in {retry_after} seconds.',
                 'retry_after': retry_after
-            }, status=429, headers={
-                'Retry-After': str(retry_after),
-                'X-RateLimit-Limit': str(limit),
-                'X-RateLimit-Remaining': '0',
-                'X-RateLimit-Reset': str(int(current['reset']))
-            })
-        
+            }, status=429, headers=result.headers())
+
         # Add rate limit headers to response
-        request.rate_limit_remaining = limit - current['count']
-        request.rate_limit_reset = int(current['reset'])
-        
+        request.rate_limit = result
+
         return None
-    
+
     def process_response(self, request, response):
         # Add rate limit headers if available
-        if hasattr(request, 'rate_limit_remaining'):
-            response['X-RateLimit-Remaining'] = str(request.rate_limit_remaining)
-            response['X-RateLimit-Reset'] = str(request.rate_limit_reset)
-        
+        result = getattr(request, 'rate_limit', None)
+        if result is not None:
+            for header, value in result.headers().items():
+                response[header] = value
+
         return response
 
 
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
 from django.core.mail import EmailMessage
+from django.db import transaction
 from django.utils import timezone
 from django.urls import reverse
 
+from utils.cache_utils import CacheTags
+
 from .models import (
     ApprovalRequest,
     InAppNotification,
@@ -42,16 +48,77 @@ def build_context(instance: Any, extra_context: Optional[Dict[str, Any]] = None)
     return context
 
 
+class RuleRegistry:
+    """
+    In-process index of active notification rules keyed by model class.
+
+    The pre_save/post_save receivers run for every model in the system, so
+    the lookup must not touch the database: all active rules are loaded in
+    one query and reused until a rule or template changes. Committed changes
+    bump a shared cache generation, which other processes notice within
+    ``RECHECK_SECONDS``.
+    """
+
+    TAG = "notification_rules"
+    RECHECK_SECONDS = 5
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rules: Optional[Dict[type, List[NotificationRule]]] = None
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+
+    def rules_for(self, model: type) -> List[NotificationRule]:
+        rules = self._current()
+        return rules.get(model, [])
+
+    def invalidate(self) -> None:
+        """Drop the index once the current transaction commits."""
+        transaction.on_commit(self._invalidate_now)
+
+    def _invalidate_now(self) -> None:
+        CacheTags.invalidate(self.TAG)
+        with self._lock:
+            self._rules = None
+
+    def _current(self) -> Dict[type, List[NotificationRule]]:
+        rules = self._rules
+        now = time.monotonic()
+        if rules is not None and now - self._checked_at < self.RECHECK_SECONDS:
+            return rules
+        generation = CacheTags.generations([self.TAG])[self.TAG]
+        with self._lock:
+            if self._rules is None or generation != self._generation:
+                self._rules = self._load()
+                self._generation = generation
+            self._checked_at = now
+            return self._rules
+
+    @staticmethod
+    def _load() -> Dict[type, List[NotificationRule]]:
+        index: Dict[type, List[NotificationRule]] = {}
+        queryset = NotificationRule.objects.filter(is_active=True).select_related("template", "content_type")
+        for rule in queryset:
+            model = rule.content_type.model_class()
+            if model is not None:
+                index.setdefault(model, []).append(rule)
+        return index
+
+
+rule_registry = RuleRegistry()
+
+
 def get_rules_for_model(model: type) -> List[NotificationRule]:
-    content_type = ContentType.objects.get_for_model(model)
-    return list(
-        NotificationRule.objects.filter(content_type=content_type, is_active=True)
-        .select_related("template")
-    )
+    return rule_registry.rules_for(model)
 
 
 def capture_initial_state(instance: Any, rules: Iterable[NotificationRule]) -> Dict[str, Any]:
-    tracked_fields = {rule.status_field for rule in rules if rule.status_field}
+    # Only status-change rules compare against the stored row.
+    tracked_fields = {
+        rule.status_field
+        for rule in rules
+        if rule.status_field and rule.trigger == NotificationRule.Trigger.STATUS_CHANGE
+    }
     if not tracked_fields or not getattr(instance, "pk", None):
         return {}
 
@@ -124,6 +191,91 @@ def resolve_phone(rule: NotificationRule, instance: Any) -> Optional[str]:
     return None
 
 
+_deferred = threading.local()
+
+
+@contextmanager
+def defer_notifications():
+    """
+    Collect post_save dispatches and send them as one batch on commit.
+
+    Intended for bulk operations: saves inside the block only record the
+    instance; when the outermost block exits, the batch is dispatched once
+    the surrounding transaction commits (immediately under autocommit) and
+    dropped if it rolls back.
+
+    Blocks nest like ``transaction.atomic``: an exception leaving a block
+    drops what was queued inside it, so wrap each unit that may roll back on
+    its own (one journal of a batch, say) in an inner block.
+    """
+    stack = getattr(_deferred, "stack", None)
+    if stack is None:
+        stack = _deferred.stack = []
+    stack.append({})
+    try:
+        yield
+    except BaseException:
+        stack.pop()
+        raise
+    else:
+        batch = stack.pop()
+        if stack:
+            for key, item in batch.items():
+                _queue(stack[-1], key, *item)
+        elif batch:
+            items = list(batch.values())
+            transaction.on_commit(lambda: dispatch_batch(items))
+    finally:
+        if not stack:
+            _deferred.stack = None
+
+
+def is_deferring() -> bool:
+    return bool(getattr(_deferred, "stack", None))
+
+
+def defer_dispatch(instance: Any, created: bool) -> None:
+    """Queue ``instance`` for the innermost active ``defer_notifications`` block."""
+    key = (instance.__class__, getattr(instance, "pk", None) or id(instance))
+    initial_state = getattr(instance, "__notification_initial__", {}) or {}
+    _queue(_deferred.stack[-1], key, instance, created, initial_state)
+
+
+def _queue(batch: Dict, key: Tuple, instance: Any, created: bool, initial_state: Dict[str, Any]) -> None:
+    queued = batch.get(key)
+    if queued is None:
+        batch[key] = (instance, created, initial_state)
+    else:
+        # Keep the state from before the first save so status changes made
+        # across several saves still fire once.
+        batch[key] = (instance, queued[1] or created, queued[2])
+
+
+def dispatch_batch(items: Iterable[Tuple[Any, bool, Dict[str, Any]]]) -> List[NotificationLog]:
+    """Dispatch queued (instance, created, initial_state) items, writing logs in one insert."""
+    pending: List[NotificationLog] = []
+    fired_rule_ids = set()
+    for instance, created, initial_state in items:
+        for rule in get_rules_for_model(instance.__class__):
+            try:
+                if not rule.should_fire(instance, created, initial_state):
+                    continue
+                logs = _build_rule_logs(rule, instance)
+            except Exception:
+                logger.exception("Failed to evaluate notification rule %s", rule.pk)
+                continue
+            if logs:
+                pending.extend(logs)
+                fired_rule_ids.add(rule.pk)
+
+    if not pending:
+        return []
+    created_logs = NotificationLog.objects.bulk_create(pending)
+    NotificationRule.objects.filter(pk__in=fired_rule_ids).update(last_triggered_at=timezone.now())
+    logger.info("notifications.batch_dispatched", extra={"logs": len(created_logs), "rules": len(fired_rule_ids)})
+    return created_logs
+
+
 def dispatch_for_instance(
     instance: Any,
     created: bool = False,
@@ -155,6 +307,24 @@ def _dispatch_rule(
     request: Any = None,
     extra_context: Optional[Dict[str, Any]] = None,
 ) -> List[NotificationLog]:
+    logs = _build_rule_logs(rule, instance, request=request, extra_context=extra_context)
+    for log in logs:
+        log.save()
+
+    if logs:
+        # ``rule`` is the registry's shared instance; write through the queryset.
+        NotificationRule.objects.filter(pk=rule.pk).update(last_triggered_at=timezone.now())
+
+    return logs
+
+
+def _build_rule_logs(
+    rule: NotificationRule,
+    instance: Any,
+    request: Any = None,
+    extra_context: Optional[Dict[str, Any]] = None,
+) -> List[NotificationLog]:
+    """Send ``rule`` on each channel and return the (unsaved) log rows."""
     context = build_context(instance, extra_context)
     subject, body = rule.template.render(context)
     logs: List[NotificationLog] = []
@@ -176,7 +346,7 @@ def _dispatch_rule(
             recipient = ""
 
         logs.append(
-            NotificationLog.objects.create(
+            NotificationLog(
                 rule=rule,
                 template=rule.template,
                 content_type=ContentType.objects.get_for_model(instance.__class__),
@@ -190,10 +360,6 @@ def _dispatch_rule(
             )
         )
 
-    if logs:
-        rule.last_triggered_at = timezone.now()
-        rule.save(update_fields=["last_triggered_at"])
-
     return logs
 
 
@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 import os
 import logging
@@ -12,7 +12,14 @@ from .models import (
     NotificationLog,
     NotificationRule,
 )
-from .services import capture_initial_state, dispatch_for_instance, get_rules_for_model
+from .services import (
+    capture_initial_state,
+    defer_dispatch,
+    dispatch_for_instance,
+    get_rules_for_model,
+    is_deferring,
+    rule_registry,
+)
 
 # Avoid recursive triggers on framework tables; Transaction remains observable.
 EXCLUDED_SENDERS = {
@@ -25,6 +32,17 @@ EXCLUDED_SENDERS = {
 }
 
 
+@receiver(post_save, sender=NotificationRule)
+@receiver(post_delete, sender=NotificationRule)
+@receiver(post_save, sender=MessageTemplate)
+@receiver(post_delete, sender=MessageTemplate)
+def invalidate_rule_registry(sender, update_fields=None, **kwargs):
+    # Stamping last_triggered_at does not change which rules apply.
+    if update_fields is not None and set(update_fields) == {"last_triggered_at"}:
+        return
+    rule_registry.invalidate()
+
+
 if os.environ.get('DISABLE_NOTIFICATION_SIGNALS') != '1':
     @receiver(pre_save)
     def notification_pre_save(sender, instance, raw: bool = False, **kwargs):
@@ -47,6 +65,11 @@ if os.environ.get('DISABLE_NOTIFICATION_SIGNALS') != '1':
         if raw or sender in EXCLUDED_SENDERS:
             return
         try:
+            if not get_rules_for_model(sender):
+                return
+            if is_deferring():
+                defer_dispatch(instance, created)
+                return
             dispatch_for_instance(instance, created=created)
         except Exception:
             # Catch unexpected failures to avoid breaking saves/management tasks
@@ -0,0 +1,89 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.test import TestCase
+
+from accounting.models import Currency
+from notification_center.models import MessageTemplate, NotificationLog, NotificationRule
+from notification_center.services import defer_notifications, rule_registry
+from notification_center.signals import notification_post_save, notification_pre_save
+from usermanagement.models import Organization
+
+
+class NotificationRuleRegistryTests(TestCase):
+    def setUp(self):
+        # The registry is process-wide; start each test from the database state.
+        rule_registry._invalidate_now()
+        self.addCleanup(rule_registry._invalidate_now)
+        self.template = MessageTemplate.objects.create(
+            name="currency-saved",
+            channel=MessageTemplate.Channel.EMAIL,
+            subject="{{ object.currency_code }}",
+            body="saved",
+            is_html=False,
+        )
+
+    def _rule(self, **overrides):
+        fields = {
+            "name": "Currency saved",
+            "content_type": ContentType.objects.get_for_model(Currency),
+            "template": self.template,
+            "trigger": NotificationRule.Trigger.ALWAYS,
+            "direct_email": "ops@example.com",
+        }
+        fields.update(overrides)
+        with self.captureOnCommitCallbacks(execute=True):
+            return NotificationRule.objects.create(**fields)
+
+    def test_models_without_rules_cost_no_queries(self):
+        self._rule()
+        rule_registry.rules_for(Organization)
+        organization = Organization(name="No Rules", code="NORULE", type="company")
+
+        with self.assertNumQueries(0):
+            notification_pre_save(sender=Organization, instance=organization)
+            notification_post_save(sender=Organization, instance=organization, created=True)
+
+    def test_registry_is_invalidated_when_a_rule_change_commits(self):
+        self.assertEqual(rule_registry.rules_for(Currency), [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            rule = NotificationRule.objects.create(
+                name="Currency saved",
+                content_type=ContentType.objects.get_for_model(Currency),
+                template=self.template,
+                trigger=NotificationRule.Trigger.ALWAYS,
+            )
+            self.assertEqual(rule_registry.rules_for(Currency), [])
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(rule_registry.rules_for(Currency), [rule])
+
+    def test_deferred_batch_drops_dispatches_of_rolled_back_blocks(self):
+        self._rule()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with defer_notifications():
+                Currency.objects.create(currency_code="AAA", currency_name="Kept", symbol="A")
+                try:
+                    with defer_notifications():
+                        Currency.objects.create(currency_code="BBB", currency_name="Dropped", symbol="B")
+                        raise ValueError("posting rolled back")
+                except ValueError:
+                    pass
+                self.assertEqual(NotificationLog.objects.count(), 0)
+
+        self.assertEqual(NotificationLog.objects.count(), 1)
+        self.assertEqual([message.subject for message in mail.outbox], ["AAA"])
+
+    def test_dispatch_stamps_the_rule_without_rebuilding_the_registry(self):
+        rule = self._rule()
+        cached = rule_registry.rules_for(Currency)[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Currency.objects.create(currency_code="CCC", currency_name="Stamped", symbol="C")
+
+        rule.refresh_from_db()
+        self.assertIsNotNone(rule.last_triggered_at)
+        self.assertIsNone(cached.last_triggered_at)
+        self.assertIs(rule_registry.rules_for(Currency)[0], cached)
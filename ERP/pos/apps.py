@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pos'
+
+    def ready(self):
+        """Register product index invalidation signals."""
+        from . import signals  # noqa
@@ -0,0 +1,212 @@
+"""
+In-memory product lookup for the POS terminal.
+
+Each organization gets one catalog index, built with one query on first use:
+
+* a hash map from product code and barcode to the product, so a scanned or
+  typed code resolves in O(1); like the old ``code=``/``barcode=`` lookup it
+  is case-sensitive;
+* a ``TypeaheadIndex`` over code, name and barcode for everything else, ranked
+  exact > code prefix > word prefix > substring.
+
+Stock on hand is cached per product next to the catalog and attached to the
+results only, so callers get copies and the shared catalog is never mutated.
+Both are versioned through ``CacheTags``: product saves bump the
+organization's catalog tag (full rebuild), stock writes bump only the moved
+product's stock tag, and the next lookup that returns that product reloads
+its quantity. ``POS_PRODUCT_INDEX_TTL`` bounds staleness from bulk updates
+that bypass signals.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Sum
+
+from accounting.services.typeahead_service import TypeaheadEntry, TypeaheadIndex
+from inventory.models import InventoryItem, Product
+from utils.cache_utils import CacheTags
+
+
+@dataclass
+class PosProduct:
+    id: int
+    code: str
+    name: str
+    barcode: str
+    sale_price: Decimal
+    uom: str = ""
+    stock_on_hand: Decimal = Decimal("0")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "code": self.code,
+            "name": self.name,
+            "barcode": self.barcode,
+            "sale_price": float(self.sale_price),
+            "uom": self.uom,
+            "stock_on_hand": float(self.stock_on_hand),
+        }
+
+
+class PosProductIndex:
+    """Exact-match map plus ranked search over one organization's products."""
+
+    def __init__(self, products: List[PosProduct], catalog_version: int):
+        self.products = products
+        self.catalog_version = catalog_version
+        self.built_at = time.monotonic()
+        # product id -> (stock generation, quantity on hand)
+        self.stock: Dict[int, Tuple[int, Decimal]] = {}
+        self._by_id = {product.id: product for product in products}
+        self._by_key: Dict[str, PosProduct] = {}
+        # Codes win over barcodes when a barcode collides with another product's code.
+        for product in products:
+            if product.barcode:
+                self._by_key.setdefault(product.barcode, product)
+        for product in products:
+            self._by_key[product.code] = product
+        self._search = TypeaheadIndex(
+            [TypeaheadEntry(id=product.id, code=product.code, name=product.name) for product in products],
+            [tuple(t.lower() for t in (p.code, p.name, p.barcode) if t) for p in products],
+            str(catalog_version),
+        )
+
+    def exact(self, key: str) -> Optional[PosProduct]:
+        """The product whose code or barcode is ``key``."""
+        return self._by_key.get((key or "").strip())
+
+    def search(self, query: str, limit: int = 10) -> List[PosProduct]:
+        hit = self.exact(query)
+        results = [hit] if hit else []
+        for entry in self._search.search(query, limit=limit + 1):
+            if len(results) >= limit:
+                break
+            if hit is None or entry.id != hit.id:
+                results.append(self._by_id[entry.id])
+        return results
+
+
+class PosProductIndexService:
+    """
+    Per-process LRU of ``PosProductIndex`` objects keyed by organization.
+
+    Lookups return copies of the catalog entries with ``stock_on_hand`` set.
+    """
+
+    MAX_INDEXES = 64
+
+    def __init__(self):
+        self._indexes: "OrderedDict[Any, PosProductIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, "POS_PRODUCT_INDEX_TTL", 300)
+
+    @staticmethod
+    def catalog_tag(organization_id) -> str:
+        return f"pos:catalog:{organization_id}"
+
+    @staticmethod
+    def stock_tag(product_id) -> str:
+        return f"pos:stock:{product_id}"
+
+    @staticmethod
+    def _load_products(organization_id) -> List[PosProduct]:
+        rows = (
+            Product.objects.filter(organization_id=organization_id)
+            .values_list("pk", "code", "name", "barcode", "sale_price", "base_unit__code")
+            .order_by("code")
+        )
+        return [
+            PosProduct(id=pk, code=code or "", name=name or "", barcode=barcode or "",
+                       sale_price=sale_price or Decimal("0"), uom=uom or "")
+            for pk, code, name, barcode, sale_price, uom in rows.iterator()
+        ]
+
+    @staticmethod
+    def _load_stock(organization_id, product_ids: Iterable[int]) -> Dict[int, Decimal]:
+        rows = (
+            InventoryItem.objects.filter(organization_id=organization_id, product_id__in=product_ids)
+            .values("product_id")
+            .annotate(total=Sum("quantity_on_hand"))
+            .order_by()
+        )
+        return {row["product_id"]: row["total"] or Decimal("0") for row in rows}
+
+    def index(self, organization) -> PosProductIndex:
+        organization_id = getattr(organization, "pk", organization)
+        tag = self.catalog_tag(organization_id)
+        catalog_version = CacheTags.generations([tag])[tag]
+        with self._lock:
+            index = self._indexes.get(organization_id)
+            if index is not None:
+                self._indexes.move_to_end(organization_id)
+        if (
+            index is None
+            or index.catalog_version != catalog_version
+            or time.monotonic() - index.built_at >= self.ttl
+        ):
+            index = PosProductIndex(self._load_products(organization_id), catalog_version)
+        with self._lock:
+            self._indexes[organization_id] = index
+            self._indexes.move_to_end(organization_id)
+            while len(self._indexes) > self.MAX_INDEXES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _with_stock(self, index, organization_id, products: List[PosProduct]) -> List[PosProduct]:
+        """Copies of ``products`` with current stock, reloading only products whose stock moved."""
+        if not products:
+            return []
+        tags = {product.id: self.stock_tag(product.id) for product in products}
+        generations = CacheTags.generations(list(tags.values()))
+        stale = [pid for pid, tag in tags.items() if index.stock.get(pid, (None,))[0] != generations[tag]]
+        if stale:
+            loaded = self._load_stock(organization_id, stale)
+            for pid in stale:
+                index.stock[pid] = (generations[tags[pid]], loaded.get(pid, Decimal("0")))
+        return [replace(product, stock_on_hand=index.stock[product.id][1]) for product in products]
+
+    def exact(self, organization, *keys: str) -> Optional[PosProduct]:
+        """The product matching the first of ``keys`` that is a code or barcode."""
+        organization_id = getattr(organization, "pk", organization)
+        index = self.index(organization_id)
+        for key in keys:
+            product = index.exact(key)
+            if product is not None:
+                return self._with_stock(index, organization_id, [product])[0]
+        return None
+
+    def search(self, organization, query: str, limit: int = 10) -> List[PosProduct]:
+        organization_id = getattr(organization, "pk", organization)
+        index = self.index(organization_id)
+        return self._with_stock(index, organization_id, index.search(query, limit=limit))
+
+    def top(self, organization, limit: int = 20) -> List[PosProduct]:
+        """The first ``limit`` products by name, for the initial POS grid."""
+        organization_id = getattr(organization, "pk", organization)
+        index = self.index(organization_id)
+        products = sorted(index.products, key=lambda p: p.name)[:limit]
+        return self._with_stock(index, organization_id, products)
+
+    def invalidate(self, organization_id) -> None:
+        """Mark the organization's catalog as stale everywhere."""
+        CacheTags.invalidate(self.catalog_tag(organization_id))
+        with self._lock:
+            self._indexes.pop(organization_id, None)
+
+    def invalidate_stock(self, product_id) -> None:
+        """Mark one product's stock on hand as stale everywhere."""
+        CacheTags.invalidate(self.stock_tag(product_id))
+
+
+pos_products = PosProductIndexService()
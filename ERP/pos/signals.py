@@ -0,0 +1,24 @@
+"""
+Keep the POS product index (``pos.product_index``) in step with the catalog and stock.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from inventory.models import InventoryItem, Product, StockLedger
+from utils.cache_utils import invalidate_now_and_on_commit
+
+from .product_index import pos_products
+
+
+@receiver([post_save, post_delete], sender=Product, dispatch_uid='pos_product_index_catalog')
+def invalidate_pos_catalog(sender, instance, **kwargs):
+    if instance.organization_id is not None:
+        invalidate_now_and_on_commit(pos_products.invalidate, instance.organization_id)
+
+
+@receiver([post_save, post_delete], sender=StockLedger, dispatch_uid='pos_product_index_ledger')
+@receiver([post_save, post_delete], sender=InventoryItem, dispatch_uid='pos_product_index_stock')
+def invalidate_pos_stock(sender, instance, **kwargs):
+    """Every stock movement writes a ledger row; direct projection edits are covered too."""
+    if instance.product_id is not None:
+        invalidate_now_and_on_commit(pos_products.invalidate_stock, instance.product_id)
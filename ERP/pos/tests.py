@@ -1,3 +1,90 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from inventory.models import InventoryItem, Product, StockLedger, Warehouse
+from usermanagement.models import Organization
+
+from .product_index import pos_products
+
+
+class PosProductIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        pos_products._indexes.clear()
+        self.organization = Organization.objects.create(name="POS Org", code="POS", type="company")
+        self.warehouse = Warehouse.objects.create(
+            organization=self.organization,
+            code="PW",
+            name="POS Warehouse",
+            address_line1="1 Road",
+            city="Pokhara",
+            country_code="NP",
+        )
+        self.cola = self._product("COLA", "Cola Can", barcode="8901001")
+        self.cola_zero = self._product("COLA-Z", "Cola Zero", barcode="8901002")
+        self.diet = self._product("DRK-1", "Diet Cola", barcode="8901003")
+        self.chocolate = self._product("SNK-1", "Chocolate Bar", barcode="8901004")
+
+    def _product(self, code, name, barcode=""):
+        return Product.objects.create(
+            organization=self.organization, code=code, name=name, barcode=barcode,
+            sale_price=Decimal("50"), is_inventory_item=True,
+        )
+
+    def _receive(self, product, qty):
+        StockLedger.objects.create(
+            organization=self.organization, product=product, warehouse=self.warehouse,
+            txn_type="receipt", reference_id="GRN", txn_date=timezone.now(),
+            qty_in=Decimal(qty), qty_out=Decimal("0"),
+        )
+        item, _ = InventoryItem.objects.get_or_create(
+            organization=self.organization, product=product, warehouse=self.warehouse,
+            location=None, batch=None,
+        )
+        item.quantity_on_hand += Decimal(qty)
+        item.save()
+
+    def test_exact_lookup_by_code_and_barcode(self):
+        self.assertEqual(pos_products.exact(self.organization, "COLA-Z").id, self.cola_zero.pk)
+        self.assertEqual(pos_products.exact(self.organization, " 8901003 ").id, self.diet.pk)
+        self.assertEqual(pos_products.exact(self.organization, "", "8901004").id, self.chocolate.pk)
+        # Codes match exactly, as the old code= lookup did.
+        self.assertIsNone(pos_products.exact(self.organization, "cola-z"))
+        self.assertIsNone(pos_products.exact(self.organization, "NOPE"))
+
+    def test_search_ranking(self):
+        codes = [product.code for product in pos_products.search(self.organization, "cola")]
+        # exact code, code prefix, word prefix in a name, substring
+        self.assertEqual(codes, ["COLA", "COLA-Z", "DRK-1", "SNK-1"])
+        self.assertEqual(len(pos_products.search(self.organization, "cola", limit=2)), 2)
+
+    def test_product_changes_rebuild_the_catalog(self):
+        self.assertEqual(pos_products.exact(self.organization, "SNK-1").name, "Chocolate Bar")
+        self.chocolate.name = "Dark Chocolate"
+        self.chocolate.barcode = "8909999"
+        self.chocolate.save()
+
+        self.assertEqual(pos_products.exact(self.organization, "SNK-1").name, "Dark Chocolate")
+        self.assertIsNone(pos_products.exact(self.organization, "8901004"))
+        self.assertEqual(pos_products.exact(self.organization, "8909999").id, self.chocolate.pk)
+
+    def test_stock_changes_reload_only_the_moved_product(self):
+        self._receive(self.cola, "12")
+        self.assertEqual(pos_products.exact(self.organization, "COLA").stock_on_hand, Decimal("12"))
+        self.assertEqual(pos_products.exact(self.organization, "SNK-1").stock_on_hand, Decimal("0"))
+
+        self._receive(self.cola, "3")
+        with self.assertNumQueries(0):
+            self.assertEqual(pos_products.exact(self.organization, "SNK-1").stock_on_hand, Decimal("0"))
+        with self.assertNumQueries(1):
+            self.assertEqual(pos_products.exact(self.organization, "COLA").stock_on_hand, Decimal("15"))
 
-# Create your tests here.
+    def test_results_are_copies(self):
+        self._receive(self.cola, "5")
+        product = pos_products.exact(self.organization, "COLA")
+        product.stock_on_hand = Decimal("999")
+        self.assertEqual(pos_products.exact(self.organization, "COLA").stock_on_hand, Decimal("5"))
+        self.assertEqual(pos_products.top(self.organization, limit=1)[0].code, "SNK-1")
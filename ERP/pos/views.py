@@ -10,10 +10,10 @@ from django.db import transaction, models
 from django.contrib import messages
 from django.urls import reverse
 from accounting.models import SalesInvoice, SalesInvoiceLine, Customer, Currency
-from inventory.models import Product
 from usermanagement.models import Organization
 from usermanagement.utils import PermissionUtils
 from .models import Cart, CartItem, POSSettings
+from .product_index import pos_products
 
 
 def _is_htmx(request):
@@ -160,15 +160,9 @@ def add_to_cart(request):
             return JsonResponse({'success': False, 'error': msg}, status=400)
 
         # Find product by code or barcode
-        product = Product.objects.filter(
-            organization=request.organization
-        ).filter(
-            models.Q(code=product_code) |
-            models.Q(barcode=barcode) |
-            models.Q(barcode=product_code)
-        ).first()
+        entry = pos_products.exact(request.organization, product_code, barcode)
 
-        if not product:
+        if not entry:
             msg = 'Product not found'
             if _is_htmx(request):
                 resp = HttpResponse(render_cart_items(request, None))
@@ -180,7 +174,7 @@ def add_to_cart(request):
         # Check if item already in cart
         cart_item = CartItem.objects.filter(
             cart=cart,
-            product=product
+            product_id=entry.id
         ).first()
 
         if cart_item:
@@ -189,12 +183,12 @@ def add_to_cart(request):
         else:
             CartItem.objects.create(
                 cart=cart,
-                product=product,
-                product_name=product.name,
-                product_code=product.code,
-                barcode=product.barcode,
+                product_id=entry.id,
+                product_name=entry.name,
+                product_code=entry.code,
+                barcode=entry.barcode,
                 quantity=quantity,
-                unit_price=product.sale_price,
+                unit_price=entry.sale_price,
             )
 
         # Recalculate cart totals
@@ -482,13 +476,7 @@ def search_products(request):
             return HttpResponse('<div class="text-center text-muted py-4">Type at least 2 characters to search</div>')
         return JsonResponse({'products': []})
 
-    products = Product.objects.filter(
-        organization=request.organization
-    ).filter(
-        models.Q(name__icontains=query) |
-        models.Q(code__icontains=query) |
-        models.Q(barcode__icontains=query)
-    )[:limit]
+    products = pos_products.search(request.organization, query, limit=limit)
 
     if request.META.get('HTTP_HX_REQUEST'):
         # Return HTML fragment for HTMX
@@ -497,18 +485,7 @@ def search_products(request):
             'heading': 'Search Results'
         })
     else:
-        product_data = []
-        for product in products:
-            product_data.append({
-                'id': product.id,
-                'code': product.code,
-                'name': product.name,
-                'barcode': product.barcode,
-                'sale_price': float(product.sale_price),
-                'uom': product.uom,
-            })
-
-        return JsonResponse({'products': product_data})
+        return JsonResponse({'products': [product.as_dict() for product in products]})
 
 
 @login_required
@@ -518,9 +495,7 @@ def top_products(request):
         limit = int(request.GET.get('limit', 20))
     except (ValueError, TypeError):
         limit = 20
-    products = Product.objects.filter(
-        organization=request.organization
-    ).order_by('name')[:limit]
+    products = pos_products.top(request.organization, limit=limit)
 
     if request.META.get('HTTP_HX_REQUEST'):
         # Return HTML fragment for HTMX
@@ -529,18 +504,7 @@ def top_products(request):
             'heading': 'Popular Products'
         })
     else:
-        product_data = []
-        for product in products:
-            product_data.append({
-                'id': product.id,
-                'code': product.code,
-                'name': product.name,
-                'barcode': product.barcode,
-                'sale_price': float(product.sale_price),
-                'uom': product.uom,
-            })
-
-        return JsonResponse({'products': product_data})
+        return JsonResponse({'products': [product.as_dict() for product in products]})
 
 
 @login_required
@@ -21,7 +21,7 @@ from django.utils import timezone
 
 from purchasing.models import GoodsReceipt, GoodsReceiptLine, PurchaseOrder
 from accounting.models import Journal, JournalLine, JournalType, AccountingPeriod
-from inventory.models import StockLedger
+from inventory.services import InventoryService
 from purchasing.services.purchase_order_service import PurchaseOrderService
 
 
@@ -148,17 +148,20 @@ class GoodsReceiptService:
             qty_to_post = line.quantity_accepted
             po_line = line.po_line
             
-            # Create StockLedger entry
-            StockLedger.objects.create(
+            # Create StockLedger entry and move the on-hand projection with it
+            InventoryService.create_stock_ledger_entry(
                 organization=gr.organization,
                 product=po_line.product,
                 warehouse=gr.warehouse,
+                location=None,
+                batch=None,
                 txn_type="goods_receipt",
                 reference_id=gr.number,
                 txn_date=posting_datetime,
                 qty_in=qty_to_post,
                 qty_out=Decimal("0"),
                 unit_cost=po_line.unit_price,
+                async_ledger=False,
             )
             
             # Update PO line tracking
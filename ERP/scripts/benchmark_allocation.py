@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark: batch ATP vs. the per-product calculate_atp path.
+
+Seeds a throwaway organization inside a transaction that is rolled back, then
+checks a multi-line order both ways and reports wall time and query counts.
+
+Usage:
+    python scripts/benchmark_allocation.py [--lines 300] [--warehouses 5]
+"""
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from inventory.models import InventoryItem, PickList, PickListLine, Product, Warehouse  # noqa: E402
+from inventory.services.allocation_service import AllocationService  # noqa: E402
+from usermanagement.models import Organization  # noqa: E402
+
+
+def seed(lines, warehouse_count):
+    organization = Organization.objects.create(name='ATP Benchmark', code='ATP-BENCH', type='company')
+    warehouses = Warehouse.objects.bulk_create([
+        Warehouse(
+            organization=organization, code=f'BW{i:02d}', name=f'Bench Warehouse {i}',
+            address_line1='Bench Road', city='Kathmandu', country_code='NP',
+        )
+        for i in range(warehouse_count)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            organization=organization, code=f'BENCH-{i:05d}', name=f'Bench {i}',
+            is_inventory_item=True, reorder_level=Decimal('10'),
+        )
+        for i in range(lines)
+    ])
+    InventoryItem.objects.bulk_create([
+        InventoryItem(
+            organization=organization, product=product, warehouse=warehouse,
+            quantity_on_hand=Decimal(5 + (p_idx + w_idx) % 40),
+        )
+        for p_idx, product in enumerate(products)
+        for w_idx, warehouse in enumerate(warehouses)
+    ])
+    pick_list = PickList.objects.create(
+        organization=organization, pick_number='PL-ATP-BENCH', warehouse=warehouses[0],
+        order_reference='SO-BENCH', status='released',
+    )
+    PickListLine.objects.bulk_create([
+        PickListLine(pick_list=pick_list, product=product, quantity_ordered=Decimal('3'), line_number=i)
+        for i, product in enumerate(products[::3], start=1)
+    ])
+    order = {product.code: Decimal(1 + i % 25) for i, product in enumerate(products)}
+    return organization, order
+
+
+def per_product(service, order):
+    """The previous check_multi_product_availability: one ATP call per line."""
+    availability = {}
+    for product_code, quantity in order.items():
+        results = service.calculate_atp(product_code, include_future=False)
+        availability[product_code] = sum((r.available for r in results), Decimal('0.00')) >= quantity
+    return availability
+
+
+def timed(label, fn):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    print(f'{label:<20} {elapsed * 1000:9.1f} ms {len(queries):6d} queries')
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=300)
+    parser.add_argument('--warehouses', type=int, default=5)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        organization, order = seed(args.lines, args.warehouses)
+        service = AllocationService(organization)
+        print(f'{len(order)} order lines x {args.warehouses} warehouses')
+
+        expected, baseline = timed('per product', lambda: per_product(service, order))
+        batch, batch_time = timed('batch', lambda: service.check_multi_product_availability(order))
+        transaction.set_rollback(True)
+
+    if batch != expected:
+        print('MISMATCH between per-product and batch availability')
+        return 1
+    print(f'speedup: {baseline / batch_time:.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
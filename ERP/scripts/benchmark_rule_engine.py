@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: compiled rule sets vs. the tree-walking jsonLogic interpreter.
+
+Usage:
+    python scripts/benchmark_rule_engine.py [--rows 10000] [--rules 40]
+"""
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from accounting.rule_engine import compile_rules, evaluate_rules, evaluate_rules_batch, interpret  # noqa: E402
+
+ACCOUNT_TYPES = ['asset', 'liability', 'equity', 'income', 'expense']
+COST_CENTERS = [f'CC{i:02d}' for i in range(10)]
+
+
+def interpreted_rules(rules, data):
+    """The previous evaluate_rules: sort and walk every jsonLogic tree per call."""
+    for rule in sorted(rules, key=lambda r: r.get('priority', 100)):
+        if rule.get('enabled', True):
+            if interpret(rule['if'], data):
+                return rule['then']
+    return None
+
+
+def make_rules(count):
+    rules = []
+    for i in range(count):
+        account_type = ACCOUNT_TYPES[i % len(ACCOUNT_TYPES)]
+        rules.append({
+            'priority': i,
+            'if': {'and': [
+                {'==': [{'var': 'account_type'}, account_type]},
+                {'==': [{'var': 'cost_center'}, COST_CENTERS[i % len(COST_CENTERS)]]},
+                {'>': [{'var': 'amount'}, 100 * (i % 7)]},
+            ]},
+            'then': f'rule-{i}',
+        })
+    rules.append({'priority': 1000, 'if': {'missing': ['account']}, 'then': 'missing-account'})
+    return rules
+
+
+def make_rows(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'account': rng.choice([None, '1000', '2000', '4000']),
+            'account_type': rng.choice(ACCOUNT_TYPES),
+            'cost_center': rng.choice(COST_CENTERS),
+            'amount': Decimal(rng.randint(0, 1000)),
+        }
+        for _ in range(count)
+    ]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed * 1000:9.1f} ms')
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--rules', type=int, default=40)
+    args = parser.parse_args()
+
+    rules = make_rules(args.rules)
+    rows = make_rows(args.rows)
+    print(f'{len(rules)} rules x {len(rows)} rows')
+
+    expected, baseline = timed('interpreter', lambda: [interpreted_rules(rules, row) for row in rows])
+    compile_rules(rules)
+    per_row, row_time = timed('compiled, per row', lambda: [evaluate_rules(rules, row) for row in rows])
+    batch, batch_time = timed('compiled, batch', lambda: evaluate_rules_batch(rules, rows))
+
+    if per_row != expected or batch != expected:
+        print('MISMATCH between interpreter and compiled results')
+        return 1
+    print(f'speedup: {baseline / row_time:.1f}x per row, {baseline / batch_time:.1f}x batch')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
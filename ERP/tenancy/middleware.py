@@ -1,8 +1,17 @@
+from contextlib import contextmanager
+
 from django.conf import settings
 from django.db import connection
-from usermanagement.models import UserOrganization
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from usermanagement.request_context import get_request_context, timed_stage
+
 
-from .models import Tenant
+@receiver(connection_created, dispatch_uid='tenancy_reset_search_path_state')
+def _forget_search_path(sender, connection, **kwargs):
+    # A fresh connection starts on the server default search_path.
+    connection.active_search_path = None
 
 
 class ActiveTenantMiddleware:
@@ -12,7 +21,8 @@ class ActiveTenantMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        self._activate_tenant(request)
+        with timed_stage('tenant'):
+            self._activate_tenant(request)
         try:
             response = self.get_response(request)
         finally:
@@ -25,7 +35,8 @@ class ActiveTenantMiddleware:
             request.tenant = None
             return
 
-        tenant = Tenant.objects.filter(pk=tenant_id, is_active=True).first()
+        context = get_request_context(request)
+        tenant = context.tenant(tenant_id)
         if not tenant:
             request.session.pop('active_tenant', None)
             request.tenant = None
@@ -33,12 +44,7 @@ class ActiveTenantMiddleware:
 
         user = getattr(request, 'user', None)
         if user and user.is_authenticated and not user.is_superuser:
-            has_membership = UserOrganization.objects.filter(
-                user_id=user.id,
-                organization__tenant=tenant,
-                is_active=True,
-            ).exists()
-            if not has_membership:
+            if tenant.pk not in context.tenant_ids:
                 request.session.pop('active_tenant', None)
                 request.tenant = None
                 return
@@ -46,6 +52,36 @@ class ActiveTenantMiddleware:
         request.tenant = tenant
         self._set_schema(tenant.data_schema)
 
+    @staticmethod
+    def _default_schema():
+        return getattr(settings, 'DEFAULT_DB_SCHEMA', 'public')
+
+    def _ensure_search_path(self, schema_name: str):
+        """Issue ``SET search_path`` only when this connection is on a different schema.
+
+        The path is still reset after every response, because persistent
+        connections (``CONN_MAX_AGE``) carry it into the next request, whose
+        session and auth middleware query before this one runs. Only the
+        statements that would not change anything are skipped, e.g. both SETs
+        of a request without a tenant.
+        """
+        engine = connection.settings_dict.get('ENGINE', '')
+        if 'sqlite' in engine or 'mssql' in engine:
+            return
+        in_transaction = connection.in_atomic_block
+        if (
+            not in_transaction
+            and connection.connection is not None
+            and getattr(connection, 'active_search_path', None) == schema_name
+        ):
+            return
+        with timed_stage('schema'):
+            with connection.cursor() as cursor:
+                cursor.execute('SET search_path TO %s', [schema_name])
+        # A rollback would silently undo a SET issued inside a transaction, so
+        # only remember paths set in autocommit mode.
+        connection.active_search_path = None if in_transaction else schema_name
+
     def _set_schema(self, schema_name: str):
         engine = connection.settings_dict.get('ENGINE', '')
         # SQLite and other simple backends do not support schemas; skip quietly.
@@ -55,8 +91,7 @@ class ActiveTenantMiddleware:
         if 'mssql' in engine:
             settings.SCHEMA_TO_INSPECT = f"'{schema_name}'"
         else:
-            with connection.cursor() as cursor:
-                cursor.execute('SET search_path TO %s', [schema_name])
+            self._ensure_search_path(schema_name)
 
     def _reset_schema(self):
         engine = connection.settings_dict.get('ENGINE', '')
@@ -66,7 +101,22 @@ class ActiveTenantMiddleware:
         connection.schema_name = None
         if 'mssql' in engine:
             settings.SCHEMA_TO_INSPECT = "'dbo'"
-        else:
-            default_schema = getattr(settings, 'DEFAULT_DB_SCHEMA', 'public')
-            with connection.cursor() as cursor:
-                cursor.execute('SET search_path TO %s', [default_schema])
+        elif connection.connection is not None:
+            self._ensure_search_path(self._default_schema())
+
+
+@contextmanager
+def tenant_schema(tenant):
+    """Scope the connection to ``tenant``'s schema outside the middleware.
+
+    Streaming response bodies are consumed after ``ActiveTenantMiddleware``
+    has already reset the schema, so generators that query the database
+    wrap their iteration in this.
+    """
+    scope = ActiveTenantMiddleware(None)
+    if tenant is not None:
+        scope._set_schema(tenant.data_schema)
+    try:
+        yield
+    finally:
+        scope._reset_schema()
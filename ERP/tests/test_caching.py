@@ -106,3 +106,104 @@ class TestCaching:
         result = cache.get_many(data.keys())
         assert len(result) == 3
         assert result[cache_key('test', item=1)] == 'value1'
+
+
+@pytest.mark.integration
+class TestCacheTags:
+    """Generation-based invalidation in utils.cache_utils."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_account_invalidation_only_drops_that_account(self):
+        from decimal import Decimal
+        from utils.cache_utils import CacheManager
+
+        CacheManager.set_account_balance(1, 10, Decimal('5.00'))
+        CacheManager.set_account_balance(2, 10, Decimal('7.00'))
+        CacheManager.set_financial_report('trial_balance', 10, {'rows': []})
+
+        CacheManager.invalidate_account_cache(1, 10)
+
+        assert CacheManager.get_account_balance(1, 10) is None
+        assert CacheManager.get_account_balance(2, 10) == Decimal('7.00')
+        assert CacheManager.get_financial_report('trial_balance', 10) is None
+
+    def test_organization_invalidation_drops_everything_for_that_org(self):
+        from decimal import Decimal
+        from utils.cache_utils import CacheManager
+
+        CacheManager.set_account_balance(1, 10, Decimal('5.00'))
+        CacheManager.set_account_tree(10, [{'id': 1}])
+        CacheManager.set_account_tree(11, [{'id': 2}])
+
+        CacheManager.invalidate_organization_cache(10)
+
+        assert CacheManager.get_account_balance(1, 10) is None
+        assert CacheManager.get_account_tree(10) is None
+        assert CacheManager.get_account_tree(11) == [{'id': 2}]
+
+    def test_evicted_counter_does_not_resurrect_stale_entries(self):
+        from utils.cache_utils import CacheTags
+
+        tag = CacheTags.organization(99)
+        stale_key = CacheTags.tagged_key('report', tag)
+        cache.set(stale_key, 'stale', 60)
+
+        cache.delete(CacheTags._counter_key(tag))
+        CacheTags.invalidate(tag)
+
+        assert CacheTags.tagged_key('report', tag) != stale_key
+
+    def test_cached_result_keys_model_instances_by_pk(self):
+        from types import SimpleNamespace
+        from utils.cache_utils import CachedResult
+
+        calls = []
+
+        class Item(SimpleNamespace):
+            @CachedResult(organization_aware=True)
+            def total(self):
+                calls.append(self.pk)
+                return self.pk * 10
+
+        organization = SimpleNamespace(id=10)
+        assert Item(pk=1, organization=organization).total() == 10
+        assert Item(pk=2, organization=organization).total() == 20
+        assert Item(pk=1, organization=organization).total() == 10
+        assert calls == [1, 2]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_signal_invalidation_waits_for_commit(self):
+        from decimal import Decimal
+        from types import SimpleNamespace
+        from django.db import transaction
+        from utils.cache_utils import CacheInvalidationManager, CacheManager
+
+        CacheManager.set_account_balance(1, 10, Decimal('5.00'))
+        with transaction.atomic():
+            CacheInvalidationManager._invalidate_account_cache(None, SimpleNamespace(pk=1, organization_id=10))
+            assert CacheManager.get_account_balance(1, 10) == Decimal('5.00')
+        assert CacheManager.get_account_balance(1, 10) is None
+
+    def test_tenant_view_cache_keeps_organizations_apart(self):
+        from types import SimpleNamespace
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from utils.cache_utils import CacheTags
+        from utils.view_caching import cache_view_per_tenant
+
+        @cache_view_per_tenant(timeout=60)
+        def dashboard(request):
+            return HttpResponse(str(request.organization.pk))
+
+        # Clock-seeded generations can coincide; the key must still differ.
+        for organization_id in (1, 2):
+            cache.set(CacheTags._counter_key(CacheTags.organization(organization_id)), 5, None)
+
+        responses = []
+        for organization_id in (1, 2):
+            request = RequestFactory().get('/dashboard/')
+            request.organization = SimpleNamespace(pk=organization_id)
+            responses.append(dashboard(request).content)
+        assert responses == [b'1', b'2']
@@ -3,8 +3,11 @@ Integration tests for rate limiting
 """
 import pytest
 import time
+from concurrent.futures import ThreadPoolExecutor
 from django.core.cache import cache
 
+from utils.ratelimit import SlidingWindowLimiter
+
 
 @pytest.mark.integration
 @pytest.mark.security
@@ -82,3 +85,42 @@ class TestRateLimiting:
         for i in range(20):
             response = client.get('/health/')
             assert response.status_code == 200  # Never rate limited
+
+
+@pytest.mark.unit
+@pytest.mark.security
+class TestSlidingWindowLimiter:
+    """Counting semantics of the limiter engine behind RateLimitMiddleware."""
+
+    def setup_method(self):
+        cache.clear()
+        self.limiter = SlidingWindowLimiter()
+
+    def test_counts_stay_exact_under_concurrency(self):
+        """1,000 requests spread over one second from 32 threads admit exactly `limit`."""
+        start = time.time()
+        stamps = [start + i / 1000 for i in range(1000)]
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(
+                lambda now: self.limiter.hit('ratelimit:test:burst', limit=600, window=60, now=now),
+                stamps,
+            ))
+
+        assert sum(result.allowed for result in results) == 600
+        assert sorted(result.remaining for result in results if result.allowed) == list(range(600))
+        assert all(result.remaining == 0 for result in results if not result.allowed)
+
+    def test_window_slides_instead_of_resetting(self):
+        now = time.time()
+        for offset in (0, 10, 20):
+            assert self.limiter.hit('ratelimit:test:slide', limit=3, window=60, now=now + offset).allowed
+
+        blocked = self.limiter.hit('ratelimit:test:slide', limit=3, window=60, now=now + 30)
+        assert not blocked.allowed
+        assert blocked.reset == pytest.approx(now + 60)
+        assert blocked.headers()['X-RateLimit-Remaining'] == '0'
+
+        # Only the first request has aged out; one slot frees up, not three.
+        assert self.limiter.hit('ratelimit:test:slide', limit=3, window=60, now=now + 61).allowed
+        assert not self.limiter.hit('ratelimit:test:slide', limit=3, window=60, now=now + 62).allowed
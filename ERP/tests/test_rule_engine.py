@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from accounting.rule_engine import (
+    compile_logic,
+    compile_rules,
+    evaluate_rules,
+    evaluate_rules_batch,
+    interpret,
+)
+
+
+RULES = [
+    {"priority": 50, "if": {"==": [{"var": "account_type"}, "asset"]}, "then": "asset"},
+    {"priority": 10, "if": {"and": [
+        {"in": [{"var": "account_type"}, ["income", "expense"]]},
+        {">": [{"var": "amount"}, 100]},
+    ]}, "then": "large-pl"},
+    {"priority": 5, "if": {"==": [{"var": "account_type"}, "asset"]}, "then": "disabled", "enabled": False},
+    {"priority": 90, "if": {"missing": ["account"]}, "then": "missing-account"},
+]
+
+
+@pytest.mark.parametrize("logic", [
+    {"if": [{"<": [{"var": "amount"}, 10]}, "small", {"<=": [10, {"var": "amount"}, 100]}, "mid", "big"]},
+    {"or": [{"!": {"var": "account"}}, {"missing_some": [1, ["a", "b"]]}]},
+    {"cat": ["x", {"var": "account_type"}, {"substr": ["abcdef", -3, 2]}]},
+    {"reduce": [{"var": "items"}, {"+": [{"var": "current"}, {"var": "accumulator"}]}, 0]},
+    {"some": [{"var": "items"}, {">": [{"var": ""}, 2]}]},
+    {"var": ["nested.key", "fallback"]},
+])
+def test_compiled_logic_matches_interpreter(logic):
+    for data in (
+        {"amount": 5, "account": "", "items": [1, 2, 3], "nested": {"key": 1}},
+        {"amount": Decimal("50"), "account": "1000", "account_type": "asset", "items": []},
+        {"amount": 500, "a": 1, "items": [4]},
+    ):
+        assert compile_logic(logic)(data) == interpret(logic, data)
+
+
+def test_rules_respect_priority_enabled_and_index():
+    assert evaluate_rules(RULES, {"account": "1", "account_type": "asset"}) == "asset"
+    assert evaluate_rules(RULES, {"account": "1", "account_type": "income", "amount": 150}) == "large-pl"
+    assert evaluate_rules(RULES, {"account_type": "income", "amount": 1}) == "missing-account"
+    assert evaluate_rules(RULES, {"account": "1", "account_type": "equity"}) is None
+
+
+def test_batch_matches_row_by_row_evaluation():
+    rows = [
+        {"account": "1", "account_type": kind, "amount": amount}
+        for kind in ("asset", "income", "expense", "equity")
+        for amount in (0, 101, 500)
+    ] + [{"account_type": "asset"}]
+    assert evaluate_rules_batch(RULES, rows) == [evaluate_rules(RULES, row) for row in rows]
+
+
+def test_compiled_rules_are_cached_until_the_rule_list_changes():
+    rules = [dict(rule) for rule in RULES]
+    compiled = compile_rules(rules)
+    assert compile_rules(rules) is compiled
+
+    rules[0]["then"] = "changed"
+    assert compile_rules(rules) is not compiled
+    assert evaluate_rules(rules, {"account": "1", "account_type": "asset"}) == "changed"
+
+
+def test_unknown_operation_is_rejected():
+    with pytest.raises(ValueError):
+        compile_logic({"nope": [1]})
@@ -1,6 +1,6 @@
 """Middleware to attach the active organization/company to the request."""
 
-from usermanagement.models import Organization, UserOrganization
+from usermanagement.request_context import get_request_context, timed_stage
 from utils.calendars import CalendarMode, get_calendar_mode
 
 
@@ -11,7 +11,8 @@ class ActiveOrganizationMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        organization = self._resolve_organization(request)
+        with timed_stage("organization"):
+            organization = self._resolve_organization(request)
         request.organization = organization
         request.calendar_mode = get_calendar_mode(organization, default=CalendarMode.DEFAULT)
         user = getattr(request, "user", None)
@@ -29,40 +30,32 @@ class ActiveOrganizationMiddleware:
                 session.pop("active_organization_id", None)
             return None
 
-        memberships = (
-            UserOrganization.objects.filter(user=user, is_active=True)
-            .select_related("organization", "organization__tenant")
-        )
+        context = get_request_context(request)
+        tenant_id = tenant.pk if tenant else None
 
-        def _return_mapping(mapping):
-            if not mapping:
+        def _return_mapping(organization_id):
+            if organization_id is None:
                 return None
-            if session:
-                session["active_organization_id"] = mapping.organization_id
-            return mapping.organization
+            organization = context.organization(organization_id)
+            if organization and session and session.get("active_organization_id") != organization_id:
+                session["active_organization_id"] = organization_id
+            return organization
 
         org_id = session.get("active_organization_id") if session else None
         if org_id:
-            scoped = memberships.filter(organization_id=org_id)
-            if tenant:
-                scoped = scoped.filter(organization__tenant=tenant)
-            mapping = scoped.first()
-            if mapping:
-                return _return_mapping(mapping)
+            resolved = _return_mapping(context.membership(organization_id=org_id, tenant_id=tenant_id))
+            if resolved:
+                return resolved
             if user.is_superuser:
-                org_qs = Organization.objects.filter(id=org_id)
-                if tenant:
-                    org_qs = org_qs.filter(tenant=tenant)
-                organization = org_qs.first()
-                if organization:
+                organization = context.organization(org_id)
+                if organization and (not tenant or organization.tenant_id == tenant.pk):
                     return organization
             if session:
                 session.pop("active_organization_id", None)
 
         if tenant:
-            mapping = memberships.filter(organization__tenant=tenant).first()
-            resolved = _return_mapping(mapping)
+            resolved = _return_mapping(context.membership(tenant_id=tenant_id))
             if resolved:
                 return resolved
 
-        return _return_mapping(memberships.first())
+        return _return_mapping(context.membership())
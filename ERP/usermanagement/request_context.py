@@ -0,0 +1,167 @@
+"""
+Request-scoped tenant and organization resolution shared by the middleware chain.
+
+``ActiveTenantMiddleware``, ``ActiveOrganizationMiddleware`` and accounting's
+``RequestMiddleware`` each used to query ``Tenant``, ``UserOrganization`` and
+``Organization`` on every request. They now read one ``RequestContext``
+attached to the request:
+
+* the user's active memberships, as ``(organization_id, tenant_id)`` pairs, are
+  kept in the session and stamped with the versions they were read under;
+* ``Organization`` (with its tenant and company config) and ``Tenant`` rows are
+  kept in the Django cache under the global version.
+
+Both versions are ``CacheTags`` generations. A membership change bumps that
+user's tag; an organization, company config or tenant change bumps the global
+tag (see ``usermanagement/signals.py``). Checking both is a single
+``cache.get_many``, so a warm request resolves its tenant and organization
+without touching the database.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from django.core.cache import cache
+from prometheus_client import Histogram
+
+from tenancy.models import Tenant
+from usermanagement.models import Organization, UserOrganization
+from utils.cache_utils import CacheTags
+
+SESSION_KEY = "_request_context"
+USER_TAG = "request_context:user:{user_id}"
+GLOBAL_TAG = "request_context:global"
+ORGANIZATION_KEY = "request_context:organization:{pk}:{version}"
+TENANT_KEY = "request_context:tenant:{pk}:{version}"
+TENANT_ORGANIZATION_KEY = "request_context:tenant_organization:{pk}:{version}"
+CACHE_TIMEOUT = 3600
+
+_MISSING = "missing"
+
+REQUEST_CONTEXT_SECONDS = Histogram(
+    "erp_request_context_stage_seconds",
+    "Time spent resolving tenant, organization and schema before the view runs.",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """Observe the wall time of one middleware stage in ``erp_request_context_stage_seconds``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REQUEST_CONTEXT_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def _versions(user_id) -> Tuple[int, int]:
+    user_tag = USER_TAG.format(user_id=user_id)
+    found = CacheTags.generations([user_tag, GLOBAL_TAG])
+    return found[user_tag], found[GLOBAL_TAG]
+
+
+def invalidate_user(user_id) -> None:
+    """Drop the cached membership map of one user."""
+    if user_id:
+        CacheTags.invalidate(USER_TAG.format(user_id=user_id))
+
+
+def invalidate_all() -> None:
+    """Drop every cached organization, tenant and membership map."""
+    CacheTags.invalidate(GLOBAL_TAG)
+
+
+class RequestContext:
+    """Memberships and cached lookups for one request's user."""
+
+    def __init__(self, request):
+        self.session = getattr(request, "session", None)
+        user = getattr(request, "user", None)
+        self.user_id = user.pk if user is not None and getattr(user, "is_authenticated", False) else None
+        self.user_version, self.global_version = _versions(self.user_id)
+        self._memberships: Optional[List[Tuple[int, Optional[int]]]] = None
+
+    @property
+    def memberships(self) -> List[Tuple[int, Optional[int]]]:
+        """Active ``(organization_id, tenant_id)`` pairs of the user, oldest membership first."""
+        if self._memberships is not None:
+            return self._memberships
+        if self.user_id is None:
+            self._memberships = []
+            return self._memberships
+
+        stamp = [self.user_version, self.global_version]
+        stored = self.session.get(SESSION_KEY) if self.session is not None else None
+        if stored and stored.get("user_id") == self.user_id and stored.get("version") == stamp:
+            self._memberships = [tuple(pair) for pair in stored["memberships"]]
+            return self._memberships
+
+        self._memberships = list(
+            UserOrganization.objects.filter(user_id=self.user_id, is_active=True)
+            .order_by("pk")
+            .values_list("organization_id", "organization__tenant_id")
+        )
+        if self.session is not None:
+            self.session[SESSION_KEY] = {
+                "user_id": self.user_id,
+                "version": stamp,
+                "memberships": [list(pair) for pair in self._memberships],
+            }
+        return self._memberships
+
+    @property
+    def tenant_ids(self) -> set:
+        return {tenant_id for _, tenant_id in self.memberships if tenant_id is not None}
+
+    def membership(self, organization_id=None, tenant_id=None) -> Optional[int]:
+        """First member organization id matching the given organization and/or tenant."""
+        for org_id, org_tenant_id in self.memberships:
+            if organization_id is not None and org_id != organization_id:
+                continue
+            if tenant_id is not None and org_tenant_id != tenant_id:
+                continue
+            return org_id
+        return None
+
+    def _cached(self, key: str, load):
+        value = cache.get(key)
+        if value is None:
+            value = load()
+            cache.set(key, _MISSING if value is None else value, CACHE_TIMEOUT)
+        return None if value == _MISSING else value
+
+    def organization(self, organization_id) -> Optional[Organization]:
+        def load():
+            organization = Organization.objects.select_related("tenant").filter(pk=organization_id).first()
+            if organization is not None:
+                organization.company_config  # warm the related cache before pickling
+            return organization
+
+        return self._cached(ORGANIZATION_KEY.format(pk=organization_id, version=self.global_version), load)
+
+    def tenant(self, tenant_id) -> Optional[Tenant]:
+        """The tenant, if it exists and is active."""
+        return self._cached(
+            TENANT_KEY.format(pk=tenant_id, version=self.global_version),
+            lambda: Tenant.objects.filter(pk=tenant_id, is_active=True).first(),
+        )
+
+    def organization_for_tenant(self, tenant) -> Optional[Organization]:
+        organization_id = self._cached(
+            TENANT_ORGANIZATION_KEY.format(pk=tenant.pk, version=self.global_version),
+            lambda: Organization.objects.filter(tenant=tenant).order_by("pk").values_list("pk", flat=True).first(),
+        )
+        return self.organization(organization_id) if organization_id is not None else None
+
+
+def get_request_context(request) -> RequestContext:
+    """The request's ``RequestContext``, created on first use."""
+    context = getattr(request, "_request_context", None)
+    if context is None:
+        context = RequestContext(request)
+        request._request_context = context
+    return context
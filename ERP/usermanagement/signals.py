@@ -6,8 +6,11 @@ from django.http import HttpRequest
 
 from django.db import transaction
 
-from usermanagement.models import Organization, UserRole, UserPermission, Role, CompanyConfig, LoginEventLog, CustomUser
+from tenancy.models import Tenant
+from usermanagement.models import Organization, UserRole, UserPermission, Role, CompanyConfig, LoginEventLog, CustomUser, UserOrganization
+from usermanagement.request_context import invalidate_all, invalidate_user
 from usermanagement.utils import PermissionUtils
+from utils.cache_utils import invalidate_now_and_on_commit
 
 
 def _invalidate(user_id, organization_id):
@@ -49,6 +52,18 @@ def invalidate_cache_on_role_permission_change(sender, instance, action, **kwarg
     PermissionUtils.bulk_invalidate(user_ids, org_id)
 
 
+
+@receiver([post_save, post_delete], sender=UserOrganization)
+def invalidate_request_context_on_membership_change(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(invalidate_user, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Organization)
+@receiver([post_save, post_delete], sender=CompanyConfig)
+@receiver([post_save, post_delete], sender=Tenant)
+def invalidate_request_context(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(invalidate_all)
+
 def _seed_noc_vendor(company: Organization):
     """Create the Nepal Oil Corporation vendor and supporting records for a company."""
     from accounting.models import AccountType, ChartOfAccount, Currency, Vendor
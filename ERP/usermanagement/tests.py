@@ -51,4 +51,54 @@ class SelectOrganizationViewTest(TestCase):
         self.assertIn(resp.status_code, (302, 303))
         # check session set
         session = self.client.session
-        self.assertEqual(session.get('active_organization_id'), self.org2.id)
\ No newline at end of file
+        self.assertEqual(session.get('active_organization_id'), self.org2.id)
+
+class ActiveOrganizationMiddlewareCacheTest(TestCase):
+    def setUp(self):
+        from django.contrib.sessions.middleware import SessionMiddleware
+        from django.core.cache import cache
+        from django.test import RequestFactory
+
+        from .middleware import ActiveOrganizationMiddleware
+
+        cache.clear()
+        self.org1 = Organization.objects.create(name="Org One", code="ORG1", type="company")
+        self.org2 = Organization.objects.create(name="Org Two", code="ORG2", type="company")
+        self.user = CustomUser.objects.create_user(username="ctxuser", password="pass", organization=self.org1)
+        UserOrganization.objects.create(user=self.user, organization=self.org1, is_active=True)
+        self.factory = RequestFactory()
+        self.sessions = SessionMiddleware(lambda r: None)
+        self.middleware = ActiveOrganizationMiddleware(lambda r: r)
+        self.session = None
+
+    def _resolve(self):
+        request = self.factory.get("/")
+        request.user = self.user
+        if self.session is None:
+            self.sessions.process_request(request)
+            self.session = request.session
+        request.session = self.session
+        return self.middleware(request).organization
+
+    def test_warm_request_resolves_without_queries(self):
+        self.assertEqual(self._resolve(), self.org1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._resolve(), self.org1)
+
+    def test_membership_change_is_picked_up(self):
+        self.assertEqual(self._resolve(), self.org1)
+        UserOrganization.objects.filter(user=self.user).delete()
+        UserOrganization.objects.create(user=self.user, organization=self.org2, is_active=True)
+        self.session["active_organization_id"] = self.org2.id
+        self.assertEqual(self._resolve(), self.org2)
+
+    def test_membership_change_bumps_the_version_again_on_commit(self):
+        from .request_context import _versions
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            UserOrganization.objects.create(user=self.user, organization=self.org2, is_active=True)
+        # A request that resolved from pre-commit rows cached under this version.
+        before_commit = _versions(self.user.pk)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(_versions(self.user.pk), before_commit)
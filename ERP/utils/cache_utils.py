@@ -7,11 +7,14 @@ cache invalidation strategies, and organization-aware caching.
 
 import hashlib
 import json
+import time
+from functools import wraps
 from typing import Optional, Dict, List, Any, Tuple, Union, Callable
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from django.core.cache import cache
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
@@ -19,10 +22,92 @@ from django.utils import timezone
 from .organization import OrganizationService
 
 
+class CacheTags:
+    """
+    Generation-based cache invalidation.
+
+    Every tag (``org:12``, ``account:40`` ...) has an integer generation stored
+    in the cache. Tagged keys embed the current generation of each of their
+    tags, so bumping a tag's generation makes every key built under it
+    unreachable in O(1); the orphaned entries simply expire. Only ``get_many``,
+    ``add`` and ``incr`` are used, which both Redis and LocMem implement
+    atomically.
+    """
+
+    COUNTER_PREFIX = "cachegen"
+
+    @staticmethod
+    def organization(organization_id: Any) -> str:
+        return f"org:{organization_id}"
+
+    @staticmethod
+    def account(account_id: Any) -> str:
+        return f"account:{account_id}"
+
+    @staticmethod
+    def ledger(organization_id: Any) -> str:
+        """Data derived from an organization's postings (trees, reports)."""
+        return f"ledger:{organization_id}"
+
+    @staticmethod
+    def user(user_id: Any) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def tenant(tenant_id: Any) -> str:
+        return f"tenant:{tenant_id}"
+
+    EXCHANGE_RATES = "exchange_rates"
+
+    @staticmethod
+    def _counter_key(tag: str) -> str:
+        return f"{CacheTags.COUNTER_PREFIX}:{tag}"
+
+    @staticmethod
+    def _seed() -> int:
+        # Seeding from the clock keeps generations moving forward even when a
+        # counter was evicted, so stale entries never become reachable again.
+        return time.time_ns() // 1_000
+
+    @staticmethod
+    def generations(tags: List[str]) -> Dict[str, int]:
+        """Return the current generation for each tag, creating missing counters."""
+        counter_keys = {CacheTags._counter_key(tag): tag for tag in tags}
+        found = cache.get_many(list(counter_keys))
+        missing = [key for key in counter_keys if key not in found]
+        if missing:
+            for key in missing:
+                cache.add(key, CacheTags._seed(), None)
+            found.update(cache.get_many(missing))
+        return {tag: found.get(key, 0) for key, tag in counter_keys.items()}
+
+    @staticmethod
+    def tagged_key(base_key: str, *tags: str) -> str:
+        """Append the current generations of ``tags`` to ``base_key``."""
+        if not tags:
+            return base_key
+        generations = CacheTags.generations(list(tags))
+        return f"{base_key}|g:" + ".".join(str(generations[tag]) for tag in tags)
+
+    @staticmethod
+    def invalidate(*tags: str) -> None:
+        """Bump the generation of each tag, invalidating every key built under it."""
+        for tag in tags:
+            key = CacheTags._counter_key(tag)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Counter missing or evicted: start a new, later generation.
+                cache.set(key, CacheTags._seed(), None)
+
+
 class CacheManager:
     """
     Centralized cache management with organization awareness and
     intelligent invalidation strategies.
+
+    Keys are versioned through ``CacheTags`` so invalidation never needs to
+    enumerate or pattern-match keys.
     """
 
     # Cache key prefixes
@@ -52,14 +137,7 @@ class CacheManager:
         Returns:
             Cached balance or None
         """
-        from decimal import Decimal
-
-        key = CacheManager._make_key(
-            CacheManager.ACCOUNT_BALANCE,
-            account_id=account_id,
-            organization_id=organization_id
-        )
-
+        key = CacheManager._account_balance_key(account_id, organization_id)
         cached = cache.get(key)
         return Decimal(str(cached)) if cached is not None else None
 
@@ -73,12 +151,7 @@ class CacheManager:
             organization_id: Organization ID
             balance: Balance to cache
         """
-        key = CacheManager._make_key(
-            CacheManager.ACCOUNT_BALANCE,
-            account_id=account_id,
-            organization_id=organization_id
-        )
-
+        key = CacheManager._account_balance_key(account_id, organization_id)
         cache.set(key, str(balance), CacheManager.MEDIUM_TIMEOUT)
 
     @staticmethod
@@ -94,15 +167,7 @@ class CacheManager:
         Returns:
             Cached exchange rate or None
         """
-        from decimal import Decimal
-
-        key = CacheManager._make_key(
-            CacheManager.EXCHANGE_RATE,
-            from_currency=from_currency,
-            to_currency=to_currency,
-            organization_id=organization_id
-        )
-
+        key = CacheManager._exchange_rate_key(from_currency, to_currency, organization_id)
         cached = cache.get(key)
         return Decimal(str(cached)) if cached is not None else None
 
@@ -122,13 +187,7 @@ class CacheManager:
             rate: Exchange rate to cache
             organization_id: Organization ID (optional)
         """
-        key = CacheManager._make_key(
-            CacheManager.EXCHANGE_RATE,
-            from_currency=from_currency,
-            to_currency=to_currency,
-            organization_id=organization_id
-        )
-
+        key = CacheManager._exchange_rate_key(from_currency, to_currency, organization_id)
         cache.set(key, str(rate), CacheManager.LONG_TIMEOUT)
 
     @staticmethod
@@ -143,10 +202,13 @@ class CacheManager:
         Returns:
             Cached permissions dictionary or None
         """
-        key = CacheManager._make_key(
-            CacheManager.USER_PERMISSIONS,
-            user_id=user_id,
-            organization_id=organization_id
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.USER_PERMISSIONS,
+                user_id=user_id,
+                organization_id=organization_id
+            ),
+            CacheTags.user(user_id),
         )
 
         return cache.get(key)
@@ -161,10 +223,13 @@ class CacheManager:
             permissions: Permissions dictionary to cache
             organization_id: Organization ID (optional)
         """
-        key = CacheManager._make_key(
-            CacheManager.USER_PERMISSIONS,
-            user_id=user_id,
-            organization_id=organization_id
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.USER_PERMISSIONS,
+                user_id=user_id,
+                organization_id=organization_id
+            ),
+            CacheTags.user(user_id),
         )
 
         cache.set(key, permissions, CacheManager.MEDIUM_TIMEOUT)
@@ -181,10 +246,14 @@ class CacheManager:
         Returns:
             Cached account tree or None
         """
-        key = CacheManager._make_key(
-            CacheManager.ACCOUNT_TREE,
-            organization_id=organization_id,
-            include_balances=include_balances
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.ACCOUNT_TREE,
+                organization_id=organization_id,
+                include_balances=include_balances
+            ),
+            CacheTags.organization(organization_id),
+            CacheTags.ledger(organization_id),
         )
 
         return cache.get(key)
@@ -199,10 +268,14 @@ class CacheManager:
             tree: Account tree to cache
             include_balances: Whether tree includes balances
         """
-        key = CacheManager._make_key(
-            CacheManager.ACCOUNT_TREE,
-            organization_id=organization_id,
-            include_balances=include_balances
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.ACCOUNT_TREE,
+                organization_id=organization_id,
+                include_balances=include_balances
+            ),
+            CacheTags.organization(organization_id),
+            CacheTags.ledger(organization_id),
         )
 
         cache.set(key, tree, CacheManager.MEDIUM_TIMEOUT)
@@ -225,11 +298,15 @@ class CacheManager:
             Cached report data or None
         """
         params_hash = CacheManager._hash_params(params or {})
-        key = CacheManager._make_key(
-            CacheManager.FINANCIAL_REPORT,
-            report_type=report_type,
-            organization_id=organization_id,
-            params_hash=params_hash
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.FINANCIAL_REPORT,
+                report_type=report_type,
+                organization_id=organization_id,
+                params_hash=params_hash
+            ),
+            CacheTags.organization(organization_id),
+            CacheTags.ledger(organization_id),
         )
 
         return cache.get(key)
@@ -251,11 +328,15 @@ class CacheManager:
             params: Report parameters
         """
         params_hash = CacheManager._hash_params(params or {})
-        key = CacheManager._make_key(
-            CacheManager.FINANCIAL_REPORT,
-            report_type=report_type,
-            organization_id=organization_id,
-            params_hash=params_hash
+        key = CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.FINANCIAL_REPORT,
+                report_type=report_type,
+                organization_id=organization_id,
+                params_hash=params_hash
+            ),
+            CacheTags.organization(organization_id),
+            CacheTags.ledger(organization_id),
         )
 
         cache.set(key, report_data, CacheManager.SHORT_TIMEOUT)
@@ -268,41 +349,36 @@ class CacheManager:
         Args:
             organization_id: Organization ID
         """
-        # Pattern-based invalidation for organization-specific data
-        patterns = [
-            f"{CacheManager.ACCOUNT_BALANCE}:*:{organization_id}",
-            f"{CacheManager.ACCOUNT_TREE}:{organization_id}:*",
-            f"{CacheManager.FINANCIAL_REPORT}:*:{organization_id}:*",
-            f"{CacheManager.ORGANIZATION_DATA}:{organization_id}:*",
-        ]
-
-        for pattern in patterns:
-            CacheManager._delete_pattern(pattern)
+        CacheTags.invalidate(CacheTags.organization(organization_id))
 
     @staticmethod
     def invalidate_account_cache(account_id: int, organization_id: int) -> None:
         """
         Invalidate cache entries for a specific account.
 
+        The account's balance is invalidated along with the organization's
+        ledger-derived entries (account trees and financial reports), since
+        those include the account's balance.
+
         Args:
             account_id: Account ID
             organization_id: Organization ID
         """
-        # Invalidate account balance
-        balance_key = CacheManager._make_key(
-            CacheManager.ACCOUNT_BALANCE,
-            account_id=account_id,
-            organization_id=organization_id
-        )
-        cache.delete(balance_key)
+        CacheManager.invalidate_accounts_cache([account_id], organization_id)
 
-        # Invalidate account trees (since they include balances)
-        tree_pattern = f"{CacheManager.ACCOUNT_TREE}:{organization_id}:*"
-        CacheManager._delete_pattern(tree_pattern)
+    @staticmethod
+    def invalidate_accounts_cache(account_ids: List[int], organization_id: int) -> None:
+        """
+        Invalidate cache entries for several accounts of one organization.
 
-        # Invalidate financial reports that might include this account
-        report_pattern = f"{CacheManager.FINANCIAL_REPORT}:*:{organization_id}:*"
-        CacheManager._delete_pattern(report_pattern)
+        Args:
+            account_ids: Account IDs
+            organization_id: Organization ID
+        """
+        CacheTags.invalidate(
+            *(CacheTags.account(account_id) for account_id in account_ids),
+            CacheTags.ledger(organization_id),
+        )
 
     @staticmethod
     def invalidate_user_permissions(user_id: int) -> None:
@@ -312,15 +388,41 @@ class CacheManager:
         Args:
             user_id: User ID
         """
-        permissions_pattern = f"{CacheManager.USER_PERMISSIONS}:{user_id}:*"
-        CacheManager._delete_pattern(permissions_pattern)
+        CacheTags.invalidate(CacheTags.user(user_id))
 
     @staticmethod
     def invalidate_exchange_rates() -> None:
         """
         Invalidate all cached exchange rates.
         """
-        CacheManager._delete_pattern(f"{CacheManager.EXCHANGE_RATE}:*")
+        CacheTags.invalidate(CacheTags.EXCHANGE_RATES)
+
+    @staticmethod
+    def _account_balance_key(account_id: int, organization_id: int) -> str:
+        return CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.ACCOUNT_BALANCE,
+                account_id=account_id,
+                organization_id=organization_id
+            ),
+            CacheTags.organization(organization_id),
+            CacheTags.account(account_id),
+        )
+
+    @staticmethod
+    def _exchange_rate_key(from_currency: str, to_currency: str, organization_id: Optional[int]) -> str:
+        tags = [CacheTags.EXCHANGE_RATES]
+        if organization_id is not None:
+            tags.append(CacheTags.organization(organization_id))
+        return CacheTags.tagged_key(
+            CacheManager._make_key(
+                CacheManager.EXCHANGE_RATE,
+                from_currency=from_currency,
+                to_currency=to_currency,
+                organization_id=organization_id
+            ),
+            *tags,
+        )
 
     @staticmethod
     def _make_key(prefix: str, **kwargs) -> str:
@@ -355,29 +457,6 @@ class CacheManager:
         sorted_params = json.dumps(params, sort_keys=True, default=str)
         return hashlib.md5(sorted_params.encode()).hexdigest()[:8]
 
-    @staticmethod
-    def _delete_pattern(pattern: str) -> None:
-        """
-        Delete cache keys matching a pattern.
-
-        Args:
-            pattern: Pattern to match (simplified implementation)
-        """
-        # Note: This is a simplified pattern deletion
-        # In production, you might want to use a more sophisticated
-        # cache backend that supports pattern deletion, or maintain
-        # a registry of keys to delete them individually
-
-        # For Redis-like caches, you could use:
-        # if hasattr(cache, 'delete_pattern'):
-        #     cache.delete_pattern(pattern)
-        # else:
-        #     # Fallback: individual key deletion if you maintain a registry
-        #     pass
-
-        # For now, we'll rely on timeout-based expiration
-        pass
-
 
 class CachedResult:
     """
@@ -397,25 +476,38 @@ class CachedResult:
         self.user_aware = user_aware
 
     def __call__(self, func: Callable) -> Callable:
+        @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
             key_components = [self.key_prefix or func.__name__]
+            tags = []
+            # Methods of organization-bound objects (``self.organization``) are
+            # keyed by that organization rather than by ``self``; model
+            # instances also add their pk so siblings don't share an entry.
+            bound_org = getattr(args[0], 'organization', None) if args else None
 
             if self.organization_aware:
                 # Assume first arg after self is organization
-                org = kwargs.get('organization') or (args[1] if len(args) > 1 else None)
+                org = kwargs.get('organization') or bound_org or (args[1] if len(args) > 1 else None)
                 if org:
-                    key_components.append(f"org={getattr(org, 'id', org)}")
+                    org_id = getattr(org, 'id', org)
+                    key_components.append(f"org={org_id}")
+                    tags.extend([CacheTags.organization(org_id), CacheTags.ledger(org_id)])
 
             if self.user_aware:
                 # Assume first arg after self is user
                 user = kwargs.get('user') or (args[1] if len(args) > 1 else None)
                 if user:
-                    key_components.append(f"user={getattr(user, 'id', user)}")
+                    user_id = getattr(user, 'id', user)
+                    key_components.append(f"user={user_id}")
+                    tags.append(CacheTags.user(user_id))
 
             # Add function arguments to key
             for i, arg in enumerate(args):
-                if i == 0 and hasattr(func, '__self__'):  # Skip self
+                if i == 0 and (hasattr(func, '__self__') or bound_org is not None):  # Skip self
+                    pk = getattr(arg, 'pk', None)
+                    if bound_org is not None and pk is not None:
+                        key_components.append(f"arg0={type(arg).__name__}:{pk}")
                     continue
                 key_components.append(f"arg{i}={arg}")
 
@@ -423,7 +515,7 @@ class CachedResult:
                 if key not in ['organization', 'user']:  # Skip special params
                     key_components.append(f"{key}={value}")
 
-            cache_key = ":".join(str(c) for c in key_components)
+            cache_key = CacheTags.tagged_key(":".join(str(c) for c in key_components), *tags)
 
             # Try to get from cache
             result = cache.get(cache_key)
@@ -475,28 +567,40 @@ class CacheInvalidationManager:
     def _invalidate_account_cache(sender, instance, **kwargs):
         """Invalidate cache when account changes."""
         if hasattr(instance, 'organization_id'):
-            CacheManager.invalidate_account_cache(instance.id, instance.organization_id)
+            account_id, organization_id = instance.pk, instance.organization_id
+            # Bump after commit so concurrent readers cannot re-cache pre-commit data.
+            transaction.on_commit(
+                lambda: CacheManager.invalidate_account_cache(account_id, organization_id)
+            )
 
     @staticmethod
     def _invalidate_journal_cache(sender, instance, **kwargs):
         """Invalidate cache when journal changes."""
-        # Invalidate account balances affected by this journal
-        if hasattr(instance, 'lines'):
-            for line in instance.lines.all():
-                if hasattr(line, 'account') and hasattr(line.account, 'organization_id'):
-                    CacheManager.invalidate_account_cache(
-                        line.account.id,
-                        line.account.organization_id
-                    )
-
-        # Invalidate financial reports
-        if hasattr(instance, 'organization_id'):
-            CacheManager.invalidate_organization_cache(instance.organization_id)
+        # Invalidate account balances affected by this journal, plus the
+        # organization's trees and reports, with one bump per tag. The ids are
+        # read now, while the lines are visible; the bump waits for the commit.
+        if hasattr(instance, 'organization_id') and instance.pk and hasattr(instance, 'lines'):
+            account_ids = list(instance.lines.values_list('account_id', flat=True).distinct())
+            organization_id = instance.organization_id
+            transaction.on_commit(
+                lambda: CacheManager.invalidate_accounts_cache(account_ids, organization_id)
+            )
 
     @staticmethod
     def _invalidate_exchange_rate_cache(sender, instance, **kwargs):
         """Invalidate cache when exchange rates change."""
-        CacheManager.invalidate_exchange_rates()
+        transaction.on_commit(CacheManager.invalidate_exchange_rates)
+
+
+def invalidate_now_and_on_commit(invalidate: Callable[..., None], *args: Any) -> None:
+    """
+    Call ``invalidate(*args)`` now and again once the current transaction commits.
+
+    The first call stops readers from serving the old data; the second drops
+    anything another request rebuilt from pre-commit rows in between.
+    """
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
 
 
 class CacheStats:
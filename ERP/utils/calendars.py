@@ -150,6 +150,48 @@ def maybe_coerce_bs_date(value: str) -> Optional[datetime.date]:
     return bs_to_ad(normalized)
 
 
+def month_start(value: DateLike, mode: str = CalendarMode.AD) -> Optional[datetime.date]:
+    """AD date on which the AD or BS calendar month containing ``value`` begins."""
+    date_obj = _ensure_date(value)
+    if not date_obj:
+        return None
+    if CalendarMode.normalize(mode) == CalendarMode.BS:
+        components = _split_bs(ad_to_bs_string(date_obj) or "")
+        start = bs_to_ad((components[0], components[1], 1)) if components else None
+        if start:
+            return start
+    return date_obj.replace(day=1)
+
+
+def recent_months(
+    end: DateLike, count: int, mode: str = CalendarMode.AD
+) -> list[tuple[datetime.date, datetime.date, str]]:
+    """
+    The ``count`` calendar months ending with the one that contains ``end``.
+
+    Returns ``(first_day, last_day, "YYYY-MM")`` tuples, oldest first; the
+    days are AD dates and the label is in the requested calendar.
+    """
+    end_date = _ensure_date(end)
+    if not end_date or count <= 0:
+        return []
+    starts = [month_start(end_date, mode)]
+    while len(starts) < count:
+        starts.insert(0, month_start(starts[0] - datetime.timedelta(days=1), mode))
+    # No month in either calendar is longer than 32 days.
+    following = month_start(starts[-1] + datetime.timedelta(days=32), mode)
+    bounds = starts + [following]
+    bs = CalendarMode.normalize(mode) == CalendarMode.BS
+    return [
+        (
+            start,
+            bounds[index + 1] - datetime.timedelta(days=1),
+            (ad_to_bs_string(start) or start.isoformat())[:7] if bs else start.strftime("%Y-%m"),
+        )
+        for index, start in enumerate(starts)
+    ]
+
+
 def get_calendar_mode(source=None, default: str = CalendarMode.DEFAULT) -> str:
     """
     Resolve the calendar mode from various sources (model, dict, settings-like object).
@@ -1,7 +1,14 @@
 """
 Rate limiting configuration for Himalytix ERP API
 """
-from django.core.cache import cache
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import cache, caches
 from functools import wraps
 from django.http import JsonResponse
 
@@ -26,3 +33,111 @@ def rate_limit_key(group, request):
 class RateLimitExceeded(Exception):
     """Exception raised when rate limit is exceeded."""
     pass
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of one ``SlidingWindowLimiter.hit``."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # epoch seconds at which the oldest counted request leaves the window
+
+    @property
+    def retry_after(self) -> int:
+        return max(0, math.ceil(self.reset - time.time()))
+
+    def headers(self) -> dict:
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(int(math.ceil(self.reset))),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after)
+        return headers
+
+
+# KEYS[1] = log key; ARGV = now, window, limit, member.
+# Drops expired entries, then records the request only if it fits, all in one
+# round trip. Rejected requests are not logged, so a client that keeps retrying
+# is released as soon as its oldest accepted request ages out.
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+local reset = now + window
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+return {allowed, count, tostring(reset)}
+"""
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window-log rate limiter: at most ``limit`` requests in any
+    ``window`` seconds, counted exactly.
+
+    With django-redis each ``hit`` is one atomic Lua call against a sorted set.
+    Other cache backends (LocMem in tests and development) keep the log in the
+    Django cache behind a process-wide lock, which is exact because LocMem is
+    itself per-process.
+    """
+
+    def __init__(self, cache_alias: str = 'default'):
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._script = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _redis_script(self):
+        if self._script is None:
+            try:
+                from django_redis.cache import RedisCache
+                from django_redis import get_redis_connection
+            except ImportError:
+                return None
+            if not isinstance(self.cache, RedisCache):
+                return None
+            self._script = get_redis_connection(self.cache_alias).register_script(_SLIDING_WINDOW_LUA)
+        return self._script
+
+    def hit(self, key: str, limit: int, window: int, now: Optional[float] = None) -> RateLimitResult:
+        """Count one request against ``key`` and report whether it is allowed."""
+        now = time.time() if now is None else now
+        script = self._redis_script()
+        if script is not None:
+            allowed, count, reset = script(
+                keys=[self.cache.make_key(key)],
+                args=[now, window, limit, f'{now:.6f}:{uuid.uuid4().hex[:8]}'],
+            )
+            return RateLimitResult(bool(allowed), limit, max(0, limit - int(count)), float(reset))
+        return self._hit_local(key, limit, window, now)
+
+    def _hit_local(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        with self._lock:
+            log = [stamp for stamp in self.cache.get(key, []) if stamp > now - window]
+            allowed = len(log) < limit
+            if allowed:
+                log.append(now)
+            self.cache.set(key, log, window)
+        reset = (log[0] if log else now) + window
+        return RateLimitResult(allowed, limit, max(0, limit - len(log)), reset)
+
+
+limiter = SlidingWindowLimiter()
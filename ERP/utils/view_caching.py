@@ -13,6 +13,8 @@ from django.views.decorators.vary import vary_on_headers
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from rest_framework.response import Response
 from rest_framework.request import Request as DRFRequest
+
+from utils.cache_utils import CacheTags
 import logging
 
 logger = logging.getLogger(__name__)
@@ -112,13 +114,27 @@ def cache_view_per_tenant(timeout: int = 300):
         @cache_view_per_tenant(timeout=600)
         def tenant_dashboard(request):
             return render(request, 'tenant_dashboard.html')
+
+    Entries are tagged with the tenant and active organization, so
+    ``CacheTags.invalidate(CacheTags.tenant(tenant_id))`` or
+    ``CacheManager.invalidate_organization_cache(org_id)`` drops them.
     """
     def decorator(view_func):
         @wraps(view_func)
         def wrapped_view(request, *args, **kwargs):
             # Get tenant from request (adjust based on your multi-tenant setup)
-            tenant_id = getattr(request, 'tenant_id', 'default')
-            cache_key = f"view:tenant:{tenant_id}:{view_func.__name__}:{request.path}"
+            tenant = getattr(request, 'tenant', None)
+            tenant_id = getattr(request, 'tenant_id', None) or getattr(tenant, 'pk', None) or 'default'
+            tags = [CacheTags.tenant(tenant_id)]
+            organization = getattr(request, 'organization', None)
+            organization_id = getattr(organization, 'pk', None)
+            if organization_id is not None:
+                tags.append(CacheTags.organization(organization_id))
+            # The organization is part of the key itself; tags only invalidate.
+            cache_key = CacheTags.tagged_key(
+                f"view:tenant:{tenant_id}:org={organization_id}:{view_func.__name__}:{request.path}",
+                *tags,
+            )
             
             cached_response = cache.get(cache_key)
             if cached_response is not None:
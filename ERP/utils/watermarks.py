@@ -0,0 +1,77 @@
+"""
+Id watermarks that survive out-of-order commits.
+
+Auto-increment ids are handed out when a row is inserted, not when its
+transaction commits, so a long transaction can commit id 90 after id 100 is
+already visible. A job that remembers "processed through 100" would skip
+id 90 for good.
+
+``settled_id`` walks the ids after a watermark and stops in front of the
+first gap that may still be filled by an open transaction. A gap is settled
+(rolled back, or lost to sequence caching) once the row after it is older
+than every transaction still open:
+
+* PostgreSQL: the oldest ``xact_start`` of the other sessions in
+  ``pg_stat_activity``, less ``TIMESTAMP_SLACK`` because row timestamps are
+  taken when the model instance is built, slightly before the insert;
+* SQLite: writers are serialized, so every gap is already settled;
+* other backends: ``now - SETTLE_GRACE``.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.db import connections
+from django.utils import timezone
+
+SETTLE_GRACE = timedelta(hours=1)
+TIMESTAMP_SLACK = timedelta(minutes=1)
+CHUNK_SIZE = 2000
+
+
+def oldest_open_transaction(using: str = "default") -> datetime:
+    """Start of the oldest transaction, other than ours, that may still insert rows."""
+    connection = connections[using]
+    now = timezone.now()
+    if connection.vendor == "sqlite":
+        return now
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT min(xact_start) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid() "
+                "AND xact_start IS NOT NULL"
+            )
+            started = cursor.fetchone()[0]
+        return min(started, now) - TIMESTAMP_SLACK if started else now
+    return now - SETTLE_GRACE
+
+
+def settled_id(
+    model,
+    after_id: Optional[int],
+    *,
+    timestamp_field: str = "created_at",
+    using: str = "default",
+) -> int:
+    """
+    Highest id of ``model`` a watermark can safely advance to from ``after_id``.
+
+    Every id up to the result is either visible now or can no longer appear.
+    Returns ``after_id`` (0 when ``None``) if nothing past it has settled.
+    The walk spans the whole table, not one organization, because the id
+    sequence is shared.
+    """
+    pk_name = model._meta.pk.attname
+    cutoff = oldest_open_transaction(using)
+    settled = after_id or 0
+    rows = (
+        model._default_manager.using(using)
+        .filter(**{f"{pk_name}__gt": settled})
+        .order_by(pk_name)
+        .values_list(pk_name, timestamp_field)
+    )
+    for pk, created in rows.iterator(chunk_size=CHUNK_SIZE):
+        if pk != settled + 1 and created >= cutoff:
+            break
+        settled = pk
+    return settled